@@ -0,0 +1,640 @@
+#!/usr/bin/env python3
+"""
+content_arena.py
+Uldtale-Battlesim Arena Load Test
+- asyncio stand-in for an ArenaNetworkManager host: one listening socket, one match per connected
+  peer. The game hosts a single match per instance (MAX_CLIENTS = 1); the stand-in serves many to
+  show where one host process saturates
+- Messages are ArenaNetworkManager's RPCs (_receive_match_setup, _register_player,
+  _receive_host_character, _player_ready, _start_match_signal, _send_action, _end_match), each
+  sent as one Godot Variant (var_to_bytes layout: [method, args...]) behind a 4-byte length over
+  TCP in place of ENet; payload sizes are the encoded Variant bytes
+- Simulated peers: characters built from classes.json / races.json / weapons.json / armors.json
+  (class base + race mods + level ups, CharacterData secondaries, one item per equipment slot)
+  serialized like _serialize_character / _serialize_equipment; actions are
+  BattleNetworkSync._serialize_action_result dictionaries, synthesized from the class skills or
+  replayed from the "action" events of a combat log (content_combatlog, --log)
+- Host side per message mirrors _register_player (decode + _deserialize_character field reads) and
+  _on_network_action_received (per-type timestamp duplicate checks, HP / resource application),
+  then answers with its own action
+- Report per concurrent match count: action round trip p50 / p99 (peer sends its action ->
+  host's answering action arrives), host handling time, payload bytes per RPC, actions/s
+- "serve" runs the stand-in host alone so peers ("run --connect") can load it from other processes
+- --wire compact switches both sides to the content_wire format; --record saves the messages for
+  content_wire.py bench
+"""
+
+import os
+import sys
+import json
+import time
+import base64
+import random
+import struct
+import asyncio
+import argparse
+
+from content_data import JSON_FILES, safe_load
+from content_loot import RARITIES, equipment_templates
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_PORT = 7777  # ArenaNetworkManager.DEFAULT_PORT
+HOST_ID = 1
+
+# CharacterData primary attributes, with their classes.json / races.json key stems
+ATTRIBUTES = ("vitality", "strength", "dexterity", "intelligence", "faith",
+              "mind", "endurance", "arcane", "agility", "fortitude")
+STEMS = ("vit", "str", "dex", "int", "fai", "mnd", "end", "arc", "agi", "for")
+# BattleAction.ActionType; -2 is BattleNetworkSync's status damage sync
+ATTACK, SKILL, ITEM, DEFEND = range(4)
+STATUS_DAMAGE = -2
+ACTION_TYPES = {"attack": ATTACK, "skill": SKILL, "item": ITEM, "defend": DEFEND}
+ITEM_CHANCE = 0.1
+STATUS_SYNC_CHANCE = 0.15
+
+# Godot Variant encoding (core/io/marshalls.cpp)
+NIL, BOOL, INT, FLOAT, STRING = 0, 1, 2, 3, 4
+DICTIONARY, ARRAY = 27, 28
+FLAG_64 = 1 << 16
+HEADER = struct.Struct("<I")
+FRAME = struct.Struct("<I")
+
+
+# -------------------------
+# Wire format
+# -------------------------
+def encode_variant(value, out):
+    if value is None:
+        out += HEADER.pack(NIL)
+    elif isinstance(value, bool):
+        out += struct.pack("<II", BOOL, int(value))
+    elif isinstance(value, int):
+        if -2 ** 31 <= value < 2 ** 31:
+            out += struct.pack("<Ii", INT, value)
+        else:
+            out += struct.pack("<Iq", INT | FLAG_64, value)
+    elif isinstance(value, float):
+        try:
+            single = struct.unpack("<f", struct.pack("<f", value))[0]
+        except OverflowError:
+            single = None
+        if single == value:
+            out += struct.pack("<If", FLOAT, value)
+        else:
+            out += struct.pack("<Id", FLOAT | FLAG_64, value)
+    elif isinstance(value, str):
+        raw = value.encode("utf-8")
+        out += struct.pack("<II", STRING, len(raw)) + raw + b"\0" * (-len(raw) % 4)
+    elif isinstance(value, dict):
+        out += struct.pack("<II", DICTIONARY, len(value))
+        for k, v in value.items():
+            encode_variant(k, out)
+            encode_variant(v, out)
+    elif isinstance(value, (list, tuple)):
+        out += struct.pack("<II", ARRAY, len(value))
+        for v in value:
+            encode_variant(v, out)
+    else:
+        raise TypeError(f"no Variant encoding for {type(value).__name__}")
+    return out
+
+def decode_variant(buf, pos=0):
+    # -> (value, next position)
+    header, = HEADER.unpack_from(buf, pos)
+    kind, wide = header & 0xFFFF, header & FLAG_64
+    pos += 4
+    if kind == NIL:
+        return None, pos
+    if kind == BOOL:
+        return bool(HEADER.unpack_from(buf, pos)[0]), pos + 4
+    if kind == INT:
+        return struct.unpack_from("<q" if wide else "<i", buf, pos)[0], pos + (8 if wide else 4)
+    if kind == FLOAT:
+        return struct.unpack_from("<d" if wide else "<f", buf, pos)[0], pos + (8 if wide else 4)
+    if kind == STRING:
+        n, = HEADER.unpack_from(buf, pos)
+        pos += 4
+        return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n + (-n % 4)
+    if kind == DICTIONARY:
+        n, = HEADER.unpack_from(buf, pos)
+        pos += 4
+        out = {}
+        for _ in range(n & 0x7FFFFFFF):
+            k, pos = decode_variant(buf, pos)
+            out[k], pos = decode_variant(buf, pos)
+        return out, pos
+    if kind == ARRAY:
+        n, = HEADER.unpack_from(buf, pos)
+        pos += 4
+        out = []
+        for _ in range(n & 0x7FFFFFFF):
+            v, pos = decode_variant(buf, pos)
+            out.append(v)
+        return out, pos
+    raise ValueError(f"unsupported Variant type {kind}")
+
+class Channel:
+    # one side of a connection: framed RPCs plus per-method byte counts. With a content_wire codec
+    # messages are [method, args...] in the compact format, actions as per-direction deltas;
+    # `record` collects every message sent (as Variant bytes) under the channel's stream name
+    def __init__(self, reader, writer, sizes, codec=None, record=None, stream=""):
+        self.reader, self.writer, self.sizes = reader, writer, sizes
+        self.codec, self.record, self.stream = codec, record, stream
+        if codec is not None:
+            from content_wire import ActionStream
+            self.sent_actions, self.received_actions = ActionStream(codec), ActionStream(codec)
+
+    def send(self, method, *args):
+        if self.record is not None:
+            self.record.append((self.stream, bytes(encode_variant([method] + list(args), bytearray()))))
+        if self.codec is None:
+            payload = encode_variant([method] + list(args), bytearray())
+        else:
+            payload = self.codec.write(bytearray(), method)
+            for a in args:
+                payload += self.sent_actions.encode(a) if method == "_send_action" else self.codec.encode(a)
+        count = self.sizes.setdefault(method, [0, 0])
+        count[0] += 1
+        count[1] += len(payload)
+        self.writer.write(FRAME.pack(len(payload)) + payload)
+
+    async def recv(self):
+        # -> (method, args); ConnectionError when the other side went away
+        try:
+            n, = FRAME.unpack(await self.reader.readexactly(FRAME.size))
+            payload = await self.reader.readexactly(n)
+        except asyncio.IncompleteReadError:
+            raise ConnectionError("connection closed")
+        if self.codec is None:
+            message, _ = decode_variant(payload)
+            return message[0], message[1:]
+        method, pos = self.codec.read(payload, 0)
+        args = []
+        while pos < len(payload):
+            if method == "_send_action":
+                a, pos = self.received_actions.read(payload, pos)
+            else:
+                a, pos = self.codec.read(payload, pos)
+            args.append(a)
+        return method, args
+
+    def close(self):
+        self.writer.close()
+
+
+# -------------------------
+# Characters and actions
+# -------------------------
+class ArenaTables:
+    # what the simulated players are made of, read once from the content data
+    def __init__(self, data, log_actions=None):
+        classes = (data.get("Classes") or {}).get("playable") or {}
+        races = (data.get("Races") or {}).get("playable") or {}
+        self.classes = {k: v for k, v in classes.items() if isinstance(v, dict)}
+        self.races = {k: v for k, v in races.items() if isinstance(v, dict)}
+        if not self.classes or not self.races:
+            raise ValueError("classes.json / races.json have no playable entries")
+        self.skills = (data.get("Skills") or {}).get("skills") or {}
+        self.slots = {}
+        for item_id, _, entry in equipment_templates(data):
+            self.slots.setdefault(entry.get("slot", ""), []).append((item_id, entry))
+        self.slots.pop("", None)
+        self.items = sorted(k for k, v in (data.get("Consumables") or {}).items() if isinstance(v, dict))
+        self.log_actions = log_actions or []
+
+def build_character(tables, rng, name, level):
+    # CharacterFactory-like: class base + race mods, level - 1 level ups (+1 everywhere, 3 random +1s)
+    cls = rng.choice(sorted(tables.classes))
+    race = rng.choice(sorted(tables.races))
+    c, r = tables.classes[cls], tables.races[race]
+    stats = [int(c.get("base_" + s, 0) or 0) + int(r.get(s + "_mod", 0) or 0) + level - 1 for s in STEMS]
+    for _ in range(3 * (level - 1)):
+        stats[rng.randrange(len(stats))] += 1
+    a = dict(zip(ATTRIBUTES, stats))
+    character = {"name": name, "level": level, "race": race, "character_class": cls}
+    character.update(a)
+    # CharacterData.calculate_secondary_attributes (no equipment)
+    character["max_hp"] = a["vitality"] * 8 + a["strength"] * 3
+    character["max_mp"] = a["mind"] * 5 + a["intelligence"] * 3
+    character["max_sp"] = a["endurance"] * 5 + a["agility"] * 3
+    character["skills"] = [s for s in c.get("skills", []) or [] if s in tables.skills]
+    character["equipment"] = {slot: serialize_item(rng, item_id, entry, level)
+                              for slot, choices in sorted(tables.slots.items())
+                              for item_id, entry in [rng.choice(choices)]}
+    return character
+
+def serialize_item(rng, item_id, entry, level):
+    # ArenaNetworkManager._serialize_equipment of a generated drop; stat_modifiers are keyed by
+    # Skill.AttributeTarget (1..10), one per rarity tier above common
+    rarity = rng.choice(RARITIES)
+    mods = {rng.randint(1, len(ATTRIBUTES)): rng.randint(1, max(level, 1))
+            for _ in range(RARITIES.index(rarity))}
+    return {
+        "id": item_id, "key": item_id, "name": entry.get("name", item_id),
+        "type": entry.get("type", ""), "slot": entry.get("slot", ""),
+        "damage": int(entry.get("damage", 0) or 0), "armor_value": int(entry.get("armor_value", 0) or 0),
+        "rarity": rarity, "item_level": level,
+        "stat_modifiers": mods, "status_effect_type": 0, "status_effect_chance": 0.0, "bonus_damage": 0,
+        "item_prefix": "", "item_suffix": "", "flavor_text": entry.get("description", ""),
+        "rarity_applied": True, "base_item_level": level,
+    }
+
+def deserialize_character(data):
+    # the field reads _deserialize_character does (a missing key is a script error there)
+    out = {k: data[k] for k in ("name", "level", "race", "character_class", "max_hp", "max_mp", "max_sp")}
+    out.update((k, data[k]) for k in ATTRIBUTES)
+    out["skills"] = [s for s in data.get("skills", []) if s]
+    out["equipment"] = {slot: dict(item) for slot, item in data.get("equipment", {}).items()
+                        if isinstance(item, dict) and item}
+    out["hp"], out["mp"], out["sp"] = out["max_hp"], out["max_mp"], out["max_sp"]
+    return out
+
+def blank_action(kind, timestamp):
+    return {
+        "type": kind, "timestamp": timestamp, "damage": 0, "healing": 0,
+        "sp_cost": 0, "mp_cost": 0, "sp_gain": 0, "mp_gain": 0, "message": "",
+        "target_is_opponent": False, "is_drain": False,
+        "status_effects": [], "status_effects_removed": [], "buffs_debuffs": [],
+    }
+
+def make_action(tables, rng, me, foe, timestamp):
+    # a _serialize_action_result dictionary for `me` acting on `foe`
+    if tables.log_actions:
+        action = dict(rng.choice(tables.log_actions), timestamp=timestamp)
+        action["target_is_opponent"] = action["damage"] > 0 or not action["healing"]
+        return action
+    if tables.items and rng.random() < ITEM_CHANCE:
+        action = blank_action(ITEM, timestamp)
+        action["item_id"] = rng.choice(tables.items)
+        action["healing"] = int(me["max_hp"] * 0.2)
+        action["message"] = f"{me['name']} used {action['item_id']}"
+        return action
+    skill = tables.skills.get(rng.choice(me["skills"])) if me["skills"] and rng.random() < 0.7 else None
+    damage = int(foe["max_hp"] * rng.uniform(0.04, 0.12))
+    if skill is None:
+        action = blank_action(ATTACK, timestamp)
+        action["message"] = f"{me['name']} attacks {foe['name']} for {damage} damage"
+    else:
+        action = blank_action(SKILL, timestamp)
+        action["skill_name"] = skill.get("name", "")
+        phys = str(skill.get("ability_type", "")).upper() == "PHYSICAL"
+        action["sp_cost" if phys else "mp_cost"] = int(skill.get("sp_cost" if phys else "mp_cost", 0) or 0)
+        action["is_drain"] = str(skill.get("type", "")).upper() == "DRAIN"
+        effects = skill.get("status_effect") or []
+        effects = effects if isinstance(effects, list) else [effects]
+        action["status_effects"] = [{"name": e, "duration": int(skill.get("duration", 3) or 3)}
+                                    for e in effects if e and e != "NONE"]
+        action["message"] = f"{me['name']} uses {action['skill_name']} on {foe['name']} for {damage} damage"
+    action["damage"] = damage
+    action["target_is_opponent"] = True
+    return action
+
+def status_sync(me, timestamp):
+    # BattleNetworkSync.send_status_damage at turn start (never lethal here)
+    return {"type": STATUS_DAMAGE, "timestamp": timestamp, "damage": min(int(me["max_hp"] * 0.03), me["hp"] - 1),
+            "healing": 0, "message": f"{me['name']} suffers from burn", "target_is_opponent": False}
+
+def load_log_actions(paths):
+    # "action" events of combat logs as _serialize_action_result dictionaries
+    from content_combatlog import iter_range
+    out = []
+    for path in paths:
+        for e in iter_range(path, 0, os.path.getsize(path), skip=()):
+            if e.get("ev") != "action" or e.get("action") not in ACTION_TYPES:
+                continue
+            action = blank_action(ACTION_TYPES[e["action"]], 0)
+            action["damage"] = int(e.get("damage", 0) or 0)
+            action["healing"] = int(e.get("healing", 0) or 0)
+            action["status_effects"] = [{"name": n, "duration": 3} for n in e.get("effects", []) if n]
+            action["message"] = f"{e.get('actor', '')} -> {e.get('target', '')}"
+            if action["type"] == SKILL:
+                action["skill_name"] = e.get("skill", "")
+            elif action["type"] == ITEM:
+                action["item_id"] = e.get("skill", "")
+            out.append(action)
+    return out
+
+
+# -------------------------
+# Stand-in host
+# -------------------------
+def apply_action(data, actor, opponent):
+    # BattleNetworkSync._apply_opponent_action_result / _apply_status_damage as seen by either side
+    target = opponent if data.get("target_is_opponent", False) else actor
+    actor["sp"] = max(0, actor["sp"] - data.get("sp_cost", 0))
+    actor["mp"] = max(0, actor["mp"] - data.get("mp_cost", 0))
+    if data.get("damage", 0) > 0:
+        target["hp"] = max(0, target["hp"] - data["damage"])
+    if data.get("healing", 0) > 0:
+        healed = actor if data.get("is_drain", False) else target
+        healed["hp"] = min(healed["max_hp"], healed["hp"] + data["healing"])
+    return len(data.get("status_effects", [])) + len(data.get("buffs_debuffs", []))
+
+class MatchState:
+    # BattleNetworkSync's receiving side for one match
+    def __init__(self, me, foe):
+        self.me, self.foe = me, foe
+        self.last = {STATUS_DAMAGE: 0, ITEM: 0, None: 0}
+        self.duplicates = 0
+        self.effects = 0
+
+    def receive(self, data):
+        # _on_network_action_received: per-type timestamp duplicate check, then apply; -> False
+        # for a duplicate
+        kind = int(data.get("type", -1))
+        slot = kind if kind in (STATUS_DAMAGE, ITEM) else None
+        stamp = data.get("timestamp", 0)
+        if stamp > 0:
+            if stamp == self.last[slot]:
+                self.duplicates += 1
+                return False
+            self.last[slot] = stamp
+        self.effects += apply_action(data, self.foe, self.me)
+        return True
+
+class ArenaHost:
+    def __init__(self, tables, seed=0, level=10, codec=None, record=None):
+        self.tables = tables
+        self.codec, self.record = codec, record
+        self.rng = random.Random(seed)
+        self.level = level
+        self.sizes = {}
+        self.handle_us = []
+        self.matches = 0
+        self.errors = 0
+
+    async def serve(self, port, ready=None, backlog=1024):
+        # a backlog below the number of peers connecting at once leaves the overflow stuck in
+        # the accept queue until SYN-ACK retries run out
+        server = await asyncio.start_server(self._match, "127.0.0.1", port, backlog=backlog)
+        if ready is not None:
+            ready.set_result(server.sockets[0].getsockname()[1])
+        return server
+
+    async def _match(self, reader, writer):
+        ch = Channel(reader, writer, self.sizes, self.codec, self.record, f"h{self.matches}")
+        rng = random.Random(self.rng.getrandbits(32))
+        character = build_character(self.tables, rng, f"Host{self.matches}", self.level)
+        me = deserialize_character(character)
+        self.matches += 1
+        state = None
+        stamp = 0  # per match, so two answers in one millisecond are not taken for duplicates
+        try:
+            # _on_peer_connected
+            ch.send("_receive_match_setup", rng.getrandbits(31))
+            while True:
+                method, args = await ch.recv()
+                t0 = time.perf_counter()
+                if method == "_register_player":
+                    state = MatchState(me, deserialize_character(args[1]))
+                    ch.send("_receive_host_character", HOST_ID, character)
+                elif method == "_player_ready":
+                    # host readies at once; _start_match tells the peer it is not the host
+                    ch.send("_start_match_signal", False)
+                elif method == "_send_action":
+                    # items do not end the peer's turn; a lethal action is followed by _end_match
+                    if state.receive(args[0]) and args[0].get("type") not in (ITEM, STATUS_DAMAGE) \
+                            and me["hp"] > 0:
+                        stamp += 1
+                        if rng.random() < STATUS_SYNC_CHANCE:
+                            sync = status_sync(me, stamp)
+                            apply_action(sync, me, state.foe)
+                            ch.send("_send_action", sync)
+                        answer = make_action(self.tables, rng, me, state.foe, stamp)
+                        apply_action(answer, me, state.foe)
+                        ch.send("_send_action", answer)
+                        if state.foe["hp"] <= 0:
+                            ch.send("_end_match", HOST_ID)
+                elif method == "_end_match":
+                    break
+                self.handle_us.append((time.perf_counter() - t0) * 1e6)
+                await ch.writer.drain()
+        except ConnectionError:
+            pass
+        except Exception as e:
+            self.errors += 1
+            print(f"ERROR: match {me['name']}: {e!r}")
+        finally:
+            ch.close()
+
+
+# -------------------------
+# Simulated peers
+# -------------------------
+async def peer(tables, address, port, rng, index, level, think, max_turns, stats, codec=None, record=None):
+    reader, writer = await asyncio.open_connection(address, port)
+    ch = Channel(reader, writer, stats["sizes"], codec, record, f"p{index}")
+    peer_id = 1000 + index
+    character = build_character(tables, rng, f"Peer{index}", level)
+    try:
+        await ch.recv()  # _receive_match_setup
+        ch.send("_register_player", peer_id, character)
+        _, args = await ch.recv()  # _receive_host_character
+        state = MatchState(deserialize_character(character), deserialize_character(args[1]))
+        me, foe = state.me, state.foe
+        ch.send("_player_ready", peer_id)
+        await ch.recv()  # _start_match_signal
+        for turn in range(1, max_turns + 1):
+            if think:
+                await asyncio.sleep(think * rng.uniform(0.5, 1.5))
+            action = make_action(tables, rng, me, foe, turn)
+            apply_action(action, me, foe)
+            t0 = time.perf_counter()
+            ch.send("_send_action", action)
+            await ch.writer.drain()
+            stats["actions"] += 1
+            if foe["hp"] <= 0:
+                ch.send("_end_match", peer_id)
+                stats["wins"] += 1
+                break
+            if action["type"] == ITEM:
+                continue  # still our turn
+            # the host's answer, after an optional status damage sync
+            method, args = await ch.recv()
+            while method == "_send_action" and args[0].get("type") == STATUS_DAMAGE:
+                state.receive(args[0])
+                method, args = await ch.recv()
+            stats["rtt"].append((time.perf_counter() - t0) * 1000)
+            state.receive(args[0])
+            if me["hp"] <= 0:
+                await ch.recv()  # _end_match
+                break
+        stats["matches"] += 1
+        await ch.writer.drain()
+    finally:
+        ch.close()
+
+async def load_level(tables, matches, address=None, port=0, seed=0, level=10, think=0.0,
+                     max_turns=40, host=None, codec=None, record=None):
+    # `matches` peers at once against `host` (in-process) or a host at address:port
+    server = None
+    if address is None:
+        host = host or ArenaHost(tables, seed, level, codec, record)
+        ready = asyncio.get_running_loop().create_future()
+        server = await host.serve(0, ready, max(matches, 1024))
+        address, port = "127.0.0.1", await ready
+    stats = {"rtt": [], "sizes": {}, "actions": 0, "matches": 0, "wins": 0, "errors": 0}
+    rng = random.Random(seed)
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*[
+        peer(tables, address, port, random.Random(rng.getrandbits(32)), i, level, think, max_turns, stats,
+             codec, record)
+        for i in range(matches)], return_exceptions=True)
+    stats["seconds"] = time.perf_counter() - t0
+    for r in results:
+        if isinstance(r, BaseException):
+            stats["errors"] += 1
+            print(f"ERROR: peer: {r!r}")
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+        stats["handle_us"] = host.handle_us
+        stats["host_errors"] = host.errors
+        for method, (n, size) in host.sizes.items():
+            count = stats["sizes"].setdefault(method, [0, 0])
+            count[0] += n
+            count[1] += size
+    return stats
+
+def run(data, levels, seed=0, level=10, think=0.0, max_turns=40, address=None, port=DEFAULT_PORT,
+        log_actions=None, codec=None, record=None):
+    # -> [{"matches": n, ...stats}] for every concurrent match count in `levels`; `codec` switches
+    # to the content_wire format, `record` collects the messages sent
+    tables = ArenaTables(data, log_actions)
+    out = []
+    for n in levels:
+        stats = asyncio.run(load_level(tables, n, address, port, seed, level, think, max_turns,
+                                       codec=codec, record=record))
+        stats["concurrent"] = n
+        out.append(stats)
+    return out
+
+
+# -------------------------
+# Report
+# -------------------------
+def percentile(values, q):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+def format_report(results):
+    lines = [f"{'matches':>8} {'actions':>8} {'act/s':>9} {'rtt p50':>9} {'rtt p99':>9} "
+             f"{'host p50':>9} {'host p99':>9} {'errors':>7}"]
+    for s in results:
+        handle = s.get("handle_us", [])
+        lines.append(
+            f"{s['concurrent']:>8} {s['actions']:>8} {s['actions'] / max(s['seconds'], 1e-9):>9.0f} "
+            f"{percentile(s['rtt'], 0.5):>7.2f}ms {percentile(s['rtt'], 0.99):>7.2f}ms "
+            + (f"{percentile(handle, 0.5):>7.0f}us {percentile(handle, 0.99):>7.0f}us "
+               if handle else f"{'-':>9} {'-':>9} ")
+            + f"{s['errors'] + s.get('host_errors', 0):>7}")
+    sizes = {}
+    for s in results:
+        for method, (n, size) in s["sizes"].items():
+            count = sizes.setdefault(method, [0, 0])
+            count[0] += n
+            count[1] += size
+    lines.append("")
+    lines.append(f"{'rpc':<26} {'messages':>9} {'avg bytes':>10} {'total KiB':>10}")
+    for method, (n, size) in sorted(sizes.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{method:<26} {n:>9} {size / n:>10.0f} {size / 1024:>10.1f}")
+    return "\n".join(lines)
+
+def to_json(results):
+    out = []
+    for s in results:
+        handle = s.get("handle_us", [])
+        out.append({
+            "concurrent": s["concurrent"], "actions": s["actions"], "matches": s["matches"],
+            "seconds": round(s["seconds"], 4), "errors": s["errors"] + s.get("host_errors", 0),
+            "rtt_ms": {q: round(percentile(s["rtt"], v), 3) for q, v in (("p50", 0.5), ("p99", 0.99))},
+            "host_us": {q: round(percentile(handle, v), 1) for q, v in (("p50", 0.5), ("p99", 0.99))}
+                       if handle else None,
+            "bytes": {m: {"messages": n, "total": size} for m, (n, size) in s["sizes"].items()},
+        })
+    return json.dumps(out, indent=2)
+
+def load_data(root_dir):
+    return {tab: safe_load(os.path.join(root_dir, JSON_FILES[tab]))
+            for tab in ("Classes", "Races", "Skills", "Weapons", "Armors", "Consumables")}
+
+def parse_levels(text):
+    try:
+        levels = [int(x) for x in text.split(",") if x.strip()]
+    except ValueError:
+        levels = []
+    if not levels or min(levels) < 1:
+        raise argparse.ArgumentTypeError(f"bad match counts '{text}' (expected e.g. 10,100,500)")
+    return levels
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Load-test an arena host with simulated peers")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--level", type=int, default=10, help="character level (more stats, bigger items)")
+    ap.add_argument("--wire", choices=("variant", "compact"), default="variant",
+                    help="payload format: var_to_bytes or content_wire (needs data/wire_ids.json)")
+    sub = ap.add_subparsers(dest="command")
+    p = sub.add_parser("run", help="drive concurrent matches (default)")
+    p.add_argument("--matches", type=parse_levels, default=[10, 100, 300],
+                   help="comma-separated concurrent match counts")
+    p.add_argument("--turns", type=int, default=40, help="max actions per peer per match")
+    p.add_argument("--think", type=float, default=0.0, help="mean seconds a peer waits before acting")
+    p.add_argument("--connect", metavar="HOST:PORT", help="load an external host ('serve') instead")
+    p.add_argument("--log", nargs="*", default=[], help="replay action events from combat logs")
+    p.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    p.add_argument("--record", metavar="PATH", help="save every message sent, for content_wire.py bench")
+    p = sub.add_parser("serve", help="run only the stand-in host")
+    p.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = ap.parse_args(argv)
+
+    data = load_data(args.root)
+    codec = None
+    if args.wire == "compact":
+        from content_wire import TABLE_FILE, WireCodec, read_table
+        table = read_table(args.root)
+        if table is None:
+            print(f"ERROR: no {TABLE_FILE}; run 'content_wire.py build' first")
+            return 1
+        codec = WireCodec(table)
+    if args.command == "serve":
+        host = ArenaHost(ArenaTables(data), args.seed, args.level, codec)
+
+        async def serve_forever():
+            server = await host.serve(args.port)
+            print(f"arena host on 127.0.0.1:{args.port} (Ctrl+C to stop)")
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            print(f"{host.matches} match(es), {host.errors} error(s)")
+        return 0
+
+    if args.command is None:
+        args = ap.parse_args(list(argv or sys.argv[1:]) + ["run"])
+    address, port = None, DEFAULT_PORT
+    if args.connect:
+        address, _, port = args.connect.rpartition(":")
+        port = int(port)
+    log_actions = load_log_actions(args.log) if args.log else None
+    if args.log and not log_actions:
+        print("ERROR: no action events in " + ", ".join(args.log))
+        return 1
+    record = [] if args.record else None
+    results = run(data, args.matches, args.seed, args.level, args.think, args.turns, address, port,
+                  log_actions, codec, record)
+    if record is not None:
+        with open(args.record, "w", encoding="utf-8") as f:
+            for stream, payload in record:
+                f.write(json.dumps({"s": stream, "v": base64.b64encode(payload).decode("ascii")}) + "\n")
+    print(to_json(results) if args.json else format_report(results))
+    return 1 if any(s["errors"] or s.get("host_errors") for s in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+content_balance.py
+Uldtale-Battlesim Balance Simulator
+- Seeded Monte Carlo duels (playable class x race vs generated floor enemies) run as NumPy
+  batches: one array lane per duel, every turn advanced for all live duels at once
+- Reads the same JSON_FILES as the content manager (or its in-memory data, unsaved edits included)
+- Mirrors CharacterFactory / EnemyFactory stat setup and level ups, EnemyFactory.apply_enemy_scaling,
+  CharacterData.calculate_secondary_attributes, _basic_attack_inline / take_damage, and the
+  CombatManager.execute_skill cost/cooldown path for DAMAGE, DRAIN (HP) and HEAL skills
+- Momentum: enemy stat scaling (+10%/level) and the basic-attack damage bonus (+5%/level),
+  which MomentumSystem applies to both sides
+- Not modelled: equipment, items, buffs/debuffs, status effects, defend
+- Output: win-rate matrix per class x race x floor as a table, CSV or JSON
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+np = None  # numpy, imported on first use (load_numpy) so the tools reusing the formulas start fast
+
+from content_data import JSON_FILES, safe_load
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# primary attributes in CharacterData order, with their classes.json / races.json key stems
+STATS = ("vit", "str", "dex", "int", "fai", "mnd", "end", "arc", "agi", "for")
+VIT, STR, DEX, INT, FAI, MND, END, ARC, AGI, FOR = range(len(STATS))
+
+ATTACK_POWER_TYPES = ("strength", "dexterity")
+SPELL_POWER_TYPES = ("balanced", "intelligence", "arcane")
+ELEMENTS = ("EARTH", "FIRE", "ICE", "WIND", "LIGHTNING", "HOLY", "DARK")
+
+# skill kinds the simulated AI acts with (everything else is never chosen)
+KIND_NONE, KIND_DAMAGE, KIND_DRAIN, KIND_HEAL = range(4)
+RESOURCE_HP, RESOURCE_MP, RESOURCE_SP = range(3)
+
+MAX_MOMENTUM = 10  # MomentumSystem.MAX_MOMENTUM
+MOMENTUM_DAMAGE = 0.05  # MomentumSystem.DAMAGE_BONUS_PER_LEVEL
+
+# EnemyAI: chance to reach the damage-skill branch, HP fraction below which it heals
+SKILL_CHANCE = 0.75
+HEAL_BELOW = 0.5
+
+
+def load_numpy():
+    # -> the numpy module, or None when it is not installed (optional: only the simulator needs it)
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+def _require_numpy():
+    if load_numpy() is None:
+        print("ERROR: the balance simulator needs numpy (pip install numpy)")
+        sys.exit(1)
+
+
+# -------------------------
+# Game formulas (scalar, shared with the vectorized code)
+# -------------------------
+def base_multiplier(floor):
+    # EnemyFactory.get_base_multiplier
+    if floor <= 2:
+        return 1.0 + (floor - 1) * 0.05
+    if floor <= 5:
+        return 1.1 + (floor - 2) * 0.15
+    if floor <= 8:
+        return 1.45 + (floor - 5) * 0.20
+    if floor <= 11:
+        return 2.05 + (floor - 8) * 0.35
+    if floor <= 14:
+        return 3.05 + (floor - 11) * 0.45
+    if floor <= 17:
+        return 4.5 + (floor - 14) * 0.60
+    if floor <= 20:
+        return 6.5 + (floor - 17) * 0.75
+    return 9.0 + (floor - 20) * 0.90
+
+def enemy_multiplier(floor, wave=1, momentum=0, boss=False):
+    # EnemyFactory.apply_enemy_scaling total_multiplier
+    mult = base_multiplier(floor) * (1.0 + 0.15 * wave)
+    if momentum > 0:
+        mult *= 1.0 + momentum * 0.10
+    return mult * (1.5 if boss else 1.0)
+
+def elemental_multiplier(elements, bonus, resist, weak):
+    # product of ElementalDamage.calculate_elemental_damage multipliers over a skill's elements
+    mult = 1.0
+    for e in elements:
+        m = (1.0 + bonus.get(e, 0.0)) * (1.0 - resist.get(e, 0.0)) * (1.0 + weak.get(e, 0.0))
+        mult *= max(m, 0.1)
+    return mult
+
+
+# -------------------------
+# Content tables
+# -------------------------
+class BalanceTables:
+    # flat numeric tables built once from the content data
+    def __init__(self, data):
+        _require_numpy()  # also the entry point of content_sweep's worker processes
+        classes = data.get("Classes", {}) or {}
+        races = data.get("Races", {}) or {}
+        skills = (data.get("Skills", {}) or {}).get("skills", {}) or {}
+
+        self.player_classes = list(classes.get("playable", {}) or {})
+        self.enemy_classes = list(classes.get("non_playable", {}) or {})
+        self.player_races = list(races.get("playable", {}) or {})
+        self.enemy_races = list(races.get("non_playable", {}) or {})
+
+        # classes: player ones first, then enemy ones (indices into the tables below)
+        class_entries = [classes["playable"][c] for c in self.player_classes] + \
+                        [classes["non_playable"][c] for c in self.enemy_classes]
+        race_entries = [races["playable"][r] for r in self.player_races] + \
+                       [races["non_playable"][r] for r in self.enemy_races]
+
+        self.skill_names = [k for k, s in skills.items() if isinstance(s, dict)]
+        skill_ids = {k: i for i, k in enumerate(self.skill_names)}
+        self._build_skills(skills)
+
+        n_cls = len(class_entries)
+        self.class_base = np.zeros((n_cls, len(STATS)), dtype=np.int64)
+        self.class_ap = np.full(n_cls, -1, dtype=np.int64)
+        self.class_sp = np.full(n_cls, -1, dtype=np.int64)
+        class_skills = []
+        for i, c in enumerate(class_entries):
+            for j, stem in enumerate(STATS):
+                self.class_base[i, j] = int(c.get("base_" + stem, 0) or 0)
+            # an unknown power type leaves the power at 0, as calculate_secondary_attributes does
+            ap, sp = c.get("attack_power_type"), c.get("spell_power_type")
+            self.class_ap[i] = ATTACK_POWER_TYPES.index(ap) if ap in ATTACK_POWER_TYPES else -1
+            self.class_sp[i] = SPELL_POWER_TYPES.index(sp) if sp in SPELL_POWER_TYPES else -1
+            class_skills.append([skill_ids[s] for s in c.get("skills", []) or [] if s in skill_ids])
+        self.max_skills = max([len(s) for s in class_skills] + [1])
+        self.class_skills = np.full((n_cls, self.max_skills), -1, dtype=np.int64)
+        for i, ids in enumerate(class_skills):
+            self.class_skills[i, :len(ids)] = ids
+
+        n_race = len(race_entries)
+        self.race_mods = np.zeros((n_race, len(STATS)), dtype=np.int64)
+        for i, r in enumerate(race_entries):
+            for j, stem in enumerate(STATS):
+                self.race_mods[i, j] = int(r.get(stem + "_mod", 0) or 0)
+
+        # elemental multiplier per (skill, attacker race, defender race)
+        self.elem = np.ones((max(len(self.skill_names), 1), n_race, n_race))
+        for k, name in enumerate(self.skill_names):
+            elements = self.skill_elements[k]
+            if not elements:
+                continue
+            for a, ra in enumerate(race_entries):
+                bonus = ra.get("elemental_damage_bonuses", {}) or {}
+                for d, rd in enumerate(race_entries):
+                    self.elem[k, a, d] = elemental_multiplier(
+                        elements, bonus, rd.get("elemental_resistances", {}) or {},
+                        rd.get("elemental_weaknesses", {}) or {})
+
+    def _build_skills(self, skills):
+        n = max(len(self.skill_names), 1)
+        self.skill_kind = np.zeros(n, dtype=np.int64)
+        self.skill_power = np.zeros(n)
+        self.skill_cost = np.zeros(n)
+        self.skill_cost_mp = np.zeros(n, dtype=bool)
+        self.skill_cooldown = np.zeros(n, dtype=np.int64)
+        self.skill_phys = np.zeros(n, dtype=bool)
+        self.skill_drain_eff = np.zeros(n)
+        self.skill_drain_to = np.zeros(n, dtype=np.int64)
+        self.skill_elements = []
+        for k, name in enumerate(self.skill_names):
+            s = skills[name]
+            stype = str(s.get("type", "")).upper()
+            target = str(s.get("target", "")).upper()
+            offensive = target in ("ENEMY", "ALL_ENEMIES")
+            if stype == "DAMAGE" and offensive:
+                self.skill_kind[k] = KIND_DAMAGE
+            elif stype == "DRAIN" and offensive and str(s.get("drain_source", "HP")).upper() == "HP":
+                self.skill_kind[k] = KIND_DRAIN
+            elif stype == "HEAL":
+                self.skill_kind[k] = KIND_HEAL
+            phys = str(s.get("ability_type", "")).upper() == "PHYSICAL"
+            self.skill_phys[k] = phys
+            # CombatManager.execute_skill: physical skills cost SP, everything else MP
+            self.skill_cost_mp[k] = not phys
+            self.skill_cost[k] = float(s.get("sp_cost", 0) if phys else s.get("mp_cost", 0)) or 0.0
+            self.skill_power[k] = float(s.get("power", 0) or 0)
+            self.skill_cooldown[k] = int(s.get("cooldown", 0) or 0)
+            self.skill_drain_eff[k] = float(s.get("drain_efficiency", 0.5) or 0.0)
+            self.skill_drain_to[k] = ("HP", "MP", "SP").index(str(s.get("drain_restore", "HP")).upper()) \
+                if str(s.get("drain_restore", "HP")).upper() in ("HP", "MP", "SP") else RESOURCE_HP
+            elements = s.get("elements")
+            if not isinstance(elements, list):
+                elements = [s.get("element", "")]
+            self.skill_elements.append([str(e).upper() for e in elements if str(e).upper() in ELEMENTS])
+
+
+# -------------------------
+# Fighters
+# -------------------------
+def level_up(rng, stats, levels):
+    # CharacterData.level_up (levels - 1 times): +1 everywhere, then distribute_enemy_points
+    # (3 random +1s); player points are spent the same way since nobody picks them here
+    ups = np.maximum(levels - 1, 0)
+    stats = stats + ups[:, None]
+    if ups.any():
+        # one uniform stat pick per point, counted per lane (a multinomial without the per-row loop)
+        lane = np.repeat(np.arange(len(ups)), 3 * ups)
+        pick = lane * len(STATS) + rng.integers(0, len(STATS), len(lane))
+        stats = stats + np.bincount(pick, minlength=len(ups) * len(STATS)).reshape(len(ups), len(STATS))
+    return stats
+
+def secondary(stats, ap_type, sp_type):
+    # CharacterData.calculate_secondary_attributes with no equipment or buffs
+    s = stats.astype(np.float64)
+    vit, st, dex, it, fai, mnd, end, arc, agi, fort = (s[:, i] for i in range(len(STATS)))
+    out = {
+        "max_hp": stats[:, VIT] * 8 + stats[:, STR] * 3,
+        "max_mp": stats[:, MND] * 5 + stats[:, INT] * 3,
+        "max_sp": stats[:, END] * 5 + stats[:, AGI] * 3,
+        "toughness": (vit * 0.45 + st * 0.25 + end * 0.15 + fort * 0.15) / 10.0,
+        "dodge": 0.05 + (agi * 0.55 + dex * 0.35 + fort * 0.10) / 200.0,
+        "spell_ward": (fort * 0.5) * (0.6 * arc + 0.3 * mnd + 0.1 * fai) / 10.0,
+        "accuracy": 0.75 + (dex * 0.35 + agi * 0.25 + mnd * 0.25 + fort * 0.15) / 200.0,
+        "crit": 0.05 + (dex * 0.4 + agi * 0.25 + it * 0.2 + fort * 0.15) / 200.0,
+    }
+    out["attack_power"] = np.select(
+        [ap_type == 0, ap_type == 1],
+        [st * 2 + dex * 0.5 + vit * 0.5, dex * 2 + st * 0.5 + agi * 0.5], 0.0)
+    out["spell_power"] = np.select(
+        [sp_type == 0, sp_type == 1, sp_type == 2],
+        [(it * 1.5 + fai * 1.5 + arc * 1.5) / 2, it * 2 + fai + arc, arc * 2 + it + fai], 0.0)
+    return out
+
+
+class Side:
+    # one fighter per lane: primary stats, secondaries, resources, skills and cooldowns
+    def __init__(self, tables, cls, race, stats):
+        self.cls = cls
+        self.race = race
+        sec = secondary(stats, tables.class_ap[cls], tables.class_sp[cls])
+        for k, v in sec.items():
+            setattr(self, k, v)
+        self.hp = self.max_hp.astype(np.float64)
+        self.mp = self.max_mp.astype(np.float64)
+        self.sp = self.max_sp.astype(np.float64)
+        self.agility = stats[:, AGI].astype(np.float64)
+        self.skills = tables.class_skills[cls]
+        self.cooldown = np.zeros(self.skills.shape, dtype=np.int64)
+        self.momentum_mult = 1.0  # MomentumSystem.get_damage_multiplier() on basic attacks
+
+def make_player(tables, rng, cls, race, level):
+    stats = tables.class_base[cls] + tables.race_mods[race]
+    return Side(tables, cls, race, level_up(rng, stats, level))
+
+def make_enemy(tables, rng, floor, wave=1, momentum=0):
+    # EnemyFactory.create_enemy: random non_playable class, random dungeon race,
+    # floor - 1 level ups, then apply_enemy_scaling (int() truncation per stat)
+    n = len(floor)
+    n_pc, n_pr = len(tables.player_classes), len(tables.player_races)
+    cls = n_pc + rng.integers(0, len(tables.enemy_classes), n)
+    race = n_pr + rng.integers(0, len(tables.enemy_races), n)
+    stats = level_up(rng, tables.class_base[cls] + tables.race_mods[race], floor)
+    mult = np.array([enemy_multiplier(f, wave, momentum) for f in range(int(floor.max()) + 1)])[floor]
+    stats = np.trunc(stats * mult[:, None]).astype(np.int64)
+    return Side(tables, cls, race, stats)
+
+
+# -------------------------
+# Duel batch
+# -------------------------
+def _take_damage(side, lanes, amount):
+    # CharacterData.take_damage: int(amount), clamped to [0, max_hp]
+    side.hp[lanes] = np.clip(side.hp[lanes] - np.trunc(amount), 0, side.max_hp[lanes])
+
+def _restore(side, lanes, resource, amount):
+    # heal / restore_mp / restore_sp: capped at the maximum
+    amount = np.trunc(amount)
+    for res, cur, top in ((RESOURCE_HP, side.hp, side.max_hp), (RESOURCE_MP, side.mp, side.max_mp),
+                          (RESOURCE_SP, side.sp, side.max_sp)):
+        m = resource == res
+        if m.any():
+            idx = lanes[m]
+            cur[idx] = np.minimum(cur[idx] + amount[m], top[idx])
+
+def _act(tables, rng, me, foe, lanes):
+    # one turn for `me` in the given lanes (EnemyAI priorities, minus buffs/items/defend)
+    n = len(lanes)
+    cd = me.cooldown[lanes]
+    cd = np.maximum(cd - 1, 0)  # reduce_cooldowns at turn start
+    me.cooldown[lanes] = cd
+    sk = me.skills[lanes]
+    has = sk >= 0
+    ski = np.where(has, sk, 0)
+    kind = np.where(has, tables.skill_kind[ski], KIND_NONE)
+    cost = tables.skill_cost[ski]
+    pool = np.where(tables.skill_cost_mp[ski], me.mp[lanes][:, None], me.sp[lanes][:, None])
+    usable = (kind != KIND_NONE) & (cd == 0) & (pool >= cost)
+
+    phys = tables.skill_phys[ski]
+    power = tables.skill_power[ski] + np.where(phys, me.attack_power[lanes][:, None], me.spell_power[lanes][:, None])
+
+    # heal when below half HP, else (75%) the strongest affordable offensive skill, else attack
+    hurt = me.hp[lanes] < HEAL_BELOW * me.max_hp[lanes]
+    heal_ok = usable & (kind == KIND_HEAL) & hurt[:, None]
+    off_ok = usable & ((kind == KIND_DAMAGE) | (kind == KIND_DRAIN))
+    want_skill = rng.random(n) < SKILL_CHANCE
+    choice = np.full(n, -1)
+    pick_heal = heal_ok.any(axis=1)
+    choice[pick_heal] = heal_ok[pick_heal].argmax(axis=1)
+    pick_off = ~pick_heal & want_skill & off_ok.any(axis=1)
+    if pick_off.any():
+        score = np.where(off_ok, power, -np.inf)
+        choice[pick_off] = score[pick_off].argmax(axis=1)
+
+    rows = np.arange(n)
+    use = choice >= 0
+    if use.any():
+        r, c = rows[use], choice[use]
+        k = ski[r, c]
+        lane = lanes[use]
+        # execute_skill: pay the cost, start the cooldown
+        mp_cost = tables.skill_cost_mp[k]
+        me.mp[lane] -= np.where(mp_cost, tables.skill_cost[k], 0.0)
+        me.sp[lane] -= np.where(mp_cost, 0.0, tables.skill_cost[k])
+        me.cooldown[lane, c] = tables.skill_cooldown[k]
+        _use_skills(tables, rng, me, foe, lane, k, power[r, c])
+
+    atk = lanes[~use]
+    if len(atk):
+        _basic_attack(rng, me, foe, atk)
+
+def _use_skills(tables, rng, me, foe, lane, k, base):
+    kind = tables.skill_kind[k]
+    phys = tables.skill_phys[k]
+    resist = np.where(phys, foe.toughness[lane], foe.spell_ward[lane])
+
+    heal = kind == KIND_HEAL
+    if heal.any():
+        # Skill.heal: power + spell_power, truncated by heal(amount: int)
+        _restore(me, lane[heal], np.full(heal.sum(), RESOURCE_HP), tables.skill_power[k[heal]] + me.spell_power[lane[heal]])
+
+    drain = kind == KIND_DRAIN
+    if drain.any():
+        # Skill.drain (HP source): no hit roll, max(1, base - resistance)
+        l = lane[drain]
+        amount = np.maximum(1.0, base[drain] - resist[drain])
+        _take_damage(foe, l, amount)
+        _restore(me, l, tables.skill_drain_to[k[drain]], amount * tables.skill_drain_eff[k[drain]])
+
+    dmg = kind == KIND_DAMAGE
+    if dmg.any():
+        # Skill.deal_damage: accuracy, dodge, max(1, base - resistance), elements, crit
+        l, kd = lane[dmg], k[dmg]
+        m = len(l)
+        u = rng.random((4, m))
+        hit = (u[0] < me.accuracy[l]) & ~(u[1] < foe.dodge[l])
+        amount = np.maximum(1.0, base[dmg] - resist[dmg]) * tables.elem[kd, me.race[l], foe.race[l]]
+        crit = u[2] < me.crit[l]
+        amount = np.where(crit, amount * (1.5 + u[3] * 0.5), amount)
+        _take_damage(foe, l[hit], amount[hit])
+
+def _basic_attack(rng, me, foe, lane):
+    # CharacterData._basic_attack_inline
+    m = len(lane)
+    u = rng.random((4, m))
+    hit = ~(u[0] >= me.accuracy[lane]) & ~(u[1] < foe.dodge[lane])
+    amount = np.maximum(1.0, me.attack_power[lane] * 0.5 * me.momentum_mult - foe.toughness[lane])
+    crit = u[2] < me.crit[lane]
+    amount = np.where(crit, amount * (1.5 + u[3] * 0.5), amount)
+    amount = np.floor(amount + 0.5)  # GDScript round(), half away from zero
+    l = lane[hit]
+    _take_damage(foe, l, amount[hit])
+    _restore(me, l, np.full(len(l), RESOURCE_MP), me.max_mp[l] * 0.08)
+    _restore(me, l, np.full(len(l), RESOURCE_SP), me.max_sp[l] * 0.08)
+
+def run_duels(tables, rng, cls, race, floor, level_offset=0, wave=1, momentum=0, max_turns=200):
+    # -> (player won, draw, turns) per lane
+    n = len(cls)
+    player = make_player(tables, rng, cls, race, np.maximum(floor + level_offset, 1))
+    enemy = make_enemy(tables, rng, floor, wave, momentum)
+    player.momentum_mult = enemy.momentum_mult = 1.0 + momentum * MOMENTUM_DAMAGE
+    # TurnManager.determine_first_turn: agility +-10% each, ties go to the player
+    p_roll = player.agility * (1 + rng.uniform(-0.1, 0.1, n))
+    e_roll = enemy.agility * (1 + rng.uniform(-0.1, 0.1, n))
+    enemy_first = e_roll > p_roll
+    turns = np.zeros(n, dtype=np.int64)
+    live = np.arange(n)
+    for t in range(max_turns):
+        if not len(live):
+            break
+        enemy_turn = enemy_first[live] ^ bool(t & 1)
+        e_lanes, p_lanes = live[enemy_turn], live[~enemy_turn]
+        if len(p_lanes):
+            _act(tables, rng, player, enemy, p_lanes)
+        if len(e_lanes):
+            _act(tables, rng, enemy, player, e_lanes)
+        turns[live] += 1
+        live = live[(player.hp[live] > 0) & (enemy.hp[live] > 0)]
+    won = (enemy.hp <= 0) & (player.hp > 0)
+    draw = (enemy.hp > 0) & (player.hp > 0)
+    return won, draw, turns
+
+
+# -------------------------
+# Win-rate matrix
+# -------------------------
+def simulate(data, floors, duels=1000, seed=0, classes=None, races=None, level_offset=0,
+             wave=1, momentum=0, max_turns=200, chunk=250000):
+    # -> result dict with win/draw rates shaped [class, race, floor];
+    # data may also be prebuilt BalanceTables; seed an int or a numpy SeedSequence (content_sweep shards)
+    _require_numpy()
+    tables = data if isinstance(data, BalanceTables) else BalanceTables(data)
+    cls_names = [c for c in tables.player_classes if classes is None or c in classes]
+    race_names = [r for r in tables.player_races if races is None or r in races]
+    floors = [int(f) for f in floors]
+    cells = [(ci, ri, fi) for ci in range(len(cls_names)) for ri in range(len(race_names))
+             for fi in range(len(floors))]
+    shape = (len(cls_names), len(race_names), len(floors))
+    wins = np.zeros(shape)
+    draws = np.zeros(shape)
+    turns = np.zeros(shape)
+    rng = np.random.Generator(np.random.PCG64(seed))
+    cell_ids = np.repeat(np.arange(len(cells)), duels)
+    cell_arr = np.array(cells, dtype=np.int64).reshape(-1, 3)
+    cls_idx = np.array([tables.player_classes.index(c) for c in cls_names], dtype=np.int64)
+    race_idx = np.array([tables.player_races.index(r) for r in race_names], dtype=np.int64)
+    floor_arr = np.array(floors, dtype=np.int64)
+    t0 = time.perf_counter()
+    for start in range(0, len(cell_ids), chunk):
+        ids = cell_ids[start:start + chunk]
+        c, r, f = cell_arr[ids, 0], cell_arr[ids, 1], cell_arr[ids, 2]
+        won, draw, n_turns = run_duels(tables, rng, cls_idx[c], race_idx[r], floor_arr[f],
+                                       level_offset, wave, momentum, max_turns)
+        np.add.at(wins, (c, r, f), won)
+        np.add.at(draws, (c, r, f), draw)
+        np.add.at(turns, (c, r, f), n_turns)
+    return {
+        "classes": cls_names,
+        "races": race_names,
+        "floors": floors,
+        "duels": duels,
+        "seed": seed,
+        "momentum": momentum,
+        "win_rate": wins / duels,
+        "draw_rate": draws / duels,
+        "mean_turns": turns / duels,
+        "seconds": time.perf_counter() - t0,
+        "total_duels": len(cell_ids),
+    }
+
+def format_table(result):
+    # one row per class/race, one column per floor (win %)
+    floors = result["floors"]
+    width = max([len(f"{c}/{r}") for c in result["classes"] for r in result["races"]] + [10])
+    lines = ["class/race".ljust(width) + "".join(f"{f:>5}" for f in floors) + "   avg"]
+    for ci, c in enumerate(result["classes"]):
+        for ri, r in enumerate(result["races"]):
+            rates = result["win_rate"][ci, ri]
+            lines.append(f"{c}/{r}".ljust(width) + "".join(f"{100 * v:5.0f}" for v in rates)
+                         + f"{100 * rates.mean():6.1f}")
+    lines.append("")
+    lines.append(format_summary(result, width))
+    return "\n".join(lines)
+
+def format_summary(result, width=12):
+    # per-class rows (averaged over races)
+    lines = ["class".ljust(width) + "".join(f"{f:>5}" for f in result["floors"]) + "   avg"]
+    for ci, c in enumerate(result["classes"]):
+        lines.append(c.ljust(width) + "".join(f"{100 * v:5.0f}" for v in result["win_rate"][ci].mean(axis=0))
+                     + f"{100 * result['win_rate'][ci].mean():6.1f}")
+    return "\n".join(lines)
+
+def write_csv(result, fh):
+    fh.write("class,race,floor,win_rate,draw_rate,mean_turns\n")
+    for ci, c in enumerate(result["classes"]):
+        for ri, r in enumerate(result["races"]):
+            for fi, f in enumerate(result["floors"]):
+                fh.write(f"{c},{r},{f},{result['win_rate'][ci, ri, fi]:.4f},"
+                         f"{result['draw_rate'][ci, ri, fi]:.4f},{result['mean_turns'][ci, ri, fi]:.2f}\n")
+
+def to_json(result):
+    out = dict(result)
+    for key in ("win_rate", "draw_rate", "mean_turns"):
+        out[key] = np.round(result[key], 4).tolist()
+    return out
+
+def load_data(root_dir):
+    return {tab: safe_load(os.path.join(root_dir, JSON_FILES[tab])) for tab in ("Classes", "Races", "Skills")}
+
+def parse_floors(text):
+    # "1-25", "1,5,10" or a mix
+    floors = []
+    for part in text.split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-", 1)
+            floors.extend(range(int(lo), int(hi) + 1))
+        elif part:
+            floors.append(int(part))
+    return floors
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo class x race x floor win rates")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--floors", default="1-25", help="e.g. 1-25 or 1,5,10")
+    ap.add_argument("--duels", type=int, default=1000, help="duels per class/race/floor cell")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--classes", help="comma-separated subset of playable classes")
+    ap.add_argument("--races", help="comma-separated subset of playable races")
+    ap.add_argument("--level-offset", type=int, default=0, help="player level = floor + offset")
+    ap.add_argument("--wave", type=int, default=1)
+    ap.add_argument("--momentum", type=int, default=0, help=f"momentum level 0-{MAX_MOMENTUM}")
+    ap.add_argument("--max-turns", type=int, default=200, help="turns before a duel counts as a draw")
+    ap.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    ap.add_argument("-o", "--output", help="write to a file instead of stdout")
+    args = ap.parse_args(argv)
+    _require_numpy()
+
+    data = load_data(args.root)
+    result = simulate(data, parse_floors(args.floors), args.duels, args.seed,
+                      args.classes.split(",") if args.classes else None,
+                      args.races.split(",") if args.races else None,
+                      args.level_offset, args.wave, args.momentum, args.max_turns)
+    fh = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(result, fh)
+        elif args.format == "json":
+            json.dump(to_json(result), fh, indent=1)
+            fh.write("\n")
+        else:
+            fh.write(format_table(result) + "\n")
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+    print(f"{result['total_duels']} duels in {result['seconds']:.2f} s (seed {args.seed})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,536 @@
+#!/usr/bin/env python3
+"""
+content_cli.py
+Uldtale-Battlesim Content CLI
+- Headless counterpart of ContentManagerApp for build boxes and scripts
+- Query, set, rename, duplicate and delete entries across all JSON_FILES tabs
+- Bulk selection with path globs (main_hand/*/*) and field filters (--where rarity=)
+- Batch scripts of JSON-lines operations run in a single process
+- Indexed search (tokens, prefixes, field:value) via content_index
+- Only tabs that were actually modified are saved (via safe_save)
+- Edits are journaled: --journal-out exports the session's patch set, replay applies one
+- Schema/cross-reference validation (content_schema); modified tabs must validate before saving
+- Saved item tabs record renamed / deleted item ids as a save migration step (content_migrate);
+  deletions only with --allow-deletions
+- pack: compile data/content.pack.json, data/enemy_stats.json, data/element_matrix.json and
+  data/wire_ids.json for the game (content_pack, content_enemy, content_elements, content_wire),
+  skipped when up to date; an existing pack is rebuilt whenever tabs are saved
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+
+from content_data import (
+    JSON_FILES, safe_load, safe_save, nested_get, parse_value_by_example, iter_entries, key_for_tab,
+)
+from content_index import ContentIndex, ITEM_TABS
+from content_schema import ContentValidator, related_tabs
+from content_pack import PackError, build_pack, pack_exists
+from content_migrate import MigrationError, describe_step, plan_tab_changes, record_step
+from content_journal import (
+    ChangeJournal, MISSING, clone, get_at, set_patches, delete_patches, rename_patches, load_patch_file,
+)
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class BatchError(Exception):
+    pass
+
+
+# -------------------------
+# Helpers
+# -------------------------
+def resolve_tab(name):
+    # accept "Status Effects", "status_effects", "status-effects", ...
+    norm = name.strip().lower().replace("_", " ").replace("-", " ")
+    for tab in JSON_FILES:
+        if tab.lower() == norm:
+            return tab
+    raise BatchError(f"Unknown tab '{name}'. Known: {', '.join(JSON_FILES)}")
+
+def resolve_tabs(name):
+    if name is None or name.strip().lower() in ("all", "*"):
+        return list(JSON_FILES.keys())
+    return [resolve_tab(n) for n in name.split(",") if n.strip()]
+
+def split_path(text):
+    return [p for p in text.strip("/").split("/") if p]
+
+def default_root():
+    # same config file the GUI uses (content_manager_config.json next to the tools)
+    cfg_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content_manager_config.json")
+    root = safe_load(cfg_path).get("root_directory", "") if os.path.exists(cfg_path) else ""
+    if root and os.path.isdir(root):
+        return root
+    return DEFAULT_ROOT
+
+def parse_where(clauses):
+    # "field=value" -> exact match on str(value); "field~text" -> substring; "field" -> present
+    # batch scripts may also pass {"field": value} for exact matches
+    if isinstance(clauses, dict):
+        return [(k, "=", _field_text(v)) for k, v in clauses.items()]
+    if isinstance(clauses, str):
+        clauses = [clauses]
+    filters = []
+    for clause in clauses or []:
+        if "=" in clause:
+            field, value = clause.split("=", 1)
+            filters.append((field.strip(), "=", value))
+        elif "~" in clause:
+            field, value = clause.split("~", 1)
+            filters.append((field.strip(), "~", value.lower()))
+        else:
+            filters.append((clause.strip(), "?", None))
+    return filters
+
+def _field_text(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (list, tuple)):
+        return ",".join(map(str, value))
+    return str(value)
+
+def matches_where(entry, filters):
+    if not filters:
+        return True
+    if not isinstance(entry, dict):
+        return False
+    for field, mode, value in filters:
+        if field not in entry:
+            return False
+        cur = entry[field]
+        if mode == "?":
+            continue
+        if mode == "=":
+            if isinstance(cur, list):
+                if value not in map(str, cur) and _field_text(cur) != value:
+                    return False
+            elif _field_text(cur) != value:
+                return False
+        elif value not in _field_text(cur).lower():
+            return False
+    return True
+
+def coerce_value(orig, raw, as_json=False):
+    if not isinstance(raw, str):
+        return raw
+    if as_json or orig is None:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            if as_json:
+                raise BatchError(f"Invalid JSON value: {raw}")
+            return raw
+    if isinstance(orig, dict):
+        try:
+            return json.loads(raw)
+        except ValueError:
+            raise BatchError(f"Field expects a JSON object, got: {raw}")
+    return parse_value_by_example(orig, raw)
+
+
+# -------------------------
+# Batch session
+# -------------------------
+class BatchSession:
+    def __init__(self, root_dir, dry_run=False, allow_deletions=False):
+        self.root_dir = root_dir
+        self.dry_run = dry_run
+        self.allow_deletions = allow_deletions  # record deleted item ids in the save migration
+        self.data = {}  # tab -> loaded JSON (loaded on first use)
+        self.journal = ChangeJournal(limit=0)  # unbounded: the whole session is exportable
+        self.validator = ContentValidator()
+        self.ops = 0
+        self.migration = None  # save migration version recorded by save()
+
+    @property
+    def dirty(self):
+        return self.journal.dirty_tabs()
+
+    def _tab_fullpath(self, tab):
+        return os.path.join(self.root_dir, JSON_FILES[tab])
+
+    def tab_data(self, tab):
+        if tab not in self.data:
+            self.data[tab] = safe_load(self._tab_fullpath(tab))
+        return self.data[tab]
+
+    def select(self, tab, pattern=None, where=None):
+        # return [(path, entry)] for entries whose "/"-joined path matches the glob
+        data = self.tab_data(tab)
+        filters = parse_where(where)
+        out = []
+        for path, entry in iter_entries(tab, data):
+            if pattern and not fnmatch.fnmatchcase("/".join(path), pattern):
+                continue
+            if matches_where(entry, filters):
+                out.append((path, entry))
+        return out
+
+    def _require_entry(self, tab, path):
+        try:
+            return nested_get(self.tab_data(tab), path)
+        except (KeyError, TypeError):
+            raise BatchError(f"{tab}: no entry at {'/'.join(path)}")
+
+    # -- operations --
+    def query(self, tabs, pattern=None, where=None, fields=None):
+        rows = []
+        for tab in tabs:
+            for path, entry in self.select(tab, pattern, where):
+                if fields and isinstance(entry, dict):
+                    entry = {f: entry[f] for f in fields if f in entry}
+                rows.append({"tab": tab, "path": "/".join(path), "entry": entry})
+        self.ops += 1
+        return rows
+
+    def search(self, query, tabs, limit=None):
+        index = ContentIndex()
+        for tab in tabs:
+            index.index_tab(tab, self.tab_data(tab))
+        rows = []
+        for tab, path in index.search(query, limit=limit):
+            rows.append({"tab": tab, "path": "/".join(path), "entry": nested_get(self.data[tab], path)})
+        self.ops += 1
+        return rows
+
+    def set_field(self, tab, pattern, field, raw, where=None, as_json=False):
+        targets = self.select(tab, pattern, where)
+        if not targets:
+            raise BatchError(f"{tab}: nothing matches '{pattern}'")
+        patches = []
+        fpath = split_path(field)
+        for path, entry in targets:
+            if not isinstance(entry, dict):
+                raise BatchError(f"{tab}: {'/'.join(path)} is not an object")
+            if not isinstance(get_at(entry, fpath[:-1]), dict):
+                raise BatchError(f"{tab}: {'/'.join(path)} has no field path '{field}'")
+            orig = get_at(entry, fpath)
+            orig = None if orig is MISSING else orig
+            value = coerce_value(orig, raw, as_json)
+            patches += set_patches(self.data, tab, list(path) + fpath, value)
+        self.journal.record(self.data, patches, f"set {field} on {tab}/{pattern}")
+        self.ops += 1
+        return len(patches)
+
+    def rename(self, tab, path, new_key):
+        entry = self._require_entry(tab, path)
+        parent = nested_get(self.tab_data(tab), path[:-1]) if len(path) > 1 else self.tab_data(tab)
+        old_key = path[-1]
+        if new_key == old_key:
+            return 0
+        if new_key in parent:
+            raise BatchError(f"{tab}: {'/'.join(path[:-1] + [new_key])} already exists")
+        # delete + re-create at the same position so the entry keeps its place in the file
+        patches = rename_patches(self.data, tab, path, new_key)
+        if isinstance(entry, dict) and entry.get("name") == old_key:
+            patches[-1].new["name"] = new_key
+        self.journal.record(self.data, patches, f"rename {'/'.join(path)} -> {new_key}")
+        self.ops += 1
+        return 1
+
+    def duplicate(self, tab, path, new_name):
+        entry = self._require_entry(tab, path)
+        parent = nested_get(self.tab_data(tab), path[:-1]) if len(path) > 1 else self.tab_data(tab)
+        new_key = key_for_tab(tab, new_name)
+        if new_key in parent:
+            raise BatchError(f"{tab}: {'/'.join(path[:-1] + [new_key])} already exists")
+        copy = clone(entry)
+        if isinstance(copy, dict):
+            copy["name"] = new_name
+        new_path = path[:-1] + [new_key]
+        self.journal.record(self.data, set_patches(self.data, tab, new_path, copy),
+                            f"duplicate {'/'.join(path)} -> {new_key}")
+        self.ops += 1
+        return new_key
+
+    def delete(self, tab, pattern, where=None):
+        targets = self.select(tab, pattern, where)
+        if not targets:
+            raise BatchError(f"{tab}: nothing matches '{pattern}'")
+        patches = []
+        for path, _ in targets:
+            patches += delete_patches(self.data, tab, path)
+        self.journal.record(self.data, patches, f"delete {tab}/{pattern}")
+        self.ops += 1
+        return len(targets)
+
+    def replay(self, patch_file, force=False):
+        # apply an exported patch set; any conflict aborts the session unless forced
+        try:
+            patch_set = load_patch_file(patch_file)
+        except (OSError, ValueError) as e:
+            raise BatchError(str(e))
+        for g in patch_set.get("groups", []):
+            for p in g.get("patches", []):
+                self.tab_data(resolve_tab(p.get("tab", "")))
+        group, conflicts = self.journal.replay(self.data, patch_set, force,
+                                               "replay " + os.path.basename(patch_file))
+        if conflicts:
+            lines = [f"  {c['tab']}: {'/'.join(map(str, c['path']))}" for c in conflicts]
+            raise BatchError(f"{len(conflicts)} conflict(s) replaying {patch_file} "
+                             "(use --force to overwrite):\n" + "\n".join(lines))
+        self.ops += 1
+        return len(group.patches) if group else 0
+
+    def validate(self, tabs):
+        # load what the check needs: the tabs, what they reference and what references them
+        need = related_tabs(tabs)
+        for tab in need:
+            self.tab_data(tab)
+        return [i for i in self.validator.validate_all(self.data) if i.tab in need]
+
+    def run_op(self, op):
+        # execute one operation dict (as found in batch scripts)
+        kind = op.get("op")
+        if kind == "query":
+            return self.query(resolve_tabs(op.get("tab")), op.get("select"),
+                              op.get("where"), op.get("fields"))
+        if kind == "search":
+            return self.search(op["query"], resolve_tabs(op.get("tab")), op.get("limit"))
+        if kind == "replay":
+            return self.replay(op["file"], op.get("force", False))
+        tab = resolve_tab(op.get("tab", ""))
+        if kind == "set":
+            # non-string values in scripts are already typed JSON and are stored as-is
+            return self.set_field(tab, op["select"], op["field"], op["value"],
+                                  op.get("where"), op.get("json", False))
+        if kind == "rename":
+            return self.rename(tab, split_path(op["path"]), op["new_key"])
+        if kind == "duplicate":
+            return self.duplicate(tab, split_path(op["path"]), op["new_name"])
+        if kind == "delete":
+            return self.delete(tab, op["select"], op.get("where"))
+        raise BatchError(f"Unknown op '{kind}'")
+
+    def save(self):
+        # write only the tabs touched by this session
+        saved, failures = [], []
+        dirty = self.dirty
+        befores = {}
+        for tab in JSON_FILES:
+            if tab not in dirty:
+                continue
+            if self.dry_run:
+                saved.append(tab)
+                continue
+            if tab in ITEM_TABS:
+                befores[tab] = safe_load(self._tab_fullpath(tab))
+            if safe_save(self._tab_fullpath(tab), self.data[tab]):
+                saved.append(tab)
+                self.journal.mark_saved(tab)
+            else:
+                failures.append(tab)
+                befores.pop(tab, None)
+        if befores:
+            self.record_migration(befores)
+        return saved, failures
+
+    def record_migration(self, befores):
+        # renamed / deleted item ids in the saved tabs -> a step in data/save_migrations.json
+        for tab in ITEM_TABS:
+            self.tab_data(tab)
+        renames, deletions = plan_tab_changes(befores, self.data)
+        if deletions and not self.allow_deletions:
+            # migrated saves lose deleted items for good: only on request
+            print("WARNING: deleted item ids not recorded for saves (use --allow-deletions, or "
+                  "content_migrate.py add --delete ID): " + ", ".join(sorted(deletions)), file=sys.stderr)
+            deletions = []
+        for line in describe_step(renames, deletions):
+            print("save migration: " + line, file=sys.stderr)
+        try:
+            self.migration = record_step(self.root_dir, renames, deletions, "content_cli: " + ", ".join(befores))
+        except (MigrationError, OSError) as e:
+            print(f"WARNING: save migration not recorded: {e}", file=sys.stderr)
+
+
+# -------------------------
+# Command line
+# -------------------------
+def read_script(path):
+    fh = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        for lineno, line in enumerate(fh, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                yield json.loads(line)
+            except ValueError as e:
+                raise BatchError(f"{path}:{lineno}: {e}")
+    finally:
+        if fh is not sys.stdin:
+            fh.close()
+
+def print_rows(rows, fmt):
+    if fmt == "keys":
+        for r in rows:
+            print(f"{r['tab']}\t{r['path']}")
+    elif fmt == "json":
+        print(json.dumps(rows, indent=4, ensure_ascii=False))
+    else:
+        for r in rows:
+            print(json.dumps(r, ensure_ascii=False, separators=(",", ":")))
+
+def build_parser():
+    ap = argparse.ArgumentParser(description="Headless Uldtale-Battlesim content editor")
+    ap.add_argument("--root", help="project root (defaults to content_manager config, then repo root)")
+    ap.add_argument("--dry-run", action="store_true", help="run operations without saving")
+    ap.add_argument("-q", "--quiet", action="store_true", help="suppress the timing summary")
+    ap.add_argument("--no-validate", action="store_true", help="save even if modified tabs fail validation")
+    ap.add_argument("--journal-out", help="write the session's changes as a replayable patch file")
+    ap.add_argument("--allow-deletions", action="store_true",
+                    help="record deleted item ids as a save migration (saves drop those items for good)")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("query", help="print matching entries")
+    p.add_argument("tab", nargs="?", default="all")
+    p.add_argument("select", nargs="?", help="path glob, e.g. main_hand/*/*")
+    p.add_argument("--where", action="append", help="field=value, field~text or field")
+    p.add_argument("--fields", help="comma-separated fields to output")
+    p.add_argument("--format", choices=("jsonl", "json", "keys"), default="jsonl")
+
+    p = sub.add_parser("search", help="indexed search, e.g. 'sword class_restriction:monk'")
+    p.add_argument("query")
+    p.add_argument("--tab", default="all")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--format", choices=("jsonl", "json", "keys"), default="keys")
+
+    p = sub.add_parser("set", help="set a field on matching entries")
+    p.add_argument("tab")
+    p.add_argument("select")
+    p.add_argument("field", help="field name, '/' for nested (effects/dodge)")
+    p.add_argument("value")
+    p.add_argument("--where", action="append")
+    p.add_argument("--json", action="store_true", help="parse value as JSON")
+
+    p = sub.add_parser("rename", help="rename an entry key")
+    p.add_argument("tab")
+    p.add_argument("path")
+    p.add_argument("new_key")
+
+    p = sub.add_parser("duplicate", help="copy an entry under a new name")
+    p.add_argument("tab")
+    p.add_argument("path")
+    p.add_argument("new_name")
+
+    p = sub.add_parser("delete", help="delete matching entries")
+    p.add_argument("tab")
+    p.add_argument("select")
+    p.add_argument("--where", action="append")
+
+    p = sub.add_parser("replay", help="apply a patch file exported by the content manager or --journal-out")
+    p.add_argument("patch")
+    p.add_argument("--force", action="store_true", help="overwrite values changed since the export")
+
+    p = sub.add_parser("validate", help="check schemas and cross-file references")
+    p.add_argument("tab", nargs="?", default="all")
+    p.add_argument("--format", choices=("text", "jsonl"), default="text")
+    p.add_argument("--strict", action="store_true", help="fail on warnings too")
+
+    p = sub.add_parser("pack", help="compile all tabs into data/content.pack.json for the game")
+    p.add_argument("--force", action="store_true", help="rebuild even if the manifest says it is current")
+
+    p = sub.add_parser("run", help="run a JSON-lines script of operations ('-' for stdin)")
+    p.add_argument("script")
+    p.add_argument("--format", choices=("jsonl", "json", "keys"), default="jsonl")
+    return ap
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    session = BatchSession(args.root or default_root(), dry_run=args.dry_run, allow_deletions=args.allow_deletions)
+    start = time.perf_counter()
+    try:
+        if args.command == "query":
+            fields = [f.strip() for f in args.fields.split(",")] if args.fields else None
+            rows = session.query(resolve_tabs(args.tab), args.select, args.where, fields)
+            print_rows(rows, args.format)
+        elif args.command == "search":
+            print_rows(session.search(args.query, resolve_tabs(args.tab), args.limit), args.format)
+        elif args.command == "set":
+            n = session.set_field(resolve_tab(args.tab), args.select, args.field, args.value,
+                                  args.where, args.json)
+            print(f"set {args.field} on {n} entr{'y' if n == 1 else 'ies'}")
+        elif args.command == "rename":
+            session.rename(resolve_tab(args.tab), split_path(args.path), args.new_key)
+            print(f"renamed {args.path} -> {args.new_key}")
+        elif args.command == "duplicate":
+            key = session.duplicate(resolve_tab(args.tab), split_path(args.path), args.new_name)
+            print(f"duplicated {args.path} -> {key}")
+        elif args.command == "delete":
+            n = session.delete(resolve_tab(args.tab), args.select, args.where)
+            print(f"deleted {n} entr{'y' if n == 1 else 'ies'}")
+        elif args.command == "replay":
+            n = session.replay(args.patch, args.force)
+            print(f"replayed {n} change(s) from {args.patch}")
+        elif args.command == "validate":
+            issues = session.validate(resolve_tabs(args.tab))
+            session.ops += 1
+            for issue in issues:
+                print(json.dumps(issue.to_json()) if args.format == "jsonl" else str(issue))
+            errors = sum(1 for i in issues if i.severity == "error")
+            if not args.quiet:
+                print(f"{errors} error(s), {len(issues) - errors} warning(s)", file=sys.stderr)
+            if errors or args.strict and issues:
+                return 1
+        elif args.command == "pack":
+            try:
+                result = build_pack(session.root_dir, force=args.force)
+            except PackError as e:
+                raise BatchError(str(e))
+            session.ops += 1
+            state = "built" if result["built"] else "up to date"
+            print(f"{result['pack']}: {state}, {result['bytes']} bytes (sources {result['source_bytes']} bytes)")
+            enemies = result["enemy_table"]
+            print(f"{enemies['path']}: {'written' if enemies['written'] else 'up to date'}, "
+                  f"{enemies['rebuilt']} row(s) recomputed")
+            elements = result["element_table"]
+            print(f"{elements['path']}: {'written' if elements['written'] else 'up to date'}, "
+                  f"{elements['rebuilt']['races']} race row(s), {elements['rebuilt']['skills']} skill cell(s) recomputed")
+            wire = result["wire_table"]
+            print(f"{wire['path']}: {'written' if wire['written'] else 'up to date'}, "
+                  f"{wire['strings']} strings (crc {wire['crc']:08x})")
+        elif args.command == "run":
+            for op in read_script(args.script):
+                result = session.run_op(op)
+                if op.get("op") in ("query", "search"):
+                    print_rows(result, args.format)
+    except BatchError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+    if session.dirty and not args.no_validate:
+        errors = [i for i in session.validate(session.dirty) if i.severity == "error"]
+        if errors:
+            for issue in errors:
+                print(str(issue), file=sys.stderr)
+            print(f"ERROR: {len(errors)} validation error(s), nothing saved (use --no-validate to override)",
+                  file=sys.stderr)
+            return 1
+    # exported only once the changes passed validation (or --no-validate), like the save
+    if args.journal_out and session.journal.can_undo():
+        session.journal.export_file(args.journal_out, session.root_dir)
+    saved, failures = session.save()
+    if saved and not args.dry_run and args.command != "pack" and pack_exists(session.root_dir):
+        # keep an existing game pack in step with the saved files
+        try:
+            build_pack(session.root_dir)
+        except PackError as e:
+            print(f"WARNING: content pack not rebuilt: {e}", file=sys.stderr)
+    elapsed = (time.perf_counter() - start) * 1000
+    if session.migration and not args.quiet:
+        print(f"item renames/deletions recorded as save migration v{session.migration}", file=sys.stderr)
+    if failures:
+        print("ERROR saving: " + ", ".join(failures), file=sys.stderr)
+    if not args.quiet:
+        action = "would save" if args.dry_run else "saved"
+        print(f"{session.ops} op(s), {action} {len(saved)} tab(s) {saved} in {elapsed:.1f} ms", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+content_combatlog.py
+Uldtale-Battlesim Combat Log Analyzer
+- Reads the JSON-lines transcripts written by scripts/combat/CombatLog.gd (game started with
+  `-- --combat-log[=path]`); "@clog " lines mixed into captured console output work too
+- Streams: files are split into byte ranges processed on a process pool, never loaded whole;
+  battles cut by a range boundary are stitched back together in order
+- Report: outcomes and turn counts (overall and per floor), damage / healing / time share per
+  skill and per status effect, and the skills and effects whose battles run longest compared
+  to battles without them ("what makes fights drag on")
+- --battle ID replays one battle turn by turn; --battles writes one CSV row per battle
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import collections
+import multiprocessing
+
+LOG_FORMAT = "uldtale-combat-log"
+LOG_VERSION = 1
+STDOUT_PREFIX = b"@clog "
+CHUNK_BYTES = 64 << 20
+BLOCK_BYTES = 4 << 20
+# per-hit and turn events only matter for transcripts; the report skips them unparsed
+SKIP_MARKS = (b'"ev":"damage"', b'"ev":"turn"')
+
+
+# -------------------------
+# Reading
+# -------------------------
+def parse_line(raw):
+    # -> event dict, or None for console noise / broken lines
+    raw = raw.strip()
+    if raw.startswith(STDOUT_PREFIX):
+        raw = raw[len(STDOUT_PREFIX):]
+    if not raw.startswith(b"{"):
+        return None
+    try:
+        event = json.loads(raw)
+    except ValueError:
+        return None
+    return event if isinstance(event, dict) else None
+
+def parse_block(block, skip=SKIP_MARKS):
+    # whole lines -> events; one json.loads per block, line by line only if a line is broken
+    if len(skip) == 2:
+        a, b = skip
+        lines = [l for l in block.split(b"\n") if (l[:1] == b"{" or l.startswith(STDOUT_PREFIX))
+                 and a not in l and b not in l]
+    else:
+        lines = [l for l in block.split(b"\n") if (l[:1] == b"{" or l.startswith(STDOUT_PREFIX))
+                 and not any(m in l for m in skip)]
+    lines = [l if l[:1] == b"{" else l[len(STDOUT_PREFIX):] for l in lines]
+    try:
+        events = json.loads(b"[" + b",".join(lines) + b"]")
+    except ValueError:
+        events = [parse_line(l) for l in lines]
+    return [e for e in events if isinstance(e, dict)]
+
+def iter_range(path, start, end, skip=SKIP_MARKS):
+    # events of the lines that start inside [start, end)
+    with open(path, "rb") as fh:
+        if start:
+            fh.seek(start - 1)
+            fh.readline()  # finish the line the previous range owns
+        pos = fh.tell()
+        while pos < end:
+            block = fh.read(min(BLOCK_BYTES, end - pos))
+            if not block:
+                break
+            pos += len(block)
+            if not block.endswith(b"\n"):
+                tail = fh.readline()  # a line starting before `end` is ours
+                block += tail
+                pos += len(tail)
+            yield from parse_block(block, skip)
+
+def split_ranges(paths, chunk=CHUNK_BYTES):
+    # [(path, start, end)] in file order
+    ranges = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), chunk):
+            ranges.append((path, start, min(start + chunk, size)))
+    return ranges
+
+
+# -------------------------
+# Aggregation
+# -------------------------
+class Aggregate:
+    def __init__(self):
+        self.battles = 0
+        self.outcomes = collections.Counter()
+        self.turns = collections.Counter()           # turns -> battles
+        self.floors = {}                             # floor -> [battles, turns, wins]
+        self.actions = {}                            # (side, action, skill) -> [uses, damage, healing, us, crits, misses]
+        self.effects = {}                            # (side, effect) -> [ticks, damage, healing, us]
+        self.presence = {}                           # label -> [battles with it, their turns]
+        self.rows = []                               # per-battle rows (--battles)
+        self.events = 0
+        self.bad = 0
+
+    def merge(self, other):
+        self.battles += other.battles
+        self.outcomes.update(other.outcomes)
+        self.turns.update(other.turns)
+        self.events += other.events
+        self.bad += other.bad
+        self.rows.extend(other.rows)
+        for mine, theirs in ((self.floors, other.floors), (self.actions, other.actions),
+                             (self.effects, other.effects), (self.presence, other.presence)):
+            for key, values in theirs.items():
+                if key in mine:
+                    mine[key] = [a + b for a, b in zip(mine[key], values)]
+                else:
+                    mine[key] = list(values)
+
+    def fold(self, events, keep_rows=False):
+        # one complete battle (its events in log order)
+        start = next(e for e in events if e.get("ev") == "battle")
+        end = next(e for e in events if e.get("ev") == "end")
+        side = {u.get("name"): u.get("side", "enemy") for u in start.get("units", [])}
+        turns = int(end.get("turns", 0))
+        won = end.get("outcome") == "victory"
+        floor = start.get("floor", 0)
+        self.battles += 1
+        self.outcomes[end.get("outcome", "?")] += 1
+        self.turns[turns] += 1
+        f = self.floors.setdefault(floor, [0, 0, 0])
+        f[0] += 1
+        f[1] += turns
+        f[2] += won
+        used, afflicted = set(), set()
+        dealt = {"player": 0, "enemy": 0}
+        actions, effects = self.actions, self.effects
+        for e in events:
+            kind = e.get("ev")
+            if kind == "action":
+                who = side.get(e.get("actor"), "enemy")
+                key = (who, e.get("action", "?"), e.get("skill") or "")
+                a = actions.get(key)
+                if a is None:
+                    a = actions[key] = [0, 0, 0, 0, 0, 0]
+                dmg = e.get("damage", 0)
+                a[0] += 1
+                a[1] += dmg
+                a[2] += e.get("healing", 0)
+                a[3] += e.get("us", 0)
+                if e.get("crit"):
+                    a[4] += 1
+                if e.get("miss") or e.get("dodge"):
+                    a[5] += 1
+                dealt[who] = dealt.get(who, 0) + dmg
+                used.add(key)
+                if e.get("effects"):
+                    afflicted.update(("applies", name) for name in e["effects"])
+            elif kind == "effect":
+                key = (side.get(e.get("actor"), "enemy"), e.get("effect", "?"))
+                t = effects.get(key)
+                if t is None:
+                    t = effects[key] = [0, 0, 0, 0]
+                t[0] += 1
+                t[1] += e.get("damage", 0)
+                t[2] += e.get("healing", 0)
+                t[3] += e.get("us", 0)
+                afflicted.add(key)
+        self.events += len(events)
+        seen = [action_label(k) for k in used] + [f"{a} {b}" if a == "applies" else f"{a} has {b}" for a, b in afflicted]
+        for label in seen:
+            p = self.presence.get(label)
+            if p is None:
+                p = self.presence[label] = [0, 0]
+            p[0] += 1
+            p[1] += turns
+        if keep_rows:
+            units = start.get("units", [])
+            player = next((u for u in units if u.get("side") == "player"), {})
+            enemies = "+".join(u.get("name", "") for u in units if u.get("side") != "player")
+            self.rows.append([start.get("b"), floor, start.get("wave", 0), int(bool(start.get("boss"))),
+                              end.get("outcome", "?"), turns, player.get("class", ""), player.get("race", ""),
+                              player.get("level", 0), enemies, dealt["player"], dealt["enemy"],
+                              round(end.get("us", 0) / 1000, 1)])
+
+def action_label(key):
+    who, action, skill = key
+    return f"{who} {action} {skill}".rstrip() if action in ("skill", "item") else f"{who} {action}"
+
+
+def _open_battle(events):
+    kinds = {e.get("ev") for e in events}
+    return "battle" in kinds, "end" in kinds
+
+def scan_range(job):
+    # worker: one byte range -> (Aggregate of the battles it holds whole, [(battle id, events)])
+    path, start, end, keep_rows = job
+    agg = Aggregate()
+    open_battles = collections.OrderedDict()  # id -> events, battles not finished in this range
+    for e in iter_range(path, start, end):
+        b = e.get("b")
+        if not b:
+            continue
+        if e.get("ev") == "battle":
+            open_battles[b] = [e]
+            continue
+        events = open_battles.get(b)
+        if events is None:
+            open_battles[b] = events = []  # started in an earlier range
+        events.append(e)
+        if e.get("ev") == "end" and events[0].get("ev") == "battle":
+            agg.fold(events, keep_rows)
+            del open_battles[b]
+    return agg, list(open_battles.items())
+
+def analyze(paths, workers=None, keep_rows=False, chunk=CHUNK_BYTES, progress=None):
+    # -> (Aggregate, stats)
+    ranges = split_ranges(paths, chunk)
+    total = sum(os.path.getsize(p) for p in paths)
+    jobs = [(p, s, e, keep_rows) for p, s, e in ranges]
+    t0 = time.perf_counter()
+    agg = Aggregate()
+    pending = collections.OrderedDict()
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    pool = multiprocessing.get_context("spawn").Pool(workers) if workers > 1 else None
+    try:
+        results = pool.imap(scan_range, jobs) if pool else map(scan_range, jobs)
+        for i, (part, leftovers) in enumerate(results):
+            agg.merge(part)
+            # stitch battles split across ranges (ranges arrive in file order)
+            for b, events in leftovers:
+                pending.setdefault(b, []).extend(events)
+                started, ended = _open_battle(pending[b])
+                if started and ended:
+                    agg.fold(pending.pop(b), keep_rows)
+            if progress:
+                progress(f"{i + 1}/{len(jobs)} ranges")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    seconds = time.perf_counter() - t0
+    unfinished = sum(1 for events in pending.values() if _open_battle(events)[0])
+    return agg, {"bytes": total, "seconds": seconds, "unfinished": unfinished, "ranges": len(jobs)}
+
+
+# -------------------------
+# Report
+# -------------------------
+def percentile_of(counter, q):
+    total = sum(counter.values())
+    if not total:
+        return 0
+    need = q * (total - 1)
+    seen = 0
+    for value in sorted(counter):
+        seen += counter[value]
+        if seen > need:
+            return value
+    return max(counter)
+
+def drag_table(agg, min_battles=20, top=15):
+    # labels whose battles take longest compared to battles without them
+    total_turns = sum(t * n for t, n in agg.turns.items())
+    rows = []
+    for label, (n, turns) in agg.presence.items():
+        rest = agg.battles - n
+        if n < min_battles or rest < min_battles:
+            continue
+        with_mean = turns / n
+        without = (total_turns - turns) / rest
+        # extra turns this label accounts for across the log
+        rows.append((label, n, with_mean, without, with_mean - without, (with_mean - without) * n))
+    rows.sort(key=lambda r: -r[5])
+    return rows[:top]
+
+def format_report(agg, stats, top=15, min_battles=20):
+    lines = []
+    turns_total = sum(t * n for t, n in agg.turns.items())
+    mean = turns_total / agg.battles if agg.battles else 0
+    outcomes = ", ".join(f"{k} {v} ({v / max(agg.battles, 1):.1%})" for k, v in agg.outcomes.most_common())
+    lines.append(f"{agg.battles} battles ({outcomes}), {stats['unfinished']} unfinished; "
+                 f"turns mean {mean:.1f}, median {percentile_of(agg.turns, 0.5)}, p90 {percentile_of(agg.turns, 0.9)}")
+    lines.append("")
+    lines.append(f"{'floor':>5} {'battles':>8} {'win %':>6} {'turns':>6}")
+    for floor in sorted(agg.floors, key=lambda f: (not isinstance(f, (int, float)), f)):
+        n, turns, wins = agg.floors[floor]
+        lines.append(f"{floor:>5} {n:>8} {wins / n:>6.1%} {turns / n:>6.1f}")
+
+    dmg_total = sum(a[1] for a in agg.actions.values()) + sum(t[1] for t in agg.effects.values()) or 1
+    us_total = sum(a[3] for a in agg.actions.values()) + sum(t[3] for t in agg.effects.values()) or 1
+    lines.append("")
+    lines.append(f"{'action':32} {'uses':>8} {'damage':>10} {'dmg %':>6} {'heal':>8} {'time %':>6} "
+                 f"{'us/use':>7} {'dmg/use':>7} {'miss %':>6}")
+    for key, (uses, dmg, heal, us, crits, misses) in sorted(agg.actions.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{action_label(key)[:32]:32} {uses:>8} {dmg:>10} {dmg / dmg_total:>6.1%} {heal:>8} "
+                     f"{us / us_total:>6.1%} {us / uses:>7.0f} {dmg / uses:>7.1f} {misses / uses:>6.1%}")
+    if agg.effects:
+        lines.append("")
+        lines.append(f"{'status effect (on)':32} {'ticks':>8} {'damage':>10} {'dmg %':>6} {'heal':>8} {'time %':>6}")
+        for (who, name), (ticks, dmg, heal, us) in sorted(agg.effects.items(), key=lambda kv: -kv[1][0]):
+            lines.append(f"{(name + ' (' + who + ')')[:32]:32} {ticks:>8} {dmg:>10} {dmg / dmg_total:>6.1%} "
+                         f"{heal:>8} {us / us_total:>6.1%}")
+    drag = drag_table(agg, min_battles, top)
+    if drag:
+        lines.append("")
+        lines.append(f"fights that drag (battles with vs without, at least {min_battles} of each):")
+        lines.append(f"{'':32} {'battles':>8} {'turns':>6} {'w/o':>6} {'+turns':>7} {'extra':>8}")
+        for label, n, with_mean, without, delta, extra in drag:
+            lines.append(f"{label[:32]:32} {n:>8} {with_mean:>6.1f} {without:>6.1f} {delta:>+7.1f} {extra:>8.0f}")
+    return "\n".join(lines)
+
+def write_rows(rows, fh):
+    fh.write("battle,floor,wave,boss,outcome,turns,class,race,level,enemies,player_damage,enemy_damage,ms\n")
+    for r in rows:
+        fh.write(",".join(str(v) for v in r) + "\n")
+
+
+# -------------------------
+# Transcript
+# -------------------------
+def replay_battle(paths, battle_id):
+    # events of one battle, damage events included (scan with a cheap byte filter first)
+    needle = json.dumps(battle_id).encode("utf-8")
+    for path in paths:
+        with open(path, "rb") as fh:
+            for raw in fh:
+                if needle not in raw:
+                    continue
+                e = parse_line(raw)
+                if e is not None and e.get("b") == battle_id:
+                    yield e
+
+def format_event(e):
+    kind = e.get("ev")
+    if kind == "battle":
+        units = ", ".join(f"{u.get('name')} ({u.get('side')} L{u.get('level')} {u.get('race')} "
+                          f"{u.get('class')}, {u.get('hp')} hp)" for u in e.get("units", []))
+        return f"battle {e.get('b')}: floor {e.get('floor')} wave {e.get('wave')}" + \
+            (" BOSS" if e.get("boss") else "") + f"\n  {units}"
+    if kind == "turn":
+        return f"turn {e.get('turn')}: {e.get('actor')}"
+    if kind == "action":
+        what = e.get("skill") or e.get("action")
+        if e.get("miss") or e.get("dodge"):
+            result = "missed" if e.get("miss") else "dodged"
+        else:
+            result = f"{e.get('damage', 0)} dmg" + (" CRIT" if e.get("crit") else "")
+            if e.get("healing"):
+                result += f", {e['healing']} healed"
+            if e.get("effects"):
+                result += ", applies " + "/".join(e["effects"])
+        return f"  {e.get('actor')} -> {e.get('target')}: {what}: {result} ({e.get('us', 0)} us)"
+    if kind == "effect":
+        return f"  {e.get('actor')} {e.get('effect')}: {e.get('damage', 0)} dmg, " \
+               f"{e.get('healing', 0)} heal, {e.get('left')} turn(s) left"
+    if kind == "damage":
+        return f"    {e.get('target')} -{e.get('amount')} hp (now {e.get('hp')})" + \
+            (f" from {e['source']}" if e.get("source") else "")
+    if kind == "skip":
+        return f"  {e.get('actor')} skips ({e.get('reason')})"
+    if kind == "end":
+        return f"{e.get('outcome')} after {e.get('turns')} turns ({e.get('us', 0) / 1000:.1f} ms)"
+    return json.dumps(e)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Analyze CombatLog.gd transcripts")
+    ap.add_argument("logs", nargs="+", help="combat log files (JSON lines)")
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processes (default: all cores)")
+    ap.add_argument("--top", type=int, default=15, help="rows in the drag table")
+    ap.add_argument("--min-battles", type=int, default=20, help="minimum battles with/without for the drag table")
+    ap.add_argument("--battle", help="print one battle turn by turn")
+    ap.add_argument("--battles", metavar="CSV", help="write one row per battle ('-' for stdout)")
+    args = ap.parse_args(argv)
+
+    missing = [p for p in args.logs if not os.path.isfile(p)]
+    if missing:
+        print(f"ERROR: not found: {', '.join(missing)}")
+        return 1
+    if args.battle:
+        found = False
+        for e in replay_battle(args.logs, args.battle):
+            found = True
+            print(format_event(e))
+        if not found:
+            print(f"ERROR: battle {args.battle} not in the log(s)")
+            return 1
+        return 0
+
+    agg, stats = analyze(args.logs, args.workers or None, keep_rows=bool(args.battles))
+    print(f"{stats['bytes'] / 1e6:.1f} MB, {agg.events} events in {stats['seconds']:.2f} s "
+          f"({stats['bytes'] / 1e6 / max(stats['seconds'], 1e-9):.0f} MB/s)", file=sys.stderr)
+    if args.battles:
+        if args.battles == "-":
+            write_rows(agg.rows, sys.stdout)
+            return 0
+        with open(args.battles, "w", encoding="utf-8") as fh:
+            write_rows(agg.rows, fh)
+    print(format_report(agg, stats, args.top, args.min_battles))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
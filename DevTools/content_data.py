@@ -0,0 +1,291 @@
+"""
+content_data.py
+Uldtale-Battlesim content data helpers (no GUI dependencies)
+- JSON_FILES tab map and per-tab file shapes
+- Safe JSON IO: atomic temp-file + rename saves, gzip backups with retention
+- Nested path helpers and value parsing shared by the GUI and headless tools
+"""
+
+import os
+import gzip
+import json
+import stat
+import time
+import hashlib
+import datetime
+import tempfile
+
+# relative paths mapped to tabs
+JSON_FILES = {
+    "Classes": "data/classes.json",
+    "Races": "data/races.json",
+    "Skills": "data/skills.json",
+    "Rarities": "data/rarities.json",
+    "Status Effects": "data/status_effects.json",
+    "Armors": "data/items/armors.json",
+    "Weapons": "data/items/weapons.json",
+    "Consumables": "data/items/consumables.json",
+    "Materials": "data/items/materials.json",
+}
+
+# backups live in <data dir>/.backups (hidden from Godot's importer)
+BACKUP_DIR = ".backups"
+# retention per file: newest N, max age, max total size (None disables a rule)
+BACKUP_POLICY = {"keep": 20, "max_age_days": 30, "max_bytes": 20 * 1024 * 1024}
+
+# -------------------------
+# Safe JSON IO + backup
+# -------------------------
+def safe_load(path):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"ERROR loading {path}: {e}")
+        return {}
+
+def dump_json(data):
+    # same layout the content manager has always written (indent=4, utf-8, platform newlines)
+    text = json.dumps(data, indent=4, ensure_ascii=False)
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return text.encode("utf-8")
+
+def _fsync_dir(dirn):
+    # make the rename itself durable (not supported on Windows)
+    if os.name != "posix":
+        return
+    fd = os.open(dirn or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def atomic_write(path, payload):
+    # write to a temp file in the same directory, fsync, then rename over the target;
+    # payload is bytes or an iterable of byte chunks (streamed, never joined in memory)
+    dirn = os.path.dirname(path) or "."
+    fd, tmp = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp", dir=dirn)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(payload, (bytes, bytearray)):
+                f.write(payload)
+            else:
+                for chunk in payload:
+                    f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        mode = stat.S_IMODE(os.stat(path).st_mode) if os.path.exists(path) else 0o644
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+    _fsync_dir(dirn)
+
+def _backup_dir(path):
+    return os.path.join(os.path.dirname(path), BACKUP_DIR)
+
+def list_backups(path):
+    # [(mtime, size, backup path)] newest first, including legacy "<file>.bak.<ts>" copies
+    base = os.path.basename(path)
+    found = []
+    bdir = _backup_dir(path)
+    if os.path.isdir(bdir):
+        for name in os.listdir(bdir):
+            if name.startswith(base + ".") and name.endswith(".json.gz"):
+                found.append(os.path.join(bdir, name))
+    dirn = os.path.dirname(path) or "."
+    for name in os.listdir(dirn):
+        if name.startswith(base + ".bak."):
+            found.append(os.path.join(dirn, name))
+    out = []
+    for bp in found:
+        try:
+            st = os.stat(bp)
+        except OSError:
+            continue
+        out.append((st.st_mtime, st.st_size, bp))
+    out.sort(reverse=True)
+    return out
+
+def prune_backups(path, policy=None):
+    # apply the retention policy (count / age / total size); the newest backup always survives
+    policy = BACKUP_POLICY if policy is None else policy
+    keep = policy.get("keep")
+    max_age = policy.get("max_age_days")
+    max_bytes = policy.get("max_bytes")
+    now = time.time()
+    total = 0
+    removed = []
+    for i, (mtime, size, bp) in enumerate(list_backups(path)):
+        total += size
+        if i == 0:
+            continue
+        expired = (keep is not None and i >= keep) \
+            or (max_age is not None and now - mtime > max_age * 86400) \
+            or (max_bytes is not None and total > max_bytes)
+        if expired:
+            try:
+                os.remove(bp)
+                removed.append(bp)
+            except OSError as e:
+                print("Backup prune failed:", e)
+    return removed
+
+def backup_file(path, content=None):
+    # gzip the current file into <dir>/.backups/<file>.<ts>.<sha>.json.gz
+    if content is None:
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            content = f.read()
+    digest = hashlib.sha1(content).hexdigest()[:10]
+    base = os.path.basename(path)
+    try:
+        newest = list_backups(path)
+        if newest and newest[0][2].endswith(f".{digest}.json.gz"):
+            # identical to the last backup: nothing new to keep
+            return newest[0][2]
+        bdir = _backup_dir(path)
+        os.makedirs(bdir, exist_ok=True)
+        ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        backup_path = os.path.join(bdir, f"{base}.{ts}.{digest}.json.gz")
+        atomic_write(backup_path, gzip.compress(content, compresslevel=6, mtime=0))
+        prune_backups(path)
+        return backup_path
+    except Exception as e:
+        print("Backup failed:", e)
+        return None
+
+def read_backup(backup_path):
+    opener = gzip.open if backup_path.endswith(".gz") else open
+    with opener(backup_path, "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+def safe_save(path, data, backup=True):
+    try:
+        dirn = os.path.dirname(path)
+        if dirn:
+            os.makedirs(dirn, exist_ok=True)
+        payload = dump_json(data)
+        old = None
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                old = f.read()
+            if old == payload:
+                # unchanged on disk: no write, no backup
+                return True
+        # backup existing file
+        if backup and old is not None:
+            backup_file(path, old)
+        atomic_write(path, payload)
+        return True
+    except Exception as e:
+        print(f"ERROR saving {path}: {e}")
+        return False
+
+# -------------------------
+# Helpers
+# -------------------------
+def make_key_from_name(name):
+    return name.strip().lower().replace(" ", "_")
+
+def is_leaf_node(obj):
+    # consider dict of only primitive values (no nested dict/list) a leaf
+    if not isinstance(obj, dict):
+        return True
+    for v in obj.values():
+        if isinstance(v, dict) or isinstance(v, list):
+            return False
+    return True
+
+def nested_get(data, path):
+    cur = data
+    for p in path:
+        cur = cur[p]
+    return cur
+
+def nested_set(data, path, value):
+    cur = data
+    for p in path[:-1]:
+        cur = cur[p]
+    cur[path[-1]] = value
+
+def nested_delete(data, path):
+    cur = data
+    for p in path[:-1]:
+        cur = cur[p]
+    del cur[path[-1]]
+
+# tabs whose entries sit under a group key (playable / non_playable / boss)
+GROUPED_TABS = ("Classes", "Races")
+# tabs whose entries sit in nested slot/type trees
+TREE_TABS = ("Armors", "Weapons")
+
+def iter_entries(tab, data):
+    # yield (path, entry) for every editable entry of a tab, following its file shape
+    if not isinstance(data, dict):
+        return
+    if tab in GROUPED_TABS:
+        for grp, entries in data.items():
+            if isinstance(entries, dict):
+                for k, v in entries.items():
+                    yield [grp, k], v
+    elif tab in TREE_TABS:
+        for top, subs in data.items():
+            if not isinstance(subs, dict):
+                continue
+            for sub, items in subs.items():
+                if not isinstance(items, dict):
+                    continue
+                for k, v in items.items():
+                    yield [top, sub, k], v
+    elif tab == "Skills" and isinstance(data.get("skills"), dict):
+        for k, v in data["skills"].items():
+            yield ["skills", k], v
+    else:
+        for k, v in data.items():
+            yield [k], v
+
+def entry_depth(tab):
+    if tab in TREE_TABS:
+        return 3
+    if tab in GROUPED_TABS or tab == "Skills":
+        return 2
+    return 1
+
+def key_for_tab(tab, name):
+    # classes, races and skills are keyed by display name; everything else by snake_case key
+    if tab in GROUPED_TABS or tab == "Skills":
+        return name.strip()
+    return make_key_from_name(name)
+
+def parse_value_by_example(orig, raw):
+    # Try to parse raw string into int/float/bool/list if orig indicates type
+    if isinstance(orig, bool):
+        return raw.lower() in ("1", "true", "yes", "y", "on")
+    if isinstance(orig, int):
+        try:
+            return int(raw)
+        except:
+            try:
+                return int(float(raw))
+            except:
+                return raw
+    if isinstance(orig, float):
+        try:
+            return float(raw)
+        except:
+            return raw
+    if isinstance(orig, list):
+        # accept comma-separated values
+        pieces = [s.strip() for s in raw.split(",") if s.strip()]
+        return pieces
+    # fallback
+    return raw
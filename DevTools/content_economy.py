@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+content_economy.py
+Uldtale-Battlesim Economy Simulator
+- Seeded Monte Carlo runs (floor 1 to N, DungeonStateManager's 5 waves + boss per floor) as NumPy
+  batches: one array lane per run, every battle advanced for all runs at once
+- Income: RewardsManager.calculate_battle_rewards currency ((50 + wave * 10) * floor, x2 for bosses),
+  its random consumable / material / equipment drops and the enemy's equipped uncommon+ gear
+  (EnemyFactory.give_enemy_equipment, get_equipment_drop_chance), all sold at value / 2 like
+  ShopScene; equipment values go through RarityGenerator.roll_rarity and EquipmentScaler
+  (calculate_item_level / scale_value)
+- Momentum (optional): win streaks of --streak battles raise drop chances and end in a breather that
+  pays 40% of the currency earned during the streak (MomentumSystem.get_momentum_bonus_rewards)
+- Spending: potions restocked before every floor, then a one-time shop kit bought as soon as it is
+  affordable (ShopManager's common ilvl 1 prices: weapons value / 2.5, armor value)
+- Reads the same item files as the content manager (or its in-memory data, unsaved edits included)
+- Output: currency / income / spend percentiles per floor, income by source, the items whose value
+  drives sell income, and shop consumables that sell for more than they cost (buy/sell loops)
+- Not modelled: defeats, class-biased drops (ClassEquipmentBias picks uniformly here), momentum
+  equipment rerolls, crafting
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+np = None  # numpy, imported on first use (load_numpy) so the tools reusing the formulas start fast
+
+from content_data import JSON_FILES, safe_load
+from content_index import item_entries
+from content_loot import RARITY_ROLL, RARITIES, ILVL_BONUS, SCALER_MULTIPLIERS, upgrade_tier
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WAVES = 5  # DungeonStateManager.waves_per_floor; wave 6 is the boss
+STARTING_GOLD = 100  # CharacterCreation.STARTING_GOLD
+SELL_DIVISOR = 2  # ShopScene: item.value / 2
+STREAK_BONUS = 0.4  # share of the streak's currency paid on a breather at momentum 3+
+MAX_MOMENTUM = 10
+
+# ShopManager.consumable_inventory (buy prices are not read from consumables.json)
+SHOP_PRICES = {
+    "health_potion": 25, "mana_potion": 30, "stamina_potion": 30, "flame_flask": 50,
+    "frost_crystal": 50, "thunder_orb": 50, "venom_vial": 50, "stone_shard": 10,
+    "rotten_dung": 10, "smoke_bomb": 15, "berserker_brew": 30, "holy_water": 50,
+}
+DEFAULT_KIT = ("short_sword", "leather_helm", "leather_armor", "leather_gloves", "leather_leggings",
+               "leather_boots")
+
+# EnemyFactory.get_available_equipment_slots order; bosses get all of them
+ENEMY_SLOTS = (("main_hand", 1), ("chest", 1), ("head", 3), ("legs", 5), ("hands", 7), ("feet", 9))
+# RewardsManager.get_equipment_drop_chance by rarity tier (common never drops)
+DROP_CHANCE = (0.0, 0.50, 0.65, 0.75, 0.85, 0.95)
+
+SOURCES = ("battle", "breather", "enemy_gear", "equipment", "consumables", "materials")
+SPENDS = ("kit", "potions")
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def load_numpy():
+    # -> the numpy module, or None when it is not installed (optional: only the simulator needs it)
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:
+            return None
+        np = numpy
+    return np
+
+def _require_numpy():
+    if load_numpy() is None:
+        print("ERROR: the economy simulator needs numpy (pip install numpy)")
+        sys.exit(1)
+
+
+# -------------------------
+# Game formulas
+# -------------------------
+def difficulty_tier(floor):
+    # EnemyFactory.get_difficulty_tier
+    for tier, top in enumerate((2, 5, 8, 11, 14, 17, 20), 1):
+        if floor <= top:
+            return tier
+    return 8
+
+def battle_currency(floor, wave, boss):
+    gold = (50 + wave * 10) * floor
+    return gold * 2 if boss else gold
+
+def momentum_bonus(momentum):
+    # RewardsManager: drop chances (and MomentumSystem.get_reward_multiplier)
+    return 1.0 + (momentum - 2) * 0.25 if momentum >= 3 else 1.0
+
+
+# -------------------------
+# Content
+# -------------------------
+class EconomyTables:
+    """Item values as arrays (one per drop pool), built once per data snapshot"""
+
+    def __init__(self, data):
+        _require_numpy()
+        self.consumables = self._flat(data.get("Consumables"))
+        self.materials = self._flat(data.get("Materials"))
+        self.weapons = self._templates("Weapons", data.get("Weapons"))
+        self.armors = self._templates("Armors", data.get("Armors"))
+        self.armors_by_slot = {}
+        for item_id, entry in self.armors:
+            self.armors_by_slot.setdefault(entry.get("slot", ""), []).append((item_id, entry))
+        self.equipment = self.weapons + self.armors  # get_random_equipment: weapons then armors
+        self.templates = dict(self.equipment)
+        self.rarity_mult = np.array([SCALER_MULTIPLIERS[r] for r in RARITIES])
+        self.ilvl_bonus = np.array([ILVL_BONUS[r] for r in RARITIES])
+        self.rarity_upper = np.array([u for _, u in RARITY_ROLL])
+        self.pools = {}
+        for name, items in (("consumables", self.consumables), ("materials", self.materials),
+                            ("weapons", self.weapons), ("armors", self.armors),
+                            ("equipment", self.equipment)):
+            self.pools[name] = self._pool(items)
+        for slot, items in self.armors_by_slot.items():
+            self.pools["armor:" + slot] = self._pool(items)
+
+    @staticmethod
+    def _flat(tab):
+        return [(k, v) for k, v in (tab or {}).items() if isinstance(v, dict)]
+
+    @staticmethod
+    def _templates(tab, data):
+        return [(path[-1], entry) for path, entry in item_entries(tab, data or {})]
+
+    @staticmethod
+    def _pool(items):
+        return ([item_id for item_id, _ in items],
+                np.array([int(entry.get("value", 0) or 0) for _, entry in items], dtype=np.int64))
+
+    def shop_price(self, item_id):
+        # ShopManager._add_common_weapons / _add_common_armor (rarity common, ilvl 1: value unscaled)
+        if item_id in SHOP_PRICES:
+            return SHOP_PRICES[item_id]
+        entry = self.templates.get(item_id)
+        if entry is None:
+            return None
+        value = int(entry.get("value", 0) or 0)
+        return int(value / 2.5) if any(item_id == w for w, _ in self.weapons) else value
+
+    def sell_price(self, item_id):
+        for items in (self.consumables, self.materials, self.equipment):
+            for key, entry in items:
+                if key == item_id:
+                    return int(entry.get("value", 0) or 0) // SELL_DIVISOR
+        return None
+
+
+def check_prices(tables):
+    # -> [(item, buy, sell)] shop consumables that sell for more than they cost
+    loops = []
+    for item_id, buy in SHOP_PRICES.items():
+        sell = tables.sell_price(item_id)
+        if sell is not None and sell > buy:
+            loops.append((item_id, buy, sell))
+    return sorted(loops, key=lambda r: r[1] - r[2])
+
+
+# -------------------------
+# Simulation
+# -------------------------
+class Ledger:
+    """Per-run totals plus per-item sale counts (for the value sensitivity table)"""
+
+    def __init__(self, runs, floors):
+        self.gold = np.full(runs, STARTING_GOLD, dtype=np.int64)
+        self.income = {s: np.zeros(runs, dtype=np.int64) for s in SOURCES}
+        self.spend = {s: np.zeros(runs, dtype=np.int64) for s in SPENDS}
+        self.floor_gold = np.zeros((len(floors), runs), dtype=np.int64)
+        self.floor_income = np.zeros((len(floors), runs), dtype=np.int64)
+        self.floor_spend = np.zeros((len(floors), runs), dtype=np.int64)
+        self.sales = {}  # pool -> per-item copper
+        self.short = np.zeros(len(floors), dtype=np.int64)  # runs that could not restock potions
+        self.kit_done = np.zeros(runs, dtype=np.int64)  # floor the shop kit was complete (0 = never)
+
+    def earn(self, source, amount):
+        self.gold += amount
+        self.income[source] += amount
+
+    def sold(self, pool, idx, copper, mask):
+        if not mask.any():
+            return
+        per_item = self.sales.get(pool)
+        if per_item is None:
+            per_item = self.sales[pool] = np.zeros(0, dtype=np.float64)
+        counts = np.bincount(idx[mask], weights=copper[mask].astype(np.float64))
+        if len(counts) > len(per_item):
+            per_item = self.sales[pool] = np.concatenate([per_item, np.zeros(len(counts) - len(per_item))])
+        per_item[:len(counts)] += counts
+
+
+def _roll_rarity(tables, rng, n, min_tier=0):
+    # roll_rarity(min_rarity_tier): rolls below the minimum are upgraded (to common past legendary)
+    tier = np.searchsorted(tables.rarity_upper, rng.random(n), side="right")
+    if min_tier <= 0:
+        return tier
+    return np.where(tier < min_tier, upgrade_tier(min_tier), tier)
+
+def _scaled_sell(tables, rng, base, floor, tier):
+    # Equipment.generate_for_floor -> scale_value, then ShopScene's value / 2
+    ilvl = np.maximum(1, floor + tables.ilvl_bonus[tier] + rng.integers(-2, 3, len(tier)))
+    value = (base * (tables.rarity_mult[tier] * (1.0 + (ilvl - 1) * 0.05))).astype(np.int64)
+    return value // SELL_DIVISOR
+
+def _drop_items(tables, rng, ledger, pool, chance, floor, source, equipment=False):
+    # add_random_item_to_rewards: one roll, one item picked uniformly from the pool
+    ids, values = tables.pools.get(pool, ((), None))
+    if not len(ids):
+        return
+    n = len(ledger.gold)
+    hit = rng.random(n) < chance
+    idx = rng.integers(0, len(ids), n)
+    if equipment:
+        copper = _scaled_sell(tables, rng, values[idx], floor, _roll_rarity(tables, rng, n))
+    else:
+        copper = values[idx] // SELL_DIVISOR
+    copper = np.where(hit, copper, 0)
+    ledger.earn(source, copper)
+    ledger.sold(pool, idx, copper, hit)
+
+def _enemy_gear(tables, rng, ledger, floor, boss, momentum):
+    # give_enemy_equipment + the uncommon+ drops in calculate_battle_rewards
+    n = len(ledger.gold)
+    tier_d = difficulty_tier(floor)
+    chance = 1.0 if boss else min(0.70 + tier_d * 0.05, 1.0)
+    guaranteed = 5 if floor >= 15 else 4 if floor >= 10 else 3 if floor >= 5 else 0
+    min_tier = floor // 3
+    armor_count = np.zeros(n, dtype=np.int64)
+    for slot, from_floor in ENEMY_SLOTS:
+        if not boss and floor < from_floor:
+            continue
+        pool = "weapons" if slot == "main_hand" else "armor:" + slot
+        ids, values = tables.pools.get(pool, ((), None))
+        equip = rng.random(n) < chance
+        if slot != "main_hand":
+            equip |= armor_count < guaranteed
+        if not len(ids):
+            continue
+        if slot != "main_hand":
+            armor_count += equip
+        idx = rng.integers(0, len(ids), n)
+        tier = _roll_rarity(tables, rng, n, min_tier)
+        drop = np.array(DROP_CHANCE)[tier]
+        if boss:
+            drop = np.where(tier > 0, np.minimum(1.0, drop + 0.15), 0.0)
+        if momentum >= 3:
+            drop = np.where(tier > 0, np.minimum(1.0, drop + (momentum - 2) * 0.10), 0.0)
+        hit = equip & (rng.random(n) < drop)
+        copper = np.where(hit, _scaled_sell(tables, rng, values[idx], floor, tier), 0)
+        ledger.earn("enemy_gear", copper)
+        ledger.sold(pool, idx, copper, hit)
+
+def _shop(tables, ledger, kit, owned, potion, potions, fi):
+    # restock potions first, then kit pieces in order, each once, as soon as affordable
+    price = SHOP_PRICES.get(potion, 0)
+    if potions and price:
+        count = np.minimum(potions, ledger.gold // price)
+        ledger.short[fi] += int((count < potions).sum())
+        ledger.gold -= count * price
+        ledger.spend["potions"] += count * price
+    if not kit:
+        return
+    done = owned.all(axis=0)
+    for k, item_id in enumerate(kit):
+        price = tables.shop_price(item_id)
+        buy = ~owned[k] & (ledger.gold >= price)
+        owned[k] |= buy
+        cost = np.where(buy, price, 0)
+        ledger.gold -= cost
+        ledger.spend["kit"] += cost
+    ledger.kit_done[~done & owned.all(axis=0)] = fi + 1
+
+def simulate(data, floors=25, runs=5000, seed=0, streak=0, potions=3, potion="health_potion",
+             kit=DEFAULT_KIT):
+    """-> result dict. data: the content manager's tabs (Consumables, Materials, Weapons, Armors)
+    or prebuilt EconomyTables. streak: battles per momentum streak (0 = breather after every win)."""
+    _require_numpy()
+    tables = data if isinstance(data, EconomyTables) else EconomyTables(data)
+    floor_list = list(range(1, floors + 1))
+    rng = np.random.Generator(np.random.PCG64(seed))
+    ledger = Ledger(runs, floor_list)
+    kit = [k for k in kit if tables.shop_price(k) is not None]
+    owned = np.zeros((len(kit), runs), dtype=bool)
+    run_len, streak_gold = 0, np.zeros(runs, dtype=np.int64)
+    t0 = time.perf_counter()
+    for fi, floor in enumerate(floor_list):
+        before_income = sum(ledger.income.values()).copy()
+        before_spend = sum(ledger.spend.values()).copy()
+        _shop(tables, ledger, kit, owned, potion, potions, fi)
+        for wave in range(1, WAVES + 2):
+            boss = wave == WAVES + 1
+            momentum = min(run_len, MAX_MOMENTUM)
+            breather = streak > 0 and run_len >= streak
+            gold = battle_currency(floor, wave, boss)
+            ledger.earn("battle", np.full(runs, gold, dtype=np.int64))
+            mult = (1 + floor * 0.1) * momentum_bonus(momentum)
+            _enemy_gear(tables, rng, ledger, floor, boss, momentum)
+            if boss:
+                _drop_items(tables, rng, ledger, "consumables", 1.0 * mult, floor, "consumables")
+                _drop_items(tables, rng, ledger, "materials", 1.0 * mult, floor, "materials")
+                _drop_items(tables, rng, ledger, "weapons", 0.5 * mult, floor, "equipment", True)
+                _drop_items(tables, rng, ledger, "armors", 0.5 * mult, floor, "equipment", True)
+            else:
+                _drop_items(tables, rng, ledger, "consumables", 0.7 * mult, floor, "consumables")
+                _drop_items(tables, rng, ledger, "materials", 0.3 * mult, floor, "materials")
+                _drop_items(tables, rng, ledger, "equipment", 0.1 * mult, floor, "equipment", True)
+            # MomentumSystem: currency accumulates while momentum >= 1; a breather at 3+ pays 40%
+            if streak > 0:
+                if breather:
+                    if momentum >= 3:
+                        ledger.earn("breather", (streak_gold * STREAK_BONUS).astype(np.int64))
+                    streak_gold[:] = 0
+                    run_len = 0
+                else:
+                    if momentum >= 1:
+                        streak_gold += gold
+                    run_len += 1
+        ledger.floor_gold[fi] = ledger.gold
+        ledger.floor_income[fi] = sum(ledger.income.values()) - before_income
+        ledger.floor_spend[fi] = sum(ledger.spend.values()) - before_spend
+    return {
+        "floors": floor_list, "runs": runs, "seed": seed, "streak": streak,
+        "potions": potions, "potion": potion, "kit": kit,
+        "ledger": ledger, "tables": tables, "loops": check_prices(tables),
+        "seconds": time.perf_counter() - t0,
+    }
+
+def kit_stats(result):
+    # -> (% of runs that completed the kit, median floor it was complete on among those)
+    done = result["ledger"].kit_done
+    done = done[done > 0]
+    if not result["kit"] or not len(done):
+        return 0.0, None
+    return 100.0 * len(done) / result["runs"], float(np.median(done))
+
+
+# -------------------------
+# Reporting
+# -------------------------
+def floor_table(result):
+    # -> rows of (floor, gold percentiles..., mean income, mean spend, potion shortfall %)
+    ledger = result["ledger"]
+    rows = []
+    for fi, floor in enumerate(result["floors"]):
+        gold = ledger.floor_gold[fi]
+        rows.append([floor] + [int(v) for v in np.percentile(gold, PERCENTILES)]
+                    + [float(ledger.floor_income[fi].mean()), float(ledger.floor_spend[fi].mean()),
+                       100.0 * ledger.short[fi] / result["runs"]])
+    return rows
+
+def source_shares(result):
+    ledger = result["ledger"]
+    total = float(sum(v.sum() for v in ledger.income.values())) or 1.0
+    return [(s, float(ledger.income[s].mean()), 100.0 * ledger.income[s].sum() / total) for s in SOURCES]
+
+def top_items(result, top=10):
+    # -> [(pool, item, mean copper per run, % of sell income)]
+    ledger, tables = result["ledger"], result["tables"]
+    rows = {}
+    for pool, per_item in ledger.sales.items():
+        ids = tables.pools[pool][0]
+        for i, copper in enumerate(per_item):
+            if copper:
+                rows[ids[i]] = rows.get(ids[i], 0.0) + copper
+    sold = sum(rows.values()) or 1.0
+    out = sorted(rows.items(), key=lambda kv: -kv[1])[:top]
+    return [(item, copper / result["runs"], 100.0 * copper / sold) for item, copper in out]
+
+def format_report(result, top=10):
+    lines = [f"{'floor':>5} " + " ".join(f"{'p' + str(p):>8}" for p in PERCENTILES)
+             + f" {'income':>9} {'spend':>7} {'short%':>6}"]
+    for row in floor_table(result):
+        lines.append(f"{row[0]:>5} " + " ".join(f"{v:>8}" for v in row[1:1 + len(PERCENTILES)])
+                     + f" {row[-3]:>9.0f} {row[-2]:>7.0f} {row[-1]:>6.1f}")
+    lines.append("gold after each floor (copper, percentiles over runs); income / spend = mean that floor; "
+                 f"short% = runs that could not buy {result['potions']} {result['potion']}")
+    lines.append("")
+    lines.append("income by source (mean per run):")
+    for source, mean, share in source_shares(result):
+        lines.append(f"  {source:<12} {mean:>12.0f} {share:>6.1f}%")
+    ledger = result["ledger"]
+    for s in SPENDS:
+        lines.append(f"  spent {s:<6} {float(ledger.spend[s].mean()):>12.0f}")
+    if result["kit"]:
+        share, floor = kit_stats(result)
+        when = f", median floor {floor:.0f}" if floor is not None else ""
+        lines.append(f"  shop kit ({len(result['kit'])} pieces) complete in {share:.1f}% of runs{when}")
+    lines.append("")
+    lines.append(f"items driving sell income (top {top}):")
+    for item, copper, share in top_items(result, top):
+        lines.append(f"  {item:<24} {copper:>10.0f} {share:>6.1f}%")
+    loops = result["loops"]
+    lines.append("")
+    if loops:
+        lines.append("shop buy/sell loops (ShopManager price < value / 2):")
+        for item, buy, sell in loops:
+            lines.append(f"  {item:<24} buy {buy:>4}  sell {sell:>4}  +{sell - buy} per cycle")
+    else:
+        lines.append("no shop buy/sell loops")
+    return "\n".join(lines)
+
+def format_summary(result):
+    # compact per-floor median gold, for the content manager
+    lines = []
+    for row in floor_table(result):
+        lines.append(f"Floor {row[0]:>2}: median {row[3]:>8} (p5 {row[1]}, p95 {row[5]})")
+    return "\n".join(lines)
+
+def write_csv(result, fh):
+    fh.write("floor," + ",".join(f"p{p}" for p in PERCENTILES) + ",mean_income,mean_spend,short_pct\n")
+    for row in floor_table(result):
+        fh.write(",".join(str(round(v, 2)) if isinstance(v, float) else str(v) for v in row) + "\n")
+
+def to_json(result, top=10):
+    return {
+        "floors": result["floors"], "runs": result["runs"], "seed": result["seed"],
+        "streak": result["streak"], "potions": result["potions"], "kit": result["kit"],
+        "percentiles": list(PERCENTILES),
+        "per_floor": floor_table(result),
+        "sources": source_shares(result),
+        "top_items": top_items(result, top),
+        "loops": result["loops"],
+        "kit_complete": kit_stats(result),
+    }
+
+def load_data(root_dir):
+    return {tab: safe_load(os.path.join(root_dir, JSON_FILES[tab]))
+            for tab in ("Consumables", "Materials", "Weapons", "Armors")}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Monte Carlo gold income vs spending per floor")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--floors", type=int, default=25, help="floors per run")
+    ap.add_argument("--runs", type=int, default=5000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--streak", type=int, default=0,
+                    help="battles per momentum streak before a breather (0 = no momentum)")
+    ap.add_argument("--potions", type=int, default=3, help="potions bought before every floor")
+    ap.add_argument("--potion", default="health_potion", help="shop consumable to restock")
+    ap.add_argument("--kit", default=",".join(DEFAULT_KIT),
+                    help="shop equipment bought once, in order ('' for none)")
+    ap.add_argument("--top", type=int, default=10, help="items listed in the sell income table")
+    ap.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    ap.add_argument("-o", "--output", help="write to a file instead of stdout")
+    args = ap.parse_args(argv)
+    _require_numpy()
+
+    if args.potion not in SHOP_PRICES:
+        print(f"ERROR: {args.potion} is not sold by the shop ({', '.join(SHOP_PRICES)})")
+        return 1
+    kit = [k for k in args.kit.split(",") if k.strip()]
+    data = load_data(args.root)
+    result = simulate(data, args.floors, args.runs, args.seed, args.streak, args.potions, args.potion, kit)
+    missing = [k for k in kit if k not in result["kit"]]
+    if missing:
+        print(f"WARNING: not in the shop, skipped: {', '.join(missing)}", file=sys.stderr)
+    fh = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+    try:
+        if args.format == "csv":
+            write_csv(result, fh)
+        elif args.format == "json":
+            json.dump(to_json(result, args.top), fh, indent=1)
+            fh.write("\n")
+        else:
+            fh.write(format_report(result, args.top) + "\n")
+    finally:
+        if fh is not sys.stdout:
+            fh.close()
+    print(f"{args.runs} runs x {args.floors} floors in {result['seconds']:.2f} s (seed {args.seed})",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+content_effects.py
+Uldtale-Battlesim Status Effect Benchmark
+- Python model of StatusEffectManager: apply_effect (bleed stacks / burst), update_effects,
+  _process_effect_damage (hp_percent / flat damage, REGENERATION, stun_chance, fallbacks for
+  effects without data), _apply_stat_modifiers / _modify_attribute through BuffDebuffManager's
+  stronger-wins rule, and the reflect_damage pass in CharacterData.take_damage
+- Reads data/status_effects.json (or the content manager's unsaved data)
+- Per effect definition: damage / healing per tick, over one application and when re-applied every
+  turn (effective DPS as % of max HP), stun uptime, and the work one tick costs the game:
+  _get_effect_data lookups (each a deep copy), stat recalculations, take_damage calls, reflected hits
+- Stress suite: every effect stacked on 1..N combatants and re-applied every turn; reports the
+  per-turn cost as it grows, with per-tick lookups (as the game does) vs definitions resolved once
+- Flags degenerate entries: guaranteed stun locks, one application killing, reflection that does
+  not decay (total reflect_damage >= 1 recurses forever), ENRAGED without stat_modifiers,
+  unknown damage types / stats
+"""
+
+import os
+import sys
+import copy
+import json
+import time
+import argparse
+
+from content_data import JSON_FILES, safe_load
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Skill.StatusEffect / Skill.AttributeTarget order
+EFFECTS = ("POISON", "BURN", "FREEZE", "BLEED", "SHOCK", "CONFUSED", "BLIND", "SLEEP",
+           "REGENERATION", "ENRAGED", "REFLECT")
+ATTRIBUTES = ("vitality", "strength", "dexterity", "intelligence", "faith", "mind", "endurance",
+              "arcane", "agility", "fortitude")
+DAMAGE_TYPES = ("none", "hp_percent", "flat", "stackable_burst", "heal_percent")
+
+# effects _process_effect_damage handles by name before looking at damage_type
+MESSAGE_ONLY = ("BLEED", "ENRAGED", "REFLECT", "CONFUSED")
+
+DEFAULT_HP = 1000
+DEFAULT_DURATION = 3  # most common skill status duration
+REFLECT_DEPTH = 64  # past this the game would overflow its stack
+
+# work counters, in this order everywhere
+WORK = ("lookups", "recalcs", "hits", "reflects", "stuns", "damage", "healing")
+LOOKUPS, RECALCS, HITS, REFLECTS, STUNS, DAMAGE, HEALING = range(len(WORK))
+
+
+# -------------------------
+# Effect data
+# -------------------------
+class EffectData:
+    """status_effects.json as the game reads it: every lookup returns a deep copy
+    (StatusEffects.get_effect_data -> duplicate(true)) unless resolve_once is set"""
+
+    def __init__(self, data, resolve_once=False):
+        self.data = data if isinstance(data, dict) else {}
+        self.resolve_once = resolve_once
+
+    def get(self, name):
+        entry = self.data.get(name)
+        if not isinstance(entry, dict):
+            return {}
+        return entry if self.resolve_once else copy.deepcopy(entry)
+
+
+def check_effects(data):
+    # -> [(effect, message)] for entries that break or degenerate in the game
+    issues = []
+    reflect_total = 0.0
+    for name in sorted(data, key=lambda n: (n not in EFFECTS, n)):
+        entry = data[name]
+        if not isinstance(entry, dict):
+            issues.append((name, "not an object"))
+            continue
+        if name not in EFFECTS:
+            issues.append((name, "not a Skill.StatusEffect; the game never applies it"))
+        kind = entry.get("damage_type", "none")
+        if kind not in DAMAGE_TYPES:
+            issues.append((name, f"unknown damage_type {kind!r} (no damage)"))
+        if kind == "heal_percent" and name != "REGENERATION":
+            issues.append((name, "heal_percent only heals for REGENERATION"))
+        if kind in ("hp_percent", "flat") and name in MESSAGE_ONLY:
+            issues.append((name, f"damage_type {kind} is ignored: {name} ticks are message-only"))
+        value = _number(entry.get("damage_value", 0))
+        if kind == "hp_percent" and value >= 1.0:
+            issues.append((name, f"damage_value {value} kills in one tick"))
+        if value < 0:
+            issues.append((name, f"negative damage_value {value}"))
+        if _number(entry.get("stun_chance", 0)) >= 1.0 and name not in MESSAGE_ONLY:
+            issues.append((name, "stun_chance >= 1: stunned every turn it is active"))
+        mods = entry.get("stat_modifiers")
+        if isinstance(mods, dict):
+            for stat in mods:
+                if stat.lower() not in ATTRIBUTES:
+                    issues.append((name, f"stat_modifiers: {stat!r} is not an attribute (ignored)"))
+        elif name == "ENRAGED":
+            issues.append((name, "no stat_modifiers: the ENRAGED tick reads them and fails"))
+        if name == "BLEED" and int(_number(entry.get("max_stacks", 3))) <= 1:
+            issues.append((name, "max_stacks <= 1: every application bursts immediately"))
+        reflect_total += _number(entry.get("reflect_damage", 0))
+    if reflect_total >= 1.0:
+        issues.append(("*", f"reflect_damage totals {reflect_total:g} when stacked: "
+                            "reflected hits never decay to 0 (unbounded recursion)"))
+    return issues
+
+def _number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+# -------------------------
+# Model
+# -------------------------
+class Unit:
+    __slots__ = ("name", "max_hp", "hp", "active", "stacks", "buffs", "debuffs", "stunned",
+                 "last_attacker")
+
+    def __init__(self, name, max_hp=DEFAULT_HP):
+        self.name = name
+        self.max_hp = max_hp
+        self.hp = max_hp
+        self.active = {}  # effect -> turns left, in application order like active_effects
+        self.stacks = {}
+        self.buffs = {}  # attribute -> [value, duration]
+        self.debuffs = {}
+        self.stunned = False
+        self.last_attacker = None
+
+
+class Sim:
+    """One battle's worth of StatusEffectManager / BuffDebuffManager state.
+    Work is charged to the effect being applied or ticked (self.work[effect])."""
+
+    def __init__(self, effects, rng):
+        self.effects = effects
+        self.rng = rng
+        self.work = {}
+        self.current = None
+        self.depth = 0
+        self.max_depth = 0
+
+    def _charge(self, index, amount=1):
+        row = self.work.get(self.current)
+        if row is None:
+            row = self.work[self.current] = [0] * len(WORK)
+        row[index] += amount
+
+    def _data(self, name):
+        self._charge(LOOKUPS)
+        return self.effects.get(name)
+
+    # === APPLY/REMOVE ===
+
+    def apply(self, unit, name, duration):
+        self.current = name
+        self._data(name)  # apply_effect resolves the data before branching
+        if name == "BLEED":
+            self._apply_bleed(unit, duration)
+        elif name not in unit.active:
+            unit.active[name] = duration
+            self._stat_modifiers(unit, name, True)
+            if name == "ENRAGED":
+                self._charge(RECALCS)
+        else:
+            unit.active[name] = max(unit.active[name], duration)
+
+    def _apply_bleed(self, unit, duration):
+        data = self._data("BLEED")
+        max_stacks = int(_number(data.get("max_stacks", 3)))
+        if "BLEED" not in unit.stacks:
+            unit.stacks["BLEED"] = 1
+            unit.active["BLEED"] = duration
+            self._stat_modifiers(unit, "BLEED", True)
+            return
+        if unit.stacks["BLEED"] < max_stacks:
+            unit.stacks["BLEED"] += 1
+            unit.active["BLEED"] += duration
+            if unit.stacks["BLEED"] < max_stacks:
+                return
+        # _trigger_bleed_burst
+        data = self._data("BLEED")
+        self.take_damage(unit, int(unit.max_hp * _number(data.get("burst_damage_percent", 0.30))))
+        self._stat_modifiers(unit, "BLEED", False)
+        unit.active.pop("BLEED", None)
+        unit.stacks.pop("BLEED", None)
+
+    def remove(self, unit, name):
+        if name not in unit.active:
+            return
+        self._stat_modifiers(unit, name, False)
+        del unit.active[name]
+        if name == "ENRAGED":
+            self._charge(RECALCS)
+        unit.stacks.pop(name, None)
+
+    def _stat_modifiers(self, unit, name, apply):
+        data = self._data(name)
+        mods = data.get("stat_modifiers")
+        if mods is None:
+            # _fallback_modifiers
+            mods = {"BURN": {"strength": -2},
+                    "FREEZE": {"vitality": -2, "agility": -2, "arcane": -2}}.get(name, {})
+        if not isinstance(mods, dict):
+            return
+        for stat, value in mods.items():
+            if stat.lower() in ATTRIBUTES:
+                self._modify(unit, stat.lower(), int(_number(value)), apply, unit.active.get(name, 1))
+
+    def _modify(self, unit, attr, value, apply, duration):
+        if not apply:
+            # erases the whole attribute, whichever effect or skill put it there
+            unit.buffs.pop(attr, None)
+            unit.debuffs.pop(attr, None)
+            return
+        table, value = (unit.buffs, value) if value > 0 else (unit.debuffs, abs(value))
+        old = table.get(attr)
+        if old is None or value > old[0]:
+            table[attr] = [value, duration]
+        elif value == old[0]:
+            old[1] = max(old[1], duration)
+        self._charge(RECALCS)
+
+    # === UPDATE TICK ===
+
+    def update(self, unit):
+        # CharacterData.update_status_effects: status tick, then buff/debuff durations
+        expired = []
+        for name in list(unit.active):
+            if name not in unit.active:  # burst or removed mid-tick
+                continue
+            self.current = name
+            unit.active[name] -= 1
+            if unit.active[name] <= 0:
+                expired.append(name)
+            else:
+                self._tick(unit, name)
+        for name in expired:
+            self.current = name
+            self.remove(unit, name)
+        self.current = None
+        changed = False
+        for table in (unit.buffs, unit.debuffs):
+            for attr in list(table):
+                table[attr][1] -= 1
+                if table[attr][1] <= 0:
+                    del table[attr]
+                    changed = True
+        if changed:
+            self._charge(RECALCS)
+
+    def _tick(self, unit, name):
+        data = self._data(name)
+        if not data:
+            self._fallback_tick(unit, name)
+            return
+        if name in ("BLEED", "REFLECT", "CONFUSED"):
+            return
+        if name == "REGENERATION":
+            heal = min(int(unit.max_hp * _number(data.get("damage_value", 0.05))), unit.max_hp - unit.hp)
+            if heal > 0:
+                unit.hp += heal
+                self._charge(HEALING, heal)
+            return
+        if name == "ENRAGED":
+            self._data("ENRAGED")
+            return
+        kind = data.get("damage_type", "none")
+        dmg = 0
+        if kind == "hp_percent":
+            dmg = int(unit.max_hp * _number(data.get("damage_value", 0)))
+        elif kind == "flat":
+            dmg = int(_number(data.get("damage_value", 0)))
+        if dmg > 0:
+            self.take_damage(unit, dmg)
+        if "stun_chance" in data and self.rng.random() < _number(data["stun_chance"]):
+            unit.stunned = True
+            self._charge(STUNS)
+
+    def _fallback_tick(self, unit, name):
+        divisor = {"POISON": 10, "BURN": 20, "SHOCK": 15}.get(name)
+        if divisor:
+            self.take_damage(unit, unit.max_hp // divisor)
+        if name == "SHOCK" and self.rng.random() < 0.2:
+            unit.stunned = True
+            self._charge(STUNS)
+
+    def take_damage(self, unit, amount, attacker=None):
+        if unit.hp <= 0:
+            unit.hp = 0
+            return
+        self._charge(HITS)
+        if attacker is not None:
+            unit.last_attacker = attacker
+        source = unit.last_attacker
+        if source is not None and source is not unit:
+            # get_total_reflection: one lookup per active effect, every hit
+            reflection = 0.0
+            for name in unit.active:
+                reflection += _number(self._data(name).get("reflect_damage", 0))
+            reflected = int(amount * reflection)
+            if reflected > 0:
+                self._charge(REFLECTS)
+                self.depth += 1
+                self.max_depth = max(self.max_depth, self.depth)
+                if self.depth < REFLECT_DEPTH:
+                    self.take_damage(source, reflected)
+                self.depth -= 1
+        amount = int(amount)
+        self._charge(DAMAGE, min(amount, unit.hp))
+        unit.hp = max(0, min(unit.max_hp, unit.hp - amount))
+
+
+# -------------------------
+# Benchmarks
+# -------------------------
+class _Rng:
+    # tiny LCG so runs are identical across Python versions and cheap next to the model
+    def __init__(self, seed):
+        self.state = seed & 0xFFFFFFFF or 1
+
+    def random(self):
+        self.state = (self.state * 1103515245 + 12345) & 0x7FFFFFFF
+        return self.state / 0x80000000
+
+
+def _pair(max_hp):
+    unit, foe = Unit("target", max_hp), Unit("attacker", max_hp)
+    unit.last_attacker, foe.last_attacker = foe, unit
+    return unit, foe
+
+def profile_effect(data, name, duration=DEFAULT_DURATION, turns=20, max_hp=DEFAULT_HP, seed=0,
+                   trials=50):
+    """One effect on one target (with a last attacker, so reflection is exercised).
+    single: applied once and ticked until it expires; sustained: re-applied every turn."""
+    effects = EffectData(data)
+    row = {"effect": name, "defined": name in data, "duration": duration}
+
+    sims, ticks, damage, healing, stunned = [], 0, 0, 0, 0
+    for t in range(trials):
+        sim = Sim(effects, _Rng(seed + t))
+        unit, _ = _pair(max_hp)
+        if name == "REGENERATION":
+            unit.hp = max_hp // 2
+        sim.apply(unit, name, duration)
+        while unit.active:
+            unit.stunned = False
+            sim.update(unit)
+            ticks += name in unit.active
+            stunned += unit.stunned
+        sims.append(sim)
+        damage += max_hp - unit.hp if name != "REGENERATION" else 0
+        healing += unit.hp - max_hp // 2 if name == "REGENERATION" else 0
+    turns_active = max(1, duration)
+    row["ticks"] = ticks / trials
+    row["single_pct"] = 100.0 * damage / trials / max_hp
+    row["heal_pct"] = 100.0 * healing / trials / max_hp
+    row["dps_single"] = row["single_pct"] / turns_active
+
+    sim = Sim(effects, _Rng(seed))
+    unit, _ = _pair(max_hp)
+    stun_turns = lost = 0
+    for _ in range(turns):
+        unit.hp = max_hp  # topped up every turn: measure the rate, not the kill
+        unit.stunned = False
+        sim.apply(unit, name, duration)
+        sim.update(unit)
+        lost += max_hp - unit.hp
+        stun_turns += unit.stunned
+    row["dps_sustained"] = 100.0 * lost / turns / max_hp
+    row["stun_uptime"] = stun_turns / turns
+    row["kill_turns"] = (100.0 / row["dps_sustained"]) if row["dps_sustained"] > 0 else None
+    row["reflect_depth"] = sim.max_depth
+
+    # work per tick, charged to this effect (apply + ticks + expiry of one application)
+    totals = [0] * len(WORK)
+    for s in sims:
+        for counts in s.work.values():
+            for i, v in enumerate(counts):
+                totals[i] += v
+    per = max(1.0, ticks / trials)
+    row["lookups_tick"] = totals[LOOKUPS] / trials / per
+    row["recalcs_tick"] = totals[RECALCS] / trials / per
+    row["hits_tick"] = totals[HITS] / trials / per
+    row["us_tick"] = _time_ticks(data, name, duration, max_hp)
+    return row
+
+def _time_ticks(data, name, duration, max_hp, reps=400):
+    # measured model time per tick (game-style lookups), microseconds
+    effects = EffectData(data)
+    t0 = time.perf_counter()
+    ticks = 0
+    for r in range(reps):
+        sim = Sim(effects, _Rng(r))
+        unit, _ = _pair(max_hp)
+        sim.apply(unit, name, max(duration, 2))
+        unit.active[name] = max(duration, 2)
+        sim.update(unit)
+        ticks += 1
+    return (time.perf_counter() - t0) / ticks * 1e6
+
+def profile_all(data, duration=DEFAULT_DURATION, turns=20, max_hp=DEFAULT_HP, seed=0):
+    # undefined effects still run, on the game's fallbacks
+    return [profile_effect(data, n, duration, turns, max_hp, seed) for n in EFFECTS]
+
+def stress(data, sizes=(1, 8, 64, 256), turns=10, duration=DEFAULT_DURATION, max_hp=DEFAULT_HP,
+           seed=0, effects_list=None):
+    """Every effect stacked on every combatant and re-applied each turn. Combatants come in pairs
+    that last hit each other, so DoT ticks run the reflection pass. Returns one row per size and
+    resolution mode plus per-effect work from the largest game-mode run."""
+    names = list(effects_list or [n for n in EFFECTS if n in data])
+    rows = []
+    per_effect = {}
+    for n in sizes:
+        for resolve_once in (False, True):
+            sim = Sim(EffectData(data, resolve_once), _Rng(seed))
+            units = []
+            while len(units) < n:
+                units.extend(_pair(max_hp))
+            units = units[:n]
+            t0 = time.perf_counter()
+            for _ in range(turns):
+                for unit in units:
+                    for name in names:
+                        sim.apply(unit, name, duration)
+                for unit in units:
+                    unit.hp = unit.max_hp  # keep everyone alive: dead units skip take_damage
+                    unit.stunned = False
+                    sim.update(unit)
+            seconds = time.perf_counter() - t0
+            totals = [0] * len(WORK)
+            for counts in sim.work.values():
+                for i, v in enumerate(counts):
+                    totals[i] += v
+            unit_turns = len(units) * turns
+            rows.append({
+                "units": len(units), "mode": "resolve once" if resolve_once else "per tick (game)",
+                "us_turn": seconds / turns * 1e6, "us_unit_turn": seconds / unit_turns * 1e6,
+                "lookups_unit_turn": totals[LOOKUPS] / unit_turns,
+                "recalcs_unit_turn": totals[RECALCS] / unit_turns,
+                "hits_unit_turn": totals[HITS] / unit_turns,
+                "reflect_depth": sim.max_depth,
+            })
+            if not resolve_once:
+                # work charged outside any effect (None) is in the totals only
+                per_effect = {k: [v / unit_turns for v in counts] for k, counts in sim.work.items()
+                              if k is not None}
+    return rows, per_effect
+
+
+# -------------------------
+# Reporting
+# -------------------------
+def _fmt(value, spec=".1f", none="-"):
+    return none if value is None else format(value, spec)
+
+def format_profiles(rows):
+    lines = [f"{'effect':<13} {'ticks':>5} {'once%':>6} {'dps%':>6} {'sust%':>6} {'heal%':>6} "
+             f"{'stun':>5} {'kill':>5} {'look/t':>6} {'calc/t':>6} {'hits/t':>6} {'us/t':>7}"]
+    for r in rows:
+        name = r["effect"] + ("" if r["defined"] else "*")
+        lines.append(
+            f"{name:<13} {r['ticks']:>5.1f} {r['single_pct']:>6.1f} {r['dps_single']:>6.2f} "
+            f"{r['dps_sustained']:>6.2f} {r['heal_pct']:>6.1f} {r['stun_uptime']:>5.2f} "
+            f"{_fmt(r['kill_turns'], '.0f'):>5} {r['lookups_tick']:>6.1f} {r['recalcs_tick']:>6.1f} "
+            f"{r['hits_tick']:>6.1f} {r['us_tick']:>7.1f}")
+    lines.append("once% = damage of one application, dps% = that per turn of duration, sust% = per turn "
+                 "when re-applied every turn (all % of max HP), kill = turns to kill from full HP "
+                 "sustained, */t = work per tick, * = no data (game fallback)")
+    return "\n".join(lines)
+
+def format_stress(rows, per_effect):
+    lines = [f"{'units':>5} {'mode':<16} {'us/turn':>10} {'us/unit':>8} {'look/u':>7} "
+             f"{'calc/u':>7} {'hits/u':>7} {'refl':>5}"]
+    for r in rows:
+        lines.append(f"{r['units']:>5} {r['mode']:<16} {r['us_turn']:>10.0f} {r['us_unit_turn']:>8.1f} "
+                     f"{r['lookups_unit_turn']:>7.1f} {r['recalcs_unit_turn']:>7.1f} "
+                     f"{r['hits_unit_turn']:>7.1f} {r['reflect_depth']:>5}")
+    if per_effect:
+        lines.append("")
+        lines.append("work per combatant-turn with everything stacked (game mode), by effect:")
+        lines.append(f"{'effect':<13} " + " ".join(f"{w:>8}" for w in WORK[:STUNS]))
+        order = sorted(per_effect, key=lambda k: -per_effect[k][LOOKUPS])
+        for name in order:
+            lines.append(f"{name:<13} " + " ".join(f"{v:>8.2f}" for v in per_effect[name][:STUNS]))
+    return "\n".join(lines)
+
+def format_issues(issues):
+    if not issues:
+        return "no degenerate entries"
+    return "\n".join(f"{name}: {msg}" for name, msg in issues)
+
+def run(data, duration=DEFAULT_DURATION, turns=20, max_hp=DEFAULT_HP, sizes=(1, 8, 64, 256), seed=0):
+    # -> report text (shared by main and the content manager)
+    t0 = time.perf_counter()
+    profiles = profile_all(data, duration, turns, max_hp, seed)
+    rows, per_effect = stress(data, sizes, min(turns, 10), duration, max_hp, seed)
+    return {"profiles": profiles, "stress": rows, "per_effect": per_effect,
+            "issues": check_effects(data), "seconds": time.perf_counter() - t0}
+
+def format_report(result):
+    return "\n\n".join([format_issues(result["issues"]), format_profiles(result["profiles"]),
+                        format_stress(result["stress"], result["per_effect"])])
+
+def load_data(root_dir):
+    return safe_load(os.path.join(root_dir, JSON_FILES["Status Effects"]))
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Status effect tick cost / stacking benchmark")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--file", help="status effect JSON to use instead of the project's")
+    ap.add_argument("--duration", type=int, default=DEFAULT_DURATION, help="turns per application")
+    ap.add_argument("--turns", type=int, default=20, help="turns for the sustained / stress runs")
+    ap.add_argument("--hp", type=int, default=DEFAULT_HP, help="target max HP")
+    ap.add_argument("--sizes", default="1,8,64,256", help="stress suite combatant counts")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--json", action="store_true", help="print the raw results as JSON")
+    args = ap.parse_args(argv)
+
+    data = safe_load(args.file) if args.file else load_data(args.root)
+    if not isinstance(data, dict) or not data:
+        print("ERROR: no status effect data found")
+        return 1
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+    result = run(data, args.duration, args.turns, args.hp, sizes, args.seed)
+    if args.json:
+        json.dump(result, sys.stdout, indent=1, default=str)
+        sys.stdout.write("\n")
+    else:
+        print(format_report(result))
+    print(f"benchmark took {result['seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+content_elements.py
+Uldtale-Battlesim Elemental Matrix
+- Precomputes data/element_matrix.json: per race (playable and non_playable) the elemental
+  resistance / weakness / damage bonus rows as RaceElementalData.apply_to_character and the
+  ElementalResistanceManager setters leave them (clamped, ElementalDamage.Element order), plus the
+  damage-taken multiplier (1 - resistance) * (1 + weakness) per element: a dense element x race
+  matrix the game indexes instead of resolving dictionaries on every hit
+- Skill x race table: each skill's elemental multiplier against every race (product over its
+  elements as Skill.deal_damage does, neutral attacker) and power x multiplier as its expected
+  damage before stats, defense and crits
+- Incremental like content_enemy: rows remember the race / skill entries they were built from;
+  after an edit only the rows (and skill cells) of changed races and skills are recomputed, and
+  the file is rewritten only when something changed
+- Built alongside the content pack (content_pack.build_pack); "show" prints both tables
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from content_data import JSON_FILES, atomic_write, safe_load
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLE_FILE = "data/element_matrix.json"
+TABLE_FORMAT = "uldtale-element-matrix"
+TABLE_VERSION = 1
+
+# ElementalDamage.Element without NONE; Skill.ElementType adds PHYSICAL, which is not elemental
+ELEMENTS = ("EARTH", "FIRE", "ICE", "WIND", "LIGHTNING", "HOLY", "DARK")
+RACE_GROUPS = ("playable", "non_playable")
+RACE_FIELDS = ("elemental_resistances", "elemental_weaknesses", "elemental_damage_bonuses")
+# ElementalResistanceManager.set_base_resistance / set_base_weakness / set_damage_bonus
+CLAMPS = ((0.0, 0.9), (0.0, 2.0), (0.0, 2.0))
+MIN_MULTIPLIER = 0.1  # ElementalDamage.calculate_elemental_damage floor
+
+
+# -------------------------
+# Content
+# -------------------------
+def skill_elements(entry):
+    # Skill.create_from_dict: "elements" (list) wins over "element"; NONE / PHYSICAL deal no
+    # elemental damage (Skill.deal_damage skips them)
+    raw = entry.get("elements")
+    if not isinstance(raw, list):
+        raw = [entry.get("element")] if isinstance(entry.get("element"), str) else []
+    return [str(e).upper() for e in raw if isinstance(e, str) and str(e).upper() in ELEMENTS]
+
+def infer_elements(skills):
+    # element names used by skills ('element' or 'elements'), for the editor's dropdowns
+    names = set()
+    node = skills.get("skills") if isinstance(skills, dict) and "skills" in skills else skills
+    if isinstance(node, dict):
+        for val in node.values():
+            if not isinstance(val, dict):
+                continue
+            for k in ("element", "elements"):
+                v = val.get(k)
+                if isinstance(v, list):
+                    names.update(v)
+                elif isinstance(v, str) and v.upper() != "NONE":
+                    names.add(v)
+    return sorted(names)
+
+def race_source(entry):
+    return {f: dict(entry.get(f) or {}) if isinstance(entry.get(f), dict) else {} for f in RACE_FIELDS}
+
+def race_row(source):
+    # RaceElementalData.apply_to_character: only ElementalDamage.Element names, clamped per setter
+    row = {}
+    for field, key, (lo, hi) in zip(RACE_FIELDS, ("resist", "weak", "bonus"), CLAMPS):
+        values = source[field]
+        row[key] = [min(max(float(values.get(e, 0.0) or 0.0), lo), hi) for e in ELEMENTS]
+    row["taken"] = [(1.0 - r) * (1.0 + w) for r, w in zip(row["resist"], row["weak"])]
+    return row
+
+def hit_multiplier(bonus, taken):
+    # ElementalDamage.calculate_elemental_damage's multiplier for one element
+    return max((1.0 + bonus) * taken, MIN_MULTIPLIER)
+
+def skill_multiplier(elements, row, bonus=None):
+    mult = 1.0
+    for e in elements:
+        i = ELEMENTS.index(e)
+        mult *= hit_multiplier(bonus[i] if bonus else 0.0, row["taken"][i])
+    return mult
+
+
+# -------------------------
+# Build
+# -------------------------
+def compile_table(races, skills, previous=None):
+    # -> (table, {"races": rows rebuilt, "skills": cells rebuilt}); unchanged rows come from `previous`
+    races, skills = races or {}, skills or {}
+    skill_node = skills.get("skills") if isinstance(skills.get("skills"), dict) else {}
+    reuse = previous is not None and previous.get("format") == TABLE_FORMAT \
+        and previous.get("version") == TABLE_VERSION and previous.get("elements") == list(ELEMENTS)
+    old_src = previous.get("sources", {}) if reuse else {}
+    old_races = previous.get("races", {}) if reuse else {}
+    old_skills = previous.get("skills", {}) if reuse else {}
+
+    rebuilt = {"races": 0, "skills": 0}
+    table_races, race_src, changed = {}, {}, set()
+    for group in RACE_GROUPS:
+        table_races[group] = {}
+        for name, entry in (races.get(group) or {}).items():
+            if not isinstance(entry, dict):
+                continue
+            key = f"{group}/{name}"
+            src = race_source(entry)
+            race_src[key] = src
+            old = old_races.get(group, {}).get(name)
+            if old is not None and old_src.get("races", {}).get(key) == src:
+                table_races[group][name] = old
+            else:
+                table_races[group][name] = race_row(src)
+                changed.add(key)
+                rebuilt["races"] += 1
+
+    table_skills, skill_src = {}, {}
+    for name, entry in skill_node.items():
+        if not isinstance(entry, dict):
+            continue
+        elements = skill_elements(entry)
+        if not elements:
+            continue  # non-elemental skills are 1.0 against everyone
+        src = {"elements": elements, "power": float(entry.get("power", 0) or 0)}
+        skill_src[name] = src
+        old = old_skills.get(name) if old_src.get("skills", {}).get(name) == src else None
+        vs, damage = {}, {}
+        for group in RACE_GROUPS:
+            vs[group], damage[group] = {}, {}
+            for race, row in table_races[group].items():
+                if old is not None and f"{group}/{race}" not in changed and race in old["vs"].get(group, {}):
+                    vs[group][race] = old["vs"][group][race]
+                else:
+                    vs[group][race] = skill_multiplier(elements, row)
+                    rebuilt["skills"] += 1
+                damage[group][race] = src["power"] * vs[group][race]
+        table_skills[name] = {"elements": elements, "power": src["power"], "vs": vs, "damage": damage}
+
+    table = {
+        "format": TABLE_FORMAT,
+        "version": TABLE_VERSION,
+        "elements": list(ELEMENTS),
+        "min_multiplier": MIN_MULTIPLIER,
+        "races": table_races,
+        "skills": table_skills,
+        "sources": {"races": race_src, "skills": skill_src},
+    }
+    return table, rebuilt
+
+def read_table(root_dir):
+    path = os.path.join(root_dir, TABLE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def encode_table(table):
+    # one race / skill per line, like content_enemy.encode_table
+    lines = ["{"]
+    keys = list(table)
+    for i, key in enumerate(keys):
+        end = "," if i + 1 < len(keys) else ""
+        value = table[key]
+        if key in ("races", "skills", "sources") and value:
+            lines.append(f' "{key}": {{')
+            names = list(value)
+            for j, name in enumerate(names):
+                sep = "," if j + 1 < len(names) else ""
+                lines.append(f'  {json.dumps(name)}: {json.dumps(value[name], separators=(",", ":"))}{sep}')
+            lines.append(" }" + end)
+        else:
+            lines.append(f' {json.dumps(key)}: {json.dumps(value, separators=(",", ":"))}{end}')
+    lines.append("}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def build_element_table(root_dir, races=None, skills=None, force=False):
+    # -> {"written": bool, "rebuilt": {...}, "path": path}; races/skills default to the files on disk
+    if races is None:
+        races = safe_load(os.path.join(root_dir, JSON_FILES["Races"]))
+    if skills is None:
+        skills = safe_load(os.path.join(root_dir, JSON_FILES["Skills"]))
+    path = os.path.join(root_dir, TABLE_FILE)
+    previous = None if force else read_table(root_dir)
+    table, rebuilt = compile_table(races, skills, previous)
+    result = {"written": False, "rebuilt": rebuilt, "path": path}
+    if previous is not None and table == previous:
+        return result
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, encode_table(table))
+    result["written"] = True
+    return result
+
+
+# -------------------------
+# Lookup / display
+# -------------------------
+def race_labels(table):
+    # -> [(group, race)] in table order
+    return [(g, r) for g in RACE_GROUPS for r in table["races"].get(g, {})]
+
+def element_matrix(table):
+    # -> (row labels, columns, rows of damage-taken multipliers)
+    labels = race_labels(table)
+    return labels, table["elements"], [table["races"][g][r]["taken"] for g, r in labels]
+
+def skill_matrix(table, damage=False):
+    # -> (skill names, race labels, rows of multipliers or expected damage)
+    labels = race_labels(table)
+    key = "damage" if damage else "vs"
+    names = list(table["skills"])
+    return names, labels, [[table["skills"][s][key][g][r] for g, r in labels] for s in names]
+
+def attack_multiplier(table, skill, attacker, defender):
+    # full lookup with an attacker's race bonus: attacker / defender are (group, race)
+    entry = table["skills"].get(skill)
+    if entry is None:
+        return 1.0
+    a = table["races"][attacker[0]][attacker[1]]
+    d = table["races"][defender[0]][defender[1]]
+    return skill_multiplier(entry["elements"], d, a["bonus"])
+
+def format_tables(table, damage=False):
+    labels, cols, rows = element_matrix(table)
+    width = max([len(r) for _, r in labels] + [10])
+    lines = ["damage taken x (race vs element)", " " * (width + 2) + "".join(f"{c[:7]:>8}" for c in cols)]
+    for (group, race), row in zip(labels, rows):
+        tag = "*" if group == "non_playable" else " "
+        lines.append(f"{race:<{width}}{tag} " + "".join(f"{v:>8.2f}" for v in row))
+    names, labels, rows = skill_matrix(table, damage)
+    lines.append("")
+    lines.append(("expected damage (power x multiplier)" if damage else "skill multiplier") + " vs race")
+    lines.append(" " * 22 + "".join(f"{r[:7]:>8}" for _, r in labels))
+    for name, row in zip(names, rows):
+        lines.append(f"{name[:21]:<22}" + "".join(f"{v:>8.{0 if damage else 2}f}" for v in row))
+    lines.append("* non_playable race")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build or inspect data/element_matrix.json")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="(re)build the matrix from races.json / skills.json")
+    p.add_argument("--force", action="store_true", help="recompute every row")
+    p = sub.add_parser("show", help="print the race x element and skill x race tables")
+    p.add_argument("--damage", action="store_true", help="skill table as power x multiplier")
+    args = ap.parse_args(argv)
+
+    if args.command == "build":
+        result = build_element_table(args.root, force=args.force)
+        state = "written" if result["written"] else "up to date"
+        print(f"{result['path']}: {state}, {result['rebuilt']['races']} race row(s) and "
+              f"{result['rebuilt']['skills']} skill cell(s) recomputed")
+        return 0
+    table = read_table(args.root)
+    if table is None:
+        print(f"ERROR: no {TABLE_FILE}; run 'content_elements.py build' first")
+        return 1
+    print(format_tables(table, args.damage))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+content_enemy.py
+Uldtale-Battlesim Enemy Stat Tables
+- Precomputes data/enemy_stats.json for EnemyFactory: primary stats of every non_playable
+  class x race at each floor (class base + race mods + one point per level up, before the
+  random level-up points, which the game still rolls) and of every dungeon-race boss
+- The total scaling multiplier (get_base_multiplier x wave x momentum x boss) for the whole
+  floor / wave / momentum grid, so create_enemy / create_boss only index and truncate
+- Stamped with FORMULA_VERSION; EnemyFactory rejects a table built for other formulas
+- Incremental: each row remembers the stat vectors it was built from; rebuilding after an
+  edit recomputes only the rows of changed class / race entries, and rewrites the file only
+  when something changed
+- Built alongside the content pack (content_pack.build_pack); "show" prints the final stats
+  of one grid cell for designers
+"""
+
+import os
+import sys
+import json
+import argparse
+
+from content_data import JSON_FILES, atomic_write, safe_load
+from content_balance import STATS, base_multiplier, enemy_multiplier, MAX_MOMENTUM
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLE_FILE = "data/enemy_stats.json"
+TABLE_FORMAT = "uldtale-enemy-stats"
+TABLE_VERSION = 1
+# bump together with EnemyFactory.ENEMY_TABLE_FORMULA whenever enemy_rows / boss_row /
+# multiplier_grid stop matching the game's formulas; the game ignores tables of another formula
+FORMULA_VERSION = 1
+
+STAT_NAMES = ("vitality", "strength", "dexterity", "intelligence", "faith",
+              "mind", "endurance", "arcane", "agility", "fortitude")
+FLOORS = 25
+WAVES = 6  # DungeonStateManager.waves_per_floor + the boss wave
+BOSS_CLASS = "King"
+BOSS_MINIONS = ("Shaman", "Brute", "Minion")  # EnemyFactory.create_boss
+MINION_CONTRIBUTION = 0.5
+# create_boss extra factors per stat (index into STATS)
+BOSS_FACTORS = {0: 2, 1: 1.5, 3: 1.5, 4: 1.5, 6: 1.5}
+
+
+# -------------------------
+# Rows
+# -------------------------
+def class_vector(entry):
+    return [int(entry.get("base_" + s, 0) or 0) for s in STATS]
+
+def race_vector(entry):
+    return [int(entry.get(s + "_mod", 0) or 0) for s in STATS]
+
+def enemy_rows(cls, race, floors=FLOORS):
+    # setup_character + (floor - 1) level_up()s, without distribute_enemy_points
+    return [[c + r + floor - 1 for c, r in zip(cls, race)] for floor in range(1, floors + 1)]
+
+def boss_row(king, minion, race):
+    # EnemyFactory.create_boss, before apply_enemy_scaling
+    row = []
+    for i, (k, m, r) in enumerate(zip(king, minion, race)):
+        value = int((k + r) + (m * MINION_CONTRIBUTION))
+        if i in BOSS_FACTORS:
+            value = int(value * BOSS_FACTORS[i])
+        row.append(value)
+    return row
+
+def multiplier_grid(floors=FLOORS, waves=WAVES, max_momentum=MAX_MOMENTUM, boss=False):
+    # [floor - 1][wave - 1][momentum], same float operations as apply_enemy_scaling
+    return [[[enemy_multiplier(f, w, m, boss) for m in range(max_momentum + 1)]
+             for w in range(1, waves + 1)] for f in range(1, floors + 1)]
+
+
+# -------------------------
+# Build
+# -------------------------
+def compile_table(classes, races, previous=None, floors=FLOORS, waves=WAVES, max_momentum=MAX_MOMENTUM):
+    # -> (table, rows rebuilt); rows whose class and race vectors match `previous` are reused
+    classes, races = classes or {}, races or {}
+    enemy_classes = {k: class_vector(v) for k, v in (classes.get("non_playable") or {}).items() if isinstance(v, dict)}
+    enemy_races = {k: race_vector(v) for k, v in (races.get("non_playable") or {}).items() if isinstance(v, dict)}
+    king = (classes.get("boss") or {}).get(BOSS_CLASS)
+    king = class_vector(king) if isinstance(king, dict) else None
+
+    grid = {"floors": floors, "waves": waves, "max_momentum": max_momentum}
+    reuse = previous is not None and previous.get("format") == TABLE_FORMAT \
+        and previous.get("version") == TABLE_VERSION and previous.get("formula") == FORMULA_VERSION \
+        and previous.get("grid") == grid
+    old_src = previous.get("sources", {}) if reuse else {}
+    old_enemies = previous.get("enemies", {}) if reuse else {}
+    old_bosses = previous.get("bosses", {}) if reuse else {}
+
+    def same(kind, name, vector):
+        return old_src.get(kind, {}).get(name) == vector
+
+    rebuilt = 0
+    enemies = {}
+    for race, rv in enemy_races.items():
+        enemies[race] = {}
+        for cls, cv in enemy_classes.items():
+            old = old_enemies.get(race, {}).get(cls)
+            if old is not None and same("races", race, rv) and same("classes", cls, cv):
+                enemies[race][cls] = old
+            else:
+                enemies[race][cls] = enemy_rows(cv, rv, floors)
+                rebuilt += 1
+    bosses = {}
+    if king is not None:
+        for race, rv in enemy_races.items():
+            bosses[race] = {}
+            for minion in BOSS_MINIONS:
+                if minion not in enemy_classes:
+                    continue
+                old = old_bosses.get(race, {}).get(minion)
+                if old is not None and same("races", race, rv) and same("classes", minion, enemy_classes[minion]) \
+                        and same("classes", BOSS_CLASS, king):
+                    bosses[race][minion] = old
+                else:
+                    bosses[race][minion] = boss_row(king, enemy_classes[minion], rv)
+                    rebuilt += 1
+
+    sources = {"classes": dict(enemy_classes), "races": enemy_races}
+    if king is not None:
+        sources["classes"][BOSS_CLASS] = king
+    table = {
+        "format": TABLE_FORMAT,
+        "version": TABLE_VERSION,
+        "formula": FORMULA_VERSION,
+        "stats": list(STAT_NAMES),
+        "grid": grid,
+        "multipliers": previous["multipliers"] if reuse else {
+            "enemy": multiplier_grid(floors, waves, max_momentum),
+            "boss": multiplier_grid(floors, waves, max_momentum, boss=True),
+        },
+        "enemies": enemies,
+        "bosses": bosses,
+        "sources": sources,
+    }
+    return table, rebuilt
+
+def read_table(root_dir):
+    path = os.path.join(root_dir, TABLE_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def encode_table(table):
+    # one race / multiplier set per line: small diffs in git, still plain JSON for the game
+    lines = ["{"]
+    keys = list(table)
+    for i, key in enumerate(keys):
+        end = "," if i + 1 < len(keys) else ""
+        value = table[key]
+        if key in ("enemies", "bosses", "multipliers", "sources") and value:
+            lines.append(f' "{key}": {{')
+            names = list(value)
+            for j, name in enumerate(names):
+                sep = "," if j + 1 < len(names) else ""
+                lines.append(f'  {json.dumps(name)}: {json.dumps(value[name], separators=(",", ":"))}{sep}')
+            lines.append(" }" + end)
+        else:
+            lines.append(f' {json.dumps(key)}: {json.dumps(value, separators=(",", ":"))}{end}')
+    lines.append("}")
+    return ("\n".join(lines) + "\n").encode("utf-8")
+
+def build_enemy_table(root_dir, classes=None, races=None, force=False):
+    # -> {"written": bool, "rebuilt": rows, "path": path}; classes/races default to the files on disk
+    if classes is None:
+        classes = safe_load(os.path.join(root_dir, JSON_FILES["Classes"]))
+    if races is None:
+        races = safe_load(os.path.join(root_dir, JSON_FILES["Races"]))
+    path = os.path.join(root_dir, TABLE_FILE)
+    previous = None if force else read_table(root_dir)
+    table, rebuilt = compile_table(classes, races, previous)
+    result = {"written": False, "rebuilt": rebuilt, "path": path}
+    if previous is not None and table == previous:
+        return result
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, encode_table(table))
+    result["written"] = True
+    return result
+
+
+# -------------------------
+# Lookup (what EnemyFactory does with the table)
+# -------------------------
+def final_stats(table, race, cls, floor, wave=1, momentum=0):
+    # stats of a spawned enemy before its random level-up points; None outside the table
+    grid = table["grid"]
+    rows = table["enemies"].get(race, {}).get(cls)
+    if rows is None or not (1 <= floor <= grid["floors"] and 1 <= wave <= grid["waves"]
+                            and 0 <= momentum <= grid["max_momentum"]):
+        return None
+    mult = table["multipliers"]["enemy"][floor - 1][wave - 1][momentum]
+    return [int(v * mult) for v in rows[floor - 1]]
+
+def final_boss_stats(table, race, minion, floor, wave=WAVES, momentum=0):
+    grid = table["grid"]
+    row = table["bosses"].get(race, {}).get(minion)
+    if row is None or not (1 <= floor <= grid["floors"] and 1 <= wave <= grid["waves"]
+                           and 0 <= momentum <= grid["max_momentum"]):
+        return None
+    mult = table["multipliers"]["boss"][floor - 1][wave - 1][momentum]
+    return [int(v * mult) for v in row]
+
+def expected_stats(table, race, cls, floor, wave=1, momentum=0):
+    # mean over the 3 random points per level up (0.3 per stat per level), before truncation
+    rows = table["enemies"].get(race, {}).get(cls)
+    mult = table["multipliers"]["enemy"][floor - 1][wave - 1][momentum]
+    return [(v + 0.3 * (floor - 1)) * mult for v in rows[floor - 1]]
+
+def format_cell(table, floor, wave, momentum):
+    head = "".join(f"{s:>6}" for s in STATS) + "   max_hp"
+    lines = [f"floor {floor}, wave {wave}, momentum {momentum}: x{table['multipliers']['enemy'][floor - 1][wave - 1][momentum]:.3f}"
+             f" (floor base x{base_multiplier(floor):.2f})",
+             "enemy (no random points) / expected".ljust(22) + head]
+    for race, by_class in table["enemies"].items():
+        for cls in by_class:
+            low = final_stats(table, race, cls, floor, wave, momentum)
+            exp = expected_stats(table, race, cls, floor, wave, momentum)
+            lines.append(f"{race} {cls}".ljust(22) + "".join(f"{v:6d}" for v in low) + f"{low[0] * 8 + low[1] * 3:9d}")
+            lines.append("".ljust(22) + "".join(f"{v:6.0f}" for v in exp) + f"{exp[0] * 8 + exp[1] * 3:9.0f}")
+    if table["bosses"]:
+        lines.append("")
+        lines.append("boss (King + minion)".ljust(22) + head)
+        for race, by_minion in table["bosses"].items():
+            for minion in by_minion:
+                s = final_boss_stats(table, race, minion, floor, wave, momentum)
+                lines.append(f"{race} {minion}".ljust(22) + "".join(f"{v:6d}" for v in s) + f"{s[0] * 8 + s[1] * 3:9d}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build or inspect data/enemy_stats.json")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="(re)build the table from classes.json / races.json")
+    p.add_argument("--force", action="store_true", help="recompute every row")
+    p = sub.add_parser("show", help="final stats of one floor / wave / momentum cell")
+    p.add_argument("--floor", type=int, default=1)
+    p.add_argument("--wave", type=int, default=1)
+    p.add_argument("--momentum", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.command == "build":
+        result = build_enemy_table(args.root, force=args.force)
+        state = "written" if result["written"] else "up to date"
+        print(f"{result['path']}: {state}, {result['rebuilt']} row(s) recomputed")
+        return 0
+    table = read_table(args.root)
+    if table is None:
+        print(f"ERROR: no {TABLE_FILE}; run 'content_enemy.py build' first")
+        return 1
+    grid = table["grid"]
+    if not (1 <= args.floor <= grid["floors"] and 1 <= args.wave <= grid["waves"]
+            and 0 <= args.momentum <= grid["max_momentum"]):
+        print(f"ERROR: outside the table (floors 1-{grid['floors']}, waves 1-{grid['waves']}, "
+              f"momentum 0-{grid['max_momentum']})")
+        return 1
+    print(format_cell(table, args.floor, args.wave, args.momentum))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,432 @@
+"""
+content_index.py
+Uldtale-Battlesim Content Index
+- In-memory inverted index over every entry of every JSON_FILES tab
+- Terms: key/value tokens, field:token pairs (rarity:epic, class_restriction:monk,
+  effects.dodge:0) and bare field: presence terms
+- Prefix lookups through a sorted vocabulary (search-as-you-type)
+- Updated incrementally per entry on Apply/New/Duplicate/Delete
+"""
+
+import re
+import bisect
+import itertools
+import threading
+
+from content_data import iter_entries, entry_depth
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+def _value_text(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+def entry_terms(path, entry, cache=None):
+    # all index terms for one entry; cache memoizes terms of repeated (field, value) pairs
+    cache = {} if cache is None else cache
+    parts = [tokenize(p) for p in path]
+    _collect_fields(entry, "", parts, cache)
+    return set().union(*parts)
+
+def _collect_fields(node, prefix, parts, cache):
+    if not isinstance(node, dict):
+        parts.append(tokenize(_value_text(node)))
+        return
+    for field, value in node.items():
+        fname = prefix + str(field).lower()
+        if isinstance(value, dict):
+            parts.append((fname + ":",))
+            _collect_fields(value, fname + ".", parts, cache)
+            continue
+        ckey = (fname, tuple(value)) if isinstance(value, list) else (fname, value)
+        try:
+            terms = cache.get(ckey)
+        except TypeError:  # list of unhashable values
+            ckey, terms = None, None
+        if terms is None:
+            terms = _field_terms(fname, value)
+            if ckey is not None:
+                cache[ckey] = terms
+        parts.append(terms)
+
+def _field_terms(fname, value):
+    terms = {fname + ":"}
+    values = value if isinstance(value, list) else [value]
+    for v in values:
+        if isinstance(v, (dict, list)):
+            continue
+        text = _value_text(v).lower()
+        toks = tokenize(text)
+        terms.update(toks)
+        for tok in toks:
+            terms.add(f"{fname}:{tok}")
+        if len(toks) > 1:
+            terms.add(f"{fname}:{text}")
+    return tuple(terms)
+
+
+class ContentIndex:
+    def __init__(self):
+        self.postings = {}   # term -> set(doc id)
+        self.vocab = []      # sorted terms, for prefix ranges
+        self.docs = {}       # doc id -> (tab, path tuple)
+        self.doc_terms = {}  # doc id -> set(term), for incremental removal
+        self.tab_docs = {}   # tab -> {path tuple: doc id}
+        self.lock = threading.RLock()
+        self._ids = itertools.count()
+        self._prefix_cache = {}
+
+    def __len__(self):
+        return len(self.docs)
+
+    # -------------------------
+    # Building / updating
+    # -------------------------
+    def index_tab(self, tab, data):
+        # terms/postings are built outside the lock so a background build never blocks searches
+        postings, docs, doc_terms, cache = {}, {}, {}, {}
+        for path, entry in iter_entries(tab, data):
+            doc = next(self._ids)
+            key = tuple(path)
+            terms = entry_terms(key, entry, cache)
+            docs[doc] = key
+            doc_terms[doc] = terms
+            for term in terms:
+                post = postings.get(term)
+                if post is None:
+                    postings[term] = {doc}
+                else:
+                    post.add(doc)
+        with self.lock:
+            self.remove_tab(tab)
+            tab_docs = self.tab_docs.setdefault(tab, {})
+            for doc, key in docs.items():
+                self.docs[doc] = (tab, key)
+                tab_docs[key] = doc
+            self.doc_terms.update(doc_terms)
+            new_terms = []
+            for term, post in postings.items():
+                cur = self.postings.get(term)
+                if cur is None:
+                    self.postings[term] = post
+                    new_terms.append(term)
+                else:
+                    cur |= post
+            # bulk load: sort the vocabulary once instead of insorting every new term
+            if new_terms:
+                self.vocab.extend(new_terms)
+                self.vocab.sort()
+            self._prefix_cache.clear()
+
+    def remove_tab(self, tab):
+        with self.lock:
+            docs = self.tab_docs.pop(tab, None)
+            if not docs:
+                return
+            emptied = False
+            for doc in docs.values():
+                self.docs.pop(doc, None)
+                for term in self.doc_terms.pop(doc, ()):
+                    post = self.postings.get(term)
+                    if post is None:
+                        continue
+                    post.discard(doc)
+                    if not post:
+                        del self.postings[term]
+                        emptied = True
+            if emptied:
+                self.vocab = [t for t in self.vocab if t in self.postings]
+            self._prefix_cache.clear()
+
+    def update_entry(self, tab, path, entry):
+        key = tuple(path)
+        with self.lock:
+            doc = self.tab_docs.get(tab, {}).get(key)
+            if doc is not None:
+                self._remove_doc(doc)
+            self._add(tab, key, entry)
+
+    def remove_entry(self, tab, path):
+        # removes the entry at path, or every entry below it when path is a container
+        key = tuple(path)
+        with self.lock:
+            docs = self.tab_docs.get(tab, {})
+            if key in docs:
+                self._remove_doc(docs[key])
+                return
+            n = len(key)
+            for p in [p for p in docs if p[:n] == key]:
+                self._remove_doc(docs[p])
+
+    def reindex(self, tab, data, path):
+        # refresh whatever part of the index a mutation at path can have touched
+        depth = entry_depth(tab)
+        path = list(path)
+        with self.lock:
+            if len(path) >= depth:
+                epath = path[:depth]
+                try:
+                    cur = data
+                    for p in epath:
+                        cur = cur[p]
+                except (KeyError, TypeError):
+                    self.remove_entry(tab, epath)
+                    return
+                self.update_entry(tab, epath, cur)
+                return
+            # container level: drop and re-add everything beneath it
+            self.remove_entry(tab, path)
+            n = len(path)
+            for p, entry in iter_entries(tab, data):
+                if p[:n] == path:
+                    self._add(tab, tuple(p), entry)
+
+    def _add(self, tab, key, entry):
+        doc = next(self._ids)
+        terms = entry_terms(key, entry)
+        self.docs[doc] = (tab, key)
+        self.doc_terms[doc] = terms
+        self.tab_docs.setdefault(tab, {})[key] = doc
+        for term in terms:
+            post = self.postings.get(term)
+            if post is None:
+                self.postings[term] = {doc}
+                bisect.insort(self.vocab, term)
+            else:
+                post.add(doc)
+        self._prefix_cache.clear()
+
+    def _remove_doc(self, doc):
+        tab, key = self.docs.pop(doc)
+        self.tab_docs.get(tab, {}).pop(key, None)
+        for term in self.doc_terms.pop(doc, ()):
+            post = self.postings.get(term)
+            if post is None:
+                continue
+            post.discard(doc)
+            if not post:
+                del self.postings[term]
+                i = bisect.bisect_left(self.vocab, term)
+                if i < len(self.vocab) and self.vocab[i] == term:
+                    del self.vocab[i]
+        self._prefix_cache.clear()
+
+    # -------------------------
+    # Querying
+    # -------------------------
+    def _prefix_docs(self, prefix):
+        hit = self._prefix_cache.get(prefix)
+        if hit is not None:
+            return hit
+        vocab = self.vocab
+        lo = bisect.bisect_left(vocab, prefix)
+        hi = bisect.bisect_left(vocab, prefix + "\uffff")
+        postings = self.postings
+        result = set()
+        for term in vocab[lo:hi]:
+            post = postings.get(term)
+            if post:
+                result |= post
+        self._prefix_cache[prefix] = result
+        return result
+
+    def _term_docs(self, term):
+        term = term.lower()
+        if ":" in term:
+            field, _, value = term.partition(":")
+            toks = tokenize(value)
+            if not toks:
+                return self._prefix_docs(field + ":")
+            # every token of the value must match within the same field
+            sets = [self._prefix_docs(f"{field}:{t}") for t in toks]
+        else:
+            toks = tokenize(term)
+            if not toks:
+                return None
+            sets = [self._prefix_docs(t) for t in toks]
+        sets.sort(key=len)
+        out = set(sets[0])
+        for s in sets[1:]:
+            out &= s
+            if not out:
+                break
+        return out
+
+    def search_docs(self, query, tabs=None):
+        # AND of all whitespace-separated terms; every term matches as a prefix
+        with self.lock:
+            sets = []
+            for term in query.split():
+                docs = self._term_docs(term)
+                if docs is None:
+                    continue
+                sets.append(docs)
+            if not sets:
+                return []
+            sets.sort(key=len)
+            result = set(sets[0])
+            for s in sets[1:]:
+                result &= s
+                if not result:
+                    return []
+            if tabs is not None:
+                wanted = set(tabs)
+                result = [d for d in result if self.docs[d][0] in wanted]
+            return sorted(result)
+
+    def search(self, query, tabs=None, limit=None):
+        # -> [(tab, path tuple)] in index (file) order
+        with self.lock:
+            docs = self.search_docs(query, tabs)
+            if limit is not None:
+                docs = docs[:limit]
+            return [self.docs[d] for d in docs]
+
+
+# -------------------------
+# Item id index
+# -------------------------
+# item tabs in ItemManager.update_items() order (first tab wins for a shared id)
+ITEM_TABS = ("Consumables", "Materials", "Weapons", "Armors")
+# secondary indexes kept per item tab
+ITEM_FIELDS = ("slot", "type", "rarity", "class_restriction")
+
+
+def item_entries(tab, data):
+    # (path, entry) for the items of a tab, skipping what ItemManager skips
+    for path, entry in iter_entries(tab, data):
+        if isinstance(entry, dict) and path[-1] != "rarity":
+            yield path, entry
+
+def _item_values(entry):
+    # field -> tuple of indexed values (list fields index every element)
+    out = {}
+    for field in ITEM_FIELDS:
+        if field not in entry:
+            continue
+        value = entry[field]
+        values = value if isinstance(value, list) else [value]
+        out[field] = tuple(v for v in values if isinstance(v, (str, int, float, bool)))
+    return out
+
+
+class ItemIndex:
+    # flat item_id -> path lookup over the item tabs (nested Armors/Weapons trees included)
+    # plus slot/type/rarity/class_restriction -> items; updated per entry like ContentIndex
+    def __init__(self):
+        self.paths = {}    # tab -> {item_id: {path tuple: None}} (one path unless an id is reused)
+        self.fields = {}   # tab -> {field: {value: {path tuple: None}}}
+        self.values = {}   # (tab, path tuple) -> indexed values, for removal
+        self.lock = threading.RLock()
+
+    def index_tab(self, tab, data):
+        if tab not in ITEM_TABS:
+            return
+        with self.lock:
+            self.remove_tab(tab)
+            for path, entry in item_entries(tab, data):
+                self._add(tab, tuple(path), entry)
+
+    def remove_tab(self, tab):
+        with self.lock:
+            self.paths.pop(tab, None)
+            self.fields.pop(tab, None)
+            for key in [k for k in self.values if k[0] == tab]:
+                del self.values[key]
+
+    def reindex(self, tab, data, path):
+        # same contract as ContentIndex.reindex: entry, field or container path
+        if tab not in ITEM_TABS:
+            return
+        depth = entry_depth(tab)
+        path = tuple(path)
+        with self.lock:
+            if len(path) >= depth:
+                key = path[:depth]
+                if (tab, key) in self.values:
+                    self._remove(tab, key)
+                cur = data
+                for p in key:
+                    cur = cur.get(p) if isinstance(cur, dict) else None
+                if isinstance(cur, dict) and key[-1] != "rarity":
+                    self._add(tab, key, cur)
+                return
+            # container level: drop and re-add everything beneath it
+            n = len(path)
+            for key in [k for (t, k) in self.values if t == tab and k[:n] == path]:
+                self._remove(tab, key)
+            for p, entry in item_entries(tab, data):
+                if tuple(p[:n]) == path:
+                    self._add(tab, tuple(p), entry)
+
+    def _add(self, tab, key, entry):
+        self.paths.setdefault(tab, {}).setdefault(key[-1], {})[key] = None
+        values = _item_values(entry)
+        self.values[(tab, key)] = values
+        fields = self.fields.setdefault(tab, {})
+        for field, vals in values.items():
+            by_value = fields.setdefault(field, {})
+            for v in vals:
+                by_value.setdefault(v, {})[key] = None
+
+    def _remove(self, tab, key):
+        values = self.values.pop((tab, key), {})
+        ids = self.paths.get(tab, {})
+        found = ids.get(key[-1])
+        if found is not None:
+            found.pop(key, None)
+            if not found:
+                del ids[key[-1]]
+        fields = self.fields.get(tab, {})
+        for field, vals in values.items():
+            by_value = fields.get(field, {})
+            for v in vals:
+                hits = by_value.get(v)
+                if hits is not None:
+                    hits.pop(key, None)
+                    if not hits:
+                        del by_value[v]
+
+    # -- queries --
+    def locate(self, item_id, tab=None):
+        # -> [(tab, path tuple)] for item_id, in ItemManager precedence order
+        with self.lock:
+            return [(t, p) for t in (ITEM_TABS if tab is None else (tab,))
+                    for p in self.paths.get(t, {}).get(item_id, ())]
+
+    def select(self, tab, **filters):
+        # -> [path tuple] of items in tab matching every field=value filter
+        with self.lock:
+            if not filters:
+                return [k for ids in self.paths.get(tab, {}).values() for k in ids]
+            fields = self.fields.get(tab, {})
+            sets = [fields.get(f, {}).get(v, {}) for f, v in filters.items()]
+            sets.sort(key=len)
+            return [k for k in sets[0] if all(k in s for s in sets[1:])]
+
+
+def item_lookup(files):
+    # game-side lookups for ItemManager, built from scratch in its dictionary order:
+    # weapons/armors keyed by id (first position, last entry wins), then grouped by type/slot
+    def equipment(tab):
+        out = {}
+        for path, entry in item_entries(tab, files.get(tab) or {}):
+            out[path[-1]] = entry
+        return out
+    weapons, armors = equipment("Weapons"), equipment("Armors")
+    lookup = {"weapons_by_type": {}, "weapons_by_slot": {},
+              "armors_by_type": {}, "armors_by_slot": {}, "armors_by_type_slot": {}}
+    for item_id, entry in weapons.items():
+        lookup["weapons_by_type"].setdefault(str(entry.get("type", "")), []).append(item_id)
+        lookup["weapons_by_slot"].setdefault(str(entry.get("slot", "main_hand")), []).append(item_id)
+    for item_id, entry in armors.items():
+        armor_type, slot = str(entry.get("type", "")), str(entry.get("slot", ""))
+        lookup["armors_by_type"].setdefault(armor_type, []).append(item_id)
+        lookup["armors_by_slot"].setdefault(slot, []).append(item_id)
+        lookup["armors_by_type_slot"].setdefault(f"{armor_type}/{slot}", []).append(item_id)
+    return lookup
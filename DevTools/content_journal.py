@@ -0,0 +1,331 @@
+"""
+content_journal.py
+Uldtale-Battlesim Content Change Journal
+- Every mutation of the in-memory tab data is recorded as path-level patches
+  (tab, path, old, new), grouped per user action
+- Multi-level undo/redo by applying patches backwards/forwards (no snapshots)
+- Per-tab dirty flags derived from save points, for incremental saves
+- Export a session's patch set as JSON and replay it against another checkout
+"""
+
+import json
+import time
+import datetime
+import itertools
+import collections
+
+PATCH_FORMAT = "uldtale-content-patch"
+PATCH_VERSION = 1
+
+
+class _Missing:
+    # marks "key absent" on either side of a patch (creation / deletion)
+    def __repr__(self):
+        return "MISSING"
+
+    def __bool__(self):
+        return False
+
+MISSING = _Missing()
+
+
+def clone(value):
+    # deep copy for JSON-shaped data (faster than copy.deepcopy)
+    if isinstance(value, dict):
+        return {k: clone(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [clone(v) for v in value]
+    return value
+
+def get_at(root, path):
+    cur = root
+    for p in path:
+        if not isinstance(cur, dict) or p not in cur:
+            return MISSING
+        cur = cur[p]
+    return cur
+
+def _insert_at(parent, key, value, index):
+    # insert key at a position, rebuilding the dict in place so file order survives undo
+    if index is None or index >= len(parent):
+        parent[key] = value
+        return len(parent) - 1
+    items = list(parent.items())
+    items.insert(max(0, index), (key, value))
+    parent.clear()
+    parent.update(items)
+    return max(0, index)
+
+def put_at(root, path, value, index=None, create_parents=False):
+    # set (or delete when value is MISSING) the value at path; returns the key position
+    cur = root
+    for p in path[:-1]:
+        nxt = cur.get(p) if isinstance(cur, dict) else None
+        if not isinstance(nxt, dict):
+            if not create_parents:
+                raise KeyError("/".join(map(str, path)))
+            nxt = cur[p] = {}
+        cur = nxt
+    key = path[-1]
+    if value is MISSING:
+        if key not in cur:
+            return index
+        pos = list(cur).index(key)
+        del cur[key]
+        return pos
+    if key in cur:
+        cur[key] = clone(value)
+        return list(cur).index(key) if index is None else index
+    return _insert_at(cur, key, clone(value), index)
+
+
+class Patch:
+    __slots__ = ("tab", "path", "old", "new", "index")
+
+    def __init__(self, tab, path, old, new, index=None):
+        self.tab = tab
+        self.path = tuple(path)
+        self.old = old
+        self.new = new
+        self.index = index
+
+    def to_json(self):
+        out = {"tab": self.tab, "path": list(self.path)}
+        if self.old is not MISSING:
+            out["old"] = self.old
+        if self.new is not MISSING:
+            out["new"] = self.new
+        if self.index is not None:
+            out["index"] = self.index
+        return out
+
+    @classmethod
+    def from_json(cls, obj):
+        return cls(obj["tab"], obj["path"], obj.get("old", MISSING), obj.get("new", MISSING), obj.get("index"))
+
+
+class Group:
+    __slots__ = ("id", "label", "time", "patches", "prev_heads")
+
+    def __init__(self, gid, label, patches):
+        self.id = gid
+        self.label = label
+        self.time = time.time()
+        self.patches = patches
+        self.prev_heads = {}
+
+    @property
+    def tabs(self):
+        return {p.tab for p in self.patches}
+
+
+# -------------------------
+# Patch builders
+# -------------------------
+def set_patches(data, tab, path, value):
+    # minimal patch for "path = value": creates missing parents at the first missing level
+    root = data.setdefault(tab, {})
+    cur = root
+    for i, p in enumerate(path[:-1]):
+        if not isinstance(cur.get(p), dict):
+            nested = clone(value)
+            for q in reversed(path[i + 1:]):
+                nested = {q: nested}
+            return [Patch(tab, path[:i + 1], MISSING, nested)]
+        cur = cur[p]
+    old = cur.get(path[-1], MISSING)
+    if old is not MISSING and old == value:
+        return []
+    return [Patch(tab, path, clone(old), clone(value))]
+
+def delete_patches(data, tab, path):
+    old = get_at(data.get(tab, {}), path)
+    if old is MISSING:
+        return []
+    return [Patch(tab, path, clone(old), MISSING)]
+
+def rename_patches(data, tab, path, new_key):
+    # delete + re-create at the same position
+    old = get_at(data.get(tab, {}), path)
+    if old is MISSING:
+        return []
+    parent = get_at(data.get(tab, {}), path[:-1]) if len(path) > 1 else data.get(tab, {})
+    pos = list(parent).index(path[-1])
+    return [Patch(tab, path, clone(old), MISSING),
+            Patch(tab, list(path[:-1]) + [new_key], MISSING, clone(old), pos)]
+
+
+# -------------------------
+# Journal
+# -------------------------
+class ChangeJournal:
+    def __init__(self, limit=500):
+        self.undo_stack = collections.deque()
+        self.redo_stack = []
+        self.limit = limit
+        self.heads = {}  # tab -> id of the latest applied group touching it
+        self.saved = {}  # tab -> head at the last load/save
+        self._ids = itertools.count(1)
+
+    def reset(self, tab=None):
+        # forget history (all tabs, or just the groups of one reloaded tab)
+        if tab is None:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+            self.heads.clear()
+            self.saved.clear()
+            return
+        self.undo_stack = collections.deque(g for g in self.undo_stack if tab not in g.tabs)
+        self.redo_stack = [g for g in self.redo_stack if tab not in g.tabs]
+        self.heads.pop(tab, None)
+        self.saved.pop(tab, None)
+
+    # -- recording --
+    def record(self, data, patches, label=""):
+        # apply patches to data and push them as one undoable step
+        patches = [p for p in patches if p is not None]
+        if not patches:
+            return None
+        for p in patches:
+            p.index = put_at(data.setdefault(p.tab, {}), p.path, p.new, p.index)
+        group = Group(next(self._ids), label, patches)
+        self._push(group)
+        self.redo_stack.clear()
+        return group
+
+    def _push(self, group):
+        for tab in group.tabs:
+            group.prev_heads[tab] = self.heads.get(tab, 0)
+            self.heads[tab] = group.id
+        self.undo_stack.append(group)
+        if self.limit and len(self.undo_stack) > self.limit:
+            self.undo_stack.popleft()
+
+    # -- undo / redo --
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def undo(self, data):
+        if not self.undo_stack:
+            return None
+        group = self.undo_stack.pop()
+        for p in reversed(group.patches):
+            put_at(data.setdefault(p.tab, {}), p.path, p.old, p.index)
+        for tab, head in group.prev_heads.items():
+            self.heads[tab] = head
+        self.redo_stack.append(group)
+        return group
+
+    def redo(self, data):
+        if not self.redo_stack:
+            return None
+        group = self.redo_stack.pop()
+        for p in group.patches:
+            put_at(data.setdefault(p.tab, {}), p.path, p.new, p.index)
+        self._push(group)
+        return group
+
+    # -- dirty tracking --
+    def is_dirty(self, tab):
+        return self.heads.get(tab, 0) != self.saved.get(tab, 0)
+
+    def dirty_tabs(self):
+        return {t for t in set(self.heads) | set(self.saved) if self.is_dirty(t)}
+
+    def mark_saved(self, tab):
+        self.saved[tab] = self.heads.get(tab, 0)
+
+    def saved_state(self, tab, current):
+        # the tab as of its last load/save, rebuilt from a copy of current by walking the
+        # journal back (or forward, after undoing past the save); None if history was trimmed
+        saved = self.saved.get(tab, 0)
+        head = self.heads.get(tab, 0)
+        base = clone(current)
+        if head == saved:
+            return base
+        for group in reversed(self.undo_stack):
+            if tab not in group.tabs:
+                continue
+            if group.id != head:
+                break
+            for p in reversed(group.patches):
+                if p.tab == tab:
+                    put_at(base, p.path, p.old, p.index)
+            head = group.prev_heads[tab]
+            if head == saved:
+                return base
+        base, head = clone(current), self.heads.get(tab, 0)
+        for group in reversed(self.redo_stack):
+            if tab not in group.tabs:
+                continue
+            for p in group.patches:
+                if p.tab == tab:
+                    put_at(base, p.path, p.new, p.index)
+            head = group.id
+            if head == saved:
+                return base
+        return None
+
+    # -- export / replay --
+    def export(self, root_dir=None):
+        return {
+            "format": PATCH_FORMAT,
+            "version": PATCH_VERSION,
+            "created": datetime.datetime.now().isoformat(timespec="seconds"),
+            "root": root_dir,
+            "groups": [
+                {"label": g.label, "time": round(g.time, 3), "patches": [p.to_json() for p in g.patches]}
+                for g in self.undo_stack
+            ],
+        }
+
+    def export_file(self, path, root_dir=None):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.export(root_dir), f, indent=1, ensure_ascii=False)
+
+    def replay(self, data, patch_set, force=False, label="replay"):
+        # apply an exported patch set as one undoable step; patches whose "old" no longer
+        # matches the current value are reported as conflicts and skipped (unless force).
+        # Each patch is checked against the data as the earlier ones of the set left it
+        applied, conflicts = [], []
+
+        def apply(p):
+            p.index = put_at(data.setdefault(p.tab, {}), p.path, p.new, p.index)
+            applied.append(p)
+
+        for gdata in patch_set.get("groups", []):
+            for pdata in gdata.get("patches", []):
+                p = Patch.from_json(pdata)
+                root = data.setdefault(p.tab, {})
+                cur = get_at(root, p.path)
+                if cur == p.new:
+                    # already applied (e.g. replaying the same patch twice)
+                    continue
+                parent_ok = len(p.path) == 1 or isinstance(get_at(root, p.path[:-1]), dict)
+                if not force and (cur != p.old or not parent_ok):
+                    conflicts.append({"tab": p.tab, "path": list(p.path),
+                                      "expected": None if p.old is MISSING else p.old,
+                                      "found": None if cur is MISSING else cur})
+                    continue
+                if not parent_ok:
+                    if p.new is MISSING:
+                        continue
+                    # forced onto a checkout without the parents: patch the first missing level
+                    for q in set_patches(data, p.tab, list(p.path), p.new):
+                        apply(q)
+                    continue
+                apply(Patch(p.tab, p.path, clone(cur), p.new, p.index))
+        # roll the working changes back so record() applies them as one group
+        for p in reversed(applied):
+            put_at(data[p.tab], p.path, p.old, p.index)
+        group = self.record(data, applied, label) if applied else None
+        return group, conflicts
+
+def load_patch_file(path):
+    with open(path, "r", encoding="utf-8") as f:
+        patch_set = json.load(f)
+    if patch_set.get("format") != PATCH_FORMAT:
+        raise ValueError(f"{path} is not a content patch file")
+    if patch_set.get("version", 0) > PATCH_VERSION:
+        raise ValueError(f"{path} has unsupported patch version {patch_set.get('version')}")
+    return patch_set
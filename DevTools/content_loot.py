@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+content_loot.py
+Uldtale-Battlesim Loot Curve Analyzer
+- Exact probability mass functions (no sampling) for the equipment drop pipeline:
+  RarityGenerator.roll_rarity (with the min_rarity_tier upgrade), EquipmentScaler.calculate_item_level
+  (floor + rarity bonus + randi_range(-2, 2)) and scale_damage / scale_armor / scale_value
+- Rarity multipliers are EquipmentScaler's constants, which the game uses; a rarities.json
+  value that differs from them is reported
+- Per item template and floor: rarity and ilvl PMFs, PMF / mean / percentiles of the scaled
+  damage, armor and value
+- Sources: "rewards" (RewardsManager, no minimum tier) and "enemy" (EnemyFactory.give_enemy_items,
+  minimum tier floor / 3, which passes legendary from floor 18: the game's upgrade then lands on
+  "common", modelled as such and reported); LootManager.determine_rarity's table is listed for reference
+- Band check: flags templates whose median scaled stat leaves a target band at any floor
+  (bands file: DevTools/loot_bands.json, see load_bands)
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+
+from content_data import JSON_FILES, safe_load
+from content_index import item_entries
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BANDS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "loot_bands.json")
+
+# RarityGenerator.roll_rarity: (rarity, upper bound of the randf() roll)
+RARITY_ROLL = (("common", 0.50), ("uncommon", 0.75), ("magic", 0.87),
+               ("rare", 0.94), ("epic", 0.98), ("legendary", 1.00))
+RARITIES = tuple(r for r, _ in RARITY_ROLL)
+# EquipmentScaler / RarityGenerator.RARITY_ILVL_BONUS and EquipmentScaler.RARITY_MULTIPLIERS
+ILVL_BONUS = {"common": 0, "uncommon": 1, "magic": 2, "rare": 3, "epic": 5, "legendary": 8}
+SCALER_MULTIPLIERS = {"common": 1.0, "uncommon": 2.0, "magic": 2.5, "rare": 3.0, "epic": 4.0, "legendary": 5.0}
+ILVL_VARIANCE = range(-2, 3)  # randi_range(-2, 2), inclusive
+
+# LootManager.determine_rarity (its own enum and multipliers)
+LOOT_MANAGER_ROLL = (("Common", 0.6), ("Uncommon", 0.8), ("Rare", 0.93),
+                     ("Epic", 0.98), ("Legendary", 0.999), ("Set", 1.0))
+
+STAT_FIELDS = ("damage", "armor_value", "value")
+PERCENTILES = (0.05, 0.5, 0.95)
+
+
+# -------------------------
+# Distributions
+# -------------------------
+def roll_pmf(table):
+    # thresholds of a single randf() roll -> {outcome: probability}
+    pmf, lower = {}, 0.0
+    for name, upper in table:
+        pmf[name] = upper - lower
+        lower = upper
+    return pmf
+
+def upgrade_tier(min_tier):
+    # RarityGenerator._get_rarity_by_tier: the tier a roll below the minimum is upgraded to;
+    # past legendary its `_:` branch returns "common"
+    return min_tier if min_tier < len(RARITIES) else 0
+
+def rarity_pmf(min_tier=0):
+    # roll_rarity(min_rarity_tier): anything rolled below the minimum is upgraded
+    up = upgrade_tier(min_tier)
+    pmf = {}
+    for tier, (rarity, p) in enumerate(roll_pmf(RARITY_ROLL).items()):
+        target = RARITIES[up if tier < min_tier else tier]
+        pmf[target] = pmf.get(target, 0.0) + p
+    return pmf
+
+def min_tier_for(source, floor):
+    # rewards / momentum bonus drops pass no minimum; enemy gear uses int(floor / 3)
+    return floor // 3 if source == "enemy" else 0
+
+def outcomes(floor, min_tier=0):
+    # -> [(rarity, ilvl, probability)] for Equipment.generate_for_floor(floor, min_tier)
+    out = []
+    for rarity, p in rarity_pmf(min_tier).items():
+        for v in ILVL_VARIANCE:
+            out.append((rarity, max(1, floor + ILVL_BONUS[rarity] + v), p / len(ILVL_VARIANCE)))
+    return out
+
+def total_multiplier(ilvl, rarity, multipliers):
+    # EquipmentScaler._get_total_multiplier (same float operations, same truncation downstream)
+    return multipliers.get(rarity, 1.0) * (1.0 + (ilvl - 1) * 0.05)
+
+def scaled(field, base, ilvl, rarity, multipliers):
+    # scale_damage / scale_armor return 0 for a 0 base; scale_value always scales
+    if field != "value" and base == 0:
+        return 0
+    return int(base * total_multiplier(ilvl, rarity, multipliers))
+
+def add(pmf, key, p):
+    pmf[key] = pmf.get(key, 0.0) + p
+
+def percentile(pmf, q):
+    # smallest value whose cumulative probability reaches q
+    total = 0.0
+    items = sorted(pmf.items())
+    for value, p in items:
+        total += p
+        if total >= q - 1e-12:
+            return value
+    return items[-1][0]
+
+def mean(pmf):
+    return sum(v * p for v, p in pmf.items())
+
+
+# -------------------------
+# Content
+# -------------------------
+def rarity_multipliers(rarities):
+    # -> (multipliers, notes): EquipmentScaler's constants; rarities.json differences are noted only
+    mults, notes = dict(SCALER_MULTIPLIERS), []
+    for rarity, entry in (rarities or {}).items():
+        if not isinstance(entry, dict) or "multiplier" not in entry:
+            continue
+        value = float(entry["multiplier"])
+        if rarity not in SCALER_MULTIPLIERS:
+            notes.append(f"rarities.json '{rarity}' is never rolled by RarityGenerator")
+        elif value != SCALER_MULTIPLIERS[rarity]:
+            notes.append(f"rarities.json {rarity} multiplier {value:g} differs from EquipmentScaler "
+                         f"({SCALER_MULTIPLIERS[rarity]:g}); the game uses the scaler's value")
+    return mults, notes
+
+def equipment_templates(data):
+    # -> [(item_id, tab, entry)] for weapons.json and armors.json
+    out = []
+    for tab in ("Weapons", "Armors"):
+        for path, entry in item_entries(tab, data.get(tab) or {}):
+            out.append((path[-1], tab, entry))
+    return out
+
+def analyze_item(entry, floors, multipliers, source="rewards", min_tier=None):
+    # -> {floor: {"rarity": pmf, "ilvl": pmf, field: pmf...}}
+    base = {f: int(entry.get(f, 0) or 0) for f in STAT_FIELDS}
+    result = {}
+    for floor in floors:
+        tier = min_tier_for(source, floor) if min_tier is None else min_tier
+        dist = {"rarity": {}, "ilvl": {}}
+        for field in STAT_FIELDS:
+            dist[field] = {}
+        for rarity, ilvl, p in outcomes(floor, tier):
+            add(dist["rarity"], rarity, p)
+            add(dist["ilvl"], ilvl, p)
+            for field in STAT_FIELDS:
+                add(dist[field], scaled(field, base[field], ilvl, rarity, multipliers), p)
+        result[floor] = dist
+    return result
+
+def summarize(pmf, qs=PERCENTILES):
+    return {"mean": mean(pmf), "percentiles": [percentile(pmf, q) for q in qs],
+            "min": min(pmf), "max": max(pmf)}
+
+
+# -------------------------
+# Target bands
+# -------------------------
+def load_bands(path):
+    # {field: {group: {floor: [lo, hi]}}}; group is an item id, "slot/type", a slot, a type or "*"
+    # (first match wins), bands between anchor floors are interpolated linearly
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    bands = {}
+    for field, groups in raw.items():
+        if field.startswith("_"):
+            continue  # comments
+        bands[field] = {g: sorted((int(k), tuple(v)) for k, v in anchors.items()) for g, anchors in groups.items()}
+    return bands
+
+def band_for(bands, field, item_id, entry):
+    groups = bands.get(field) or {}
+    slot, kind = entry.get("slot", ""), entry.get("type", "")
+    for key in (item_id, f"{slot}/{kind}", slot, kind, "*"):
+        if key in groups:
+            return key, groups[key]
+    return None, None
+
+def band_at(anchors, floor):
+    if floor <= anchors[0][0]:
+        return anchors[0][1]
+    for (f0, (lo0, hi0)), (f1, (lo1, hi1)) in zip(anchors, anchors[1:]):
+        if floor <= f1:
+            t = (floor - f0) / (f1 - f0)
+            return lo0 + (lo1 - lo0) * t, hi0 + (hi1 - hi0) * t
+    return anchors[-1][1]
+
+def check_bands(analysis, templates, bands):
+    # -> [(item_id, field, group, floors outside, worst (floor, median, lo, hi))]
+    flags = []
+    for item_id, tab, entry in templates:
+        for field in STAT_FIELDS:
+            if field != "value" and not entry.get(field):
+                continue
+            group, anchors = band_for(bands, field, item_id, entry)
+            if anchors is None:
+                continue
+            outside, worst, worst_gap = [], None, 0.0
+            for floor, dist in analysis[item_id].items():
+                median = percentile(dist[field], 0.5)
+                lo, hi = band_at(anchors, floor)
+                gap = (lo - median) / lo if median < lo else (median - hi) / hi if median > hi else 0.0
+                if gap > 0:
+                    outside.append(floor)
+                    if gap > worst_gap:
+                        worst, worst_gap = (floor, median, lo, hi), gap
+            if outside:
+                flags.append((item_id, field, group, outside, worst))
+    return flags
+
+
+# -------------------------
+# Report
+# -------------------------
+def analyze(data, floors, source="rewards", min_tier=None, bands=None):
+    t0 = time.perf_counter()
+    multipliers, notes = rarity_multipliers(data.get("Rarities"))
+    templates = equipment_templates(data)
+    analysis = {item_id: analyze_item(entry, floors, multipliers, source, min_tier)
+                for item_id, _, entry in templates}
+    flags = check_bands(analysis, templates, bands or {})
+    tiers = {f: min_tier_for(source, f) if min_tier is None else min_tier for f in floors}
+    over = [f for f, t in tiers.items() if upgrade_tier(t) != t]
+    if over:
+        notes.append(f"floors {_fmt_range(over)}: minimum tier is past legendary and "
+                     "RarityGenerator._get_rarity_by_tier returns \"common\" (game bug)")
+    return {"floors": list(floors), "source": source, "min_tier": min_tier, "multipliers": multipliers,
+            "notes": notes, "templates": templates, "analysis": analysis, "flags": flags,
+            "seconds": time.perf_counter() - t0}
+
+def _fmt_range(floors):
+    # [1, 2, 3, 7] -> "1-3,7"
+    parts, start = [], None
+    for i, f in enumerate(floors):
+        if start is None:
+            start = f
+        if i + 1 == len(floors) or floors[i + 1] != f + 1:
+            parts.append(str(start) if start == f else f"{start}-{f}")
+            start = None
+    return ",".join(parts)
+
+def format_report(report, item=None):
+    floors = report["floors"]
+    lines = [f"Rarity PMF per floor (source: {report['source']})",
+             "floor " + "".join(f"{r:>10}" for r in RARITIES)]
+    for floor in floors:
+        tier = min_tier_for(report["source"], floor) if report["min_tier"] is None else report["min_tier"]
+        pmf = rarity_pmf(tier)
+        lines.append(f"{floor:>5} " + "".join(f"{100 * pmf.get(r, 0.0):9.2f}%" for r in RARITIES))
+    lines.append("LootManager.determine_rarity: " + ", ".join(
+        f"{r} {100 * p:.1f}%" for r, p in roll_pmf(LOOT_MANAGER_ROLL).items()))
+    for note in report["notes"]:
+        lines.append("NOTE: " + note)
+
+    shown = [t for t in report["templates"] if item is None or t[0] == item]
+    qs = "/".join(f"p{int(q * 100)}" for q in PERCENTILES)
+    for item_id, tab, entry in shown:
+        fields = [f for f in STAT_FIELDS if f == "value" or entry.get(f)]
+        lines.append("")
+        lines.append(f"{item_id} ({tab}, base " + ", ".join(f"{f} {entry.get(f, 0)}" for f in fields) + ")")
+        lines.append("floor  ilvl " + qs.ljust(10) + "".join(f"  {f} mean {qs}".ljust(28) for f in fields))
+        for floor in floors:
+            dist = report["analysis"][item_id][floor]
+            il = summarize(dist["ilvl"])
+            row = f"{floor:>5}  " + "/".join(str(v) for v in il["percentiles"]).ljust(15)
+            for f in fields:
+                s = summarize(dist[f])
+                row += f"  {s['mean']:8.1f} " + "/".join(str(v) for v in s["percentiles"]).ljust(17)
+            lines.append(row)
+        if item is not None:
+            for f in fields:
+                lines.append(f"{f} PMF at floor {floors[-1]}: " + ", ".join(
+                    f"{v}:{100 * p:.2f}%" for v, p in sorted(report["analysis"][item_id][floors[-1]][f].items())))
+
+    lines.append("")
+    flags = [f for f in report["flags"] if item is None or f[0] == item]
+    if flags:
+        lines.append(f"{len(flags)} template stat(s) outside their target band:")
+        for item_id, field, group, outside, (floor, median, lo, hi) in flags:
+            lines.append(f"  {item_id}.{field} [{group}]: floors {_fmt_range(outside)}; "
+                         f"worst floor {floor}: median {median} not in {lo:.0f}-{hi:.0f}")
+    else:
+        lines.append("All templates inside their target bands")
+    return "\n".join(lines)
+
+def to_json(report, item=None):
+    out = {k: report[k] for k in ("floors", "source", "min_tier", "multipliers", "notes")}
+    out["items"] = {}
+    for item_id, tab, entry in report["templates"]:
+        if item is not None and item_id != item:
+            continue
+        out["items"][item_id] = {"tab": tab, "floors": {
+            str(floor): {key: {str(k): round(p, 10) for k, p in (pmf.items() if key == "rarity" else sorted(pmf.items()))}
+                         for key, pmf in dist.items()}
+            for floor, dist in report["analysis"][item_id].items()}}
+    out["flags"] = [{"item": i, "field": f, "band": g, "floors": o, "worst": w} for i, f, g, o, w in report["flags"]]
+    return out
+
+
+def main(argv=None):
+    from content_balance import parse_floors
+    ap = argparse.ArgumentParser(description="Exact loot rarity / ilvl / stat distributions per template and floor")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--floors", default="1-25")
+    ap.add_argument("--source", choices=("rewards", "enemy"), default="rewards",
+                    help="rewards: no minimum rarity; enemy: minimum tier floor / 3")
+    ap.add_argument("--min-tier", type=int, help="force a minimum rarity tier (0-5) for every floor")
+    ap.add_argument("--item", help="only this template, with full PMFs")
+    ap.add_argument("--bands", default=DEFAULT_BANDS, help="target bands JSON ('' to skip)")
+    ap.add_argument("--format", choices=("table", "json"), default="table")
+    args = ap.parse_args(argv)
+
+    data = {tab: safe_load(os.path.join(args.root, JSON_FILES[tab])) for tab in ("Weapons", "Armors", "Rarities")}
+    report = analyze(data, parse_floors(args.floors), args.source, args.min_tier, load_bands(args.bands))
+    if args.item and args.item not in report["analysis"]:
+        print(f"ERROR: no weapon or armor template '{args.item}'")
+        return 1
+    if args.format == "json":
+        json.dump(to_json(report, args.item), sys.stdout, indent=1)
+        print()
+    else:
+        print(format_report(report, args.item))
+    print(f"{len(report['templates'])} templates x {len(report['floors'])} floors in "
+          f"{report['seconds'] * 1000:.0f} ms", file=sys.stderr)
+    return 1 if report["flags"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,43 +6,73 @@ Uldtale-Battlesim Content Manager
 - Loads files from data/ and data/items/
 - Edit JSON entries, add/duplicate/delete
 - Dropdowns for rarity/elements where possible
-- Auto-backups on save
+- Atomic saves of changed tabs only; compressed auto-backups with retention (config "backup_policy")
 - Dark mode toggle
+- Lazy per-tab loading with background prefetch (config "lazy_load")
+- Virtualized list/tree views, updated in place on New/Duplicate/Delete
+- Indexed search-as-you-type per tab (key, value and field:value terms) plus global Find
+- Change journal: multi-level undo/redo (Ctrl+Z / Ctrl+Y), dirty flags per tab,
+  export/replay of a session's patch set
+- Schema + cross-reference validation (content_schema): checked on Apply, gates saves
+- Watches loaded files for external changes (git, Godot editor) and reloads just that tab,
+  merging unsaved edits per entry (config "watch_files", "watch_interval")
+- Build Pack: compiles all tabs into data/content.pack.json for fast game startup (content_pack)
+  plus the precomputed enemy stat table (content_enemy), element matrix (content_elements) and
+  arena wire string table (content_wire); an existing pack is rebuilt after every save
+  (config "pack_on_save")
+- Balance: Monte Carlo class x race x floor win rates of the current (unsaved) data (content_balance)
+- Economy: Monte Carlo gold per floor (income vs spending) of the current (unsaved) item values
+  (content_economy)
+- Effects: status effect damage / tick cost benchmark and degenerate-entry checks of the current
+  (unsaved) status effects (content_effects)
+- Elements: heatmaps of the race x element damage-taken matrix and the skill x race multiplier /
+  expected damage table (content_elements); only the rows of edited races / skills are recomputed
+- Saving an item tab records renamed / deleted item ids as a save migration step
+  (data/save_migrations.json, content_migrate) after the user confirms the listed changes
+- Usages / Rename: where the selected key is defined and used across the tabs and GDScript
+  sources, and a rename that rewrites all of them in one batch (content_refs); the reference
+  graph is built on first use and kept current on every edit
 """
 
 import os
 import json
-import shutil
+import time
 import datetime
+import threading
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import ttk, messagebox, simpledialog, filedialog
 
-CONFIG_FILE = "content_manager_config.json"
+from content_data import (
+    JSON_FILES, GROUPED_TABS, TREE_TABS, BACKUP_POLICY, safe_load, safe_save, make_key_from_name,
+    is_leaf_node, nested_get, iter_entries, entry_depth, parse_value_by_example,
+)
+from content_index import ContentIndex, ItemIndex, ITEM_TABS
+from content_schema import ContentValidator, REFS, related_tabs
+from content_pack import PackError, build_pack, pack_exists
+import content_balance
+import content_economy
+import content_effects
+import content_elements
+from content_watch import FileWatcher, load_signed, merge_entries
+from content_journal import ChangeJournal, MISSING, clone, get_at, set_patches, delete_patches, load_patch_file
+from content_migrate import MigrationError, describe_step, plan_tab_changes, record_step
+from content_refs import RenameError, affected_tabs, build_graph, format_usages, kind_of, rename_everywhere
 
-# relative paths mapped to tabs
-JSON_FILES = {
-    "Classes": "data/classes.json",
-    "Races": "data/races.json",
-    "Skills": "data/skills.json",
-    "Rarities": "data/rarities.json",
-    "Status Effects": "data/status_effects.json",
-    "Armors": "data/items/armors.json",
-    "Weapons": "data/items/weapons.json",
-    "Consumables": "data/items/consumables.json",
-    "Materials": "data/items/materials.json",
-}
+CONFIG_FILE = "content_manager_config.json"
+ELEMENT_TABS = ("Races", "Skills")
 
 # -------------------------
 # Config utilities
 # -------------------------
 def load_config():
     if not os.path.exists(CONFIG_FILE):
-        return {"root_directory": "", "dark_mode": False}
+        return {"root_directory": "", "dark_mode": False, "lazy_load": True}
     try:
         with open(CONFIG_FILE, "r", encoding="utf-8") as f:
             return json.load(f)
     except Exception:
-        return {"root_directory": "", "dark_mode": False}
+        return {"root_directory": "", "dark_mode": False, "lazy_load": True}
 
 def save_config(cfg):
     try:
@@ -51,109 +81,163 @@ def save_config(cfg):
     except Exception as e:
         print("Failed saving config:", e)
 
-# -------------------------
-# Safe JSON IO + backup
-# -------------------------
-def safe_load(path):
-    if not os.path.exists(path):
-        return {}
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"ERROR loading {path}: {e}")
-        return {}
-
-def backup_file(path):
-    if not os.path.exists(path):
-        return None
-    ts = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
-    base = os.path.basename(path)
-    dirn = os.path.dirname(path)
-    backup_name = f"{base}.bak.{ts}"
-    backup_path = os.path.join(dirn, backup_name)
-    try:
-        shutil.copy2(path, backup_path)
-        return backup_path
-    except Exception as e:
-        print("Backup failed:", e)
-        return None
-
-def safe_save(path, data):
-    try:
-        os.makedirs(os.path.dirname(path), exist_ok=True)
-        # backup existing file
-        if os.path.exists(path):
-            backup_file(path)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4, ensure_ascii=False)
-        return True
-    except Exception as e:
-        print(f"ERROR saving {path}: {e}")
-        return False
+def heat_color(mult):
+    # elemental heatmap cell: white at 1.0, greener toward 0 (resisted), redder toward 2+ (weak)
+    if mult < 1.0:
+        k = int(155 * (1.0 - max(mult, 0.0)))
+        return f"#{255 - k:02x}ff{255 - k:02x}"
+    k = int(155 * min(mult - 1.0, 1.0))
+    return f"#ff{255 - k:02x}{255 - k:02x}"
 
 # -------------------------
-# Helpers
+# Virtualized views
 # -------------------------
-def make_key_from_name(name):
-    return name.strip().lower().replace(" ", "_")
-
-def is_leaf_node(obj):
-    # consider dict of only primitive values (no nested dict/list) a leaf
-    if not isinstance(obj, dict):
-        return True
-    for v in obj.values():
-        if isinstance(v, dict) or isinstance(v, list):
-            return False
-    return True
-
-def nested_get(data, path):
-    cur = data
-    for p in path:
-        cur = cur[p]
-    return cur
-
-def nested_set(data, path, value):
-    cur = data
-    for p in path[:-1]:
-        cur = cur[p]
-    cur[path[-1]] = value
-
-def nested_delete(data, path):
-    cur = data
-    for p in path[:-1]:
-        cur = cur[p]
-    del cur[path[-1]]
-
-def parse_value_by_example(orig, raw):
-    # Try to parse raw string into int/float/bool/list if orig indicates type
-    if isinstance(orig, bool):
-        return raw.lower() in ("1", "true", "yes", "y", "on")
-    if isinstance(orig, int):
+# treeview children are inserted in chunks; the rest sit behind a "... N more" row
+TREE_CHUNK = 500
+TREE_PLACEHOLDER = "::placeholder"
+TREE_MORE = "::more"
+# tree search opens at most this many matching branches
+SEARCH_REVEAL_LIMIT = 200
+# rows offered by the global Find box
+FIND_LIMIT = 50
+
+class VirtualList:
+    """Listbox that only materializes the rows currently in view."""
+
+    def __init__(self, parent, on_select=None):
+        self.items = []      # full row list; the Listbox holds only items[offset:offset+rows]
+        self.offset = 0
+        self.rows = 20
+        self.selected = None  # index into self.items
+        self.on_select = on_select
+
+        lb = tk.Listbox(parent, exportselection=False, activestyle="none")
+        lb.pack(side="left", fill="both", expand=True)
+        vsb = ttk.Scrollbar(parent, orient="vertical", command=self._on_scrollbar)
+        vsb.pack(side="right", fill="y")
+        self.listbox = lb
+        self.scrollbar = vsb
+        self._line = max(1, tkfont.Font(font=lb.cget("font")).metrics("linespace") + 1)
+
+        lb.bind("<Configure>", self._on_configure)
+        lb.bind("<<ListboxSelect>>", self._on_listbox_select)
+        lb.bind("<MouseWheel>", lambda e: self.scroll(-1 * (e.delta // 120 or (1 if e.delta > 0 else -1)) * 3))
+        lb.bind("<Button-4>", lambda e: self.scroll(-3))
+        lb.bind("<Button-5>", lambda e: self.scroll(3))
+        lb.bind("<Up>", lambda e: self._move(-1))
+        lb.bind("<Down>", lambda e: self._move(1))
+        lb.bind("<Prior>", lambda e: self._move(-self.rows))
+        lb.bind("<Next>", lambda e: self._move(self.rows))
+
+    # -- data --
+    def set_items(self, items):
+        self.items = list(items)
+        self.offset = 0
+        self.selected = None
+        self._render()
+
+    def index(self, item):
         try:
-            return int(raw)
-        except:
-            try:
-                return int(float(raw))
-            except:
-                return raw
-    if isinstance(orig, float):
-        try:
-            return float(raw)
-        except:
-            return raw
-    if isinstance(orig, list):
-        # accept comma-separated values
-        pieces = [s.strip() for s in raw.split(",") if s.strip()]
-        return pieces
-    # fallback
-    return raw
+            return self.items.index(item)
+        except ValueError:
+            return None
+
+    def insert(self, index, item):
+        index = len(self.items) if index is None else index
+        self.items.insert(index, item)
+        if self.selected is not None and self.selected >= index:
+            self.selected += 1
+        self._render()
+
+    def remove(self, item):
+        idx = self.index(item)
+        if idx is None:
+            return
+        del self.items[idx]
+        if self.selected == idx:
+            self.selected = None
+        elif self.selected is not None and self.selected > idx:
+            self.selected -= 1
+        self._render()
+
+    def selection(self):
+        if self.selected is None or self.selected >= len(self.items):
+            return None
+        return self.items[self.selected]
+
+    def select(self, item):
+        idx = self.index(item)
+        if idx is None:
+            return
+        self.selected = idx
+        self.see(idx)
+
+    def see(self, idx):
+        if idx < self.offset:
+            self.offset = idx
+        elif idx >= self.offset + self.rows:
+            self.offset = idx - self.rows + 1
+        self._render()
+
+    # -- scrolling --
+    def scroll(self, delta):
+        self.offset += delta
+        self._render()
+        return "break"
+
+    def _move(self, delta):
+        if not self.items:
+            return "break"
+        cur = self.offset if self.selected is None else self.selected
+        self.selected = min(max(0, cur + delta), len(self.items) - 1)
+        self.see(self.selected)
+        if self.on_select:
+            self.on_select()
+        return "break"
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.offset = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.offset += int(args[1]) * step
+        self._render()
+
+    def _on_configure(self, event):
+        rows = max(1, event.height // self._line)
+        if rows != self.rows:
+            self.rows = rows
+            self._render()
+
+    def _on_listbox_select(self, event):
+        sel = self.listbox.curselection()
+        if not sel:
+            return
+        self.selected = self.offset + sel[0]
+        if self.on_select:
+            self.on_select()
+
+    def _render(self):
+        total = len(self.items)
+        self.offset = max(0, min(self.offset, total - self.rows))
+        lb = self.listbox
+        lb.delete(0, tk.END)
+        window = self.items[self.offset:self.offset + self.rows]
+        if window:
+            lb.insert(tk.END, *window)
+        if self.selected is not None and self.offset <= self.selected < self.offset + len(window):
+            lb.selection_set(self.selected - self.offset)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
 # -------------------------
 # GUI Application
 # -------------------------
 class ContentManagerApp(tk.Tk):
     def __init__(self):
+        self._startup_t0 = time.perf_counter()
         super().__init__()
         self.title("Uldtale Battlesim - Content Manager")
         self.geometry("1200x760")
@@ -162,6 +246,9 @@ class ContentManagerApp(tk.Tk):
         self.config_data = load_config()
         self.root_dir = self.config_data.get("root_directory", "")
         self.dark_mode = self.config_data.get("dark_mode", False)
+        # lazy: parse a tab's JSON / build its view only when the tab is first selected
+        self.lazy_load = self.config_data.get("lazy_load", True)
+        BACKUP_POLICY.update(self.config_data.get("backup_policy", {}))
 
         # state
         self.data = {}  # tab -> loaded JSON
@@ -169,6 +256,28 @@ class ContentManagerApp(tk.Tk):
         self.current_path = None  # list path into JSON for currently selected node
         self.rarity_list = []
         self.elements_list = []
+        self.loaded_views = set()  # tabs whose Listbox/Treeview has been built
+        self.index = ContentIndex()  # inverted index over every loaded entry
+        self.item_index = ItemIndex()  # item_id -> path(s) plus slot/type/rarity/class lookups
+        self.journal = ChangeJournal(self.config_data.get("undo_limit", 500))
+        self.validator = ContentValidator()  # issues per entry, kept current on every mutation
+        self.refs = None  # content_refs.RefGraph, built on the first Usages / Rename
+        # external edits: polled off the Tk thread, applied per tab on it
+        self.watch_files = self.config_data.get("watch_files", True)
+        self.watcher = FileWatcher(self.config_data.get("watch_interval", 1.0))
+        self.dirty_tabs = set()  # tabs with unsaved in-memory changes (mirrors the journal)
+        self._find_hits = {}
+        self._element_table = None  # last content_elements table, reused row by row on refresh
+        self._elements_win = None
+        self._elements_pending = False
+
+        # background prefetch (worker thread only parses JSON, never touches Tk)
+        self._prefetched = {}
+        self._prefetch_claimed = set()  # tabs the Tk thread loads itself (the worker leaves them alone)
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_gen = 0
+        self._prefetch_thread = None
+        self._prefetch_t0 = None
 
         # widgets storage
         self.listboxes = {}
@@ -180,12 +289,22 @@ class ContentManagerApp(tk.Tk):
         if not self.root_dir or not os.path.isdir(self.root_dir):
             self._prompt_for_root()
         else:
-            self._load_all_files()
-            self._populate_all()
+            self._open_project(self._startup_t0)
 
         # apply dark mode if configured
         if self.dark_mode:
             self.toggle_dark_mode(enable=True)
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        if self.watch_files:
+            self.watcher.start()
+            self.after(int(self.watcher.interval * 1000), self._drain_watch)
+
+    def _on_close(self):
+        if self.dirty_tabs and not messagebox.askyesno(
+                "Quit", "Unsaved changes in " + ", ".join(sorted(self.dirty_tabs)) + ". Quit without saving?"):
+            return
+        self.watcher.stop()
+        self.destroy()
 
     # -----------------------
     # UI setup
@@ -202,6 +321,27 @@ class ContentManagerApp(tk.Tk):
         ttk.Button(toolbar, text="Change Root", command=self._change_root).pack(side="left")
         ttk.Button(toolbar, text="Reload", command=self._reload_all).pack(side="left", padx=6)
         ttk.Button(toolbar, text="Save All", command=self._save_all).pack(side="left", padx=6)
+        ttk.Button(toolbar, text="Undo", command=self._undo).pack(side="left")
+        ttk.Button(toolbar, text="Redo", command=self._redo).pack(side="left", padx=6)
+        ttk.Button(toolbar, text="Export Patch", command=self._export_patch).pack(side="left")
+        ttk.Button(toolbar, text="Replay Patch", command=self._replay_patch).pack(side="left", padx=6)
+        ttk.Button(toolbar, text="Validate", command=self._validate_all).pack(side="left")
+        ttk.Button(toolbar, text="Build Pack", command=self._build_pack).pack(side="left", padx=6)
+        ttk.Button(toolbar, text="Balance", command=self._run_balance).pack(side="left")
+        ttk.Button(toolbar, text="Economy", command=self._run_economy).pack(side="left", padx=6)
+        ttk.Button(toolbar, text="Effects", command=self._run_effects).pack(side="left")
+        ttk.Button(toolbar, text="Elements", command=self._show_elements).pack(side="left", padx=6)
+
+        ttk.Separator(toolbar, orient="vertical").pack(side="left", fill="y", padx=8)
+
+        # Global find across all tabs
+        ttk.Label(toolbar, text="Find:").pack(side="left")
+        self.find_var = tk.StringVar()
+        self.find_box = ttk.Combobox(toolbar, textvariable=self.find_var, width=40)
+        self.find_box.pack(side="left", padx=(4,0))
+        self.find_box.bind("<KeyRelease>", self._on_find_changed)
+        self.find_box.bind("<<ComboboxSelected>>", self._on_find_selected)
+        self.find_box.bind("<Return>", self._on_find_selected)
 
         ttk.Separator(toolbar, orient="vertical").pack(side="left", fill="y", padx=8)
 
@@ -213,12 +353,18 @@ class ContentManagerApp(tk.Tk):
         self.notebook = ttk.Notebook(self)
         self.notebook.pack(fill="both", expand=True, padx=6, pady=6)
         self.notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+        self.bind_all("<Control-z>", lambda e: self._undo())
+        self.bind_all("<Control-y>", lambda e: self._redo())
+        self.bind_all("<Control-Shift-Z>", lambda e: self._redo())
 
         # Build tabs
+        self.tab_frames = {}
         for tab_name in JSON_FILES.keys():
             frame = ttk.Frame(self.notebook)
             self.notebook.add(frame, text=tab_name)
+            self.tab_frames[tab_name] = frame
             self._build_tab_ui(tab_name, frame)
+        self._frame_tabs = {str(f): t for t, f in self.tab_frames.items()}
 
         # Status bar
         self.status_var = tk.StringVar(value="Ready")
@@ -238,6 +384,8 @@ class ContentManagerApp(tk.Tk):
         ttk.Button(btn_frame, text="Duplicate", command=lambda tn=tab_name: self._duplicate_item(tn)).pack(side="left", padx=4)
         ttk.Button(btn_frame, text="Delete", command=lambda tn=tab_name: self._delete_item(tn)).pack(side="left")
         ttk.Button(btn_frame, text="Save", command=lambda tn=tab_name: self._save_tab(tn)).pack(side="left", padx=4)
+        ttk.Button(btn_frame, text="Usages", command=lambda tn=tab_name: self._show_usages(tn)).pack(side="left")
+        ttk.Button(btn_frame, text="Rename", command=lambda tn=tab_name: self._rename_everywhere(tn)).pack(side="left", padx=4)
 
         # Search
         sframe = ttk.Frame(left)
@@ -247,6 +395,8 @@ class ContentManagerApp(tk.Tk):
         ent = ttk.Entry(sframe, textvariable=sv)
         ent.pack(side="left", fill="x", expand=True, padx=6)
         ent.bind("<Return>", lambda e, tn=tab_name, v=sv: self._search_tab(tn, v.get()))
+        # search as you type (index lookups, no view rebuild for unchanged queries)
+        ent.bind("<KeyRelease>", lambda e, tn=tab_name, v=sv: self._search_tab(tn, v.get(), live=True))
 
         # For Armors/Weapons, use Treeview; else Listbox
         container = ttk.Frame(left)
@@ -259,14 +409,13 @@ class ContentManagerApp(tk.Tk):
             vsb.pack(side="right", fill="y")
             tree.configure(yscrollcommand=vsb.set)
             tree.bind("<<TreeviewSelect>>", lambda e, tn=tab_name: self._on_tree_select(tn))
+            tree.bind("<<TreeviewOpen>>", lambda e, tn=tab_name: self._on_tree_open(tn))
+            # configure tags once
+            tree.tag_configure("leaf", background="#f0fff0")
+            tree.tag_configure("more", foreground="gray")
             self.treeviews[tab_name] = tree
         else:
-            lb = tk.Listbox(container)
-            lb.pack(side="left", fill="both", expand=True)
-            vsb = ttk.Scrollbar(container, orient="vertical", command=lb.yview)
-            vsb.pack(side="right", fill="y")
-            lb.configure(yscrollcommand=vsb.set)
-            lb.bind("<<ListboxSelect>>", lambda e, tn=tab_name: self._on_list_select(tn))
+            lb = VirtualList(container, on_select=lambda tn=tab_name: self._on_list_select(tn))
             self.listboxes[tab_name] = lb
 
         # right pane: editor
@@ -318,37 +467,173 @@ class ContentManagerApp(tk.Tk):
         self.dir_label.config(text=new)
         self.config_data["root_directory"] = new
         save_config(self.config_data)
-        self._load_all_files()
-        self._populate_all()
+        self._open_project()
         self.status("Project root updated.")
 
+    def _open_project(self, t0=None):
+        t0 = time.perf_counter() if t0 is None else t0
+        if self.lazy_load:
+            self._load_lazy()
+            mode = "lazy"
+        else:
+            self._load_all_files()
+            self._populate_all()
+            mode = "eager"
+        self._report_first_interactive(t0, mode)
+
     def _load_all_files(self):
+        self._prefetch_gen += 1  # drop results of any running prefetch
         self.data.clear()
+        self.loaded_views.clear()
+        self._clear_dirty()
+        self.journal.reset()
+        self.watcher.clear()
+        self.index = ContentIndex()
+        self.item_index = ItemIndex()
+        self.refs = None
         for tab, rel in JSON_FILES.items():
             full = os.path.join(self.root_dir, rel)
-            self.data[tab] = safe_load(full)
+            self.data[tab], sig = load_signed(full)
+            self.watcher.watch(tab, full, sig)
+            self.index.index_tab(tab, self.data[tab])
+            self.item_index.index_tab(tab, self.data[tab])
+        self.validator.validate_all(self.data)
         # infer enums
         self._load_enums()
 
+    # -------------------------
+    # Lazy loading
+    # -------------------------
+    def _load_lazy(self):
+        # load and show only the selected tab; prefetch the rest off the main thread
+        self._prefetch_gen += 1
+        self.data.clear()
+        self.loaded_views.clear()
+        self._clear_dirty()
+        self.journal.reset()
+        self.validator.reset()
+        self.watcher.clear()
+        self.index = ContentIndex()
+        self.item_index = ItemIndex()
+        self.refs = None
+        with self._prefetch_lock:
+            self._prefetched.clear()
+            self._prefetch_claimed.clear()
+        self.rarity_list = []
+        self.elements_list = []
+        selected = self.notebook.select()
+        first = self._frame_tabs.get(str(selected), next(iter(JSON_FILES)))
+        self._ensure_tab_view(first)
+        self._start_prefetch()
+
+    def _ensure_tab_data(self, tab):
+        # parse a tab's JSON on first use (taking the prefetched copy when available)
+        if tab in self.data:
+            return self.data[tab]
+        with self._prefetch_lock:
+            ready = self._prefetched.pop(tab, None)
+            if ready is None:
+                self._prefetch_claimed.add(tab)
+        if ready is None:
+            node, sig = load_signed(self._tab_fullpath(tab))
+            self.index.index_tab(tab, node)
+            self.item_index.index_tab(tab, node)
+        else:
+            node, sig = ready
+        self.data[tab] = node
+        self.watcher.watch(tab, self._tab_fullpath(tab), sig)
+        self.validator.load_tab(self.data, tab)
+        if self.refs is not None:
+            self.refs.index_tab(tab, node)
+        if tab in ("Rarities", "Skills"):
+            self._load_enums()
+        return node
+
+    def _ensure_tab_view(self, tab):
+        self._ensure_tab_data(tab)
+        if tab not in self.loaded_views:
+            self._populate_tab(tab)
+
+    def _start_prefetch(self):
+        gen = self._prefetch_gen
+        root = self.root_dir
+        index, item_index = self.index, self.item_index
+        # enum sources first so dropdowns are ready early
+        pending = sorted((t for t in JSON_FILES if t not in self.data),
+                         key=lambda t: t not in ("Rarities", "Skills"))
+
+        def worker():
+            for tab in pending:
+                if gen != self._prefetch_gen:
+                    return
+                node, sig = load_signed(os.path.join(root, JSON_FILES[tab]))
+                # index off the Tk thread; the tab is not visible to the UI until drained. Under
+                # the lock, so a tab the Tk thread loads itself is never indexed twice at once
+                with self._prefetch_lock:
+                    if gen != self._prefetch_gen or tab in self._prefetch_claimed:
+                        continue
+                    index.index_tab(tab, node)
+                    item_index.index_tab(tab, node)
+                    self._prefetched[tab] = (node, sig)
+
+        self._prefetch_t0 = time.perf_counter()
+        self._prefetch_thread = threading.Thread(target=worker, name="content-prefetch", daemon=True)
+        self._prefetch_thread.start()
+        self.after(50, lambda: self._drain_prefetch(gen))
+
+    def _drain_prefetch(self, gen):
+        # runs on the Tk thread: move parsed tabs into self.data (views stay unbuilt)
+        if gen != self._prefetch_gen:
+            return
+        # check liveness before draining so nothing stored after the swap is left behind
+        alive = self._prefetch_thread is not None and self._prefetch_thread.is_alive()
+        with self._prefetch_lock:
+            ready, self._prefetched = self._prefetched, {}
+        enums_changed = False
+        for tab, (node, sig) in ready.items():
+            if tab not in self.data:
+                self.data[tab] = node
+                self.watcher.watch(tab, self._tab_fullpath(tab), sig)
+                self.validator.load_tab(self.data, tab)
+                enums_changed = enums_changed or tab in ("Rarities", "Skills")
+        if enums_changed:
+            self._load_enums()
+        if alive:
+            self.after(50, lambda: self._drain_prefetch(gen))
+        else:
+            ms = (time.perf_counter() - self._prefetch_t0) * 1000
+            print(f"[startup] background prefetch finished in {ms:.1f} ms")
+
+    def _report_first_interactive(self, t0, mode):
+        # first idle callback after the initial view is built = window is interactive
+        def done():
+            ms = (time.perf_counter() - t0) * 1000
+            parsed = len(self.data)
+            print(f"[startup] first interactive in {ms:.1f} ms ({mode}, {parsed}/{len(JSON_FILES)} tabs parsed)")
+            self.status(f"Ready in {ms:.0f} ms ({mode} load)")
+            log_path = self.config_data.get("startup_log")
+            if log_path:
+                entry = {
+                    "time": datetime.datetime.now().isoformat(timespec="seconds"),
+                    "mode": mode,
+                    "first_interactive_ms": round(ms, 1),
+                    "tabs_parsed": parsed,
+                    "content_bytes": sum(os.path.getsize(self._tab_fullpath(t)) for t in JSON_FILES
+                                         if os.path.exists(self._tab_fullpath(t))),
+                }
+                try:
+                    with open(log_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps(entry) + "\n")
+                except Exception as e:
+                    print("Failed writing startup log:", e)
+        self.after_idle(done)
+
     def _load_enums(self):
         # rarities
         rarities = self.data.get("Rarities", {})
         self.rarity_list = list(rarities.keys()) if isinstance(rarities, dict) else []
         # elements: infer from skills (fields 'element' or 'elements')
-        elems = set()
-        skills = self.data.get("Skills", {})
-        sknode = skills.get("skills") if isinstance(skills, dict) and "skills" in skills else skills
-        if isinstance(sknode, dict):
-            for s, val in sknode.items():
-                if isinstance(val, dict):
-                    for k in ("element", "elements"):
-                        if k in val:
-                            v = val[k]
-                            if isinstance(v, list):
-                                elems.update(v)
-                            elif isinstance(v, str) and v.upper() != "NONE":
-                                elems.add(v)
-        self.elements_list = sorted(elems)
+        self.elements_list = content_elements.infer_elements(self.data.get("Skills", {}))
 
     # -------------------------
     # Populate views
@@ -362,6 +647,7 @@ class ContentManagerApp(tk.Tk):
         self._widgets and self._widgets.get(tab, {}).get("selected_label", ttk.Label()) and \
             self._widgets[tab]["selected_label"].config(text="Selected: -")
         self.current_tab = tab
+        self.loaded_views.add(tab)
         # tree vs list
         if tab in ("Armors", "Weapons"):
             tree = self.treeviews.get(tab)
@@ -374,53 +660,195 @@ class ContentManagerApp(tk.Tk):
             lb = self.listboxes.get(tab)
             if not lb:
                 return
-            lb.delete(0, tk.END)
-            node = self.data.get(tab, {})
-            if tab in ("Classes", "Races"):
-                for grp, entries in node.items():
-                    for k in entries.keys():
-                        lb.insert(tk.END, f"{grp}:{k}")
-            elif isinstance(node, dict):
-                for k in node.keys():
-                    lb.insert(tk.END, k)
+            lb.set_items(self._list_rows(tab))
+
+    def _list_rows(self, tab):
+        return [self._row_label(tab, path) for path, _ in iter_entries(tab, self.data.get(tab, {}))]
+
+    def _row_label(self, tab, path):
+        if tab in GROUPED_TABS:
+            return f"{path[0]}:{path[1]}"
+        return path[-1]
+
+    def _row_path(self, tab, label):
+        if tab in GROUPED_TABS:
+            grp, name = label.split(":", 1)
+            return [grp, name]
+        if tab == "Skills" and isinstance(self.data.get(tab, {}).get("skills"), dict):
+            return ["skills", label]
+        return [label]
 
     def _populate_tree(self, tree, parent, node):
-        # recursively populate keys
+        # insert the next chunk of direct children that have no row yet (a search reveal or a new
+        # entry may have added rows out of order); deeper levels are materialized on <<TreeviewOpen>>
         if not isinstance(node, dict):
             return
-        for key, val in node.items():
-            nid = tree.insert(parent, "end", text=key, open=False)
-            if isinstance(val, dict):
-                # mark leaf nodes visually by tag if leaf
-                if is_leaf_node(val):
-                    tree.item(nid, tags=("leaf",))
-                self._populate_tree(tree, nid, val)
-        # configure tag once
-        tree.tag_configure("leaf", background="#f0fff0")
+        keys = [k for k in node if not tree.exists(self._tree_iid(parent, k))]
+        for key in keys[:TREE_CHUNK]:
+            self._tree_insert_node(tree, parent, key, node[key])
+        if len(keys) > TREE_CHUNK:
+            tree.insert(parent, "end", iid=parent + TREE_MORE, text=f"... {len(keys) - TREE_CHUNK} more", tags=("more",))
+
+    def _tree_sync_more(self, tree, parent, node):
+        # recount "... N more" after rows were added / removed outside a chunk load
+        more = parent + TREE_MORE
+        if not tree.exists(more) or not isinstance(node, dict):
+            return
+        left = sum(1 for k in node if not tree.exists(self._tree_iid(parent, k)))
+        if left:
+            tree.item(more, text=f"... {left} more")
+        else:
+            tree.delete(more)
+
+    def _tree_iid(self, parent, key):
+        return f"{parent}/{key}" if parent else key
+
+    def _tree_insert_node(self, tree, parent, key, val, index="end"):
+        iid = self._tree_iid(parent, key)
+        # mark leaf nodes visually by tag if leaf
+        tags = ("leaf",) if isinstance(val, dict) and is_leaf_node(val) else ()
+        tree.insert(parent, index, iid=iid, text=key, open=False, tags=tags)
+        if isinstance(val, dict) and val:
+            # placeholder child gives the row an expand arrow until it is opened
+            tree.insert(iid, "end", iid=iid + TREE_PLACEHOLDER, text="")
+        return iid
+
+    def _tree_path(self, tree, iid):
+        # build path from tree root
+        path = []
+        cur = iid
+        while cur:
+            path.insert(0, tree.item(cur, "text"))
+            cur = tree.parent(cur)
+        return path
+
+    def _tree_materialize(self, tab, iid):
+        tree = self.treeviews[tab]
+        if iid and tree.exists(iid + TREE_PLACEHOLDER):
+            tree.delete(iid + TREE_PLACEHOLDER)
+            node = nested_get(self.data[tab], self._tree_path(tree, iid))
+            self._populate_tree(tree, iid, node)
+
+    def _on_tree_open(self, tab):
+        tree = self.treeviews.get(tab)
+        if tree:
+            self._tree_materialize(tab, tree.focus())
+
+    def _load_more(self, tab, more_iid):
+        tree = self.treeviews[tab]
+        parent = tree.parent(more_iid)
+        tree.delete(more_iid)
+        node = nested_get(self.data[tab], self._tree_path(tree, parent)) if parent else self.data[tab]
+        self._populate_tree(tree, parent, node)
+
+    def _tree_reveal(self, tab, path):
+        # materialize and open every ancestor of path, inserting rows beyond the loaded chunk
+        tree = self.treeviews[tab]
+        parent = ""
+        node = self.data[tab]
+        for i, key in enumerate(path):
+            if not isinstance(node, dict) or key not in node:
+                return None
+            siblings, node = node, node[key]
+            iid = self._tree_iid(parent, key)
+            if not tree.exists(iid):
+                more = parent + TREE_MORE
+                index = tree.index(more) if tree.exists(more) else "end"
+                self._tree_insert_node(tree, parent, key, node, index)
+                self._tree_sync_more(tree, parent, siblings)
+            if i < len(path) - 1:
+                self._tree_materialize(tab, iid)
+                tree.item(iid, open=True)
+            parent = iid
+        return parent
+
+    # -------------------------
+    # In-place view updates
+    # -------------------------
+    def _view_insert(self, tab, path, after=None):
+        # show a newly created entry without rebuilding the widget
+        if tab not in self.loaded_views:
+            return
+        if tab in TREE_TABS:
+            self._tree_insert_path(tab, path, after)
+            return
+        lb = self.listboxes.get(tab)
+        if not lb:
+            return
+        label = self._row_label(tab, path)
+        if lb.index(label) is not None:
+            return
+        index = None
+        if after:
+            prev = lb.index(self._row_label(tab, after))
+            index = None if prev is None else prev + 1
+        lb.insert(index, label)
+
+    def _view_remove(self, tab, path):
+        if tab not in self.loaded_views:
+            return
+        if tab in TREE_TABS:
+            tree = self.treeviews.get(tab)
+            iid = "/".join(path)
+            if tree and tree.exists(iid):
+                tree.delete(iid)
+            if tree:
+                parent = "/".join(path[:-1])
+                self._tree_sync_more(tree, parent, get_at(self.data.get(tab, {}), path[:-1]))
+            return
+        lb = self.listboxes.get(tab)
+        if lb:
+            lb.remove(self._row_label(tab, path))
+
+    def _tree_insert_path(self, tab, path, after=None):
+        tree = self.treeviews.get(tab)
+        if not tree:
+            return
+        parent = ""
+        node = self.data[tab]
+        for i, key in enumerate(path):
+            siblings, node = node, node[key]
+            iid = self._tree_iid(parent, key)
+            if not tree.exists(iid):
+                if parent and tree.exists(parent + TREE_PLACEHOLDER):
+                    # parent still collapsed: its children load when it is opened
+                    return
+                if parent and not tree.get_children(parent) and not tree.item(parent, "open"):
+                    # first child of a collapsed empty container: give it an expand arrow
+                    tree.insert(parent, "end", iid=parent + TREE_PLACEHOLDER, text="")
+                    return
+                index = "end"
+                sibling = self._tree_iid(parent, after[-1]) if after and i == len(path) - 1 else None
+                if sibling and tree.exists(sibling):
+                    index = tree.index(sibling) + 1
+                elif tree.exists(parent + TREE_MORE):
+                    index = tree.index(parent + TREE_MORE)
+                self._tree_insert_node(tree, parent, key, node, index)
+                self._tree_sync_more(tree, parent, siblings)
+            parent = iid
 
     # -------------------------
     # Selection handlers
     # -------------------------
     def _on_tab_changed(self, event):
-        tab = event.widget.tab(event.widget.select(), "text")
+        # tab captions carry a dirty marker, so map the frame back to its tab name
+        tab = self._frame_tabs.get(str(event.widget.select()))
+        if tab is None:
+            return
         self.current_tab = tab
         self.current_path = None
+        if self.root_dir and os.path.isdir(self.root_dir):
+            self._ensure_tab_view(tab)
         self.status(f"Switched to {tab}")
 
     def _on_list_select(self, tab):
         lb = self.listboxes.get(tab)
         if not lb:
             return
-        sel = lb.curselection()
-        if not sel:
+        value = lb.selection()
+        if value is None:
             return
-        value = lb.get(sel)
-        path = []
-        if tab in ("Classes", "Races"):
-            grp, name = value.split(":", 1)
-            path = [grp, name]
-        else:
-            path = [value]
+        path = self._row_path(tab, value)
         self.current_tab = tab
         self.current_path = path
         self._widgets[tab]["selected_label"].config(text="Selected: " + "/".join(path))
@@ -439,12 +867,10 @@ class ContentManagerApp(tk.Tk):
         if not sels:
             return
         iid = sels[0]
-        # build path from tree root
-        path = []
-        cur = iid
-        while cur:
-            path.insert(0, tree.item(cur, "text"))
-            cur = tree.parent(cur)
+        if iid.endswith(TREE_MORE):
+            self._load_more(tab, iid)
+            return
+        path = self._tree_path(tree, iid)
         self.current_tab = tab
         self.current_path = path
         self._widgets[tab]["selected_label"].config(text="Selected: " + "/".join(path))
@@ -476,12 +902,14 @@ class ContentManagerApp(tk.Tk):
             # choose widget type
             # rarity dropdown
             if key.lower() == "rarity":
+                self._ensure_tab_data("Rarities")
                 cb = ttk.Combobox(frame, values=self.rarity_list)
                 cb.set("" if val is None else str(val))
                 cb.grid(row=row, column=1, sticky="ew", padx=6, pady=4)
                 widget = cb
             # element(s)
             elif key.lower() in ("element", "elements", "elemental", "elements_list"):
+                self._ensure_tab_data("Skills")
                 # support multiple via comma-separated entry
                 if isinstance(val, list):
                     ent = ttk.Entry(frame)
@@ -520,6 +948,7 @@ class ContentManagerApp(tk.Tk):
 
     def _apply_changes(self, tab, path):
         node = nested_get(self.data[tab], path)
+        patches = []
         for key, (widget, orig) in self.editor_widgets.items():
             new_val = None
             # resolve widget type
@@ -538,8 +967,20 @@ class ContentManagerApp(tk.Tk):
                     new_val = widget.get()
                 except:
                     new_val = str(widget)
-            node[key] = new_val
-
+            if node.get(key, MISSING) != new_val:
+                patches += set_patches(self.data, tab, path + [key], new_val)
+
+        # refuse values the game loaders would choke on (bad types, enums, dangling references)
+        for target in REFS.get(tab, {}).values():
+            self._ensure_tab_data(target)
+        candidate = dict(node, **{p.path[-1]: p.new for p in patches})
+        errors = [i for i in self.validator.check_entry(self.data, tab, path, candidate) if i.severity == "error"]
+        if errors:
+            messagebox.showerror("Invalid values", "Not applied:\n" + "\n".join(str(i) for i in errors[:15]))
+            return
+        if not self._record(patches, "edit " + "/".join(path)):
+            self.status("No changes to apply")
+            return
         self.status(f"Applied changes to {'/'.join(path)}")
 
     def _revert_node(self, tab, path):
@@ -569,18 +1010,15 @@ class ContentManagerApp(tk.Tk):
             slot_choice = simpledialog.askstring("Slot", f"Slot (existing or new). Existing: {', '.join(slot_existing)}", initialvalue=(slot_existing[0] if slot_existing else "slot"))
             if slot_choice is None:
                 return
-            # ensure structure exists
-            if tab not in self.data:
-                self.data[tab] = {}
-            if top_choice not in self.data[tab]:
-                self.data[tab][top_choice] = {}
-            if slot_choice not in self.data[tab][top_choice]:
-                self.data[tab][top_choice][slot_choice] = {}
-            # create default template
+            # create default template (missing category/slot are created with it)
             template = {"name": name, "description": "", "value": 0, "rarity": ""}
-            self.data[tab][top_choice][slot_choice][key] = template
-            # refresh tree
-            self._populate_tab(tab)
+            path = [top_choice, slot_choice, key]
+            if not self._confirm_item_id(tab, path):
+                return
+            self._view_remove(tab, path)
+            self._record(set_patches(self.data, tab, path, template), "new " + "/".join(path))
+            # refresh tree in place
+            self._view_insert(tab, path)
             self.status(f"Created {name} under {top_choice}/{slot_choice}")
         elif tab in ("Classes", "Races"):
             name = simpledialog.askstring("New Entry", "Enter new entry name:")
@@ -593,20 +1031,18 @@ class ContentManagerApp(tk.Tk):
                 messagebox.showerror("Invalid group", "Group must be 'playable' or 'non_playable'")
                 return
             key = name
-            if group not in self.data[tab]:
-                self.data[tab][group] = {}
-            self.data[tab][group][key] = {"base_vit":5,"base_str":5,"base_dex":5,"base_int":5,"skills":[]}
-            self._populate_tab(tab)
+            template = {"base_vit":5,"base_str":5,"base_dex":5,"base_int":5,"skills":[]}
+            self._record(set_patches(self.data, tab, [group, key], template), f"new {group}/{key}")
+            self._view_insert(tab, [group, key])
             self.status(f"Created {name} in {group}")
         elif tab == "Skills":
             name = simpledialog.askstring("New Skill", "Enter skill name:")
             if not name:
                 return
             key = name
-            if "skills" not in self.data["Skills"]:
-                self.data["Skills"]["skills"] = {}
-            self.data["Skills"]["skills"][key] = {"name": key, "description":"", "ability_type":"MAGICAL", "type":"DAMAGE", "target":"ENEMY", "power":10, "mp_cost":0, "cooldown":0}
-            self._populate_tab(tab)
+            template = {"name": key, "description":"", "ability_type":"MAGICAL", "type":"DAMAGE", "target":"ENEMY", "power":10, "mp_cost":0, "cooldown":0}
+            self._record(set_patches(self.data, tab, ["skills", key], template), f"new skill {key}")
+            self._view_insert(tab, ["skills", key])
             self.status(f"Created skill {key}")
         else:
             # flat dicts
@@ -614,8 +1050,10 @@ class ContentManagerApp(tk.Tk):
             if not name:
                 return
             key = make_key_from_name(name)
-            self.data.setdefault(tab, {})[key] = {"name": name, "description": ""}
-            self._populate_tab(tab)
+            if not self._confirm_item_id(tab, [key]):
+                return
+            self._record(set_patches(self.data, tab, [key], {"name": name, "description": ""}), f"new {key}")
+            self._view_insert(tab, [key])
             self.status(f"Created {key} in {tab}")
 
     def _duplicate_item(self, tab):
@@ -633,14 +1071,32 @@ class ContentManagerApp(tk.Tk):
         if not new_name:
             return
         new_key = make_key_from_name(new_name)
+        new_path = parent_path + [new_key]
+        if not self._confirm_item_id(tab, new_path):
+            return
+        # an overwritten key gets a fresh row
+        self._view_remove(tab, new_path)
         # deep copy
-        parent_node[new_key] = json.loads(json.dumps(parent_node[old_key]))
+        copy = clone(parent_node[old_key])
         # if has name field update
-        if isinstance(parent_node[new_key], dict):
-            parent_node[new_key]["name"] = new_name
-        self._populate_tab(tab)
+        if isinstance(copy, dict):
+            copy["name"] = new_name
+        self._record(set_patches(self.data, tab, new_path, copy), f"duplicate {old_key} -> {new_key}")
+        self._view_insert(tab, new_path, after=self.current_path)
         self.status(f"Duplicated {old_key} -> {new_key}")
 
+    def _confirm_item_id(self, tab, path):
+        # the game keys every item by id alone (ItemManager), so an id reused elsewhere shadows the other
+        if tab not in ITEM_TABS:
+            return True
+        others = [(t, p) for t, p in self.item_index.locate(path[-1]) if (t, list(p)) != (tab, path)]
+        if not others:
+            return True
+        where = "\n".join(f"{t}: {'/'.join(p)}" for t, p in others)
+        return messagebox.askyesno("Item id in use",
+                                   f"Item id '{path[-1]}' is already used by:\n{where}\n\n"
+                                   "The game looks items up by id only, so one would hide the other. Continue?")
+
     def _delete_item(self, tab):
         if not self.current_path:
             messagebox.showwarning("No selection", "Select an item to delete")
@@ -649,57 +1105,305 @@ class ContentManagerApp(tk.Tk):
         if not messagebox.askyesno("Confirm delete", f"Delete {full}?"):
             return
         # delete nested
-        try:
-            nested_delete(self.data[tab], self.current_path)
-        except Exception as e:
-            messagebox.showerror("Delete failed", str(e))
+        patches = delete_patches(self.data, tab, self.current_path)
+        if not patches:
+            messagebox.showerror("Delete failed", f"{full} not found")
             return
-        self._populate_tab(tab)
+        self._record(patches, "delete " + full)
+        self._view_remove(tab, self.current_path)
+        self._widgets[tab]["selected_label"].config(text="Selected: -")
         self._clear_editor(tab)
         self.current_path = None
         self.status(f"Deleted {full}")
 
+    # -------------------------
+    # References
+    # -------------------------
+    def _refs(self):
+        # one graph over every tab (unparsed ones read from disk) and the scripts
+        if self.refs is None:
+            t0 = time.perf_counter()
+            self.refs = build_graph(self.root_dir, self.data)
+            print(f"Reference graph built in {(time.perf_counter() - t0) * 1000:.0f} ms")
+        return self.refs
+
+    def _selected_key(self, tab):
+        if self.current_tab != tab or not self.current_path or len(self.current_path) != entry_depth(tab):
+            messagebox.showwarning("No selection", "Select an entry first")
+            return None
+        return self.current_path[-1]
+
+    def _show_usages(self, tab):
+        key = self._selected_key(tab)
+        if key is None:
+            return
+        kind = kind_of(tab)
+        t0 = time.perf_counter()
+        found = self._refs().usages(kind, key)
+        ms = (time.perf_counter() - t0) * 1000
+        lines = format_usages(kind, key, found, self.root_dir).split("\n")
+        if len(lines) > 40:
+            lines = lines[:40] + [f"... and {len(lines) - 40} more"]
+        self.status(f"Usages of {key}: {len(found['json'])} entry field(s), "
+                    f"{len(found['scripts'])} script line(s) ({ms:.1f} ms)")
+        messagebox.showinfo("Usages", "\n".join(lines))
+
+    def _rename_everywhere(self, tab):
+        key = self._selected_key(tab)
+        if key is None:
+            return
+        kind = kind_of(tab)
+        # the rename works on the files, so pick up external edits and refuse over unsaved ones
+        self._sync_external(list(self.data))
+        dirty = [t for t in affected_tabs(kind) if t in self.dirty_tabs]
+        if dirty:
+            messagebox.showwarning("Unsaved changes", "Save or undo the changes in " + ", ".join(dirty)
+                                   + " first: the rename rewrites those files.")
+            return
+        new = simpledialog.askstring("Rename", f"New key for {kind} '{key}':", initialvalue=key)
+        if not new or new == key:
+            return
+        try:
+            plan = rename_everywhere(self.root_dir, kind, key, new, graph=self._refs(), dry_run=True)
+            warning = f"\n\nWARNING: {plan['warning']}" if plan["warning"] else ""
+            if not messagebox.askyesno("Rename", f"Rename {kind} '{key}' -> '{new}' in {len(plan['files'])} file(s)?\n\n"
+                                       + "\n".join(plan["files"]) + warning):
+                return
+            result = rename_everywhere(self.root_dir, kind, key, new, graph=self._refs())
+        except (RenameError, OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Rename failed", str(e))
+            return
+        # reload the rewritten tabs; their undo history does not apply to the new files
+        new_path = self.current_path[:-1] + [new]
+        for t in affected_tabs(kind):
+            if t in self.data and JSON_FILES[t] in result["files"]:
+                disk, sig = load_signed(self._tab_fullpath(t))
+                self._replace_tab(t, disk, sig)
+                if t != tab:
+                    self._refresh_tab_view(t)
+        self.current_path = None
+        self._populate_tab(tab)
+        self._goto_entry(tab, new_path)
+        self._refresh_pack()
+        note = f"; save migration v{result['migration']}" if result["migration"] else ""
+        self.status(f"Renamed {key} -> {new} in {len(result['files'])} file(s){note}")
+
+    # -------------------------
+    # Mutation bookkeeping
+    # -------------------------
+    def _record(self, patches, label):
+        # every edit goes through the journal; returns the undo group (None if nothing changed)
+        group = self.journal.record(self.data, patches, label)
+        if group is not None:
+            for tab, path in self._group_entries(group):
+                self._entry_changed(tab, path)
+        return group
+
+    def _group_entries(self, group):
+        # distinct (tab, path) pairs of a group, clipped to entry level
+        seen = []
+        for p in group.patches:
+            key = (p.tab, list(p.path[:entry_depth(p.tab)]))
+            if key not in seen:
+                seen.append(key)
+        return seen
+
+    def _entry_changed(self, tab, path):
+        # single hook for every in-memory mutation at path (entry, field or container)
+        self.index.reindex(tab, self.data.get(tab, {}), path)
+        self.item_index.reindex(tab, self.data.get(tab, {}), path)
+        self.validator.update(self.data, tab, path)
+        if self.refs is not None:
+            self.refs.reindex(tab, self.data.get(tab, {}), path)
+        self._sync_dirty()
+        if tab in ELEMENT_TABS and self._elements_win is not None and not self._elements_pending:
+            # one heatmap refresh per undo group / reload, not per entry
+            self._elements_pending = True
+            self.after_idle(self._refresh_elements)
+
+    def _sync_dirty(self):
+        # dirty = the journal moved away from the tab's save point (undo back to it is clean)
+        for tab in JSON_FILES:
+            dirty = self.journal.is_dirty(tab)
+            if dirty != (tab in self.dirty_tabs):
+                self._mark_dirty(tab, dirty)
+
+    def _mark_dirty(self, tab, dirty=True):
+        if dirty:
+            self.dirty_tabs.add(tab)
+        else:
+            self.dirty_tabs.discard(tab)
+        frame = self.tab_frames.get(tab)
+        if frame is not None:
+            self.notebook.tab(frame, text=tab + (" *" if dirty else ""))
+
+    def _clear_dirty(self):
+        for tab in list(self.dirty_tabs):
+            self._mark_dirty(tab, False)
+
+    # -------------------------
+    # Undo / redo / patches
+    # -------------------------
+    def _undo(self):
+        group = self.journal.undo(self.data)
+        if group is None:
+            self.status("Nothing to undo")
+            return
+        self._journal_applied(group)
+        self.status(f"Undid: {group.label}")
+
+    def _redo(self):
+        group = self.journal.redo(self.data)
+        if group is None:
+            self.status("Nothing to redo")
+            return
+        self._journal_applied(group)
+        self.status(f"Redid: {group.label}")
+
+    def _journal_applied(self, group):
+        # bring index, views and editor in line after the journal rewrote data
+        relist = set()
+        for tab, path in self._group_entries(group):
+            self._entry_changed(tab, path)
+            if len(path) < entry_depth(tab) and tab not in TREE_TABS:
+                relist.add(tab)
+                continue
+            depths = [len(p.path) for p in group.patches if p.tab == tab and list(p.path[:len(path)]) == path]
+            if min(depths) > len(path):
+                # field-level edits only: rows unchanged
+                continue
+            self._view_remove(tab, path)
+            if get_at(self.data.get(tab, {}), path) is not MISSING:
+                self._view_insert(tab, path, after=self._prev_sibling(tab, path))
+        for tab in relist:
+            if tab in self.loaded_views and self.listboxes.get(tab):
+                self.listboxes[tab].set_items(self._list_rows(tab))
+        tab, path = self.current_tab, self.current_path
+        if tab in group.tabs and path:
+            node = get_at(self.data.get(tab, {}), path)
+            if node is MISSING:
+                self._widgets[tab]["selected_label"].config(text="Selected: -")
+                self._clear_editor(tab)
+                self.current_path = None
+            elif isinstance(node, dict) and self.editor_widgets:
+                self._show_editor_for_node(tab, path, node)
+
+    def _prev_sibling(self, tab, path):
+        parent = get_at(self.data.get(tab, {}), path[:-1])
+        keys = list(parent) if isinstance(parent, dict) else []
+        i = keys.index(path[-1]) if path[-1] in keys else 0
+        return path[:-1] + [keys[i - 1]] if i > 0 else None
+
+    def _export_patch(self):
+        if not self.journal.can_undo():
+            self.status("No changes to export")
+            return
+        path = filedialog.asksaveasfilename(
+            title="Export change patch", defaultextension=".json",
+            initialfile="content_patch.json", filetypes=[("Content patch", "*.json")])
+        if not path:
+            return
+        try:
+            self.journal.export_file(path, self.root_dir)
+        except OSError as e:
+            messagebox.showerror("Export failed", str(e))
+            return
+        self.status(f"Exported {len(self.journal.undo_stack)} change(s) -> {path}")
+
+    def _replay_patch(self):
+        path = filedialog.askopenfilename(title="Replay change patch", filetypes=[("Content patch", "*.json")])
+        if not path:
+            return
+        try:
+            patch_set = load_patch_file(path)
+        except (OSError, ValueError) as e:
+            messagebox.showerror("Replay failed", str(e))
+            return
+        for g in patch_set.get("groups", []):
+            for p in g.get("patches", []):
+                if p.get("tab") in JSON_FILES:
+                    self._ensure_tab_data(p["tab"])
+        group, conflicts = self.journal.replay(self.data, patch_set, label="replay " + os.path.basename(path))
+        if group is not None:
+            self._journal_applied(group)
+        applied = len(group.patches) if group else 0
+        msg = f"Applied {applied} change(s)."
+        if conflicts:
+            lines = [f"{c['tab']}: {'/'.join(map(str, c['path']))}" for c in conflicts[:15]]
+            msg += f"\n{len(conflicts)} conflict(s) skipped (value changed since export):\n" + "\n".join(lines)
+        messagebox.showinfo("Replay", msg)
+        self.status(f"Replayed {os.path.basename(path)}: {applied} applied, {len(conflicts)} conflicts")
+
     # -------------------------
     # Search
     # -------------------------
-    def _search_tab(self, tab, query):
+    def _search_tab(self, tab, query, live=False):
         q = query.strip().lower()
+        last = self._get_widget_attr(tab, "last_query")
+        if live and q == last:
+            # navigation keys etc. - nothing to redo
+            return
+        self._set_widget_attr(tab, "last_query", q)
         if not q:
             self._populate_tab(tab)
             return
-        matches = []
+        hits = self.index.search(q, tabs=[tab])
         if tab in ("Armors", "Weapons"):
             tree = self.treeviews.get(tab)
-            # repopulate then expand nodes with matches
+            # repopulate collapsed, then materialize and open only the matching branches
             self._populate_tab(tab)
-            def match_node(iid):
-                text = tree.item(iid, "text").lower()
-                matched = q in text
-                for ch in tree.get_children(iid):
-                    if match_node(ch):
-                        matched = True
-                tree.item(iid, open=matched)
-                return matched
-            for root in tree.get_children():
-                match_node(root)
-            self.status(f"Searched {tab} for '{query}'")
+            first = None
+            for _, path in hits[:SEARCH_REVEAL_LIMIT]:
+                iid = self._tree_reveal(tab, list(path))
+                first = first or iid
+            if first:
+                tree.see(first)
+            shown = f" (showing {SEARCH_REVEAL_LIMIT})" if len(hits) > SEARCH_REVEAL_LIMIT else ""
+            self.status(f"{len(hits)} matches in {tab} for '{query}'{shown}")
         else:
             lb = self.listboxes.get(tab)
             if not lb:
                 return
-            lb.delete(0, tk.END)
-            node = self.data.get(tab, {})
-            items = []
-            if tab in ("Classes", "Races"):
-                for grp, entries in node.items():
-                    for k in entries.keys():
-                        items.append(f"{grp}:{k}")
-            elif isinstance(node, dict):
-                items = list(node.keys())
-            for it in items:
-                if q in it.lower():
-                    lb.insert(tk.END, it)
-            self.status(f"Found matches in {tab}")
+            lb.set_items(self._row_label(tab, path) for _, path in hits)
+            self.status(f"{len(hits)} matches in {tab} for '{query}'")
+
+    def _on_find_changed(self, event=None):
+        q = self.find_var.get().strip()
+        if not q or event is not None and event.keysym in ("Return", "Up", "Down", "Escape"):
+            return
+        self._find_hits = {}
+        for tab, path in self.index.search(q, limit=FIND_LIMIT):
+            self._find_hits[f"{tab}: {'/'.join(path)}"] = (tab, list(path))
+        self.find_box.configure(values=list(self._find_hits))
+
+    def _on_find_selected(self, event=None):
+        hit = self._find_hits.get(self.find_var.get())
+        if hit is None:
+            # Return on a typed query: jump to the first match
+            self._on_find_changed()
+            if not self._find_hits:
+                self.status(f"No matches for '{self.find_var.get()}'")
+                return
+            hit = next(iter(self._find_hits.values()))
+        self._goto_entry(*hit)
+
+    def _goto_entry(self, tab, path):
+        self.notebook.select(self.tab_frames[tab])
+        self._ensure_tab_view(tab)
+        if tab in ("Armors", "Weapons"):
+            tree = self.treeviews[tab]
+            iid = self._tree_reveal(tab, path)
+            if iid:
+                tree.selection_set(iid)
+                tree.see(iid)
+        else:
+            lb = self.listboxes[tab]
+            label = self._row_label(tab, path)
+            if lb.index(label) is None:
+                # a filtered list may hide the entry
+                self._populate_tab(tab)
+            lb.select(label)
+            self._on_list_select(tab)
 
     # -------------------------
     # Save functions
@@ -710,25 +1414,432 @@ class ContentManagerApp(tk.Tk):
 
     def _save_tab(self, tab):
         path = self._tab_fullpath(tab)
+        # never overwrite an external edit that has not been merged yet
+        self._sync_external([tab])
+        if tab not in self.dirty_tabs:
+            self.status(f"No unsaved changes in {tab}")
+            return
+        if not self._confirm_valid([tab]):
+            return
+        befores = self._saved_items([tab])
         ok = safe_save(path, self.data.get(tab, {}))
         if ok:
+            self.journal.mark_saved(tab)
+            self.watcher.refresh(tab)
+            self._mark_dirty(tab, False)
             self.status(f"Saved {tab} -> {path}")
+            self._record_save_migration(befores)
+            self._refresh_pack()
             messagebox.showinfo("Saved", f"Saved {tab}")
         else:
             messagebox.showerror("Save failed", f"Could not save {path}")
 
     def _save_all(self):
+        # only tabs with unsaved changes are written (untouched or never-parsed tabs are skipped)
         failures = []
+        saved = []
+        self._sync_external(self.dirty_tabs)
+        if not self._confirm_valid(self.dirty_tabs):
+            return
+        befores = self._saved_items(self.dirty_tabs)
         for tab, rel in JSON_FILES.items():
+            if tab not in self.dirty_tabs:
+                continue
             full = os.path.join(self.root_dir, rel)
             ok = safe_save(full, self.data.get(tab, {}))
-            if not ok:
+            if ok:
+                saved.append(tab)
+                self.journal.mark_saved(tab)
+                self.watcher.refresh(tab)
+                self._mark_dirty(tab, False)
+            else:
                 failures.append(full)
+        if saved:
+            self._record_save_migration({t: b for t, b in befores.items() if t in saved})
+            self._refresh_pack()
         if failures:
             messagebox.showerror("Save errors", "Failed to save:\n" + "\n".join(failures))
+        elif not saved:
+            self.status("Nothing to save")
+        else:
+            messagebox.showinfo("Saved", "Saved: " + ", ".join(saved) + " (previous versions backed up).")
+            self.status(f"Saved {len(saved)} file(s)")
+
+    # -------------------------
+    # Content pack
+    # -------------------------
+    def _build_pack(self):
+        if self.dirty_tabs and not messagebox.askyesno(
+                "Build Pack", "The pack is built from the files on disk.\n"
+                "Unsaved changes in " + ", ".join(sorted(self.dirty_tabs)) + " will not be included.\n\nContinue?"):
+            return
+        t0 = time.perf_counter()
+        try:
+            result = build_pack(self.root_dir, force=True)
+        except (PackError, OSError) as e:
+            messagebox.showerror("Build Pack", str(e))
+            return
+        ms = (time.perf_counter() - t0) * 1000
+        self.status(f"Built {result['pack']} ({result['bytes']} bytes from {result['source_bytes']}) in {ms:.0f} ms")
+        enemies, elements, wire = result["enemy_table"], result["element_table"], result["wire_table"]
+        messagebox.showinfo("Build Pack", f"Wrote {result['pack']}\n"
+                            f"{result['bytes']} bytes (sources {result['source_bytes']} bytes)\n"
+                            f"Enemy stat table: {enemies['rebuilt']} row(s) recomputed\n"
+                            f"Element matrix: {elements['rebuilt']['races']} race row(s), "
+                            f"{elements['rebuilt']['skills']} skill cell(s) recomputed\n"
+                            f"Arena wire table: {wire['strings']} strings (crc {wire['crc']:08x})")
+
+    def _saved_items(self, tabs):
+        # item tabs as last saved (journal, else disk), to diff against after saving
+        befores = {}
+        for tab in tabs:
+            if tab not in ITEM_TABS or tab not in self.data:
+                continue
+            before = self.journal.saved_state(tab, self.data[tab])
+            befores[tab] = before if before is not None else safe_load(self._tab_fullpath(tab))
+        return befores
+
+    def _record_save_migration(self, befores):
+        # renamed / deleted item ids become a step that content_migrate applies to saves
+        if not befores:
+            return
+        for tab in ITEM_TABS:
+            self._ensure_tab_data(tab)
+        renames, deletions = plan_tab_changes(befores, self.data)
+        if not renames and not deletions:
+            return
+        lines = describe_step(renames, deletions)
+        if len(lines) > 20:
+            lines = lines[:20] + [f"... {len(lines) - 20} more"]
+        msg = "Record these item changes for existing save files?\n\n" + "\n".join(lines)
+        if deletions:
+            msg += "\n\nDeleted items are removed from migrated saves for good."
+        if not messagebox.askyesno("Save Migration", msg):
+            self.status("Saved; save migration not recorded (content_migrate.py add can record it later)")
+            return
+        try:
+            version = record_step(self.root_dir, renames, deletions, "content manager: " + ", ".join(befores))
+        except (MigrationError, OSError) as e:
+            print("Save migration not recorded:", e)
+            return
+        if version:
+            self.status(f"Saved; item renames/deletions recorded as save migration v{version}")
+
+    def _refresh_pack(self):
+        # keep an existing pack in step with the saved files (never creates one)
+        if not self.config_data.get("pack_on_save", True) or not pack_exists(self.root_dir):
+            return
+        try:
+            if build_pack(self.root_dir)["built"]:
+                self.status("Saved; content pack rebuilt")
+        except (PackError, OSError) as e:
+            print("Pack rebuild failed:", e)
+            self.status("Saved; content pack NOT rebuilt (see console)")
+
+    # -------------------------
+    # External changes
+    # -------------------------
+    def _drain_watch(self):
+        for tab, (disk, sig) in self.watcher.take().items():
+            self._on_external_change(tab, disk, sig)
+        self.after(int(self.watcher.interval * 1000), self._drain_watch)
+
+    def _sync_external(self, tabs):
+        # synchronous check, used right before saving
+        for tab, (disk, sig) in self.watcher.poll(set(tabs)).items():
+            self._on_external_change(tab, disk, sig)
+
+    def _on_external_change(self, tab, disk, sig):
+        if tab not in self.data:
+            return
+        if not self.journal.is_dirty(tab):
+            self._replace_tab(tab, disk, sig)
+            self._refresh_tab_view(tab)
+            self.status(f"Reloaded {tab} (changed on disk)")
+            return
+        # unsaved edits: re-apply them on top of the new file content, entry by entry
+        base = self.journal.saved_state(tab, self.data[tab])
+        keep, conflicts = merge_entries(tab, base, self.data[tab], disk)
+        if conflicts:
+            names = "\n".join("/".join(p) for p, _, _ in conflicts[:15])
+            if len(conflicts) > 15:
+                names += f"\n... and {len(conflicts) - 15} more"
+            if messagebox.askyesno(
+                    f"{tab} changed on disk",
+                    f"{os.path.basename(self._tab_fullpath(tab))} was changed outside the editor.\n"
+                    f"These entries were also edited here:\n{names}\n\n"
+                    f"Keep your versions? (No = take the file's versions)"):
+                keep += [(p, local) for p, local, _ in conflicts]
+        self._replace_tab(tab, disk, sig)
+        patches = []
+        for path, value in keep:
+            if value is MISSING:
+                patches += delete_patches(self.data, tab, list(path))
+            else:
+                patches += set_patches(self.data, tab, list(path), value)
+        # one undo step on top of the reloaded file; the tab stays dirty
+        self._record(patches, f"keep unsaved edits in {tab}")
+        self._refresh_tab_view(tab)
+        self.status(f"Merged external change to {tab}: kept {len(keep)} local edit(s), "
+                    f"{len(conflicts)} conflict(s)")
+
+    def _replace_tab(self, tab, disk, sig):
+        # swap in new file content: this tab's history no longer applies
+        self.journal.reset(tab)
+        self.data[tab] = disk
+        self.watcher.watch(tab, self._tab_fullpath(tab), sig)
+        self.index.index_tab(tab, disk)
+        self.item_index.index_tab(tab, disk)
+        self.validator.load_tab(self.data, tab)
+        if self.refs is not None:
+            self.refs.index_tab(tab, disk)
+        if tab in ("Rarities", "Skills"):
+            self._load_enums()
+        self._sync_dirty()
+
+    def _refresh_tab_view(self, tab):
+        current_tab, current_path = self.current_tab, self.current_path
+        if tab in self.loaded_views:
+            self._populate_tab(tab)
+        self.current_tab = current_tab
+        if current_tab != tab or not current_path:
+            return
+        node = get_at(self.data.get(tab, {}), current_path)
+        if isinstance(node, dict) and self.editor_widgets:
+            self._show_editor_for_node(tab, current_path, node)
+        else:
+            self._clear_editor(tab)
+            self.current_path = None
+
+    # -------------------------
+    # Validation
+    # -------------------------
+    def _confirm_valid(self, tabs):
+        # saving content with errors needs an explicit override; edits can also break
+        # entries of other tabs that reference the saved ones (e.g. a deleted skill)
+        errors = self.validator.errors(related_tabs(tabs))
+        if not errors:
+            return True
+        lines = "\n".join(str(i) for i in errors[:15])
+        more = f"\n... and {len(errors) - 15} more" if len(errors) > 15 else ""
+        return messagebox.askyesno("Validation errors", f"{len(errors)} error(s):\n{lines}{more}\n\nSave anyway?")
+
+    def _validate_all(self):
+        t0 = time.perf_counter()
+        for tab in JSON_FILES:
+            self._ensure_tab_data(tab)
+        issues = self.validator.validate_all(self.data)
+        ms = (time.perf_counter() - t0) * 1000
+        errors = sum(1 for i in issues if i.severity == "error")
+        summary = f"{errors} error(s), {len(issues) - errors} warning(s) in {ms:.0f} ms"
+        self.status("Validation: " + summary)
+        if issues:
+            shown = sorted(issues, key=lambda i: i.severity != "error")[:30]
+            messagebox.showinfo("Validation", summary + "\n\n" + "\n".join(str(i) for i in shown))
         else:
-            messagebox.showinfo("Saved", "All files saved (backups created if file existed).")
-            self.status("Saved all files")
+            messagebox.showinfo("Validation", "All content valid (" + summary + ")")
+
+    # -------------------------
+    # Balance simulation
+    # -------------------------
+    def _run_balance(self):
+        if content_balance.load_numpy() is None:
+            messagebox.showerror("Balance", "The balance simulator needs numpy (pip install numpy).")
+            return
+        if getattr(self, "_balance_thread", None) and self._balance_thread.is_alive():
+            self.status("Balance simulation already running")
+            return
+        floors = simpledialog.askstring("Balance", "Floors (e.g. 1-25 or 1,5,10):",
+                                        initialvalue=self.config_data.get("balance_floors", "1-25"))
+        if not floors:
+            return
+        try:
+            floor_list = content_balance.parse_floors(floors)
+        except ValueError:
+            messagebox.showerror("Balance", f"Invalid floors: {floors}")
+            return
+        duels = int(self.config_data.get("balance_duels", 500))
+        for tab in ("Classes", "Races", "Skills"):
+            self._ensure_tab_data(tab)
+        # snapshot on the Tk thread: edits made while it runs do not race the worker
+        data = {tab: clone(self.data[tab]) for tab in ("Classes", "Races", "Skills")}
+        box = {}
+
+        def worker():
+            try:
+                box["result"] = content_balance.simulate(data, floor_list, duels, seed=0)
+            except Exception as e:
+                box["error"] = e
+
+        self._balance_thread = threading.Thread(target=worker, name="content-balance", daemon=True)
+        self._balance_thread.start()
+        self.status_var.set(f"Simulating {duels} duels per class/race/floor...")
+        self.after(100, lambda: self._poll_balance(box))
+
+    def _poll_balance(self, box):
+        if self._balance_thread.is_alive():
+            self.after(100, lambda: self._poll_balance(box))
+            return
+        if "error" in box:
+            messagebox.showerror("Balance", str(box["error"]))
+            self.status("Balance simulation failed")
+            return
+        result = box["result"]
+        summary = f"{result['total_duels']} duels in {result['seconds']:.1f} s"
+        self.status("Balance: " + summary)
+        messagebox.showinfo("Balance", "Player win % per floor (no equipment)\n\n"
+                            + content_balance.format_summary(result) + "\n\n" + summary
+                            + "\nPer race: python content_balance.py")
+
+    def _run_economy(self):
+        if content_economy.load_numpy() is None:
+            messagebox.showerror("Economy", "The economy simulator needs numpy (pip install numpy).")
+            return
+        if getattr(self, "_economy_thread", None) and self._economy_thread.is_alive():
+            self.status("Economy simulation already running")
+            return
+        tabs = ("Consumables", "Materials", "Weapons", "Armors")
+        for tab in tabs:
+            self._ensure_tab_data(tab)
+        data = {tab: clone(self.data[tab]) for tab in tabs}
+        runs = int(self.config_data.get("economy_runs", 2000))
+        box = {}
+
+        def worker():
+            try:
+                box["result"] = content_economy.simulate(data, runs=runs)
+            except Exception as e:
+                box["error"] = e
+
+        self._economy_thread = threading.Thread(target=worker, name="content-economy", daemon=True)
+        self._economy_thread.start()
+        self.status_var.set(f"Simulating {runs} runs...")
+        self.after(100, lambda: self._poll_economy(box))
+
+    def _poll_economy(self, box):
+        if self._economy_thread.is_alive():
+            self.after(100, lambda: self._poll_economy(box))
+            return
+        if "error" in box:
+            messagebox.showerror("Economy", str(box["error"]))
+            self.status("Economy simulation failed")
+            return
+        result = box["result"]
+        summary = f"{result['runs']} runs in {result['seconds']:.1f} s"
+        self.status("Economy: " + summary)
+        loops = "".join(f"\nShop loop: {item} buys for {buy}, sells for {sell}"
+                        for item, buy, sell in result["loops"])
+        messagebox.showinfo("Economy", "Gold after each floor (copper)\n\n"
+                            + content_economy.format_summary(result) + "\n" + loops + "\n\n" + summary
+                            + "\nIncome by source: python content_economy.py")
+
+    def _run_effects(self):
+        if getattr(self, "_effects_thread", None) and self._effects_thread.is_alive():
+            self.status("Effect benchmark already running")
+            return
+        self._ensure_tab_data("Status Effects")
+        data = clone(self.data["Status Effects"])
+        box = {}
+
+        def worker():
+            try:
+                box["result"] = content_effects.run(data, sizes=(1, 8, 64))
+            except Exception as e:
+                box["error"] = e
+
+        self._effects_thread = threading.Thread(target=worker, name="content-effects", daemon=True)
+        self._effects_thread.start()
+        self.status_var.set("Benchmarking status effects...")
+        self.after(100, lambda: self._poll_effects(box))
+
+    def _poll_effects(self, box):
+        if self._effects_thread.is_alive():
+            self.after(100, lambda: self._poll_effects(box))
+            return
+        if "error" in box:
+            messagebox.showerror("Effects", str(box["error"]))
+            self.status("Effect benchmark failed")
+            return
+        result = box["result"]
+        self.status(f"Effects: {len(result['issues'])} issue(s), {result['seconds']:.1f} s")
+        messagebox.showinfo("Effects", content_effects.format_issues(result["issues"]) + "\n\n"
+                            + content_effects.format_profiles(result["profiles"])
+                            + "\n\nStress suite: python content_effects.py")
+
+    def _show_elements(self):
+        if self._elements_win is not None:
+            self._elements_win.lift()
+            self._refresh_elements()
+            return
+        win = tk.Toplevel(self)
+        win.title("Elemental matrix")
+        win.geometry("1000x640")
+        bar = ttk.Frame(win)
+        bar.pack(side="top", fill="x", padx=6, pady=4)
+        self._elements_damage = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="Skills as expected damage (power x multiplier)",
+                        variable=self._elements_damage, command=self._refresh_elements).pack(side="left")
+        ttk.Label(bar, text="green: resisted, red: extra damage, * non-playable").pack(side="right")
+        frame = ttk.Frame(win)
+        frame.pack(fill="both", expand=True)
+        canvas = tk.Canvas(frame, background="white", highlightthickness=0)
+        ys = ttk.Scrollbar(frame, orient="vertical", command=canvas.yview)
+        xs = ttk.Scrollbar(frame, orient="horizontal", command=canvas.xview)
+        canvas.configure(yscrollcommand=ys.set, xscrollcommand=xs.set)
+        ys.pack(side="right", fill="y")
+        xs.pack(side="bottom", fill="x")
+        canvas.pack(side="left", fill="both", expand=True)
+
+        def close():
+            self._elements_win = None
+            win.destroy()
+
+        win.protocol("WM_DELETE_WINDOW", close)
+        self._elements_win, self._elements_canvas = win, canvas
+        self._refresh_elements()
+
+    def _refresh_elements(self):
+        self._elements_pending = False
+        if self._elements_win is None:
+            return
+        for tab in ELEMENT_TABS:
+            self._ensure_tab_data(tab)
+        t0 = time.perf_counter()
+        table, rebuilt = content_elements.compile_table(
+            self.data.get("Races"), self.data.get("Skills"), previous=self._element_table)
+        self._element_table = table
+        self._draw_elements(table, bool(self._elements_damage.get()))
+        self.status(f"Elements: {rebuilt['races']} race row(s), {rebuilt['skills']} skill cell(s) "
+                    f"recomputed in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    def _draw_elements(self, table, damage):
+        canvas = self._elements_canvas
+        canvas.delete("all")
+        cw, ch, lw = 62, 18, 170
+        labels, cols, rows = content_elements.element_matrix(table)
+        race_names = [r + ("*" if g == "non_playable" else "") for g, r in labels]
+        y = self._draw_heatmap(canvas, 4, "Damage taken (race x element)", race_names, cols, rows, rows,
+                               "{:.2f}", cw, ch, lw)
+        names, labels, mults = content_elements.skill_matrix(table)
+        values = content_elements.skill_matrix(table, damage)[2] if damage else mults
+        self._draw_heatmap(canvas, y + ch, "Expected damage vs race" if damage else "Skill multiplier vs race",
+                           names, race_names, values, mults, "{:.0f}" if damage else "{:.2f}", cw, ch, lw)
+        canvas.configure(scrollregion=canvas.bbox("all"))
+
+    def _draw_heatmap(self, canvas, y, title, row_names, col_names, values, mults, fmt, cw, ch, lw):
+        # cells coloured by multiplier (1.0 white), labelled with `values`; returns the next free y
+        canvas.create_text(4, y, text=title, anchor="nw", font=("TkDefaultFont", 10, "bold"))
+        y += ch + 4
+        for j, name in enumerate(col_names):
+            canvas.create_text(lw + j * cw + cw // 2, y + ch // 2, text=name[:8])
+        for i, (name, row, mrow) in enumerate(zip(row_names, values, mults)):
+            top = y + (i + 1) * ch
+            canvas.create_text(lw - 6, top + ch // 2, text=name[:24], anchor="e")
+            for j, (v, m) in enumerate(zip(row, mrow)):
+                x = lw + j * cw
+                canvas.create_rectangle(x, top, x + cw, top + ch, fill=heat_color(m), outline="#cccccc")
+                canvas.create_text(x + cw // 2, top + ch // 2, text=fmt.format(v))
+        return y + (len(row_names) + 1) * ch
 
     # -------------------------
     # Utilities
@@ -773,8 +1884,10 @@ class ContentManagerApp(tk.Tk):
     # Reload and populate helpers
     # -------------------------
     def _reload_all(self):
-        self._load_all_files()
-        self._populate_all()
+        if self.dirty_tabs and not messagebox.askyesno(
+                "Discard changes?", "Unsaved changes in " + ", ".join(sorted(self.dirty_tabs)) + ". Reload anyway?"):
+            return
+        self._open_project()
         messagebox.showinfo("Reload", "All files reloaded from disk.")
         self.status("Reloaded files")
 
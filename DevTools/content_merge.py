@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+"""
+content_merge.py
+Uldtale-Battlesim Structural Diff / Merge
+- Semantic diff of two versions of a content file: entries added, removed and renamed and the
+  single fields that changed, following the tab's file shape (content_data.iter_entries)
+- Three-way merge at field granularity: objects are merged key by key, lists and scalars are
+  single values; a conflict is the same value changed differently on both sides
+- Entry renames (editor / content_cli rename) are followed, so an edit to the old key on the
+  other side lands on the renamed entry
+- Key order is kept from ours, with keys added by theirs placed after their old neighbour;
+  a merge that differs from both sides is written in the editor's layout (dump_json)
+- git drivers: "merge BASE OURS THEIRS --path P" writes the merge into OURS and exits 1 on
+  conflicts. The file is still valid JSON, with ours' value (or --favor) at each conflict,
+  and the conflicts are printed. "git-diff" is a diff command and "install" registers both
+  (the matching .gitattributes lines are checked in)
+- diff --patch writes a content patch file that "content_cli.py replay" applies
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import datetime
+import subprocess
+
+from content_data import JSON_FILES, atomic_write, dump_json, iter_entries
+from content_journal import MISSING, Patch, PATCH_FORMAT, PATCH_VERSION
+
+DRIVER = "uldtale-content"
+
+
+# -------------------------
+# Shapes
+# -------------------------
+def tab_for_path(path):
+    # JSON_FILES tab of a file path (repo-relative, absolute or just the file name); None if unknown
+    norm = path.replace("\\", "/")
+    for tab, rel in JSON_FILES.items():
+        if norm == rel or norm.endswith("/" + rel):
+            return tab
+    name = os.path.basename(norm)
+    for tab, rel in JSON_FILES.items():
+        if os.path.basename(rel) == name:
+            return tab
+    return None
+
+def entry_parents(tab, *versions):
+    # paths of the objects that hold entries (group / slot-type / "skills" / the root)
+    if tab is None:
+        return {()}
+    parents = set()
+    for data in versions:
+        parents.update(tuple(p[:-1]) for p, _ in iter_entries(tab, data))
+    return parents or {()}
+
+def split_path(path, parents):
+    # -> (entry path, field path)
+    for i in range(len(path)):
+        if path[:i] in parents:
+            return path[:i + 1], path[i + 1:]
+    return path, ()
+
+def _same_entry(old, new, old_key, new_key):
+    if old == new:
+        return True
+    # renames also update "name" when it matched the key
+    return isinstance(old, dict) and isinstance(new, dict) and old.get("name") == old_key \
+        and new.get("name") == new_key and dict(old, name=new_key) == new
+
+def find_renames(base, side):
+    # {old key: new key} for entries that only moved to another key on this side
+    gone = [k for k in base if k not in side]
+    if not gone:
+        return {}
+    added = [k for k in side if k not in base]
+    out, taken = {}, set()
+    for old in gone:
+        for new in added:
+            if new not in taken and _same_entry(base[old], side[new], old, new):
+                out[old] = new
+                taken.add(new)
+                break
+    return out
+
+def _rekey(d, old, new):
+    # copy of d with `old` renamed to `new` in place
+    return {(new if k == old else k): v for k, v in d.items()}
+
+
+# -------------------------
+# Diff
+# -------------------------
+def diff_values(old, new, parents=frozenset({()}), path=()):
+    # -> [(op, path, old, new)]; op is "add", "delete", "set" or "rename" (new = new key)
+    if old == new:
+        return []
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return [("set", path, old, new)]
+    changes = []
+    renames = find_renames(old, new) if path in parents else {}
+    for k in old:
+        if k in renames:
+            changes.append(("rename", path + (k,), old[k], renames[k]))
+        elif k not in new:
+            changes.append(("delete", path + (k,), old[k], MISSING))
+    moved = set(renames.values())
+    for k, v in new.items():
+        if k in moved:
+            continue
+        if k not in old:
+            changes.append(("add", path + (k,), MISSING, v))
+        else:
+            changes.extend(diff_values(old[k], v, parents, path + (k,)))
+    return changes
+
+def diff_tab(tab, old, new):
+    return diff_values(old, new, entry_parents(tab, old, new))
+
+def to_patches(tab, new, changes):
+    # journal patches (content_journal.Patch) replaying the diff on the old version
+    patches = []
+    for op, path, old, value in changes:
+        parent = new
+        for p in path[:-1]:
+            parent = parent.get(p, {}) if isinstance(parent, dict) else {}
+        if op == "rename":
+            target = path[:-1] + (value,)
+            pos = list(parent).index(value) if value in parent else None
+            patches.append(Patch(tab, path, old, MISSING))
+            patches.append(Patch(tab, target, MISSING, parent.get(value), pos))
+        elif op == "add":
+            patches.append(Patch(tab, path, MISSING, value, list(parent).index(path[-1])))
+        else:
+            patches.append(Patch(tab, path, old, value))
+    return patches
+
+def patch_set(tab, new, changes, label):
+    return {
+        "format": PATCH_FORMAT,
+        "version": PATCH_VERSION,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "root": None,
+        "groups": [{"label": label, "time": round(time.time(), 3),
+                    "patches": [p.to_json() for p in to_patches(tab, new, changes)]}],
+    }
+
+def _show(value, width=60):
+    if value is MISSING:
+        return "(absent)"
+    text = json.dumps(value, ensure_ascii=False)
+    return text if len(text) <= width else text[:width - 3] + "..."
+
+def _label(path, parents):
+    entry, field = split_path(path, parents)
+    text = "/".join(map(str, entry))
+    return text + ("." + ".".join(map(str, field)) if field else "")
+
+def format_diff(changes, parents):
+    lines = []
+    for op, path, old, new in changes:
+        label = _label(path, parents)
+        if op == "add":
+            lines.append(f"+ {label}")
+        elif op == "delete":
+            lines.append(f"- {label}")
+        elif op == "rename":
+            lines.append(f"> {label} -> {new}")
+        else:
+            lines.append(f"~ {label}: {_show(old)} -> {_show(new)}")
+    return "\n".join(lines)
+
+
+# -------------------------
+# Merge
+# -------------------------
+class Merge:
+    # one three-way merge; conflicts = [(path, base, ours, theirs, note)]
+    def __init__(self, tab=None, favor=None):
+        self.tab = tab
+        self.favor = favor
+        self.parents = {()}
+        self.conflicts = []
+
+    def run(self, base, ours, theirs):
+        self.parents = entry_parents(self.tab, base, ours, theirs)
+        return self.value(base, ours, theirs, ())
+
+    def value(self, base, ours, theirs, path):
+        if ours == theirs:
+            return ours
+        if ours == base:
+            return theirs
+        if theirs == base:
+            return ours
+        if isinstance(ours, dict) and isinstance(theirs, dict):
+            return self.object(base if isinstance(base, dict) else {}, ours, theirs, path)
+        self.conflicts.append((path, base, ours, theirs, ""))
+        return theirs if self.favor == "theirs" else ours
+
+    def object(self, base, ours, theirs, path):
+        if path in self.parents:
+            base, ours, theirs = self.follow_renames(base, ours, theirs, path)
+        out = {}
+        for k in merged_order(ours, theirs):
+            v = self.value(base.get(k, MISSING), ours.get(k, MISSING), theirs.get(k, MISSING), path + (k,))
+            if v is not MISSING:
+                out[k] = v
+        return out
+
+    def follow_renames(self, base, ours, theirs, path):
+        # move the base entry (and the other side's copy) to the renamed key so edits merge there
+        mine, other = find_renames(base, ours), find_renames(base, theirs)
+        for old in [k for k in base if k in mine or k in other]:
+            a, b = mine.get(old), other.get(old)
+            if a and b and a != b:
+                self.conflicts.append((path + (old,), base[old], a, b, "renamed differently"))
+                if self.favor == "theirs":
+                    ours, a = _rekey(ours, a, b), b
+                else:
+                    theirs = _rekey(theirs, b, a)
+            new = a or b
+            if a and not b and old in theirs and new not in theirs:
+                theirs = _rekey(theirs, old, new)
+            elif b and not a and old in ours and new not in ours:
+                ours = _rekey(ours, old, new)
+            base = _rekey(base, old, new)
+        return base, ours, theirs
+
+def merged_order(ours, theirs):
+    # ours' key order; keys only in theirs follow the key they followed there
+    after, anchor = {}, None
+    for k in theirs:
+        if k in ours:
+            anchor = k
+        else:
+            after.setdefault(anchor, []).append(k)
+    if not after:
+        return list(ours)
+    keys = list(after.get(None, []))
+    for k in ours:
+        keys.append(k)
+        keys.extend(after.get(k, []))
+    return keys
+
+def merge_tab(tab, base, ours, theirs, favor=None):
+    # -> (merged, conflicts)
+    m = Merge(tab, favor)
+    return m.run(base, ours, theirs), m.conflicts
+
+def format_conflicts(conflicts, parents):
+    lines = []
+    for path, base, ours, theirs, note in conflicts:
+        if note:
+            lines.append(f"! {_label(path, parents)}: {note} ({ours} / {theirs})")
+        else:
+            lines.append(f"! {_label(path, parents)}: base {_show(base, 40)}, "
+                         f"ours {_show(ours, 40)}, theirs {_show(theirs, 40)}")
+    return "\n".join(lines)
+
+
+# -------------------------
+# Files / git
+# -------------------------
+def load(path):
+    # missing file (e.g. /dev/null for a new file) is an empty object; bad JSON raises ValueError
+    if path in (os.devnull, "/dev/null") or not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def text_merge(base, ours, theirs, path):
+    # unparsable input: fall back to git's line merge so the file still gets conflict markers
+    print(f"ERROR: {path} is not valid JSON on every side, using a text merge")
+    return 1 if subprocess.call(["git", "merge-file", "-L", "ours", "-L", "base", "-L", "theirs",
+                                 ours, base, theirs]) else 0
+
+def merge_files(base_path, ours_path, theirs_path, path=None, out=None, tab=None, favor=None, quiet=False):
+    # -> exit code: 0 clean, 1 conflicts (git merge driver contract)
+    start = time.perf_counter()
+    path = path or ours_path
+    tab = tab or tab_for_path(path)
+    try:
+        base, ours, theirs = load(base_path), load(ours_path), load(theirs_path)
+    except ValueError:
+        return text_merge(base_path, ours_path, theirs_path, path)
+    merged, conflicts = merge_tab(tab, base, ours, theirs, favor)
+    # a result equal to one side keeps that file's bytes (hand-formatted files stay as they are)
+    if merged == ours and not out:
+        pass
+    elif merged == ours or merged == theirs:
+        with open(ours_path if merged == ours else theirs_path, "rb") as f:
+            atomic_write(out or ours_path, f.read())
+    else:
+        atomic_write(out or ours_path, dump_json(merged))
+    ms = (time.perf_counter() - start) * 1000
+    parents = entry_parents(tab, merged)
+    if not quiet or conflicts:
+        changes = len(diff_values(ours, merged, parents))
+        print(f"{path}: {changes} change(s) merged, {len(conflicts)} conflict(s) in {ms:.1f} ms")
+    if conflicts:
+        print(format_conflicts(conflicts, parents))
+        if favor:
+            return 0
+        return 1
+    return 0
+
+def install(root_dir):
+    # register the drivers in the repository's git config (the attributes are in .gitattributes)
+    script = os.path.relpath(os.path.abspath(__file__), root_dir).replace("\\", "/")
+    settings = {
+        f"merge.{DRIVER}.name": "Uldtale content JSON structural merge",
+        f"merge.{DRIVER}.driver": f"python3 {script} merge %O %A %B --path %P --quiet",
+        f"diff.{DRIVER}.command": f"python3 {script} git-diff",
+    }
+    for key, value in settings.items():
+        if subprocess.call(["git", "-C", root_dir, "config", key, value]):
+            print(f"ERROR: git config {key} failed")
+            return 1
+        print(f"{key} = {value}")
+    out = subprocess.run(["git", "-C", root_dir, "check-attr", "merge", "--"] + list(JSON_FILES.values()),
+                         capture_output=True, text=True).stdout
+    missing = [line.split(":")[0] for line in out.splitlines() if not line.endswith(": " + DRIVER)]
+    if missing:
+        print(f"note: .gitattributes has no '{DRIVER}' line for: {', '.join(missing)}")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Structural diff / three-way merge of content JSON files")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("diff", help="entries and fields that differ between two versions of a file")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--tab", help="tab shape to use (default: from the file name)")
+    p.add_argument("--patch", help="also write the diff as a content patch file (content_cli replay)")
+    p = sub.add_parser("merge", help="three-way merge into OURS (git merge driver: %%O %%A %%B --path %%P)")
+    p.add_argument("base")
+    p.add_argument("ours")
+    p.add_argument("theirs")
+    p.add_argument("--path", help="repository path of the file (picks the tab shape)")
+    p.add_argument("--tab", help="tab shape to use (default: from --path or the file name)")
+    p.add_argument("-o", "--output", help="write the result here instead of OURS")
+    p.add_argument("--favor", choices=("ours", "theirs"), help="resolve conflicts to one side and exit 0")
+    p.add_argument("--quiet", action="store_true", help="print only conflicts")
+    p = sub.add_parser("git-diff", help="git diff.<driver>.command entry point")
+    p.add_argument("args", nargs="*")
+    p = sub.add_parser("install", help="register the merge and diff drivers in .git/config")
+    p.add_argument("--root", default=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    args = ap.parse_args(argv)
+
+    if args.command == "install":
+        return install(args.root)
+    if args.command == "merge":
+        return merge_files(args.base, args.ours, args.theirs, args.path, args.output,
+                           args.tab, args.favor, args.quiet)
+
+    if args.command == "git-diff":
+        # path old-file old-hex old-mode new-file new-hex new-mode
+        if len(args.args) < 5:
+            print("ERROR: git-diff expects the 7 arguments git passes to diff commands")
+            return 2
+        name, old_path, new_path, tab = args.args[0], args.args[1], args.args[4], None
+    else:
+        name, old_path, new_path, tab = args.new, args.old, args.new, args.tab
+    tab = tab or tab_for_path(name) or tab_for_path(old_path)
+    try:
+        old, new = load(old_path), load(new_path)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 2
+    parents = entry_parents(tab, old, new)
+    changes = diff_values(old, new, parents)
+    if args.command == "git-diff":
+        print(f"content diff {name}" + (f" ({tab})" if tab else ""))
+    if changes:
+        print(format_diff(changes, parents))
+    if args.command == "diff" and args.patch:
+        if tab is None:
+            print(f"ERROR: cannot tell which tab {new_path} is; pass --tab for a patch file")
+            return 2
+        with open(args.patch, "w", encoding="utf-8") as f:
+            json.dump(patch_set(tab, new, changes, f"diff {os.path.basename(old_path)}"), f,
+                      indent=1, ensure_ascii=False)
+        print(f"wrote {args.patch}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,397 @@
+#!/usr/bin/env python3
+"""
+content_migrate.py
+Uldtale-Battlesim Save Migrations
+- SaveManager.load_game looks every saved item up by id, so renaming or deleting an item in
+  weapons / armors / consumables / materials silently drops it from existing saves
+- Saving an item tab in the content manager (or content_cli) diffs the tab against its last
+  saved state and appends a versioned step to data/save_migrations.json: renames (an item that
+  disappeared and reappeared under another id with the same content) and deletions
+- Deletions cannot be undone in migrated saves, so the planned step is shown before it is recorded
+  (a dialog in the content manager; content_cli needs --allow-deletions)
+- Renamed skills, classes and races (content_refs rename) are steps too: saves name them in
+  "skills" / "skill_levels", "character_class" and "race"
+- Saves carry "content_version" (written by SaveManager.save_game); migrating a directory applies
+  the steps newer than each save, on a process pool, and stamps the new version
+- Files already at the target version are skipped after reading their first few KB
+- The batch is all or nothing: migrated files are staged next to the originals and only renamed
+  into place once every save migrated cleanly
+- --dry-run prints the changes per save without writing anything
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import datetime
+import argparse
+import multiprocessing
+
+from content_data import atomic_write, _fsync_dir
+from content_index import ITEM_TABS, item_entries
+from content_saves import iter_save_files
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_FILE = "data/save_migrations.json"
+MIGRATIONS_FORMAT = "uldtale-save-migrations"
+MIGRATIONS_VERSION = 2  # 2: steps may carry key renames (KEY_RENAMES)
+VERSION_KEY = "content_version"
+STAGE_SUFFIX = ".migrating"
+HEAD_BYTES = 4096
+# JSON.stringify sorts keys, so the version sits among the first top-level scalars
+_VERSION_RE = re.compile(rb'"' + VERSION_KEY.encode() + rb'"\s*:\s*(\d+)')
+# content tab -> step field renaming its keys in saves
+KEY_RENAMES = {"Skills": "skill_renames", "Classes": "class_renames", "Races": "race_renames"}
+
+
+class MigrationError(Exception):
+    pass
+
+
+# -------------------------
+# Steps from content edits
+# -------------------------
+def tab_items(tab, data):
+    # item id -> entry for one item tab
+    if tab not in ITEM_TABS or not isinstance(data, dict):
+        return {}
+    return {path[-1]: entry for path, entry in item_entries(tab, data)}
+
+def item_ids(data):
+    # every item id in the loaded item tabs of data
+    ids = set()
+    for tab in ITEM_TABS:
+        ids.update(tab_items(tab, data.get(tab)))
+    return ids
+
+def item_changes(tab, before, after):
+    # -> (removed {id: entry}, added {id: entry}) between two versions of a tab
+    old, new = tab_items(tab, before), tab_items(tab, after)
+    return ({k: v for k, v in old.items() if k not in new},
+            {k: v for k, v in new.items() if k not in old})
+
+def _same_item(a, b):
+    # a rename keeps the content; the display name may follow the new key
+    return {k: v for k, v in a.items() if k != "name"} == {k: v for k, v in b.items() if k != "name"}
+
+def plan_step(removed, added, existing=()):
+    # -> (renames {old: new}, deletions [old]); ids still present in some item tab are left alone
+    renames, deletions = {}, []
+    taken = set()
+    for old_id, entry in removed.items():
+        if old_id in existing:
+            continue
+        matches = [new_id for new_id, new in added.items() if new_id not in taken and _same_item(entry, new)]
+        if len(matches) == 1:
+            renames[old_id] = matches[0]
+            taken.add(matches[0])
+        else:
+            deletions.append(old_id)
+    return renames, deletions
+
+
+# -------------------------
+# Migrations file
+# -------------------------
+def read_migrations(root_dir):
+    path = os.path.join(root_dir, MIGRATIONS_FILE)
+    if not os.path.exists(path):
+        return {"format": MIGRATIONS_FORMAT, "format_version": MIGRATIONS_VERSION, "version": 0, "steps": []}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        raise MigrationError(f"cannot read {path}: {e}")
+    if data.get("format") != MIGRATIONS_FORMAT:
+        raise MigrationError(f"{path} is not a save migrations file")
+    if data.get("format_version", 0) > MIGRATIONS_VERSION:
+        raise MigrationError(f"{path} has unsupported format version {data.get('format_version')}")
+    return data
+
+def record_step(root_dir, renames, deletions, label="", key_renames=None):
+    # append a step; key_renames: {tab in KEY_RENAMES: {old: new}}; -> its version, or None when
+    # there is nothing to migrate
+    key_renames = {tab: dict(m) for tab, m in (key_renames or {}).items() if m}
+    if not renames and not deletions and not key_renames:
+        return None
+    data = read_migrations(root_dir)
+    version = data.get("version", 0) + 1
+    data["version"] = version
+    step = {
+        "version": version,
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "label": label,
+        "renames": dict(renames),
+        "deletions": sorted(deletions),
+    }
+    for tab, mapping in key_renames.items():
+        step[KEY_RENAMES[tab]] = mapping
+    if key_renames:
+        # older tools would stamp saves without applying these
+        data["format_version"] = max(data.get("format_version", 1), MIGRATIONS_VERSION)
+    data["steps"].append(step)
+    path = os.path.join(root_dir, MIGRATIONS_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, (json.dumps(data, indent=1, ensure_ascii=False) + "\n").encode("utf-8"))
+    return version
+
+def plan_tab_changes(befores, data):
+    # befores: {tab: tab data as last saved}; data: current tabs (all item tabs loaded)
+    # -> (renames, deletions) to show the user before record_step
+    removed, added = {}, {}
+    for tab, before in befores.items():
+        r, a = item_changes(tab, before, data.get(tab))
+        removed.update(r)
+        added.update(a)
+    return plan_step(removed, added, item_ids(data))
+
+def describe_step(renames, deletions):
+    # one line per change, as printed by "list"
+    return [f"rename {old} -> {new}" for old, new in renames.items()] + [f"delete {old}" for old in sorted(deletions)]
+
+
+# -------------------------
+# One save
+# -------------------------
+def migrate_save(save, steps):
+    # apply the steps newer than the save in place; -> list of human readable changes
+    changes = []
+    version = int(save.get(VERSION_KEY, 0) or 0)
+    for step in steps:
+        if step["version"] <= version:
+            continue
+        renames, deleted = step.get("renames", {}), set(step.get("deletions", []))
+        for box in ("inventory", "stash"):
+            items = save.get(box)
+            if not isinstance(items, dict):
+                continue
+            kept = {}
+            for key, item in items.items():
+                if not isinstance(item, dict):
+                    # SaveManager drops these too (its loader expects a dictionary per item)
+                    changes.append(f"{box}/{key}: removed (not an item record)")
+                    continue
+                if item.get("is_equipment"):
+                    # unique key per piece; the item id is base_id
+                    base = item.get("base_id")
+                    if base in deleted:
+                        changes.append(f"{box}/{key}: removed ({base} deleted)")
+                        continue
+                    if base in renames:
+                        item["base_id"] = renames[base]
+                        changes.append(f"{box}/{key}: {base} -> {renames[base]}")
+                    kept[key] = item
+                    continue
+                # stackable items are keyed by their id
+                if key in deleted:
+                    changes.append(f"{box}/{key}: removed x{item.get('quantity', 1)} (deleted)")
+                    continue
+                new_key = renames.get(key, key)
+                if new_key != key:
+                    changes.append(f"{box}/{key}: -> {new_key}")
+                if new_key in kept:
+                    kept[new_key]["quantity"] = kept[new_key].get("quantity", 0) + item.get("quantity", 0)
+                else:
+                    kept[new_key] = item
+            items.clear()
+            items.update(kept)
+        equipment = save.get("equipment")
+        if isinstance(equipment, dict):
+            for slot in list(equipment):
+                item = equipment[slot]
+                if not isinstance(item, dict):
+                    continue
+                if item.get("id") in deleted:
+                    changes.append(f"equipment/{slot}: unequipped ({item['id']} deleted)")
+                    del equipment[slot]
+                elif item.get("id") in renames:
+                    changes.append(f"equipment/{slot}: {item['id']} -> {renames[item['id']]}")
+                    item["id"] = renames[item["id"]]
+        changes += _rename_keys(save, step)
+        version = step["version"]
+    save[VERSION_KEY] = version
+    return changes
+
+def _rename_keys(save, step):
+    # skill / class / race renames of one step, in place; -> changes
+    changes = []
+    skills = step.get(KEY_RENAMES["Skills"]) or {}
+    if skills:
+        known = save.get("skills")
+        if isinstance(known, list):
+            for i, name in enumerate(known):
+                if isinstance(name, str) and name in skills:
+                    changes.append(f"skills/{name}: -> {skills[name]}")
+                    known[i] = skills[name]
+        levels = save.get("skill_levels")
+        if isinstance(levels, dict) and any(name in skills for name in levels):
+            renamed = {skills.get(name, name): level for name, level in levels.items()}
+            levels.clear()
+            levels.update(renamed)
+    for tab, field in (("Classes", "character_class"), ("Races", "race")):
+        mapping = step.get(KEY_RENAMES[tab]) or {}
+        value = save.get(field)
+        if isinstance(value, str) and value in mapping:
+            changes.append(f"{field}: {value} -> {mapping[value]}")
+            save[field] = mapping[value]
+    return changes
+
+def read_version(head):
+    # content_version from the start of a save, or None when it is not there
+    m = _VERSION_RE.search(head)
+    return int(m.group(1)) if m else None
+
+def encode_save(save):
+    # same shape as JSON.stringify(save_data): sorted keys, no whitespace
+    return json.dumps(save, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+# -------------------------
+# Batch
+# -------------------------
+_worker = {}
+
+def _init_worker(steps, target, dry_run):
+    _worker.update(steps=steps, target=target, dry_run=dry_run)
+
+def _migrate_file(job):
+    # -> (relative path, status, changes or error); status: skipped / changed / error
+    rel, full = job
+    target = _worker["target"]
+    try:
+        with open(full, "rb") as f:
+            head = f.read(HEAD_BYTES)
+            version = read_version(head)
+            if version is not None and version >= target:
+                return rel, "skipped", []
+            raw = head + f.read()
+        save = json.loads(raw.decode("utf-8"))
+        if not isinstance(save, dict):
+            raise ValueError("not a save (top level is not an object)")
+        if int(save.get(VERSION_KEY, 0) or 0) >= target:
+            return rel, "skipped", []
+        changes = migrate_save(save, _worker["steps"])
+        if not _worker["dry_run"]:
+            stage = full + STAGE_SUFFIX
+            with open(stage, "wb") as f:
+                f.write(encode_save(save))
+                f.flush()
+                os.fsync(f.fileno())
+        return rel, "changed", changes
+    except Exception as e:
+        return rel, "error", f"{type(e).__name__}: {e}"
+
+def migrate_dir(saves_dir, migrations, workers=None, dry_run=False, report=None):
+    # -> stats; nothing is replaced unless every save migrated (see stats["errors"])
+    steps = sorted(migrations.get("steps", []), key=lambda s: s["version"])
+    target = migrations.get("version", 0)
+    stats = {"files": 0, "skipped": 0, "changed": 0, "items": 0, "errors": [], "seconds": 0.0, "target": target}
+    t0 = time.perf_counter()
+    staged = []
+    jobs = iter_save_files(saves_dir)
+    workers = max(1, workers or os.cpu_count() or 1)
+    if workers == 1:
+        _init_worker(steps, target, dry_run)
+        pool = None
+        results = map(_migrate_file, jobs)
+    else:
+        pool = multiprocessing.get_context("spawn").Pool(workers, _init_worker, (steps, target, dry_run))
+        results = pool.imap_unordered(_migrate_file, jobs, chunksize=32)
+    try:
+        for rel, status, detail in results:
+            stats["files"] += 1
+            if status == "skipped":
+                stats["skipped"] += 1
+            elif status == "error":
+                stats["errors"].append((rel, detail))
+            else:
+                stats["changed"] += 1
+                stats["items"] += len(detail)
+                if not dry_run:
+                    staged.append(rel)
+                if report:
+                    report(rel, detail)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    try:
+        if stats["errors"]:
+            return stats  # all or nothing: the staged files are dropped below
+        # commit: every staged file replaces its original
+        dirs = set()
+        for rel in staged:
+            full = os.path.join(saves_dir, rel)
+            os.replace(full + STAGE_SUFFIX, full)
+            dirs.add(os.path.dirname(full))
+        staged = []
+        for d in dirs:
+            _fsync_dir(d)
+    finally:
+        for rel in staged:
+            try:
+                os.unlink(os.path.join(saves_dir, rel) + STAGE_SUFFIX)
+            except OSError:
+                pass
+        stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Record and apply save-file migrations for item renames/deletions")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("apply", help="migrate every save under a directory")
+    p.add_argument("saves", help="directory of save JSON files (searched recursively)")
+    p.add_argument("--dry-run", action="store_true", help="print what would change, write nothing")
+    p.add_argument("-j", "--workers", type=int, default=0, help="processes (default: all cores)")
+    p.add_argument("-q", "--quiet", action="store_true", help="no per-save diff")
+    p = sub.add_parser("add", help="record a step by hand (edits made outside the content tools)")
+    p.add_argument("--rename", action="append", default=[], metavar="OLD=NEW")
+    p.add_argument("--delete", action="append", default=[], metavar="ID")
+    p.add_argument("--label", default="manual")
+    sub.add_parser("list", help="print the recorded steps")
+    args = ap.parse_args(argv)
+
+    try:
+        if args.command == "add":
+            renames = dict(r.split("=", 1) for r in args.rename if "=" in r)
+            version = record_step(args.root, renames, args.delete, args.label)
+            print(f"recorded step {version}" if version else "nothing to record")
+            return 0
+        migrations = read_migrations(args.root)
+        if args.command == "list":
+            for step in migrations["steps"]:
+                print(f"v{step['version']} {step['created']} {step['label']}")
+                for line in describe_step(step["renames"], step["deletions"]):
+                    print("  " + line)
+            print(f"current version: {migrations.get('version', 0)}")
+            return 0
+        if not os.path.isdir(args.saves):
+            print(f"ERROR: {args.saves} is not a directory")
+            return 1
+
+        def report(rel, changes):
+            if args.quiet:
+                return
+            print(f"{rel}:")
+            for line in changes or ["(version only)"]:
+                print(f"  {line}")
+
+        stats = migrate_dir(args.saves, migrations, args.workers or None, args.dry_run, report)
+    except MigrationError as e:
+        print("ERROR:", e)
+        return 1
+    if stats["errors"]:
+        print(f"ERROR: {len(stats['errors'])} save(s) could not be migrated; nothing was changed")
+        for rel, err in stats["errors"]:
+            print(f"  {rel}: {err}")
+        return 1
+    action = "would migrate" if args.dry_run else "migrated"
+    print(f"{stats['files']} saves: {action} {stats['changed']} ({stats['items']} item change(s)), "
+          f"{stats['skipped']} already at v{stats['target']} in {stats['seconds']:.2f} s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+content_pack.py
+Uldtale-Battlesim Content Pack Compiler
+- Compiles every JSON_FILES tab into one minified data/content.pack.json that the game
+  parses once at startup (scripts/ContentPack.gd) instead of each autoload re-reading
+  the indent=4 files
+- Precomputed lookups, in the shapes the game builds at runtime today:
+  item_id -> [file, path...], weapon/armor ids by type and slot (ItemManager) and
+  class -> usable weapon/armor ids (ClassEquipmentBias)
+- Only content that passes content_schema validation is packed
+- data/enemy_stats.json (content_enemy), data/element_matrix.json (content_elements) and the
+  arena wire string table data/wire_ids.json (content_wire) are refreshed with every build
+- data/content.pack.manifest.json records the sha256 of every source file: rebuilds are
+  skipped when nothing changed, and debug builds of the game fall back to the JSON of
+  files edited after the pack was built
+"""
+
+import os
+import json
+import hashlib
+import datetime
+
+from content_data import JSON_FILES, atomic_write
+from content_index import ITEM_TABS, item_entries, item_lookup
+from content_enemy import build_enemy_table
+from content_elements import build_element_table
+from content_wire import build_wire_table
+from content_schema import ContentValidator
+
+PACK_FILE = "data/content.pack.json"
+MANIFEST_FILE = "data/content.pack.manifest.json"
+PACK_FORMAT = "uldtale-content-pack"
+PACK_VERSION = 1
+
+
+class PackError(Exception):
+    pass
+
+
+def sha256_bytes(raw):
+    # same digest as Godot's FileAccess.get_sha256()
+    return hashlib.sha256(raw).hexdigest()
+
+def read_sources(root_dir):
+    # -> {rel path: (raw bytes, parsed data)}; missing files pack as {} like safe_load
+    sources = {}
+    for rel in JSON_FILES.values():
+        full = os.path.join(root_dir, rel)
+        raw = b""
+        data = {}
+        if os.path.exists(full):
+            with open(full, "rb") as f:
+                raw = f.read()
+            try:
+                data = json.loads(raw.decode("utf-8"))
+            except Exception as e:
+                raise PackError(f"{rel}: {e}")
+        sources[rel] = (raw, data)
+    return sources
+
+
+# -------------------------
+# Lookup indexes
+# -------------------------
+def item_index(tabs):
+    # item_id -> [file, key...]; same precedence as ItemManager.update_items()
+    # (first tab wins across tabs, last entry wins within one)
+    index = {}
+    for tab in ITEM_TABS:
+        found = {}
+        for path, _ in item_entries(tab, tabs.get(tab) or {}):
+            found[path[-1]] = [JSON_FILES[tab]] + path
+        for item_id, ref in found.items():
+            index.setdefault(item_id, ref)
+    return index
+
+def _equipment(tab, data):
+    # {item_id: entry} in ItemManager.weapons / .armors order
+    return {path[-1]: entry for path, entry in item_entries(tab, data or {})}
+
+def class_index(classes, weapons, armors):
+    # ClassEquipmentBias caches: class -> {main_hand: [], off_hand: []} and class -> {armor type: []};
+    # an empty class_restriction means every class in classes.json
+    all_classes = []
+    for group in ("playable", "non_playable", "boss"):
+        all_classes.extend((classes or {}).get(group, {}) or {})
+    class_weapons = {}
+    for item_id, entry in _equipment("Weapons", weapons).items():
+        slot = "off_hand" if entry.get("slot", "main_hand") == "off_hand" else "main_hand"
+        for cls in entry.get("class_restriction") or all_classes:
+            class_weapons.setdefault(cls, {"main_hand": [], "off_hand": []})[slot].append(item_id)
+    class_armors = {}
+    for item_id, entry in _equipment("Armors", armors).items():
+        armor_type = entry.get("type", "")
+        for cls in entry.get("class_restriction") or all_classes:
+            class_armors.setdefault(cls, {}).setdefault(armor_type, []).append(item_id)
+    return class_weapons, class_armors
+
+
+# -------------------------
+# Build
+# -------------------------
+def read_manifest(root_dir):
+    path = os.path.join(root_dir, MANIFEST_FILE)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def is_current(root_dir, sources, manifest=None):
+    # pack on disk was built from exactly these source bytes (and was not touched since)
+    manifest = read_manifest(root_dir) if manifest is None else manifest
+    if not manifest or manifest.get("format") != PACK_FORMAT or manifest.get("version") != PACK_VERSION:
+        return False
+    recorded = manifest.get("sources", {})
+    if set(recorded) != set(sources):
+        return False
+    for rel, (raw, _) in sources.items():
+        if recorded[rel].get("sha256") != sha256_bytes(raw):
+            return False
+    pack_path = os.path.join(root_dir, PACK_FILE)
+    if not os.path.exists(pack_path):
+        return False
+    with open(pack_path, "rb") as f:
+        return sha256_bytes(f.read()) == manifest.get("pack", {}).get("sha256")
+
+def compile_pack(sources):
+    files = {rel: data for rel, (_, data) in sources.items()}
+    tabs = {tab: files.get(rel) for tab, rel in JSON_FILES.items()}
+    class_weapons, class_armors = class_index(tabs["Classes"], tabs["Weapons"], tabs["Armors"])
+    pack = {
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "files": files,
+        "index": {
+            "items": item_index(tabs),
+            "item_lookup": item_lookup(tabs),
+            "class_weapons": class_weapons,
+            "class_armors": class_armors,
+        },
+    }
+    return json.dumps(pack, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _enemy_table(root_dir, sources, force):
+    tabs = {tab: sources[rel][1] for tab, rel in JSON_FILES.items()}
+    return build_enemy_table(root_dir, tabs["Classes"], tabs["Races"], force)
+
+def _element_table(root_dir, sources, force):
+    tabs = {tab: sources[rel][1] for tab, rel in JSON_FILES.items()}
+    return build_element_table(root_dir, tabs["Races"], tabs["Skills"], force)
+
+def _derived_tables(result, root_dir, sources, force):
+    tabs = {tab: sources[rel][1] for tab, rel in JSON_FILES.items()}
+    result["enemy_table"] = _enemy_table(root_dir, sources, force)
+    result["element_table"] = _element_table(root_dir, sources, force)
+    result["wire_table"] = build_wire_table(root_dir, tabs, force)
+
+def build_pack(root_dir, force=False, validate=True):
+    # -> {"built": bool, "pack": path, "bytes": n, "source_bytes": n, "enemy_table": {...},
+    # "element_table": {...}, "wire_table": {...}}; PackError on invalid content
+    sources = read_sources(root_dir)
+    pack_path = os.path.join(root_dir, PACK_FILE)
+    result = {"built": False, "pack": pack_path,
+              "source_bytes": sum(len(raw) for raw, _ in sources.values())}
+    if not force and is_current(root_dir, sources):
+        # sources were validated when this pack was built
+        _derived_tables(result, root_dir, sources, force)
+        result["bytes"] = os.path.getsize(pack_path)
+        return result
+    if validate:
+        data = {tab: sources[rel][1] for tab, rel in JSON_FILES.items()}
+        errors = [i for i in ContentValidator().validate_all(data) if i.severity == "error"]
+        if errors:
+            shown = "\n".join(str(i) for i in errors[:10])
+            more = f"\n... and {len(errors) - 10} more" if len(errors) > 10 else ""
+            raise PackError(f"{len(errors)} validation error(s), pack not built:\n{shown}{more}")
+    _derived_tables(result, root_dir, sources, force)
+    payload = compile_pack(sources)
+    manifest = {
+        "format": PACK_FORMAT,
+        "version": PACK_VERSION,
+        "built": datetime.datetime.now().isoformat(timespec="seconds"),
+        "pack": {"path": PACK_FILE, "sha256": sha256_bytes(payload), "bytes": len(payload)},
+        "sources": {rel: {"sha256": sha256_bytes(raw), "bytes": len(raw)} for rel, (raw, _) in sources.items()},
+    }
+    os.makedirs(os.path.dirname(pack_path), exist_ok=True)
+    atomic_write(pack_path, payload)
+    # manifest last: a pack without a matching manifest is never trusted
+    atomic_write(os.path.join(root_dir, MANIFEST_FILE),
+                 json.dumps(manifest, indent=4).encode("utf-8"))
+    result["built"] = True
+    result["bytes"] = len(payload)
+    return result
+
+def pack_exists(root_dir):
+    return os.path.exists(os.path.join(root_dir, PACK_FILE))
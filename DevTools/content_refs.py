@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+content_refs.py
+Uldtale-Battlesim Reference Graph
+- Indexes every content key (skills, classes, races, status effects, rarities, item ids) with
+  its uses: the content_schema.REFS fields of the JSON_FILES tabs and string literals in the
+  GDScript sources (scripts/ and scenes/, comments and docstrings skipped). Item ids, skill,
+  class and race names also live in save files, which content_migrate updates
+- Built once, then kept current: reindex() after an edit (the editor's _entry_changed hook),
+  scripts re-scanned only when their mtime / size changed
+- usages(kind, key): where the key is defined, which entries / fields point at it and which
+  script lines spell it out
+- rename_everywhere: one batch over every affected file. In the tab files the key keeps its
+  place and "name" follows when it matched; reference fields and script literals are
+  rewritten as single string tokens, so the rest of each file keeps its layout. Every file
+  is staged next to the original and only replaced once all are ready; the originals are
+  put back if a replace fails. Item, skill, class and race renames add a save migration step;
+  rarity names on saved items are not migrated (a warning says so)
+"""
+
+import os
+import re
+import sys
+import json
+import bisect
+import argparse
+
+from content_data import JSON_FILES, backup_file, dump_json, entry_depth, iter_entries, safe_load, _fsync_dir
+from content_index import ITEM_TABS
+from content_migrate import KEY_RENAMES, MigrationError, record_step
+from content_pack import PackError, build_pack, pack_exists
+from content_schema import REFS, ref_values
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_DIRS = ("scripts", "scenes")
+STAGE_SUFFIX = ".renaming"
+ITEMS = "Items"  # the game keys every item by id alone, across the four item tabs
+
+# comments and triple-quoted docstrings are matched (and skipped) so their quotes do not count
+_TOKENS = re.compile(r'#[^\n]*|"""[\s\S]*?"""|"((?:[^"\\\n]|\\.)*)"|\'((?:[^\'\\\n]|\\.)*)\'')
+_JSON_TOKENS = re.compile(r'"(?:[^"\\]|\\.)*"|[{}\[\],:]')
+
+
+class RenameError(Exception):
+    pass
+
+
+def kind_of(tab):
+    return ITEMS if tab in ITEM_TABS else tab
+
+def kind_tabs(kind):
+    return ITEM_TABS if kind == ITEMS else (kind,)
+
+def resolve_kind(name):
+    low = name.strip().lower()
+    for kind in list(JSON_FILES) + [ITEMS]:
+        k = kind.lower()
+        if low in (k, k[:-1], k[:-2], k[:-3] + "y"):  # "classes", "class", "status effect", "rarity"
+            return kind_of(kind)
+    return None
+
+# tab -> [(field, referenced kind)]
+REF_FIELDS = {tab: [(field, kind_of(target)) for field, target in fields.items()] for tab, fields in REFS.items()}
+
+def affected_tabs(kind):
+    # tabs a rename of kind may rewrite: where it is defined plus where it is referenced
+    return [tab for tab in JSON_FILES
+            if tab in kind_tabs(kind) or any(k == kind for _, k in REF_FIELDS.get(tab, ()))]
+
+
+def scan_literals(text):
+    # -> [(offset of the opening quote, literal text)] for plain (escape-free) string literals
+    out = []
+    for m in _TOKENS.finditer(text):
+        value = m.group(1) if m.group(1) is not None else m.group(2)
+        if value and "\\" not in value:
+            out.append((m.start(), value))
+    return out
+
+
+# -------------------------
+# Graph
+# -------------------------
+class RefGraph:
+    def __init__(self, root_dir):
+        self.root_dir = root_dir
+        self.defs = {}        # (kind, key) -> set((tab, path))
+        self.uses = {}        # (kind, key) -> set((tab, path, field))
+        self.entries = {}     # (tab, path) -> ((kind, key), [(kind, key, field)])
+        self.scripts = {}     # rel path -> (stat signature, [(offset, literal)], line starts)
+        self.literals = {}    # literal -> set(rel paths)
+
+    # -- JSON --
+    def index_tab(self, tab, data):
+        for tp in [tp for tp in self.entries if tp[0] == tab]:
+            self._forget(tp)
+        for path, entry in iter_entries(tab, data):
+            self._add(tab, tuple(path), entry)
+
+    def reindex(self, tab, data, path):
+        # after a mutation at path (field, entry or container level), like ContentValidator.update
+        depth = entry_depth(tab)
+        path = tuple(path[:depth])
+        n = len(path)
+        if n == depth:
+            self._forget((tab, path))
+            entry = data
+            for p in path:
+                entry = entry.get(p) if isinstance(entry, dict) else None
+            if entry is not None:
+                self._add(tab, path, entry)
+            return
+        for tp in [tp for tp in self.entries if tp[0] == tab and tp[1][:n] == path]:
+            self._forget(tp)
+        for p, entry in iter_entries(tab, data):
+            if tuple(p[:n]) == path:
+                self._add(tab, tuple(p), entry)
+
+    def _add(self, tab, path, entry):
+        name = (kind_of(tab), path[-1])
+        self.defs.setdefault(name, set()).add((tab, path))
+        refs = []
+        if isinstance(entry, dict):
+            for field, kind in REF_FIELDS.get(tab, ()):
+                for key in ref_values(entry.get(field)):
+                    refs.append((kind, key, field))
+                    self.uses.setdefault((kind, key), set()).add((tab, path, field))
+        self.entries[(tab, path)] = (name, refs)
+
+    def _forget(self, tp):
+        found = self.entries.pop(tp, None)
+        if found is None:
+            return
+        name, refs = found
+        self.defs.get(name, set()).discard(tp)
+        for kind, key, field in refs:
+            self.uses.get((kind, key), set()).discard(tp + (field,))
+
+    # -- scripts --
+    def refresh_scripts(self):
+        # (re)scan new or changed .gd files; -> number of files scanned
+        seen, scanned = set(), 0
+        for top in SCRIPT_DIRS:
+            base = os.path.join(self.root_dir, top)
+            for dirpath, dirnames, filenames in os.walk(base):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for fn in filenames:
+                    if not fn.endswith(".gd"):
+                        continue
+                    full = os.path.join(dirpath, fn)
+                    rel = os.path.relpath(full, self.root_dir).replace(os.sep, "/")
+                    seen.add(rel)
+                    st = os.stat(full)
+                    sig = (st.st_mtime_ns, st.st_size)
+                    if rel in self.scripts and self.scripts[rel][0] == sig:
+                        continue
+                    with open(full, "r", encoding="utf-8", errors="replace") as f:
+                        text = f.read()
+                    self._index_script(rel, sig, text)
+                    scanned += 1
+        for rel in [r for r in self.scripts if r not in seen]:
+            self._index_script(rel, None, None)
+        return scanned
+
+    def _index_script(self, rel, sig, text):
+        old = self.scripts.pop(rel, None)
+        if old is not None:
+            for _, lit in old[1]:
+                files = self.literals.get(lit)
+                if files:
+                    files.discard(rel)
+        if text is None:
+            return
+        lits = scan_literals(text)
+        starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        self.scripts[rel] = (sig, lits, starts)
+        for _, lit in lits:
+            self.literals.setdefault(lit, set()).add(rel)
+
+    def script_uses(self, key):
+        # -> [(rel, line, column)] (1-based) of literals spelling key
+        out = []
+        for rel in sorted(self.literals.get(key, ())):
+            _, lits, starts = self.scripts[rel]
+            for off, lit in lits:
+                if lit == key:
+                    line = bisect.bisect_right(starts, off)
+                    out.append((rel, line, off - starts[line - 1] + 1))
+        return out
+
+    # -- queries --
+    def usages(self, kind, key, scripts=True):
+        if scripts:
+            self.refresh_scripts()
+        return {
+            "defs": sorted(self.defs.get((kind, key), ())),
+            "json": sorted(self.uses.get((kind, key), ())),
+            "scripts": self.script_uses(key) if scripts else [],
+        }
+
+    def keys(self, kind):
+        return {key for k, key in self.defs if k == kind and self.defs[(k, key)]}
+
+
+def build_graph(root_dir, data=None, scripts=True):
+    # data: {tab: loaded JSON} (default: the files on disk)
+    graph = RefGraph(root_dir)
+    for tab, rel in JSON_FILES.items():
+        tab_data = data.get(tab) if data is not None and tab in data else safe_load(os.path.join(root_dir, rel))
+        graph.index_tab(tab, tab_data)
+    if scripts:
+        graph.refresh_scripts()
+    return graph
+
+def format_usages(kind, key, found, root_dir=None):
+    lines = [f"{kind} {key!r}"]
+    for tab, path in found["defs"]:
+        lines.append(f"  defined   {tab}: {'/'.join(path)}")
+    for tab, path, field in found["json"]:
+        lines.append(f"  used by   {tab}: {'/'.join(path)}.{field}")
+    for rel, line, col in found["scripts"]:
+        text = ""
+        if root_dir:
+            try:
+                with open(os.path.join(root_dir, rel), "r", encoding="utf-8", errors="replace") as f:
+                    for i, t in enumerate(f, 1):
+                        if i == line:
+                            text = "  " + t.strip()
+                            break
+            except OSError:
+                pass
+        lines.append(f"  script    {rel}:{line}:{col}{text}")
+    if found["defs"]:
+        if kind == ITEMS or kind in KEY_RENAMES:
+            lines.append("  saves     named in save files (renames add a save migration step)")
+        elif kind == "Rarities":
+            lines.append("  saves     named on saved items (NOT migrated by a rename)")
+    if len(lines) == 1:
+        lines.append("  (no definition or uses)")
+    return "\n".join(lines)
+
+
+# -------------------------
+# Rename
+# -------------------------
+def json_strings(text):
+    # yield (path, is_key, start, end) for every string token of a JSON document
+    frames = []  # [container "{" / "[", current key or index, expecting a key]
+    for m in _JSON_TOKENS.finditer(text):
+        tok = m.group()
+        if tok == "{" or tok == "[":
+            frames.append([tok, None if tok == "{" else 0, tok == "{"])
+        elif tok == "}" or tok == "]":
+            frames.pop()
+        elif tok == ",":
+            top = frames[-1]
+            if top[0] == "{":
+                top[2] = True
+            else:
+                top[1] += 1
+        elif tok == ":":
+            frames[-1][2] = False
+        elif frames and frames[-1][2]:
+            frames[-1][1] = json.loads(tok)
+            yield tuple(f[1] for f in frames), True, m.start(), m.end()
+        else:
+            yield tuple(f[1] for f in frames), False, m.start(), m.end()
+
+def patch_json_text(raw, edits, data):
+    # rewrite only the edited string tokens; -> new bytes, or None if the result would not
+    # parse back to data (the caller then writes the whole file)
+    try:
+        text = raw.decode("utf-8")
+        parts, last = [], 0
+        for path, is_key, start, end in json_strings(text):
+            new = edits.get((path, is_key))
+            if new is not None:
+                parts.append(text[last:start] + json.dumps(new, ensure_ascii=False))
+                last = end
+        parts.append(text[last:])
+        out = "".join(parts)
+        if json.loads(out) != data:
+            return None
+    except (ValueError, IndexError, UnicodeDecodeError):
+        return None
+    return out.encode("utf-8")
+
+def _rename_key(parent, old, new):
+    # same position in the file, like content_journal.rename_patches
+    items = [((new if k == old else k), v) for k, v in parent.items()]
+    parent.clear()
+    parent.update(items)
+
+def plan_json(root_dir, kind, old, new):
+    # -> ({tab: (original bytes or None, new data, {(path, is_key): new string})}, [change descriptions])
+    out, changes = {}, []
+    for tab in affected_tabs(kind):
+        path = os.path.join(root_dir, JSON_FILES[tab])
+        data = safe_load(path)
+        edits = {}
+        # references first: edits are addressed by the paths of the original file
+        for field, target in REF_FIELDS.get(tab, ()):
+            if target != kind:
+                continue
+            for epath, entry in iter_entries(tab, data):
+                if not isinstance(entry, dict):
+                    continue
+                value = entry.get(field)
+                at = tuple(epath) + (field,)
+                if value == old:
+                    entry[field] = new
+                    edits[(at, False)] = new
+                elif isinstance(value, list) and old in value:
+                    entry[field] = [new if v == old else v for v in value]
+                    edits.update(((at + (i,), False), new) for i, v in enumerate(value) if v == old)
+                else:
+                    continue
+                changes.append(f"{tab}: {'/'.join(epath)}.{field}")
+        if tab in kind_tabs(kind):
+            for epath, entry in list(iter_entries(tab, data)):
+                if epath[-1] == new:
+                    raise RenameError(f"{tab}: {'/'.join(epath)} already exists")
+                if epath[-1] != old:
+                    continue
+                parent = data
+                for p in epath[:-1]:
+                    parent = parent[p]
+                _rename_key(parent, old, new)
+                edits[(tuple(epath), True)] = new
+                if isinstance(entry, dict) and entry.get("name") == old:
+                    entry["name"] = new
+                    edits[(tuple(epath) + ("name",), False)] = new
+                changes.append(f"{tab}: {'/'.join(epath)} -> {new}")
+        if edits:
+            raw = None
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    raw = f.read()
+            out[tab] = (raw, data, edits)
+    return out, changes
+
+def plan_scripts(graph, old, new):
+    # -> ({rel: (original bytes, new bytes)}, [change descriptions]); files are re-read and re-scanned
+    graph.refresh_scripts()
+    out, changes = {}, []
+    for rel in sorted(graph.literals.get(old, ())):
+        full = os.path.join(graph.root_dir, rel)
+        with open(full, "rb") as f:
+            raw = f.read()
+        text = raw.decode("utf-8")
+        parts, last = [], 0
+        for off, lit in scan_literals(text):
+            if lit == old:
+                parts.append(text[last:off + 1] + new)
+                last = off + 1 + len(old)
+        if not parts:
+            continue
+        parts.append(text[last:])
+        out[rel] = (raw, "".join(parts).encode("utf-8"))
+        lines = sorted({line for r, line, _ in graph.script_uses(old) if r == rel})
+        changes.append(f"{rel}: line(s) {', '.join(map(str, lines))}")
+    return out, changes
+
+def commit_files(files):
+    # files: {full path: (original bytes or None, new bytes)}; all staged, then all replaced
+    staged = []
+    try:
+        for full, (_, payload) in files.items():
+            stage = full + STAGE_SUFFIX
+            with open(stage, "wb") as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            if os.path.exists(full):
+                os.chmod(stage, os.stat(full).st_mode & 0o7777)
+            staged.append(full)
+        done = []
+        try:
+            for full in staged:
+                os.replace(full + STAGE_SUFFIX, full)
+                done.append(full)
+        except OSError:
+            # put back what was already replaced
+            for full in done:
+                raw = files[full][0]
+                if raw is not None:
+                    with open(full, "wb") as f:
+                        f.write(raw)
+            raise
+        staged = []
+        for d in {os.path.dirname(full) for full in files}:
+            _fsync_dir(d)
+    finally:
+        for full in staged:
+            try:
+                os.unlink(full + STAGE_SUFFIX)
+            except OSError:
+                pass
+
+def rename_everywhere(root_dir, kind, old, new, graph=None, scripts=True, dry_run=False):
+    # -> {"changes": [...], "files": [rel paths], "migration": version or None}
+    if not new or new == old:
+        raise RenameError("new key must differ from the old one")
+    graph = graph or build_graph(root_dir, scripts=scripts)
+    if not graph.defs.get((kind, old)):
+        raise RenameError(f"no {kind} entry {old!r}")
+    if graph.defs.get((kind, new)):
+        raise RenameError(f"{kind} {new!r} already exists")
+    tabs, changes = plan_json(root_dir, kind, old, new)
+    files = {}
+    for tab, (raw, data, edits) in tabs.items():
+        payload = patch_json_text(raw, edits, data) if raw is not None else None
+        files[os.path.join(root_dir, JSON_FILES[tab])] = (raw, payload or dump_json(data))
+    if scripts:
+        gd, gd_changes = plan_scripts(graph, old, new)
+        changes += gd_changes
+        for rel, pair in gd.items():
+            files[os.path.join(root_dir, rel)] = pair
+    warning = f"saved items keep rarity {old!r}: existing saves are not migrated" if kind == "Rarities" else None
+    result = {"changes": changes, "migration": None, "warning": warning,
+              "files": sorted(os.path.relpath(f, root_dir).replace(os.sep, "/") for f in files)}
+    if dry_run:
+        return result
+    for tab, (raw, _, _) in tabs.items():
+        if raw is not None:
+            backup_file(os.path.join(root_dir, JSON_FILES[tab]), raw)
+    commit_files(files)
+    for tab, (_, data, _) in tabs.items():
+        graph.index_tab(tab, data)
+    if scripts:
+        graph.refresh_scripts()
+    if kind == ITEMS or kind in KEY_RENAMES:
+        # saves name items, skills, classes and races: SaveManager applies the step on load
+        try:
+            if kind == ITEMS:
+                result["migration"] = record_step(root_dir, {old: new}, [], f"rename {old} -> {new}")
+            else:
+                result["migration"] = record_step(root_dir, {}, [], f"rename {kind} {old} -> {new}",
+                                                  key_renames={kind: {old: new}})
+        except (MigrationError, OSError) as e:
+            print(f"WARNING: save migration not recorded: {e}", file=sys.stderr)
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Find usages of a content key, or rename it everywhere")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--no-scripts", action="store_true", help="leave the GDScript sources out")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("usages", help="where a key is defined and used")
+    p.add_argument("kind", help="Skills, Classes, Races, Status Effects, Rarities or Items")
+    p.add_argument("key")
+    p = sub.add_parser("rename", help="rename a key in every tab file and script (all or nothing)")
+    p.add_argument("kind")
+    p.add_argument("old")
+    p.add_argument("new")
+    p.add_argument("--dry-run", action="store_true", help="list the changes without writing")
+    args = ap.parse_args(argv)
+
+    kind = resolve_kind(args.kind)
+    if kind is None:
+        print(f"ERROR: unknown kind {args.kind!r}")
+        return 1
+    scripts = not args.no_scripts
+    if args.command == "usages":
+        graph = build_graph(args.root, scripts=scripts)
+        print(format_usages(kind, args.key, graph.usages(kind, args.key, scripts), args.root))
+        return 0
+    try:
+        result = rename_everywhere(args.root, kind, args.old, args.new, scripts=scripts, dry_run=args.dry_run)
+    except (RenameError, OSError, UnicodeDecodeError) as e:
+        print(f"ERROR: {e}")
+        return 1
+    for line in result["changes"]:
+        print(f"  {line}")
+    state = "would change" if args.dry_run else "changed"
+    print(f"{kind} {args.old!r} -> {args.new!r}: {state} {len(result['files'])} file(s)"
+          + (f", save migration v{result['migration']}" if result["migration"] else ""))
+    if result["warning"]:
+        print(f"WARNING: {result['warning']}", file=sys.stderr)
+    if not args.dry_run and pack_exists(args.root):
+        try:
+            build_pack(args.root)
+        except PackError as e:
+            print(f"WARNING: content pack not rebuilt: {e}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
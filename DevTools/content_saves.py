@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+content_saves.py
+Uldtale-Battlesim Save Corpus Analytics
+- Streams a directory tree of SaveManager.save_game JSON files (one per character), parses them
+  on a process pool in fixed-size batches (bounded memory) and keeps one compact row per save
+- Columnar summary: array-backed numeric columns, dictionary-encoded class / race / rarity columns
+- Columns: level, class, race, xp, floor reached (max_floor_cleared), currency, attribute points,
+  skills, inventory / stash counts, equipped item count, rarity tiers, ilvl (saves written before
+  item_level was saved report -1) and gear score
+- --cache keeps the summary between runs: only new or changed files are parsed again
+- Aggregate queries: --where filters, --group-by columns, --agg count / mean / median / min / max /
+  sum / pNN, e.g. "median gear score by floor reached":
+  content_saves.py DIR --group-by floor --agg median:gear_score
+"""
+
+import os
+import sys
+import json
+import time
+import array
+import argparse
+import multiprocessing
+
+from content_loot import RARITIES
+
+SUMMARY_FORMAT = "uldtale-save-summary"
+SUMMARY_VERSION = 1
+BATCH = 4096
+SLOTS = ("main_hand", "off_hand", "head", "chest", "hands", "legs", "feet")  # CharacterData.equipment
+
+# (column, kind): "cat" columns are dictionary-encoded strings, "int" / "float" are arrays
+COLUMNS = (
+    ("class", "cat"), ("race", "cat"), ("level", "int"), ("xp", "int"), ("floor", "int"),
+    ("currency", "int"), ("attribute_points", "int"), ("skills", "int"),
+    ("inventory_items", "int"), ("inventory_qty", "int"), ("inventory_equipment", "int"),
+    ("stash_items", "int"), ("stash_qty", "int"),
+    ("equipped", "int"), ("gear_score", "int"), ("rarity_max", "int"), ("rarity_mean", "float"),
+    ("ilvl_max", "int"), ("ilvl_mean", "float"),
+) + tuple((f"{slot}_rarity", "cat") for slot in SLOTS)
+ARRAY_CODES = {"cat": "i", "int": "q", "float": "d"}
+
+
+# -------------------------
+# One save
+# -------------------------
+def rarity_tier(value):
+    # generated equipment stores the RarityGenerator name; anything else counts as common
+    if isinstance(value, str):
+        return RARITIES.index(value) if value in RARITIES else 0
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    return 0
+
+def item_score(item):
+    # gear score of one item: damage + armor + legendary bonus damage + stat modifier points
+    mods = item.get("stat_modifiers") or {}
+    return int(item.get("damage", 0) or 0) + int(item.get("armor_value", 0) or 0) \
+        + int(item.get("bonus_damage", 0) or 0) + sum(int(v or 0) for v in mods.values() if not isinstance(v, dict))
+
+def save_row(data):
+    # SaveManager.save_game dict -> {column: value}
+    inventory = data.get("inventory") or {}
+    stash = data.get("stash") or {}
+    equipment = {s: e for s, e in (data.get("equipment") or {}).items() if isinstance(e, dict)}
+    tiers = [rarity_tier(e.get("rarity")) for e in equipment.values()]
+    ilvls = [int(e["item_level"]) for e in equipment.values() if "item_level" in e]
+    row = {
+        "class": str(data.get("character_class", "")),
+        "race": str(data.get("race", "")),
+        "level": int(data.get("level", 1) or 0),
+        "xp": int(data.get("xp", 0) or 0),
+        "floor": int(data.get("max_floor_cleared", 0) or 0),
+        "currency": int(data.get("currency", 0) or 0),
+        "attribute_points": int(data.get("attribute_points", 0) or 0),
+        "skills": len(data.get("skills") or []),
+        "inventory_items": len(inventory),
+        "inventory_qty": sum(int(i.get("quantity", 0) or 0) for i in inventory.values() if isinstance(i, dict)),
+        "inventory_equipment": sum(1 for i in inventory.values() if isinstance(i, dict) and i.get("is_equipment")),
+        "stash_items": len(stash),
+        "stash_qty": sum(int(i.get("quantity", 0) or 0) for i in stash.values() if isinstance(i, dict)),
+        "equipped": len(equipment),
+        "gear_score": sum(item_score(e) for e in equipment.values()),
+        "rarity_max": max(tiers) if tiers else -1,
+        "rarity_mean": sum(tiers) / len(tiers) if tiers else float("nan"),
+        "ilvl_max": max(ilvls) if ilvls else -1,
+        "ilvl_mean": sum(ilvls) / len(ilvls) if ilvls else float("nan"),
+    }
+    for slot in SLOTS:
+        item = equipment.get(slot)
+        row[f"{slot}_rarity"] = "" if item is None else RARITIES[min(rarity_tier(item.get("rarity")), len(RARITIES) - 1)]
+    return row
+
+def parse_file(job):
+    # worker: (relative path, full path) -> (relative path, signature, row tuple or None, error)
+    rel, full = job
+    try:
+        st = os.stat(full)
+        with open(full, "rb") as f:
+            data = json.loads(f.read().decode("utf-8"))
+        if not isinstance(data, dict):
+            raise ValueError("not a save (top level is not an object)")
+        row = save_row(data)
+        return rel, (st.st_mtime_ns, st.st_size), tuple(row[name] for name, _ in COLUMNS), None
+    except Exception as e:
+        return rel, None, None, f"{type(e).__name__}: {e}"
+
+def iter_save_files(root):
+    # lazy recursive walk: (relative path, full path) for every .json under root
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError:
+            continue
+        for entry in sorted(entries, key=lambda e: e.name):
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.name.endswith(".json"):
+                yield os.path.relpath(entry.path, root), entry.path
+
+
+# -------------------------
+# Columnar summary
+# -------------------------
+class SaveSummary:
+    def __init__(self):
+        self.columns = {name: array.array(ARRAY_CODES[kind]) for name, kind in COLUMNS}
+        self.kinds = dict(COLUMNS)
+        self.categories = {name: [] for name, kind in COLUMNS if kind == "cat"}
+        self._codes = {name: {} for name in self.categories}
+        self.files = []
+        self.sigs = []
+        self.errors = {}  # relative path -> message
+
+    def __len__(self):
+        return len(self.files)
+
+    def code(self, column, value):
+        codes = self._codes[column]
+        if value not in codes:
+            codes[value] = len(self.categories[column])
+            self.categories[column].append(value)
+        return codes[value]
+
+    def append(self, rel, sig, values):
+        for (name, kind), value in zip(COLUMNS, values):
+            self.columns[name].append(self.code(name, value) if kind == "cat" else value)
+        self.files.append(rel)
+        self.sigs.append(sig)
+
+    def value(self, column, i):
+        v = self.columns[column][i]
+        return self.categories[column][v] if self.kinds[column] == "cat" else v
+
+    def keep(self, rows):
+        # new summary with only the given row indices (category tables are rebuilt)
+        out = SaveSummary()
+        for i in rows:
+            out.append(self.files[i], self.sigs[i], [self.value(name, i) for name, _ in COLUMNS])
+        return out
+
+    # -- cache file --
+    def to_json(self):
+        return {"format": SUMMARY_FORMAT, "version": SUMMARY_VERSION,
+                "columns": {k: v.tolist() for k, v in self.columns.items()},
+                "categories": self.categories, "files": self.files, "sigs": [list(s) for s in self.sigs],
+                "errors": self.errors}
+
+    @classmethod
+    def from_json(cls, raw):
+        out = cls()
+        if raw.get("format") != SUMMARY_FORMAT or raw.get("version") != SUMMARY_VERSION \
+                or set(raw.get("columns", {})) != set(out.columns):
+            return out  # other version: start over
+        for name, values in raw["columns"].items():
+            out.columns[name] = array.array(ARRAY_CODES[out.kinds[name]], values)
+        for name, values in raw["categories"].items():
+            out.categories[name] = list(values)
+            out._codes[name] = {v: i for i, v in enumerate(values)}
+        out.files = list(raw["files"])
+        out.sigs = [tuple(s) for s in raw["sigs"]]
+        out.errors = dict(raw.get("errors", {}))
+        return out
+
+
+def load_cache(path):
+    if not path or not os.path.exists(path):
+        return SaveSummary()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return SaveSummary.from_json(json.load(f))
+    except (OSError, ValueError) as e:
+        print(f"ERROR reading cache {path}: {e} (rebuilding)")
+        return SaveSummary()
+
+def write_cache(path, summary):
+    from content_data import atomic_write
+    atomic_write(path, json.dumps(summary.to_json(), separators=(",", ":")).encode("utf-8"))
+
+
+def scan(root, cache=None, workers=None, progress=None):
+    # -> (summary, stats); parses only files that are new or changed since `cache`
+    cache = cache or SaveSummary()
+    known = {rel: i for i, rel in enumerate(cache.files)}
+    keep, todo, seen = [], [], set()
+    stats = {"files": 0, "parsed": 0, "cached": 0, "errors": 0, "bytes": 0, "seconds": 0.0}
+    t0 = time.perf_counter()
+    for rel, full in iter_save_files(root):
+        seen.add(rel)
+        stats["files"] += 1
+        i = known.get(rel)
+        if i is not None:
+            try:
+                st = os.stat(full)
+            except OSError:
+                continue
+            if tuple(cache.sigs[i]) == (st.st_mtime_ns, st.st_size):
+                keep.append(i)
+                continue
+        todo.append((rel, full))
+    summary = cache.keep(keep)
+    retry = {rel for rel, _ in todo}
+    summary.errors = {rel: err for rel, err in cache.errors.items() if rel in seen and rel not in retry}
+    stats["cached"] = len(keep)
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    pool = multiprocessing.get_context("spawn").Pool(workers) if workers > 1 and len(todo) > BATCH // 4 else None
+    try:
+        for start in range(0, len(todo), BATCH):
+            batch = todo[start:start + BATCH]
+            results = pool.map(parse_file, batch, chunksize=64) if pool else map(parse_file, batch)
+            for rel, sig, values, error in results:
+                if error:
+                    summary.errors[rel] = error
+                    stats["errors"] += 1
+                    continue
+                summary.append(rel, sig, values)
+                stats["parsed"] += 1
+                stats["bytes"] += sig[1]
+            if progress:
+                progress(f"{min(start + BATCH, len(todo))}/{len(todo)} parsed")
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+    stats["seconds"] = time.perf_counter() - t0
+    return summary, stats
+
+
+# -------------------------
+# Queries
+# -------------------------
+def parse_condition(text):
+    # "class=Paladin", "level>=10", "floor<5", "race!=Hume"
+    for op in (">=", "<=", "!=", "=", ">", "<"):
+        if op in text:
+            column, value = text.split(op, 1)
+            return column.strip(), op, value.strip()
+    raise ValueError(f"bad condition: {text}")
+
+def _compare(a, op, b):
+    return {"=": a == b, "!=": a != b, ">": a > b, "<": a < b, ">=": a >= b, "<=": a <= b}[op]
+
+def select_rows(summary, where):
+    rows = range(len(summary))
+    for text in where or []:
+        column, op, raw = parse_condition(text)
+        if column not in summary.columns:
+            raise ValueError(f"unknown column: {column}")
+        col = summary.columns[column]
+        if summary.kinds[column] == "cat":
+            cats = summary.categories[column]
+            rows = [i for i in rows if _compare(cats[col[i]], op, raw)]
+        else:
+            value = float(raw)
+            rows = [i for i in rows if _compare(col[i], op, value)]
+    return list(rows)
+
+def percentile(values, q):
+    # linear interpolation between closest ranks (numpy's default)
+    if not values:
+        return float("nan")
+    values = sorted(values)
+    pos = (len(values) - 1) * q
+    lo = int(pos)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+def aggregate(func, values):
+    values = [v for v in values if v == v]  # NaN = not recorded
+    if func == "count":
+        return len(values)
+    if not values:
+        return float("nan")
+    if func == "mean":
+        return sum(values) / len(values)
+    if func == "median":
+        return percentile(values, 0.5)
+    if func == "min":
+        return min(values)
+    if func == "max":
+        return max(values)
+    if func == "sum":
+        return sum(values)
+    if func.startswith("p") and func[1:].isdigit():
+        return percentile(values, int(func[1:]) / 100)
+    raise ValueError(f"unknown aggregate: {func}")
+
+def query(summary, group_by=None, aggs=("count",), where=None):
+    # -> (header, rows); group keys sorted numerically where possible
+    rows = select_rows(summary, where)
+    group_by = group_by or []
+    specs = []
+    for spec in aggs:
+        func, _, column = spec.partition(":")
+        if func != "count" and column not in summary.columns:
+            raise ValueError(f"unknown column in {spec}")
+        specs.append((func, column or None))
+    for column in group_by:
+        if column not in summary.columns:
+            raise ValueError(f"unknown column: {column}")
+    groups = {}
+    for i in rows:
+        key = tuple(summary.value(c, i) for c in group_by)
+        groups.setdefault(key, []).append(i)
+    header = list(group_by) + [f"{f}({c})" if c else f for f, c in specs]
+    out = []
+    for key in sorted(groups, key=lambda k: tuple((0, v, "") if isinstance(v, (int, float)) else (1, 0, v) for v in k)):
+        idx = groups[key]
+        values = []
+        for func, column in specs:
+            if column is None:
+                values.append(len(idx))
+            else:
+                col = summary.columns[column]
+                values.append(aggregate(func, [col[i] for i in idx]))
+        out.append(list(key) + values)
+    return header, out
+
+def format_rows(header, rows, fmt="table"):
+    def cell(v):
+        if isinstance(v, float):
+            return "" if v != v else f"{v:.2f}".rstrip("0").rstrip(".")
+        return str(v)
+    if fmt == "csv":
+        return "\n".join(",".join(cell(v) for v in r) for r in [header] + rows)
+    if fmt == "json":
+        return json.dumps([dict(zip(header, r)) for r in rows], indent=1)
+    cells = [[cell(v) for v in r] for r in [header] + rows]
+    widths = [max(len(r[i]) for r in cells) for i in range(len(header))]
+    return "\n".join("  ".join(c.rjust(w) for c, w in zip(r, widths)) for r in cells)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Aggregate queries over a directory of save files")
+    ap.add_argument("saves", help="directory of SaveManager JSON files (searched recursively)")
+    ap.add_argument("--cache", help="summary cache file; only new/changed saves are parsed again")
+    ap.add_argument("-j", "--workers", type=int, default=0, help="parser processes (default: all cores)")
+    ap.add_argument("--where", action="append", default=[], help="filter, e.g. class=Paladin or level>=10")
+    ap.add_argument("--group-by", default="", help="comma-separated columns")
+    ap.add_argument("--agg", action="append", default=[], help="count, mean:col, median:col, p90:col, ...")
+    ap.add_argument("--format", choices=("table", "csv", "json"), default="table")
+    ap.add_argument("--columns", action="store_true", help="list the available columns")
+    ap.add_argument("--errors", action="store_true", help="list files that could not be parsed")
+    args = ap.parse_args(argv)
+
+    if args.columns:
+        for name, kind in COLUMNS:
+            print(f"{name:22} {kind}")
+        return 0
+    if not os.path.isdir(args.saves):
+        print(f"ERROR: {args.saves} is not a directory")
+        return 1
+    summary, stats = scan(args.saves, load_cache(args.cache), args.workers or None,
+                          progress=lambda m: print(m, file=sys.stderr))
+    if args.cache:
+        write_cache(args.cache, summary)
+    print(f"{stats['files']} saves: {stats['parsed']} parsed ({stats['bytes'] / 1e6:.1f} MB), "
+          f"{stats['cached']} cached, {len(summary.errors)} unreadable in {stats['seconds']:.2f} s",
+          file=sys.stderr)
+    if args.errors:
+        for rel, err in sorted(summary.errors.items()):
+            print(f"{rel}: {err}")
+        return 0
+    try:
+        t0 = time.perf_counter()
+        header, rows = query(summary, [c for c in args.group_by.split(",") if c], args.agg or ["count"], args.where)
+    except ValueError as e:
+        print(f"ERROR: {e}")
+        return 1
+    print(format_rows(header, rows, args.format))
+    print(f"query over {len(summary)} saves in {(time.perf_counter() - t0) * 1000:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+"""
+content_schema.py
+Uldtale-Battlesim Content Schemas
+- One schema per JSON_FILES tab, mirroring what the Godot loaders read
+  (ItemManager.gd / Item.gd / Equipment.gd, SkillManager.gd / Skill.gd, StatusEffectManager.gd)
+- Schemas are compiled once into checker functions
+- Cross-file references: class skills -> skills.json, skill/consumable status_effect ->
+  status_effects.json, item rarity -> rarities.json, class_restriction -> classes.json
+- ContentValidator keeps issues per entry and re-checks incrementally on every mutation
+  (including referrers of an added/removed key); a full run is a cold rebuild
+"""
+
+from content_data import JSON_FILES, iter_entries, entry_depth
+
+# enums the loaders index by name (scenes/mechanics/Skill.gd, scripts/resources/Item.gd)
+ENUMS = {
+    "SkillType": ("DAMAGE", "HEAL", "BUFF", "DEBUFF", "RESTORE", "INFLICT_STATUS", "DRAIN"),
+    "TargetType": ("SELF", "ALLY", "ENEMY", "ALL_ALLIES", "ALL_ENEMIES"),
+    "AttributeTarget": ("NONE", "VITALITY", "STRENGTH", "DEXTERITY", "INTELLIGENCE", "FAITH",
+                        "MIND", "ENDURANCE", "ARCANE", "AGILITY", "FORTITUDE"),
+    "StatusEffect": ("NONE", "POISON", "BURN", "FREEZE", "BLEED", "SHOCK", "CONFUSED", "BLIND",
+                     "SLEEP", "REGENERATION", "ENRAGED", "REFLECT"),
+    "AbilityType": ("PHYSICAL", "MAGICAL"),
+    "DrainTarget": ("HP", "MP", "SP"),
+    "ElementType": ("NONE", "EARTH", "FIRE", "ICE", "WIND", "LIGHTNING", "HOLY", "DARK", "PHYSICAL"),
+    "ItemType": ("CONSUMABLE", "MATERIAL", "TREASURE", "INGREDIENT", "WEAPON", "ARMOR", "KEY_ITEM"),
+    "ConsumableType": ("DAMAGE", "HEAL", "BUFF", "DEBUFF", "RESTORE", "CURE"),
+    "DamageType": ("none", "hp_percent", "flat", "heal_percent", "stackable_burst"),
+    "HandSlot": ("main_hand", "off_hand"),
+    # CharacterData.calculate_secondary_stats match arms
+    "AttackPowerType": ("strength", "dexterity"),
+    "SpellPowerType": ("balanced", "intelligence", "arcane"),
+}
+
+# reference values that mean "no reference"
+NO_REF = ("", "NONE")
+
+
+class Issue:
+    __slots__ = ("severity", "tab", "path", "field", "message")
+
+    def __init__(self, severity, tab, path, field, message):
+        self.severity = severity
+        self.tab = tab
+        self.path = tuple(path)
+        self.field = field
+        self.message = message
+
+    def __str__(self):
+        where = "/".join(self.path) + (f".{self.field}" if self.field else "")
+        return f"{self.severity.upper()} {self.tab}: {where}: {self.message}"
+
+    def to_json(self):
+        return {"severity": self.severity, "tab": self.tab, "path": list(self.path),
+                "field": self.field, "message": self.message}
+
+
+# -------------------------
+# Checkers: value -> error message or None; .ok is the fast predicate
+# used on the (common) valid path, the message is only built on failure
+# -------------------------
+def _type(name, types):
+    # exact type match: bool is an int subclass but the loaders treat it as a different type
+    allowed = frozenset(types)
+
+    def check(v):
+        if type(v) not in allowed:
+            return f"expected {name}, got {type(v).__name__} {v!r}"
+        return None
+    check.ok = lambda v: type(v) in allowed
+    check.types = allowed
+    check.label = name
+    return check
+
+INT = _type("int", (int,))
+NUMBER = _type("number", (int, float))
+STR = _type("string", (str,))
+BOOL = _type("bool", (bool,))
+DICT = _type("object", (dict,))
+
+def enum(name, ignore_case=False):
+    values = ENUMS[name]
+    allowed = frozenset(v.upper() for v in values) if ignore_case else frozenset(values)
+
+    def check(v):
+        if type(v) is not str:
+            return f"expected {name} name, got {type(v).__name__} {v!r}"
+        if (v.upper() if ignore_case else v) not in allowed:
+            return f"{v!r} is not a {name} ({', '.join(values)})"
+        return None
+    if ignore_case:
+        check.ok = lambda v: type(v) is str and v.upper() in allowed
+    else:
+        check.ok = lambda v: type(v) is str and v in allowed
+    check.label = name
+    return check
+
+def list_of(item):
+    ok = item.ok
+
+    def check(v):
+        if type(v) is not list:
+            return f"expected list of {item.label}, got {type(v).__name__} {v!r}"
+        for i, x in enumerate(v):
+            err = item(x)
+            if err:
+                return f"[{i}] {err}"
+        return None
+    check.ok = lambda v: type(v) is list and all(map(ok, v))
+    check.label = f"list of {item.label}"
+    return check
+
+def map_of(value, key=None):
+    ok = value.ok
+    key_ok = key.ok if key else None
+
+    def check(v):
+        if type(v) is not dict:
+            return f"expected object, got {type(v).__name__} {v!r}"
+        for k, x in v.items():
+            err = (key and key(k)) or value(x)
+            if err:
+                return f"[{k}] {err}"
+        return None
+    check.ok = lambda v: (type(v) is dict and all(map(ok, v.values()))
+                          and (key_ok is None or all(map(key_ok, v))))
+    check.label = f"object of {value.label}"
+    return check
+
+def one_of(*checkers):
+    oks = [c.ok for c in checkers]
+
+    def ok_any(v):
+        for ok in oks:
+            if ok(v):
+                return True
+        return False
+
+    def check(v):
+        if ok_any(v):
+            return None
+        return "expected " + " or ".join(c.label for c in checkers) + f", got {v!r}"
+    check.ok = ok_any
+    check.label = " or ".join(c.label for c in checkers)
+    return check
+
+
+# -------------------------
+# Schemas
+# -------------------------
+STAT = enum("AttributeTarget", ignore_case=True)
+ELEMENT = enum("ElementType", ignore_case=True)
+STATUS_NAME = enum("StatusEffect", ignore_case=True)
+
+_EQUIPMENT = {
+    "required": {
+        "name": STR, "description": STR, "value": INT, "type": STR, "slot": STR,
+        "class_restriction": list_of(STR), "rarity": STR,
+    },
+    "optional": {
+        "damage": INT, "armor_value": INT, "spell_power": INT,
+        # stored as-is by Equipment.gd (may name derived stats such as spell_ward)
+        "attribute_target": one_of(STR, list_of(STR)),
+        "attribute_increase": one_of(INT, list_of(INT)),
+        "effects": map_of(NUMBER),
+    },
+}
+
+SCHEMAS = {
+    "Classes": {
+        "required": dict(
+            {f"base_{s}": INT for s in ("vit", "str", "dex", "int", "fai", "mnd", "end", "arc", "agi", "for")},
+            attack_power_type=enum("AttackPowerType"), spell_power_type=enum("SpellPowerType"),
+            skills=list_of(STR),
+        ),
+        # an unmatched power type leaves the stat at its default instead of failing to load
+        "warn": ("attack_power_type", "spell_power_type"),
+    },
+    "Races": {
+        "required": {f"{s}_mod": INT for s in ("vit", "str", "dex", "int", "fai", "mnd", "end", "arc", "agi", "for")},
+        "optional": {
+            "elemental_resistances": map_of(NUMBER, ELEMENT),
+            "elemental_weaknesses": map_of(NUMBER, ELEMENT),
+            "elemental_damage_bonuses": map_of(NUMBER, ELEMENT),
+        },
+    },
+    "Skills": {
+        "required": {
+            "name": STR, "description": STR, "power": INT, "cooldown": INT, "duration": INT,
+            "ability_type": enum("AbilityType", ignore_case=True),
+            "type": enum("SkillType", ignore_case=True),
+            "target": enum("TargetType", ignore_case=True),
+        },
+        "optional": {
+            "mp_cost": INT, "sp_cost": INT, "category": STR,
+            "element": one_of(ELEMENT, list_of(ELEMENT)),
+            "elements": list_of(ELEMENT),
+            "attribute_target": one_of(STAT, list_of(STAT)),
+            "attribute_targets": one_of(list_of(STAT), STAT),
+            "status_effect": one_of(STATUS_NAME, list_of(STATUS_NAME)),
+            "status_effects": list_of(STATUS_NAME),
+            "drain_source": enum("DrainTarget", ignore_case=True),
+            "drain_restore": enum("DrainTarget", ignore_case=True),
+            "drain_efficiency": NUMBER,
+        },
+    },
+    "Rarities": {
+        "required": {"multiplier": NUMBER, "color": STR},
+    },
+    "Status Effects": {
+        "required": {"damage_type": enum("DamageType"), "message": STR},
+        "optional": dict(
+            {f: NUMBER for f in ("damage_value", "stun_chance", "burst_damage_percent", "accuracy_reduction",
+                                 "self_harm_chance", "self_harm_multiplier", "dodge_reduction", "reflect_damage")},
+            stat_modifiers=map_of(NUMBER), max_stacks=INT, break_on_damage=BOOL,
+        ),
+    },
+    "Armors": _EQUIPMENT,
+    "Weapons": {
+        "required": _EQUIPMENT["required"],
+        "optional": dict(
+            _EQUIPMENT["optional"],
+            dual_wieldable=BOOL, dual_wield_classes=list_of(STR), preferred_slot=enum("HandSlot"),
+            blocks_offhand=BOOL, offhand_exceptions=list_of(STR),
+        ),
+    },
+    "Consumables": {
+        # Item.create_from_dict indexes these enums by exact name
+        "required": {
+            "name": STR, "description": STR, "value": INT, "item_type": enum("ItemType"),
+            "consumable_type": enum("ConsumableType"), "effect_duration": INT,
+        },
+        "optional": {
+            "target_type": enum("TargetType"), "stackable": BOOL, "max_stack": INT,
+            "is_percentage_based": BOOL, "effect_power": INT, "effect_percent": NUMBER,
+            "combat_usable": BOOL, "status_effect": enum("StatusEffect"), "poison_chance": NUMBER,
+            "buff_type": STR,
+        },
+    },
+    "Materials": {
+        "required": {"name": STR, "description": STR, "value": INT, "item_type": enum("ItemType")},
+        "optional": {"stackable": BOOL, "max_stack": INT},
+    },
+}
+
+# tab -> field -> referenced tab (keys of that tab's entries)
+REFS = {
+    "Classes": {"skills": "Skills"},
+    "Skills": {"status_effect": "Status Effects", "status_effects": "Status Effects"},
+    "Armors": {"rarity": "Rarities", "class_restriction": "Classes"},
+    "Weapons": {"rarity": "Rarities", "class_restriction": "Classes", "dual_wield_classes": "Classes"},
+    "Consumables": {"status_effect": "Status Effects"},
+}
+
+# tree tabs: entry fields that must agree with where the entry sits in the file
+PATH_FIELDS = {
+    "Armors": ("type", "slot"),
+    "Weapons": ("slot", "type"),
+}
+
+
+def _rule_consumable(path, entry):
+    if not entry.get("is_percentage_based", False) and "effect_power" not in entry:
+        yield "effect_power", "required unless is_percentage_based is true"
+
+def _rule_skill(path, entry):
+    if entry.get("name") != path[-1]:
+        yield "name", f"{entry.get('name')!r} differs from key {path[-1]!r} (SkillManager looks skills up by key)"
+
+# extra per-entry rules: (path, entry) -> [(field, message)] errors
+RULES = {
+    "Consumables": _rule_consumable,
+    "Skills": _rule_skill,
+}
+RULE_SEVERITY = {"Skills": "warning"}
+
+
+def compile_schema(tab, schema):
+    # -> function(path, entry) -> [Issue] covering types, required/unknown fields and path rules
+    required = list(schema.get("required", {}))
+    required_set = frozenset(required)
+    known = dict(schema.get("required", {}), **schema.get("optional", {}))
+    # plain type fields are checked inline, the rest through their predicates
+    types = {field: check.types for field, check in known.items() if hasattr(check, "types")}
+    oks = {field: check.ok for field, check in known.items() if field not in types}
+    path_fields = PATH_FIELDS.get(tab, ())
+    rule = RULES.get(tab)
+    rule_severity = RULE_SEVERITY.get(tab, "error")
+    warn = set(schema.get("warn", ()))
+
+    def validate(path, entry):
+        if type(entry) is not dict:
+            return [Issue("error", tab, path, None, f"entry must be an object, got {type(entry).__name__}")]
+        out = []
+        if not entry.keys() >= required_set:
+            for field in required:
+                if field not in entry:
+                    out.append(Issue("error", tab, path, field, "missing required field"))
+        for field, value in entry.items():
+            allowed = types.get(field)
+            if allowed is not None:
+                if type(value) in allowed:
+                    continue
+            else:
+                ok = oks.get(field)
+                if ok is None:
+                    out.append(Issue("warning", tab, path, field, "unknown field"))
+                    continue
+                if ok(value):
+                    continue
+            severity = "warning" if field in warn else "error"
+            out.append(Issue(severity, tab, path, field, known[field](value)))
+        for field, expected in zip(path_fields, path):
+            if field in entry and entry[field] != expected:
+                out.append(Issue("error", tab, path, field, f"{entry[field]!r} but entry is filed under {expected!r}"))
+        if rule:
+            out.extend(Issue(rule_severity, tab, path, f, m) for f, m in rule(path, entry))
+        return out
+    return validate
+
+COMPILED = {tab: compile_schema(tab, s) for tab, s in SCHEMAS.items()}
+
+# referenced tab -> [(referring tab, field)]
+REFERRERS = {}
+for _tab, _fields in REFS.items():
+    for _field, _target in _fields.items():
+        REFERRERS.setdefault(_target, []).append((_tab, _field))
+
+
+def related_tabs(tabs):
+    # tabs plus everything they reference and everything referencing them
+    out = set(tabs)
+    for tab in tabs:
+        out.update(REFS.get(tab, {}).values())
+        out.update(t for t, _ in REFERRERS.get(tab, ()))
+    return out
+
+def ref_values(value):
+    values = value if isinstance(value, list) else [value]
+    return [v for v in values if isinstance(v, str) and v not in NO_REF]
+
+def tab_keys(tab, data):
+    return {path[-1] for path, _ in iter_entries(tab, data)}
+
+
+# -------------------------
+# Validator
+# -------------------------
+class ContentValidator:
+    def __init__(self):
+        self.entries = {}    # tab -> {path tuple: [Issue]}
+        self.keys = {}       # referenced tab -> set(entry keys)
+        self.refs = {}       # (tab, path tuple) -> set((target tab, key)) it points at
+        self.referrers = {}  # (target tab, key) -> set((tab, path tuple))
+
+    def reset(self):
+        self.entries.clear()
+        self.keys.clear()
+        self.refs.clear()
+        self.referrers.clear()
+
+    # -- pure checks --
+    def check_entry(self, data, tab, path, entry):
+        # schema + outgoing reference issues for one entry; data supplies the referenced tabs
+        return self._check_entry(data, tab, tuple(path), entry)[0]
+
+    def _check_entry(self, data, tab, path, entry):
+        compiled = COMPILED.get(tab)
+        issues = compiled(path, entry) if compiled else []
+        targets = set()
+        fields = REFS.get(tab)
+        if not fields or type(entry) is not dict:
+            return issues, targets
+        for field, target in fields.items():
+            value = entry.get(field)
+            if not value:
+                continue
+            keys = self._keys(data, target)
+            for ref in ref_values(value):
+                targets.add((target, ref))
+                # an unloaded referenced tab is checked once it loads (see load_tab)
+                if keys is not None and ref not in keys:
+                    issues.append(Issue("error", tab, path, field, f"{ref!r} not found in {JSON_FILES[target]}"))
+        return issues, targets
+
+    def _keys(self, data, target):
+        keys = self.keys.get(target)
+        if keys is None and target in data:
+            keys = self.keys[target] = tab_keys(target, data[target])
+        return keys
+
+    def validate_all(self, data):
+        # full (cold) run over every loaded tab
+        self.reset()
+        for tab in REFERRERS:
+            self._keys(data, tab)
+        for tab in JSON_FILES:
+            if tab in data:
+                self.load_tab(data, tab)
+        return self.issues()
+
+    # -- incremental state --
+    def load_tab(self, data, tab):
+        # (re)validate a whole tab, e.g. when it is first parsed or reloaded from disk
+        for path in list(self.entries.get(tab, {})):
+            self._forget(tab, path)
+        self.entries[tab] = {}
+        old = self.keys.get(tab)
+        if tab in REFERRERS:
+            self.keys[tab] = tab_keys(tab, data[tab])
+        for path, entry in iter_entries(tab, data[tab]):
+            self._check(data, tab, tuple(path), entry)
+        if tab in REFERRERS:
+            if old is None:
+                # referrers checked while this tab was not loaded yet
+                changed = {key for t, key in self.referrers if t == tab}
+            else:
+                changed = old ^ self.keys[tab]
+            self._recheck_referrers(data, tab, changed)
+
+    def update(self, data, tab, path):
+        # re-check after a mutation at path (field, entry or container level)
+        if tab not in self.entries or tab not in data:
+            return
+        depth = entry_depth(tab)
+        path = tuple(path[:depth])
+        n = len(path)
+        entries = self.entries[tab]
+        if n == depth:
+            existed = path in entries
+            if existed:
+                self._forget(tab, path)
+            entry = _entry_at(data[tab], path)
+            if entry is not None:
+                self._check(data, tab, path, entry)
+            structural = existed != (entry is not None)
+        else:
+            for p in [p for p in entries if p[:n] == path]:
+                self._forget(tab, p)
+            for p, entry in iter_entries(tab, data[tab]):
+                if tuple(p[:n]) == path:
+                    self._check(data, tab, tuple(p), entry)
+            structural = True
+        if structural and tab in REFERRERS:
+            # an entry appeared or disappeared: re-check whatever points at changed keys
+            old = self.keys.get(tab, set())
+            new = self.keys[tab] = tab_keys(tab, data[tab])
+            self._recheck_referrers(data, tab, old ^ new)
+
+    def _recheck_referrers(self, data, tab, keys):
+        for key in keys:
+            for rtab, rpath in list(self.referrers.get((tab, key), ())):
+                entry = _entry_at(data.get(rtab), rpath)
+                self._forget(rtab, rpath)
+                if entry is not None:
+                    self._check(data, rtab, rpath, entry)
+
+    def _check(self, data, tab, path, entry):
+        issues, targets = self._check_entry(data, tab, path, entry)
+        self.entries.setdefault(tab, {})[path] = issues or ()
+        if targets:
+            self.refs[(tab, path)] = targets
+            for t in targets:
+                refs = self.referrers.get(t)
+                if refs is None:
+                    self.referrers[t] = {(tab, path)}
+                else:
+                    refs.add((tab, path))
+
+    def _forget(self, tab, path):
+        self.entries.get(tab, {}).pop(path, None)
+        for t in self.refs.pop((tab, path), ()):
+            refs = self.referrers.get(t)
+            if refs:
+                refs.discard((tab, path))
+
+    # -- results --
+    def issues(self, tabs=None, severity=None):
+        out = []
+        for tab in JSON_FILES:
+            if tabs is not None and tab not in tabs:
+                continue
+            for found in self.entries.get(tab, {}).values():
+                if found:
+                    out.extend(i for i in found if severity is None or i.severity == severity)
+        return out
+
+    def errors(self, tabs=None):
+        return self.issues(tabs, "error")
+
+
+def _entry_at(root, path):
+    cur = root
+    for p in path:
+        if not isinstance(cur, dict) or p not in cur:
+            return None
+        cur = cur[p]
+    return cur
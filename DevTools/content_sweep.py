@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+content_sweep.py
+Uldtale-Battlesim Balance Sweep Runner
+- Runs content_balance over the full grid: every playable class x race, floors and
+  momentum levels, split into one shard per (momentum, floor)
+- Shards are spread over a process pool; each shard gets its own seed derived from the
+  sweep seed and the shard key (a fixed-seed take on RandomManager.new_game_seed), so results
+  do not depend on worker count or completion order
+- Finished shards are appended to a JSON-lines results file (flushed and fsync'd one line
+  at a time); rerunning the same command resumes with the shards that are missing
+- The results file header records the sweep parameters and a hash of the content, and a
+  resume against different settings or edited content is refused
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import multiprocessing
+
+import content_balance
+from content_balance import BalanceTables, MAX_MOMENTUM, format_summary, load_data, parse_floors, simulate
+from content_pack import sha256_bytes
+
+SWEEP_FORMAT = "uldtale-balance-sweep"
+SWEEP_VERSION = 1
+DEFAULT_OUT = "balance_sweep.jsonl"
+
+
+class SweepError(Exception):
+    pass
+
+
+def content_hash(data):
+    return sha256_bytes(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+
+def shard_seed(seed, shard):
+    # independent stream per shard: same numbers whichever worker runs it, and when
+    return content_balance.np.random.SeedSequence(seed, spawn_key=tuple(shard))
+
+
+# -------------------------
+# Results file
+# -------------------------
+def read_results(path):
+    # -> (header or None, {shard: record}, offset of the end of the last complete line)
+    header, done, good = None, {}, 0
+    if not os.path.exists(path):
+        return header, done, good
+    with open(path, "rb") as f:
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break  # cut off mid-write by an interrupted run
+            try:
+                rec = json.loads(raw.decode("utf-8"))
+            except ValueError:
+                break
+            if header is None:
+                if "sweep" not in rec:
+                    raise SweepError(f"{path} is not a sweep results file")
+                header = rec["sweep"]
+            else:
+                done[tuple(rec["shard"])] = rec
+            good += len(raw)
+    return header, done, good
+
+def append_line(fh, record):
+    fh.write(json.dumps(record, separators=(",", ":")) + "\n")
+    fh.flush()
+    os.fsync(fh.fileno())
+
+
+# -------------------------
+# Workers
+# -------------------------
+_worker = {}
+
+def _init_worker(data, params):
+    # tables are built once per process, not per shard
+    _worker["tables"] = BalanceTables(data)
+    _worker["params"] = params
+
+def _run_shard(shard):
+    p = _worker["params"]
+    momentum, floor = shard
+    result = simulate(_worker["tables"], [floor], p["duels"], shard_seed(p["seed"], shard),
+                      p["classes"], p["races"], p["level_offset"], p["wave"], momentum, p["max_turns"])
+    duels = p["duels"]
+    # counts rather than rates, so shards combine exactly
+    return {
+        "shard": list(shard),
+        "wins": (result["win_rate"][:, :, 0] * duels).round().astype(int).tolist(),
+        "draws": (result["draw_rate"][:, :, 0] * duels).round().astype(int).tolist(),
+        "turns": (result["mean_turns"][:, :, 0] * duels).round().astype(int).tolist(),
+        "seconds": round(result["seconds"], 3),
+    }
+
+
+# -------------------------
+# Sweep
+# -------------------------
+def sweep_header(data, floors, momentum, duels, seed, classes=None, races=None,
+                 level_offset=0, wave=1, max_turns=200):
+    tables = BalanceTables(data)
+    return {
+        "format": SWEEP_FORMAT,
+        "version": SWEEP_VERSION,
+        "content": content_hash(data),
+        "classes": [c for c in tables.player_classes if classes is None or c in classes],
+        "races": [r for r in tables.player_races if races is None or r in races],
+        "floors": list(floors),
+        "momentum": list(momentum),
+        "duels": duels,
+        "seed": seed,
+        "level_offset": level_offset,
+        "wave": wave,
+        "max_turns": max_turns,
+    }
+
+def run_sweep(data, header, out_path, workers=None, restart=False, progress=print):
+    # -> {"shards": total, "ran": n, "duels": n, "seconds": s}; SweepError on a mismatched file
+    if restart and os.path.exists(out_path):
+        os.remove(out_path)
+    existing, done, good = read_results(out_path)
+    if existing is not None and existing != header:
+        changed = sorted(k for k in set(existing) | set(header) if existing.get(k) != header.get(k))
+        raise SweepError(f"{out_path} belongs to a different sweep ({', '.join(changed)} differ); "
+                         "use another --out or --restart")
+    shards = [(m, f) for m in header["momentum"] for f in header["floors"]]
+    todo = [s for s in shards if s not in done]
+    cells = len(header["classes"]) * len(header["races"])
+    stats = {"shards": len(shards), "ran": 0, "duels": 0, "seconds": 0.0}
+    if done:
+        progress(f"Resuming: {len(done)}/{len(shards)} shards already in {out_path}")
+    if not todo:
+        return stats
+
+    params = {k: header[k] for k in ("duels", "seed", "level_offset", "wave", "max_turns")}
+    params["classes"], params["races"] = header["classes"], header["races"]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(todo)))
+    t0 = time.perf_counter()
+    with open(out_path, "r+b" if existing is not None else "wb") as raw:
+        raw.truncate(good)  # drop a half-written last line
+    with open(out_path, "a", encoding="utf-8") as fh:
+        if existing is None:
+            append_line(fh, {"sweep": header})
+        if workers == 1:
+            _init_worker(data, params)
+            results = map(_run_shard, todo)
+            pool = None
+        else:
+            pool = multiprocessing.get_context("spawn").Pool(workers, _init_worker, (data, params))
+            results = pool.imap_unordered(_run_shard, todo)
+        try:
+            for rec in results:
+                append_line(fh, rec)
+                stats["ran"] += 1
+                stats["duels"] += cells * header["duels"]
+                elapsed = time.perf_counter() - t0
+                progress(f"[{len(done) + stats['ran']}/{len(shards)}] momentum {rec['shard'][0]} "
+                         f"floor {rec['shard'][1]}: {stats['duels'] / elapsed:,.0f} duels/s")
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
+    stats["seconds"] = time.perf_counter() - t0
+    return stats
+
+def collect(out_path):
+    # results file -> one content_balance-style result per momentum level (missing shards are NaN)
+    np = content_balance.np
+    header, done, _ = read_results(out_path)
+    if header is None:
+        raise SweepError(f"{out_path}: no results")
+    shape = (len(header["classes"]), len(header["races"]), len(header["floors"]))
+    duels = header["duels"]
+    by_momentum = {}
+    for m in header["momentum"]:
+        res = {"classes": header["classes"], "races": header["races"], "floors": header["floors"],
+               "duels": duels, "momentum": m}
+        for key in ("win_rate", "draw_rate", "mean_turns"):
+            res[key] = np.full(shape, np.nan)
+        for fi, f in enumerate(header["floors"]):
+            rec = done.get((m, f))
+            if rec is None:
+                continue
+            res["win_rate"][:, :, fi] = np.array(rec["wins"]) / duels
+            res["draw_rate"][:, :, fi] = np.array(rec["draws"]) / duels
+            res["mean_turns"][:, :, fi] = np.array(rec["turns"]) / duels
+        by_momentum[m] = res
+    return header, by_momentum
+
+def write_csv(header, by_momentum, fh):
+    fh.write("class,race,floor,momentum,win_rate,draw_rate,mean_turns\n")
+    for m, res in by_momentum.items():
+        for ci, c in enumerate(res["classes"]):
+            for ri, r in enumerate(res["races"]):
+                for fi, f in enumerate(res["floors"]):
+                    if res["win_rate"][ci, ri, fi] != res["win_rate"][ci, ri, fi]:
+                        continue  # NaN: shard not run yet
+                    fh.write(f"{c},{r},{f},{m},{res['win_rate'][ci, ri, fi]:.4f},"
+                             f"{res['draw_rate'][ci, ri, fi]:.4f},{res['mean_turns'][ci, ri, fi]:.2f}\n")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Sharded, resumable class x race x floor x momentum sweep")
+    ap.add_argument("--root", default=content_balance.DEFAULT_ROOT, help="project root")
+    ap.add_argument("--out", default=DEFAULT_OUT, help="append-only results file (JSON lines)")
+    ap.add_argument("--floors", default="1-25")
+    ap.add_argument("--momentum", default=f"0-{MAX_MOMENTUM}", help="momentum levels, e.g. 0-10 or 0,5")
+    ap.add_argument("--duels", type=int, default=1000, help="duels per class/race/floor/momentum cell")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--classes")
+    ap.add_argument("--races")
+    ap.add_argument("--level-offset", type=int, default=0)
+    ap.add_argument("--wave", type=int, default=1)
+    ap.add_argument("--max-turns", type=int, default=200)
+    ap.add_argument("-j", "--workers", type=int, default=0, help="processes (default: all cores)")
+    ap.add_argument("--restart", action="store_true", help="discard existing results first")
+    ap.add_argument("--report", action="store_true", help="only summarize the results file")
+    ap.add_argument("--format", choices=("table", "csv"), default="table")
+    args = ap.parse_args(argv)
+    content_balance._require_numpy()
+
+    try:
+        if not args.report:
+            data = load_data(args.root)
+            header = sweep_header(data, parse_floors(args.floors), parse_floors(args.momentum),
+                                  args.duels, args.seed,
+                                  args.classes.split(",") if args.classes else None,
+                                  args.races.split(",") if args.races else None,
+                                  args.level_offset, args.wave, args.max_turns)
+            stats = run_sweep(data, header, args.out, args.workers or None, args.restart,
+                              progress=lambda m: print(m, file=sys.stderr))
+            if stats["ran"]:
+                print(f"{stats['ran']} shard(s), {stats['duels']} duels in {stats['seconds']:.1f} s "
+                      f"({stats['duels'] / stats['seconds']:,.0f} duels/s)", file=sys.stderr)
+        header, by_momentum = collect(args.out)
+    except SweepError as e:
+        print("ERROR:", e)
+        return 1
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; rerun the same command to resume from {args.out}", file=sys.stderr)
+        return 130
+
+    if args.format == "csv":
+        write_csv(header, by_momentum, sys.stdout)
+        return 0
+    for m, res in by_momentum.items():
+        print(f"momentum {m}: player win % per floor")
+        print(format_summary(res))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
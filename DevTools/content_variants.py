@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""
+content_variants.py
+Uldtale-Battlesim Item Variant Generator
+- Expands item templates into variants from a rules file (DevTools/variant_rules.json, see
+  load_rules): each rule picks templates in an item tab (path glob + --where style filters)
+  and crosses them with named axes such as material tiers, themed affixes or per-class versions
+- An axis option renames ("{name}", "{value}"), scales / adds to numeric fields (dotted paths
+  reach into "effects"; scale skips fields the entry lacks, add creates them) and sets fields; "for_each" repeats an option per value of a template
+  list field (e.g. one variant per class_restriction entry)
+- Variants are keyed with make_key_from_name and deduplicated against every item id
+  (the game looks items up by id alone) and each other; existing entries are never replaced,
+  so a rerun adds nothing. Entries that another template's variants would produce are not
+  used as templates
+- Each variant is checked with the tab schema and references (content_schema) and dropped
+  with its first issue when invalid
+- Variants are built copy-on-write and streamed into the file's slot/type tree right after
+  the template's group, in the editor's layout (dump_json); only the set of ids is kept,
+  so memory does not grow with the number of variants. The replaced file is backed up
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import argparse
+import itertools
+
+from content_data import (
+    JSON_FILES, atomic_write, backup_file, entry_depth, iter_entries, make_key_from_name, safe_load,
+)
+from content_cli import matches_where, parse_where
+from content_index import ITEM_TABS
+from content_pack import PackError, build_pack, pack_exists
+from content_schema import PATH_FIELDS, ContentValidator
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "variant_rules.json")
+OPTION_KEYS = ("name", "scale", "add", "set", "for_each")
+CHUNK = 1 << 16
+
+
+class RuleError(Exception):
+    pass
+
+class NothingNew(Exception):
+    pass
+
+
+# -------------------------
+# Rules
+# -------------------------
+def load_rules(path=RULES_FILE):
+    # {"axes": {axis: [option, ...]}, "rules": [{"tab", "from", "where", "axes"}]}; "_comment" keys are ignored
+    data = safe_load(path)
+    if not data:
+        raise RuleError(f"no rules in {path}")
+    axes = data.get("axes", {})
+    rules = []
+    for i, rule in enumerate(data.get("rules", [])):
+        tab = rule.get("tab")
+        if tab not in ITEM_TABS:
+            raise RuleError(f"rule {i}: tab must be one of {', '.join(ITEM_TABS)}, got {tab!r}")
+        for name in rule.get("axes", []):
+            if name not in axes:
+                raise RuleError(f"rule {i}: unknown axis {name!r}")
+            for option in axes[name]:
+                check_option(tab, name, option)
+        rules.append(rule)
+    return axes, rules
+
+def check_option(tab, axis, option):
+    unknown = set(option) - set(OPTION_KEYS)
+    if unknown:
+        raise RuleError(f"axis {axis}: unknown option key(s) {', '.join(sorted(unknown))}")
+    moved = set(PATH_FIELDS.get(tab, ())) & set(option.get("set", {}))
+    if moved:
+        # variants stay in their template's slot/type group
+        raise RuleError(f"axis {axis}: cannot set {', '.join(sorted(moved))} (that is where the entry is filed)")
+    for field in list(option.get("scale", {})) + list(option.get("add", {})):
+        if not field.replace(".", "").replace("_", "").isalnum():
+            raise RuleError(f"axis {axis}: bad field path {field!r}")
+    try:
+        _fill([option.get("name", ""), option.get("set", {})], {"name": "", "value": ""})
+    except (KeyError, ValueError, IndexError) as e:
+        raise RuleError(f"axis {axis}: bad placeholder in {option} ({e})")
+    if "{value}" in json.dumps(option) and not option.get("for_each"):
+        raise RuleError(f"axis {axis}: {{value}} needs for_each")
+
+
+# -------------------------
+# Expansion
+# -------------------------
+def _fill(value, subst):
+    if isinstance(value, str):
+        return value.format_map(subst)
+    if isinstance(value, list):
+        return [_fill(v, subst) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, subst) for k, v in value.items()}
+    return value
+
+def _number(old, new):
+    # ints stay ints (the loaders read value / damage / armor_value as int)
+    if isinstance(old, int) and not isinstance(old, bool):
+        return int(round(new))
+    return round(new, 4)
+
+def _update(entry, path, fn, create=False):
+    # copy-on-write: copies only the dicts along the dotted path; a missing field is left
+    # out unless create (then it starts from 0)
+    keys = path.split(".")
+    if not create:
+        cur = entry
+        for k in keys:
+            if not isinstance(cur, dict) or k not in cur:
+                return entry
+            cur = cur[k]
+    out = dict(entry)
+    cur = out
+    for k in keys[:-1]:
+        cur[k] = dict(cur.get(k) or {})
+        cur = cur[k]
+    last = keys[-1]
+    old = cur.get(last, 0)
+    if isinstance(old, (int, float)) and not isinstance(old, bool):
+        cur[last] = fn(old)
+    return out
+
+def option_steps(template, option):
+    # one axis option -> [(subst, option)]; for_each repeats it per value of a template list
+    field = option.get("for_each")
+    if not field:
+        return [({}, option)]
+    values = template.get(field)
+    return [({"value": v}, option) for v in values or [] if isinstance(v, str)]
+
+def apply_option(entry, subst, option):
+    subst = dict(subst, name=entry.get("name", ""))
+    out = dict(entry)
+    if "name" in option:
+        out["name"] = option["name"].format_map(subst)
+    for field, factor in option.get("scale", {}).items():
+        out = _update(out, field, lambda v, f=factor: _number(v, v * f))
+    for field, amount in option.get("add", {}).items():
+        out = _update(out, field, lambda v, a=amount: _number(v, v + a) if isinstance(a, int) else round(v + a, 4),
+                      create=True)
+    for field, value in option.get("set", {}).items():
+        out[field] = _fill(value, subst)
+    return out
+
+def _steps(template, axes):
+    return [[step for option in options for step in option_steps(template, option)] for options in axes]
+
+def expand(template, axes):
+    # yield every variant of one template over the axes (not the template itself); depth first,
+    # so each partial variant is built once and shared by everything below it
+    steps = _steps(template, axes)
+
+    def walk(entry, i, changed):
+        if i == len(steps):
+            if changed:
+                yield entry
+            return
+        for subst, option in steps[i]:
+            if option:
+                yield from walk(apply_option(entry, subst, option), i + 1, True)
+            else:
+                yield from walk(entry, i + 1, changed)
+    return walk(template, 0, False)
+
+def variant_names(template, axes):
+    # names only (cheap): used to tell templates from earlier variants
+    for combo in itertools.product(*_steps(template, axes)):
+        if not any(option for _, option in combo):
+            continue
+        name = template.get("name", "")
+        for subst, option in combo:
+            if "name" in option:
+                name = option["name"].format_map(dict(subst, name=name))
+        yield name
+
+
+# -------------------------
+# Generator
+# -------------------------
+class VariantGenerator:
+    def __init__(self, root_dir, axes, rules):
+        self.root_dir = root_dir
+        self.axes = axes
+        self.rules = rules
+        self.data = {}
+        self.validator = ContentValidator()
+        self.seen = set()
+        self.stats = {}
+        self.issues = []
+
+    def tab_data(self, tab):
+        if tab not in self.data:
+            self.data[tab] = safe_load(os.path.join(self.root_dir, JSON_FILES[tab]))
+        return self.data[tab]
+
+    def load(self):
+        # every item id, plus the tabs the schema references (Classes, Rarities)
+        for tab in ITEM_TABS:
+            self.seen.update(path[-1] for path, _ in iter_entries(tab, self.tab_data(tab)))
+        for tab in ("Classes", "Rarities"):
+            self.tab_data(tab)
+
+    def templates(self, tab):
+        # group path -> [(template, axes)] in file order
+        data = self.tab_data(tab)
+        groups = {}
+        for rule in self.rules:
+            if rule["tab"] != tab:
+                continue
+            filters = parse_where(rule.get("where"))
+            axes = [self.axes[a] for a in rule.get("axes", [])]
+            picked = [(path, entry) for path, entry in iter_entries(tab, data)
+                      if isinstance(entry, dict) and fnmatch.fnmatchcase("/".join(path), rule.get("from", "*"))
+                      and matches_where(entry, filters)]
+            # entries another template would generate are earlier output, not templates
+            made = set()
+            for _, entry in picked:
+                made.update(make_key_from_name(n) for n in variant_names(entry, axes))
+            for path, entry in picked:
+                if path[-1] not in made:
+                    groups.setdefault(tuple(path[:-1]), []).append((entry, axes))
+        return groups
+
+    def variants(self, tab, group, templates):
+        # yield (key, entry) for the new, valid variants of one group's templates
+        stats = self.stats[tab]
+        for template, axes in templates:
+            for entry in expand(template, axes):
+                key = make_key_from_name(entry.get("name", ""))
+                if not key or key in self.seen:
+                    stats["duplicates"] += 1
+                    continue
+                self.seen.add(key)
+                issues = [i for i in self.validator.check_entry(self.data, tab, group + (key,), entry)
+                          if i.severity == "error"]
+                if issues:
+                    stats["invalid"] += 1
+                    if len(self.issues) < 20:
+                        self.issues.append(issues[0])
+                    continue
+                stats["generated"] += 1
+                yield key, entry
+
+    def chunks(self, tab):
+        # the tab file with every group's variants appended, as encoded chunks
+        self.stats[tab] = {"generated": 0, "duplicates": 0, "invalid": 0, "bytes": 0}
+        extra = {group: self.variants(tab, group, templates) for group, templates in self.templates(tab).items()}
+        buf, size = [], 0
+        for text in stream_json(self.tab_data(tab), entry_depth(tab), extra):
+            buf.append(text)
+            size += len(text)
+            if size >= CHUNK:
+                yield self._encode(tab, buf)
+                buf, size = [], 0
+        yield self._encode(tab, buf)
+        if not self.stats[tab]["generated"]:
+            # nothing new: keep the file (and its layout) as it is
+            raise NothingNew(tab)
+
+    def _encode(self, tab, parts):
+        data = "".join(parts)
+        if os.linesep != "\n":
+            data = data.replace("\n", os.linesep)
+        raw = data.encode("utf-8")
+        self.stats[tab]["bytes"] += len(raw)
+        return raw
+
+    def write(self, tab, out=None, dry_run=False):
+        path = out or os.path.join(self.root_dir, JSON_FILES[tab])
+        old = None
+        if out is None and os.path.exists(path):
+            with open(path, "rb") as f:
+                old = f.read()
+        try:
+            if dry_run:
+                for _ in self.chunks(tab):
+                    pass
+            else:
+                atomic_write(path, self.chunks(tab))
+        except NothingNew:
+            return path
+        if old is not None and not dry_run:
+            backup_file(path, old)
+        return path
+
+
+_scalar = json.JSONEncoder(ensure_ascii=False).encode
+_string = json.encoder.encode_basestring  # C escaper, as json.dumps(ensure_ascii=False) uses
+
+def dump_value(v, pad=""):
+    # json.dumps(v, indent=4, ensure_ascii=False) with continuation lines prefixed by pad;
+    # the stdlib falls back to its pure-Python encoder whenever indent is set
+    t = type(v)
+    if t is str:
+        return _string(v)
+    if t is int:
+        return int.__repr__(v)
+    if t is float and v == v and v not in (float("inf"), float("-inf")):
+        return float.__repr__(v)
+    if t is bool:
+        return "true" if v else "false"
+    if t is dict:
+        if not v:
+            return "{}"
+        inner = pad + "    "
+        return "{\n" + ",\n".join(inner + _string(k) + ": " + dump_value(x, inner) for k, x in v.items()) \
+            + "\n" + pad + "}"
+    if t is list:
+        if not v:
+            return "[]"
+        inner = pad + "    "
+        return "[\n" + ",\n".join(inner + dump_value(x, inner) for x in v) + "\n" + pad + "]"
+    return _scalar(v)
+
+def stream_json(data, depth, extra, path=(), level=0):
+    # dump_json's layout (indent=4) for a tab tree, with extra[group path] -> iterable of
+    # (key, entry) appended to that group; entries are encoded one at a time
+    pad = " " * (4 * (level + 1))
+    items = iter(data.items())
+    if len(path) == depth - 1 and path in extra:
+        items = itertools.chain(items, extra[path])
+    first = True
+    for k, v in items:
+        yield ("{\n" if first else ",\n") + pad + _string(k) + ": "
+        first = False
+        if len(path) < depth - 1 and isinstance(v, dict):
+            yield from stream_json(v, depth, extra, path + (k,), level + 1)
+        else:
+            yield dump_value(v, pad)
+    yield "{}" if first else "\n" + " " * (4 * level) + "}"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Generate item variants from template rules")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    ap.add_argument("--rules", default=RULES_FILE, help="rules file (default: DevTools/variant_rules.json)")
+    ap.add_argument("--tab", action="append", help="only these item tabs (default: every tab with rules)")
+    ap.add_argument("--out", help="write the (single) tab here instead of its data file")
+    ap.add_argument("--dry-run", action="store_true", help="count and validate without writing")
+    args = ap.parse_args(argv)
+
+    try:
+        axes, rules = load_rules(args.rules)
+    except RuleError as e:
+        print(f"ERROR: {e}")
+        return 1
+    tabs = [t for t in ITEM_TABS if any(r["tab"] == t for r in rules) and (not args.tab or t in args.tab)]
+    if args.out and len(tabs) != 1:
+        print("ERROR: --out needs exactly one tab (use --tab)")
+        return 1
+    gen = VariantGenerator(args.root, axes, rules)
+    gen.load()
+    written = False
+    for tab in tabs:
+        start = time.perf_counter()
+        path = gen.write(tab, args.out, args.dry_run)
+        s = gen.stats[tab]
+        state = "dry run" if args.dry_run else ("written" if s["generated"] else "unchanged")
+        print(f"{tab}: {s['generated']} variant(s), {s['duplicates']} duplicate(s) skipped, "
+              f"{s['invalid']} invalid; {path}: {state}, {s['bytes']} bytes in "
+              f"{time.perf_counter() - start:.2f} s")
+        written = written or (s["generated"] and not args.dry_run and not args.out)
+    for issue in gen.issues:
+        print(f"  {issue}")
+    if written and pack_exists(args.root):
+        # keep an existing game pack in step with the new files
+        try:
+            build_pack(args.root)
+        except PackError as e:
+            print(f"WARNING: content pack not rebuilt: {e}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,173 @@
+"""
+content_watch.py
+Uldtale-Battlesim Content File Watcher
+- Polls the loaded JSON_FILES paths on a background thread (mtime/size first,
+  sha1 of the bytes only when those changed)
+- Changed files are parsed off the Tk thread and handed over per tab (latest wins)
+- Baselines are the signature of the bytes the app actually holds (set on load/save),
+  so the manager's own saves are never reported as external edits
+- merge_entries: three-way merge of unsaved edits with the new file content, entry by entry;
+  an entry changed on both sides is merged field by field (content_merge) before it counts
+  as a conflict
+"""
+
+import os
+import json
+import hashlib
+import threading
+
+from content_data import iter_entries
+from content_journal import MISSING
+from content_merge import Merge
+
+
+def read_signed(path):
+    # -> (raw bytes, signature) or (None, None) if the file is missing;
+    # stat is taken before reading so a write racing the read shows up on the next poll
+    try:
+        st = os.stat(path)
+        with open(path, "rb") as f:
+            raw = f.read()
+    except FileNotFoundError:
+        return None, None
+    return raw, (st.st_mtime_ns, st.st_size, hashlib.sha1(raw).hexdigest())
+
+def parse_json_bytes(raw, path):
+    try:
+        return json.loads(raw.decode("utf-8"))
+    except Exception as e:
+        print(f"ERROR loading {path}: {e}")
+        return None
+
+def load_signed(path):
+    # safe_load counterpart that also returns the signature of what was parsed
+    raw, sig = read_signed(path)
+    if raw is None:
+        return {}, None
+    data = parse_json_bytes(raw, path)
+    return ({} if data is None else data), sig
+
+
+class FileWatcher:
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.paths = {}     # tab -> file path
+        self.baseline = {}  # tab -> signature of the content the app holds
+        self.pending = {}   # tab -> (data, signature) waiting for the Tk thread
+        self.lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    # -- registration (Tk thread) --
+    def watch(self, tab, path, sig):
+        with self.lock:
+            self.paths[tab] = path
+            self.baseline[tab] = sig
+            self.pending.pop(tab, None)
+
+    def refresh(self, tab):
+        # re-sign after the app itself wrote the file
+        path = self.paths.get(tab)
+        if path:
+            self.watch(tab, path, read_signed(path)[1])
+
+    def clear(self):
+        with self.lock:
+            self.paths.clear()
+            self.baseline.clear()
+            self.pending.clear()
+
+    # -- polling --
+    def poll(self, tabs=None):
+        # -> {tab: (data, signature)} for files whose content differs from the baseline
+        with self.lock:
+            todo = [(t, p, self.baseline.get(t)) for t, p in self.paths.items() if tabs is None or t in tabs]
+        changed = {}
+        for tab, path, base in todo:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue  # e.g. mid-checkout; picked up once it is back
+            if base is not None and (st.st_mtime_ns, st.st_size) == base[:2]:
+                continue
+            raw, sig = read_signed(path)
+            if raw is None:
+                continue
+            if base is not None and sig[2] == base[2]:
+                # touched but identical: just move the baseline
+                with self.lock:
+                    if self.baseline.get(tab) == base:
+                        self.baseline[tab] = sig
+                continue
+            data = parse_json_bytes(raw, path)
+            if data is None:
+                continue  # half-written by a non-atomic editor: retry next poll
+            changed[tab] = (data, sig)
+        return changed
+
+    def take(self):
+        # Tk thread: hand over what the background thread found
+        with self.lock:
+            found, self.pending = self.pending, {}
+        return found
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="content-watch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                changed = self.poll()
+            except Exception as e:
+                print("Watcher error:", e)
+                continue
+            if not changed:
+                continue
+            with self.lock:
+                for tab, (data, sig) in changed.items():
+                    # skip files re-registered (saved/reloaded) since the poll started
+                    base = self.baseline.get(tab)
+                    if tab in self.paths and (base is None or base[2] != sig[2]):
+                        self.pending[tab] = (data, sig)
+
+
+# -------------------------
+# Merge
+# -------------------------
+def merge_entries(tab, base, local, disk):
+    # entry-level three-way merge of unsaved local edits onto new disk content
+    # -> (keep, conflicts): keep = [(path, local value or MISSING)] to re-apply on top of disk,
+    #    conflicts = [(path, local, disk)] changed on both sides; base None = unknown history
+    l = {tuple(p): e for p, e in iter_entries(tab, local)}
+    d = {tuple(p): e for p, e in iter_entries(tab, disk)}
+    b = None if base is None else {tuple(p): e for p, e in iter_entries(tab, base)}
+    keep, conflicts = [], []
+    paths = list(l) + [p for p in (b if b is not None else d) if p not in l]
+    for path in paths:
+        lv = l.get(path, MISSING)
+        dv = d.get(path, MISSING)
+        if lv == dv:
+            continue
+        if b is None:
+            conflicts.append((path, lv, dv))
+            continue
+        bv = b.get(path, MISSING)
+        if lv == bv:
+            continue  # untouched here: the file wins
+        if dv == bv:
+            keep.append((path, lv))
+            continue
+        m = Merge(tab)
+        merged = m.value(bv, lv, dv, path)
+        if m.conflicts or merged is MISSING:
+            conflicts.append((path, lv, dv))
+        elif merged != dv:
+            keep.append((path, merged))
+    return keep, conflicts
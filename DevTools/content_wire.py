@@ -0,0 +1,458 @@
+#!/usr/bin/env python3
+"""
+content_wire.py
+Uldtale-Battlesim Arena Wire Format
+- Compact encoding for the arena RPC payloads (ArenaNetworkManager characters, BattleNetworkSync
+  action results), decoded by scripts/network/ArenaWire.gd
+- Shared string table data/wire_ids.json, built from JSON_FILES alongside the content pack:
+  payload keys first, then enum names (status effects, attributes, elements, slots, rarities),
+  then class / race / skill / item names. Strings in the table travel as their index (one byte
+  for the first 128); its version is a CRC of the list, and peers whose versions differ keep
+  sending plain dictionaries
+- Values are tagged: small ints and the first 128 symbols fit in the tag byte, other ints are
+  zigzag varints, floats f32 when exact (like var_to_bytes), else f64
+- Actions are deltas: a bit mask of the ACTION_FIELDS that differ from the previous action on
+  the same (reliable, ordered) channel, then only those values; the timestamp is sent as the
+  difference to the previous one. The first action of a match is a delta against blank_action
+- bench: Variant bytes (content_arena.encode_variant) vs compact vs compact + delta, and
+  encode / decode time, over payloads recorded with `content_arena.py run --record`
+  (or synthesized the same way when no recording is given)
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import base64
+import struct
+import random
+import argparse
+
+from content_data import JSON_FILES, atomic_write, safe_load
+from content_index import item_entries
+
+DEFAULT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TABLE_FILE = "data/wire_ids.json"
+TABLE_FORMAT = "uldtale-wire-ids"
+TABLE_VERSION = 1
+
+# BattleNetworkSync._serialize_action_result, in mask bit order (skill_name / item_id are per type)
+ACTION_FIELDS = (
+    "type", "timestamp", "damage", "healing", "sp_cost", "mp_cost", "sp_gain", "mp_gain", "message",
+    "target_is_opponent", "is_drain", "status_effects", "status_effects_removed", "buffs_debuffs",
+    "skill_name", "item_id",
+)
+EXTRA_BIT = 1 << len(ACTION_FIELDS)  # keys outside ACTION_FIELDS follow as one dictionary
+# every other key the arena RPCs send (characters, equipment, nested action entries)
+PAYLOAD_KEYS = (
+    "name", "duration", "stat", "amount", "is_debuff",
+    "level", "race", "character_class",
+    "vitality", "strength", "dexterity", "intelligence", "faith", "mind", "endurance", "arcane",
+    "agility", "fortitude", "max_hp", "max_mp", "max_sp", "skills", "equipment",
+    "id", "key", "slot", "armor_value", "rarity", "item_level", "stat_modifiers",
+    "status_effect_type", "status_effect_chance", "bonus_damage", "item_prefix", "item_suffix",
+    "flavor_text", "rarity_applied", "base_item_level",
+)
+ENUM_NAMES = (
+    "ALL", "NONE",
+    # Skill.AttributeTarget
+    "VITALITY", "STRENGTH", "DEXTERITY", "INTELLIGENCE", "FAITH", "MIND", "ENDURANCE", "ARCANE",
+    "AGILITY", "FORTITUDE",
+    # ElementalDamage.Element
+    "EARTH", "FIRE", "ICE", "WIND", "LIGHTNING", "HOLY", "DARK",
+)
+# ArenaNetworkManager RPCs, named in content_arena's stand-in framing (Godot sends method ids)
+RPC_NAMES = (
+    "_send_action", "_receive_match_setup", "_register_player", "_receive_host_character",
+    "_player_ready", "_start_match_signal", "_end_match",
+)
+
+# value tags; 0x40-0x7F are the ints 0..63, 0x80-0xFF the symbols 0..127
+T_NIL, T_FALSE, T_TRUE, T_INT, T_F32, T_F64, T_SYM, T_STR, T_LIST, T_DICT, T_ABSENT = range(11)
+SMALL_INT, SMALL_SYM = 0x40, 0x80
+F32 = struct.Struct("<f")
+F64 = struct.Struct("<d")
+
+
+class WireError(Exception):
+    pass
+
+
+# -------------------------
+# String table
+# -------------------------
+def table_strings(data):
+    # -> ordered, de-duplicated symbol list (earlier = more frequent = shorter)
+    out = list(ACTION_FIELDS) + list(PAYLOAD_KEYS) + list(ENUM_NAMES) + list(RPC_NAMES)
+    out += list((data.get("Status Effects") or {}))
+    for tab in ("Weapons", "Armors"):
+        for _, entry in item_entries(tab, data.get(tab) or {}):
+            out += [entry.get("slot"), entry.get("type"), entry.get("rarity")]
+    out += list((data.get("Rarities") or {}))
+    for tab in ("Classes", "Races"):
+        for group in ("playable", "non_playable"):
+            out += list((data.get(tab) or {}).get(group) or {})
+    out += list(((data.get("Skills") or {}).get("skills") or {}))
+    for tab in ("Weapons", "Armors", "Consumables", "Materials"):
+        for path, entry in item_entries(tab, data.get(tab) or {}):
+            out += [path[-1], entry.get("name")]
+    seen, strings = set(), []
+    for s in out:
+        if isinstance(s, str) and s and s not in seen:
+            seen.add(s)
+            strings.append(s)
+    return strings
+
+def compile_table(data):
+    strings = table_strings(data)
+    return {
+        "format": TABLE_FORMAT,
+        "version": TABLE_VERSION,
+        "crc": zlib.crc32("\n".join(strings).encode("utf-8")),
+        "strings": strings,
+    }
+
+def read_table(root_dir):
+    try:
+        with open(os.path.join(root_dir, TABLE_FILE), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def build_wire_table(root_dir, data=None, force=False):
+    # -> {"written": bool, "strings": n, "crc": crc, "path": path}; data defaults to the files on disk
+    if data is None:
+        data = {tab: safe_load(os.path.join(root_dir, JSON_FILES[tab]))
+                for tab in ("Classes", "Races", "Skills", "Status Effects", "Rarities",
+                            "Weapons", "Armors", "Consumables", "Materials")}
+    table = compile_table(data)
+    path = os.path.join(root_dir, TABLE_FILE)
+    result = {"written": False, "strings": len(table["strings"]), "crc": table["crc"], "path": path}
+    if not force and read_table(root_dir) == table:
+        return result
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    atomic_write(path, (json.dumps(table, ensure_ascii=False) + "\n").encode("utf-8"))
+    result["written"] = True
+    return result
+
+
+# -------------------------
+# Codec
+# -------------------------
+def _uvarint(out, n):
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_uvarint(buf, pos):
+    n = shift = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+def _zigzag(n):
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+def _unzigzag(n):
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+class WireCodec:
+    def __init__(self, table):
+        if table.get("format") != TABLE_FORMAT or table.get("version") != TABLE_VERSION:
+            raise WireError("unknown wire table format")
+        self.crc = table["crc"]
+        self.strings = table["strings"]
+        self.ids = {s: i for i, s in enumerate(self.strings)}
+
+    def write(self, out, v):
+        if v is None:
+            out.append(T_NIL)
+        elif v is True:
+            out.append(T_TRUE)
+        elif v is False:
+            out.append(T_FALSE)
+        elif isinstance(v, int):
+            if 0 <= v < 64:
+                out.append(SMALL_INT | v)
+            else:
+                out.append(T_INT)
+                _uvarint(out, _zigzag(v))
+        elif isinstance(v, float):
+            try:
+                exact = F32.unpack(F32.pack(v))[0] == v
+            except OverflowError:
+                exact = False
+            out.append(T_F32 if exact else T_F64)
+            out += (F32 if exact else F64).pack(v)
+        elif isinstance(v, str):
+            i = self.ids.get(v)
+            if i is not None and i < 128:
+                out.append(SMALL_SYM | i)
+            elif i is not None:
+                out.append(T_SYM)
+                _uvarint(out, i)
+            else:
+                raw = v.encode("utf-8")
+                out.append(T_STR)
+                _uvarint(out, len(raw))
+                out += raw
+        elif isinstance(v, (list, tuple)):
+            out.append(T_LIST)
+            _uvarint(out, len(v))
+            for x in v:
+                self.write(out, x)
+        elif isinstance(v, dict):
+            out.append(T_DICT)
+            _uvarint(out, len(v))
+            for k, x in v.items():
+                self.write(out, k)
+                self.write(out, x)
+        else:
+            raise WireError(f"cannot encode {type(v).__name__}")
+        return out
+
+    def read(self, buf, pos=0):
+        # -> (value, next position)
+        tag = buf[pos]
+        pos += 1
+        if tag >= SMALL_SYM:
+            return self.strings[tag & 0x7F], pos
+        if tag >= SMALL_INT:
+            return tag & 0x3F, pos
+        if tag == T_NIL:
+            return None, pos
+        if tag in (T_TRUE, T_FALSE):
+            return tag == T_TRUE, pos
+        if tag == T_INT:
+            n, pos = _read_uvarint(buf, pos)
+            return _unzigzag(n), pos
+        if tag == T_F32:
+            return F32.unpack_from(buf, pos)[0], pos + 4
+        if tag == T_F64:
+            return F64.unpack_from(buf, pos)[0], pos + 8
+        if tag == T_SYM:
+            n, pos = _read_uvarint(buf, pos)
+            return self.strings[n], pos
+        if tag == T_STR:
+            n, pos = _read_uvarint(buf, pos)
+            return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+        if tag == T_LIST:
+            n, pos = _read_uvarint(buf, pos)
+            out = []
+            for _ in range(n):
+                v, pos = self.read(buf, pos)
+                out.append(v)
+            return out, pos
+        if tag == T_DICT:
+            n, pos = _read_uvarint(buf, pos)
+            out = {}
+            for _ in range(n):
+                k, pos = self.read(buf, pos)
+                out[k], pos = self.read(buf, pos)
+            return out, pos
+        raise WireError(f"bad tag {tag} at {pos - 1}")
+
+    def encode(self, v):
+        return bytes(self.write(bytearray(), v))
+
+    def decode(self, buf):
+        v, _ = self.read(buf)
+        return v
+
+
+def blank_action():
+    # BattleNetworkSync._serialize_action_result before the result is filled in (timestamp 0)
+    return {
+        "type": 0, "timestamp": 0, "damage": 0, "healing": 0,
+        "sp_cost": 0, "mp_cost": 0, "sp_gain": 0, "mp_gain": 0, "message": "",
+        "target_is_opponent": False, "is_drain": False,
+        "status_effects": [], "status_effects_removed": [], "buffs_debuffs": [],
+    }
+
+class ActionStream:
+    # one direction of one match: both ends keep the last action and exchange only the difference
+    def __init__(self, codec):
+        self.codec = codec
+        self.prev = blank_action()
+
+    def encode(self, action):
+        out = bytearray()
+        mask, body = 0, bytearray()
+        prev = self.prev
+        for bit, key in enumerate(ACTION_FIELDS):
+            if key not in action:
+                if key in prev:
+                    mask |= 1 << bit
+                    body.append(T_ABSENT)
+                continue
+            v = action[key]
+            if key in prev and _same(prev[key], v):
+                continue
+            mask |= 1 << bit
+            if key == "timestamp" and isinstance(v, int) and isinstance(prev.get(key), int):
+                body.append(T_INT)
+                _uvarint(body, _zigzag(v - prev[key]))
+            else:
+                self.codec.write(body, v)
+        extra = {k: v for k, v in action.items() if k not in ACTION_FIELDS}
+        if extra:
+            mask |= EXTRA_BIT
+            self.codec.write(body, extra)
+        _uvarint(out, mask)
+        out += body
+        self.prev = dict(action)
+        return bytes(out)
+
+    def decode(self, buf):
+        return self.read(buf, 0)[0]
+
+    def read(self, buf, pos):
+        # -> (action, next position)
+        mask, pos = _read_uvarint(buf, pos)
+        action = {k: v for k, v in self.prev.items() if k in ACTION_FIELDS}
+        for bit, key in enumerate(ACTION_FIELDS):
+            if not mask & (1 << bit):
+                continue
+            if buf[pos] == T_ABSENT:
+                action.pop(key, None)
+                pos += 1
+            elif key == "timestamp" and buf[pos] == T_INT and isinstance(self.prev.get(key), int):
+                n, pos = _read_uvarint(buf, pos + 1)
+                action[key] = self.prev[key] + _unzigzag(n)
+            else:
+                action[key], pos = self.codec.read(buf, pos)
+        if mask & EXTRA_BIT:
+            extra, pos = self.codec.read(buf, pos)
+            action.update(extra)
+        self.prev = dict(action)
+        return action, pos
+
+def _same(a, b):
+    # equal and of the same type (True == 1 must still be sent)
+    return type(a) is type(b) and a == b
+
+
+# -------------------------
+# Benchmark
+# -------------------------
+def load_recording(path):
+    # `content_arena.py run --record` lines -> [(stream, method, args)]
+    from content_arena import decode_variant
+    out = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rec = json.loads(line)
+                message, _ = decode_variant(base64.b64decode(rec["v"]))
+                out.append((rec["s"], message[0], message[1:]))
+    return out
+
+def synthesize(data, matches=50, turns=30, seed=0, level=10):
+    # the payloads a content_arena run sends, without the network
+    import content_arena
+    tables = content_arena.ArenaTables(data)
+    rng = random.Random(seed)
+    out = []
+    for m in range(matches):
+        me = content_arena.build_character(tables, rng, f"Peer{m}", level)
+        foe = content_arena.build_character(tables, rng, f"Host{m}", level)
+        out.append((f"{m}>", "_register_player", [1000 + m, me]))
+        out.append((f"{m}<", "_receive_host_character", [1, foe]))
+        a, b = content_arena.deserialize_character(me), content_arena.deserialize_character(foe)
+        for turn in range(1, turns + 1):
+            for stream, actor, target in ((f"{m}>", a, b), (f"{m}<", b, a)):
+                action = content_arena.make_action(tables, rng, actor, target, turn * 1500)
+                out.append((stream, "_send_action", [action]))
+    return out
+
+def bench(codec, records, repeat=3):
+    # -> {kind: {"messages", "variant", "compact", "delta", "variant_us", "compact_us"}}; sizes are
+    # the RPC arguments (each var_to_bytes encoded for Variant), as the method travels as an id
+    from content_arena import encode_variant, decode_variant
+    report = {}
+    streams = {}
+    for stream, method, args in records:
+        kind = "action" if method == "_send_action" else "character" if method in (
+            "_register_player", "_receive_host_character") else "other"
+        r = report.setdefault(kind, {"messages": 0, "variant": 0, "compact": 0, "delta": 0,
+                                     "variant_us": 0.0, "compact_us": 0.0})
+        r["messages"] += 1
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            raw = [bytes(encode_variant(a, bytearray())) for a in args]
+            for x in raw:
+                decode_variant(x)
+        r["variant_us"] += (time.perf_counter() - t0) / repeat * 1e6
+        r["variant"] += sum(len(x) for x in raw)
+        full = [codec.encode(a) for a in args]
+        r["compact"] += sum(len(x) for x in full)
+        if kind == "action":
+            # deltas depend on the stream's history: timed once, in order
+            send = streams.setdefault(stream, (ActionStream(codec), ActionStream(codec)))
+            t0 = time.perf_counter()
+            packed = send[0].encode(args[0])
+            back = send[1].decode(packed)
+            r["compact_us"] += (time.perf_counter() - t0) * 1e6
+            if back != args[0]:
+                raise WireError(f"action round trip mismatch on {stream}")
+            r["delta"] += len(packed)
+        else:
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                back = [codec.decode(codec.encode(a)) for a in args]
+            r["compact_us"] += (time.perf_counter() - t0) / repeat * 1e6
+            if back != list(args):
+                raise WireError(f"{method} round trip mismatch")
+            r["delta"] += sum(len(x) for x in full)
+    return report
+
+def format_bench(report):
+    lines = [f"{'payload':<10} {'messages':>8} {'variant B':>10} {'compact B':>10} {'delta B':>9} "
+             f"{'saved':>6} {'variant us':>11} {'wire us':>8}"]
+    for kind, r in sorted(report.items()):
+        n = max(r["messages"], 1)
+        lines.append(f"{kind:<10} {r['messages']:>8} {r['variant'] / n:>10.0f} {r['compact'] / n:>10.0f} "
+                     f"{r['delta'] / n:>9.0f} {1 - r['delta'] / max(r['variant'], 1):>6.0%} "
+                     f"{r['variant_us'] / n:>11.1f} {r['compact_us'] / n:>8.1f}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Build the arena wire string table or benchmark the codec")
+    ap.add_argument("--root", default=DEFAULT_ROOT, help="project root")
+    sub = ap.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("build", help="(re)write data/wire_ids.json")
+    p.add_argument("--force", action="store_true", help="rewrite even when unchanged")
+    p = sub.add_parser("bench", help="compare Variant and compact payload sizes / codec time")
+    p.add_argument("--payloads", help="recording from 'content_arena.py run --record'")
+    p.add_argument("--matches", type=int, default=50, help="synthesized matches without --payloads")
+    p.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+
+    if args.command == "build":
+        result = build_wire_table(args.root, force=args.force)
+        state = "written" if result["written"] else "up to date"
+        print(f"{result['path']}: {state}, {result['strings']} strings, crc {result['crc']:08x}")
+        return 0
+    table = read_table(args.root)
+    if table is None:
+        print(f"ERROR: no {TABLE_FILE}; run 'content_wire.py build' first")
+        return 1
+    codec = WireCodec(table)
+    if args.payloads:
+        records = load_recording(args.payloads)
+    else:
+        import content_arena
+        records = synthesize(content_arena.load_data(args.root), args.matches, seed=args.seed)
+    print(format_bench(bench(codec, records)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,58 @@
+"""
+test_content_journal.py
+ChangeJournal.replay against patch sets whose patches build on each other
+(run from DevTools/: python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_journal import ChangeJournal, set_patches
+
+
+def export_edits(data, edits):
+    # record edits one group each on a scratch copy -> the exported patch set
+    journal = ChangeJournal()
+    for tab, path, value in edits:
+        journal.record(data, set_patches(data, tab, path, value), "/".join(path))
+    return journal.export()
+
+
+class ReplayTest(unittest.TestCase):
+    def setUp(self):
+        self.base = {"Skills": {"Fire": {"power": 10}}}
+
+    def test_two_edits_to_one_field(self):
+        patch_set = export_edits({"Skills": {"Fire": {"power": 10}}},
+                                 [("Skills", ["Fire", "power"], 20), ("Skills", ["Fire", "power"], 30)])
+        journal = ChangeJournal()
+        group, conflicts = journal.replay(self.base, patch_set)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(self.base, {"Skills": {"Fire": {"power": 30}}})
+        journal.undo(self.base)
+        self.assertEqual(self.base, {"Skills": {"Fire": {"power": 10}}})
+
+    def test_edit_to_created_entry(self):
+        patch_set = export_edits({"Skills": {"Fire": {"power": 10}}},
+                                 [("Skills", ["Ice"], {"power": 5}), ("Skills", ["Ice", "power"], 7)])
+        journal = ChangeJournal()
+        group, conflicts = journal.replay(self.base, patch_set)
+        self.assertEqual(conflicts, [])
+        self.assertEqual(self.base["Skills"]["Ice"], {"power": 7})
+        journal.undo(self.base)
+        self.assertEqual(self.base, {"Skills": {"Fire": {"power": 10}}})
+
+    def test_conflict_applies_nothing_of_it(self):
+        patch_set = export_edits({"Skills": {"Fire": {"power": 10}}}, [("Skills", ["Fire", "power"], 20)])
+        data = {"Skills": {"Fire": {"power": 15}}}
+        group, conflicts = ChangeJournal().replay(data, patch_set)
+        self.assertIsNone(group)
+        self.assertEqual([c["found"] for c in conflicts], [15])
+        self.assertEqual(data, {"Skills": {"Fire": {"power": 15}}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+test_content_manager_tree.py
+Chunked tree loading: rows added out of order (search reveal, new entries) never hide or repeat keys
+(run from DevTools/: python -m unittest discover tests; no display needed)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+try:
+    import content_manager
+except ImportError:  # tkinter missing
+    content_manager = None
+
+
+class FakeTree:
+    # the ttk.Treeview calls the content manager makes, in memory
+    def __init__(self):
+        self.rows = {"": {"children": [], "text": "", "parent": None}}
+
+    def insert(self, parent, index, iid=None, text="", open=False, tags=()):
+        if iid in self.rows:
+            raise ValueError(f"Item {iid} already exists")
+        self.rows[iid] = {"children": [], "text": text, "parent": parent}
+        children = self.rows[parent]["children"]
+        children.insert(len(children) if index == "end" else index, iid)
+        return iid
+
+    def exists(self, iid):
+        return iid in self.rows
+
+    def get_children(self, iid=""):
+        return tuple(self.rows[iid]["children"])
+
+    def parent(self, iid):
+        return self.rows[iid]["parent"]
+
+    def index(self, iid):
+        return self.rows[self.parent(iid)]["children"].index(iid)
+
+    def delete(self, *iids):
+        for iid in iids:
+            if iid in self.rows:
+                self.delete(*self.rows[iid]["children"])
+                self.rows[self.parent(iid)]["children"].remove(iid)
+                del self.rows[iid]
+
+    def item(self, iid, key=None, **kw):
+        if kw:
+            self.rows[iid].update(kw)
+            return None
+        return self.rows[iid][key] if key else self.rows[iid]
+
+
+@unittest.skipIf(content_manager is None, "tkinter not available")
+class TreeChunkTest(unittest.TestCase):
+    def setUp(self):
+        app = self.app = content_manager.ContentManagerApp.__new__(content_manager.ContentManagerApp)
+        self.keys = [f"blade_{i:04d}" for i in range(1200)]
+        app.data = {"Weapons": {k: {"name": k, "damage": 1} for k in self.keys}}
+        app.treeviews = {"Weapons": FakeTree()}
+        app.loaded_views = {"Weapons"}
+        self.tree = app.treeviews["Weapons"]
+        app._populate_tree(self.tree, "", app.data["Weapons"])
+
+    def rows(self):
+        return [c for c in self.tree.get_children("") if not c.endswith(content_manager.TREE_MORE)]
+
+    def load_all(self):
+        more = content_manager.TREE_MORE
+        while self.tree.exists(more):
+            self.app._load_more("Weapons", more)
+
+    def test_reveal_then_load_more(self):
+        self.app._tree_reveal("Weapons", ["blade_0900"])
+        more = self.tree.item(content_manager.TREE_MORE, "text")
+        self.assertEqual(more, f"... {1200 - content_manager.TREE_CHUNK - 1} more")
+        self.load_all()
+        rows = self.rows()
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertEqual(sorted(rows), self.keys)
+
+    def test_new_and_deleted_entries(self):
+        self.app.data["Weapons"]["blade_new"] = {"name": "New", "damage": 1}
+        self.app._view_insert("Weapons", ["blade_new"])
+        del self.app.data["Weapons"]["blade_1100"]
+        self.app._view_remove("Weapons", ["blade_1100"])
+        self.load_all()
+        rows = self.rows()
+        self.assertEqual(len(rows), len(set(rows)))
+        self.assertEqual(sorted(rows), sorted(self.app.data["Weapons"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
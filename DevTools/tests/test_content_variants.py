@@ -0,0 +1,65 @@
+"""
+test_content_variants.py
+Variants of the shipped rules over the repo's item tabs add no fields their template lacks
+(run from DevTools/: python -m unittest discover tests)
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from content_index import ITEM_TABS
+from content_variants import DEFAULT_ROOT, VariantGenerator, apply_option, expand, load_rules
+
+
+def field_paths(entry, prefix=""):
+    # dotted paths of every key, nested dicts included
+    out = set()
+    for k, v in entry.items():
+        out.add(prefix + k)
+        if isinstance(v, dict):
+            out |= field_paths(v, prefix + k + ".")
+    return out
+
+def allowed_paths(axes):
+    # what an option may create: its set fields and add paths (with their parents), plus name
+    out = {"name"}
+    for options in axes:
+        for option in options:
+            out.update(option.get("set", {}))
+            for field in option.get("add", {}):
+                parts = field.split(".")
+                out.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+    return out
+
+
+class VariantFieldsTest(unittest.TestCase):
+    def test_scale_skips_missing_fields(self):
+        entry = apply_option({"name": "Axe", "damage": 10}, {}, {"scale": {"damage": 1.5, "armor_value": 2}})
+        self.assertEqual(entry, {"name": "Axe", "damage": 15})
+
+    def test_add_creates_missing_fields(self):
+        entry = apply_option({"name": "Axe"}, {}, {"add": {"effects.dodge": 0.01}})
+        self.assertEqual(entry, {"name": "Axe", "effects": {"dodge": 0.01}})
+
+    def test_shipped_rules_add_no_new_fields(self):
+        axes, rules = load_rules()
+        gen = VariantGenerator(DEFAULT_ROOT, axes, rules)
+        gen.load()
+        checked = 0
+        for tab in ITEM_TABS:
+            for templates in gen.templates(tab).values():
+                for template, rule_axes in templates:
+                    allowed = allowed_paths(rule_axes)
+                    base = field_paths(template)
+                    for variant in expand(template, rule_axes):
+                        extra = field_paths(variant) - base - allowed
+                        self.assertFalse(extra, f"{tab} {variant.get('name')}: new field(s) {sorted(extra)}")
+                        checked += 1
+        self.assertGreater(checked, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
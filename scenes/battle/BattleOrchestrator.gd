@@ -122,6 +122,8 @@ func _initialize_systems():
 	
 	flow_controller = BattleFlowController.new()
 	flow_controller.initialize(combat_engine, visual_manager, ui_controller, turn_handler, context, self)
+	
+	CombatLog.begin_battle(context)
 
 func _connect_signals():
 	turn_controller.turn_started.connect(_on_turn_started)
@@ -53,6 +53,7 @@ func check_battle_end() -> bool:
 	if not context.is_battle_ended():
 		return false
 	
+	CombatLog.end_battle(context.did_player_win())
 	if context.did_player_win():
 		await _handle_victory()
 	else:
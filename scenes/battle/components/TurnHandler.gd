@@ -100,6 +100,7 @@ func _process_status_effects(character: CharacterData) -> void:
 
 func _handle_stunned_turn(character: CharacterData) -> void:
 	var stun_msg = "%s is stunned and loses their turn!" % character.name
+	CombatLog.skip(character, "stunned")
 	ui_controller.add_combat_log(stun_msg, "purple")
 	character.is_stunned = false
 	
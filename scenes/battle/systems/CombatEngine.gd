@@ -30,6 +30,12 @@ func execute_action(action: BattleAction) -> ActionResult:
 	
 	print("CombatEngine: Executing %s" % action.get_description())
 	
+	var start_usec = Time.get_ticks_usec()
+	var result = _dispatch_action(action)
+	CombatLog.action(action, result, Time.get_ticks_usec() - start_usec)
+	return result
+
+func _dispatch_action(action: BattleAction) -> ActionResult:
 	var confusion_result = _check_confusion_before_action(action)
 	if confusion_result:
 		return confusion_result
@@ -96,6 +96,7 @@ func _start_turn(character: CharacterData):
 	
 	var is_player = character == player
 	print("TurnController: Turn %d - %s's turn" % [turn_number, character.name])
+	CombatLog.turn(turn_number, character)
 	
 	emit_signal("turn_started", character, is_player)
 
@@ -281,10 +281,7 @@ func deal_damage(user: CharacterData, targets: Array) -> Dictionary:
 			var total_multiplier = 1.0
 			for elemental_type in elemental_types:
 				var attacker_bonus = user.get_elemental_damage_bonus(elemental_type)
-				var target_resistance = t.get_elemental_resistance(elemental_type)
-				var target_weakness = t.get_elemental_weakness(elemental_type)
-				var elem_result = ElementalDamage.calculate_elemental_damage(1.0, elemental_type, attacker_bonus, target_resistance, target_weakness)
-				total_multiplier *= elem_result.multiplier
+				total_multiplier *= ElementalDamage.hit_multiplier(attacker_bonus, t.elemental_resistances.get_damage_taken_multiplier(elemental_type))
 			damage *= total_multiplier
 		
 		# Crit check
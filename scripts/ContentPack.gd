@@ -0,0 +1,96 @@
+# ContentPack.gd
+# Shared loader for the data/*.json content files
+# Reads res://data/content.pack.json (built by DevTools/content_pack.py) once and hands
+# out already-parsed files and precomputed lookups. Files missing from the pack, or edited
+# after it was built (checked against the manifest in debug builds), are read from their
+# own JSON instead and cached, so each file is parsed at most once per run.
+# Returned dictionaries are shared between callers: treat them as read-only.
+
+class_name ContentPack
+extends RefCounted
+
+const PACK_PATH = "res://data/content.pack.json"
+const MANIFEST_PATH = "res://data/content.pack.manifest.json"
+const PACK_FORMAT = "uldtale-content-pack"
+const PACK_VERSION = 1
+
+static var _pack: Dictionary = {}
+static var _loaded: bool = false
+static var _stale: Dictionary = {}  # relative path -> true when the JSON changed after packing
+static var _files: Dictionary = {}  # res:// path -> parsed JSON (fallback cache)
+
+static func _load_pack():
+	if _loaded:
+		return
+	_loaded = true
+
+	if not FileAccess.file_exists(PACK_PATH):
+		return
+
+	var file = FileAccess.open(PACK_PATH, FileAccess.READ)
+	if file == null:
+		return
+	var data = JSON.parse_string(file.get_as_text())
+	file.close()
+
+	if typeof(data) != TYPE_DICTIONARY or data.get("format") != PACK_FORMAT or int(data.get("version", 0)) != PACK_VERSION:
+		push_warning("ContentPack: ignoring %s (unknown format)" % PACK_PATH)
+		return
+
+	_pack = data
+
+	# Exported builds ship the pack and JSON together; only editor/debug runs can be stale
+	if OS.is_debug_build():
+		_check_manifest()
+
+	print("[ContentPack] Loaded %d files from pack (%d stale)" % [_pack.files.size(), _stale.size()])
+
+static func _check_manifest():
+	var file = FileAccess.open(MANIFEST_PATH, FileAccess.READ)
+	if file == null:
+		push_warning("ContentPack: no manifest, reading JSON files instead")
+		_pack = {}
+		return
+	var manifest = JSON.parse_string(file.get_as_text())
+	file.close()
+
+	if typeof(manifest) != TYPE_DICTIONARY or manifest.get("pack", {}).get("sha256", "") != FileAccess.get_sha256(PACK_PATH):
+		push_warning("ContentPack: manifest does not match the pack, reading JSON files instead")
+		_pack = {}
+		return
+
+	var sources = manifest.get("sources", {})
+	for rel in _pack.files:
+		var source = sources.get(rel, {})
+		if source.get("sha256", "") != FileAccess.get_sha256("res://" + rel):
+			_stale[rel] = true
+			print("[ContentPack] %s changed since the pack was built, using the JSON file" % rel)
+
+## Parsed content of a data file, e.g. load_json("res://data/races.json")
+static func load_json(path: String):
+	_load_pack()
+
+	var rel = path.trim_prefix("res://")
+	if not _pack.is_empty() and _pack.files.has(rel) and not _stale.has(rel):
+		return _pack.files[rel]
+
+	if _files.has(path):
+		return _files[path]
+
+	var file = FileAccess.open(path, FileAccess.READ)
+	if file == null:
+		return null
+	var data = JSON.parse_string(file.get_as_text())
+	file.close()
+
+	_files[path] = data
+	return data
+
+## Precomputed lookup from the pack ("items", "class_weapons", "class_armors");
+## empty when there is no pack or any packed file is stale (callers build their own)
+static func get_index(index_name: String) -> Dictionary:
+	_load_pack()
+
+	if _pack.is_empty() or not _stale.is_empty():
+		return {}
+	return _pack.get("index", {}).get(index_name, {})
@@ -17,6 +17,11 @@ var temp_resistances: Dictionary = {}
 var temp_weaknesses: Dictionary = {}
 var temp_damage_bonuses: Dictionary = {}
 
+# Damage-taken multiplier per element, (1 - resistance) * (1 + weakness); rebuilt lazily after
+# any setter / modifier change so hits do one lookup instead of four
+var _taken: Dictionary = {}
+var _taken_dirty: bool = true
+
 func _init(p_character: CharacterData):
 	character = p_character
 	_initialize_defaults()
@@ -38,10 +43,12 @@ func _initialize_defaults():
 func set_base_resistance(element: ElementalDamage.Element, value: float):
 	"""Set base resistance from race data"""
 	base_resistances[element] = clamp(value, 0.0, 0.9)  # Max 90% resistance
+	_taken_dirty = true
 
 func set_base_weakness(element: ElementalDamage.Element, value: float):
 	"""Set base weakness from race data"""
 	base_weaknesses[element] = clamp(value, 0.0, 2.0)  # Max 200% extra damage
+	_taken_dirty = true
 
 func set_damage_bonus(element: ElementalDamage.Element, value: float):
 	"""Set damage bonus from race data"""
@@ -52,10 +59,12 @@ func set_damage_bonus(element: ElementalDamage.Element, value: float):
 func add_temp_resistance(element: ElementalDamage.Element, value: float):
 	"""Add temporary resistance (stacks with base)"""
 	temp_resistances[element] += value
+	_taken_dirty = true
 
 func add_temp_weakness(element: ElementalDamage.Element, value: float):
 	"""Add temporary weakness (stacks with base)"""
 	temp_weaknesses[element] += value
+	_taken_dirty = true
 
 func add_temp_damage_bonus(element: ElementalDamage.Element, value: float):
 	"""Add temporary damage bonus (stacks with base)"""
@@ -69,6 +78,7 @@ func clear_temp_modifiers():
 		temp_resistances[element] = 0.0
 		temp_weaknesses[element] = 0.0
 		temp_damage_bonuses[element] = 0.0
+	_taken_dirty = true
 
 # === GETTERS (used in combat calculations) ===
 
@@ -87,6 +97,14 @@ func get_total_damage_bonus(element: ElementalDamage.Element) -> float:
 	var total = damage_bonuses.get(element, 0.0) + temp_damage_bonuses.get(element, 0.0)
 	return max(0.0, total)
 
+func get_damage_taken_multiplier(element: ElementalDamage.Element) -> float:
+	"""Multiplier this character takes from an element before the attacker's bonus"""
+	if _taken_dirty:
+		for e in base_resistances:
+			_taken[e] = (1.0 - get_total_resistance(e)) * (1.0 + get_total_weakness(e))
+		_taken_dirty = false
+	return _taken.get(element, 1.0)
+
 # === COMBAT INTEGRATION ===
 
 func calculate_incoming_damage(base_damage: float, element: ElementalDamage.Element) -> Dictionary:
@@ -17,6 +17,17 @@ func _build_class_caches():
 	if _cache_built:
 		return
 	
+	# Prebuilt by DevTools/content_pack.py when the content pack is current
+	var packed_weapons = ContentPack.get_index("class_weapons")
+	var packed_armors = ContentPack.get_index("class_armors")
+	if not packed_weapons.is_empty() and not packed_armors.is_empty():
+		_class_weapon_cache = packed_weapons.duplicate(true)
+		_class_armor_cache = packed_armors.duplicate(true)
+		_cache_built = true
+		print("[ClassEquipmentBias] Using class caches from content pack")
+		_print_cache_summary()
+		return
+	
 	print("[ClassEquipmentBias] Building dynamic class caches from equipment data...")
 	
 	# Get all equipment templates
@@ -98,18 +109,11 @@ func _get_all_class_names() -> Array:
 		print("[ClassEquipmentBias] ERROR: classes.json not found!")
 		return classes
 	
-	var file = FileAccess.open(file_path, FileAccess.READ)
-	var json_text = file.get_as_text()
-	file.close()
-	
-	var json = JSON.new()
-	var error = json.parse(json_text)
-	if error != OK:
+	var data = ContentPack.load_json(file_path)
+	if typeof(data) != TYPE_DICTIONARY:
 		print("[ClassEquipmentBias] ERROR: Failed to parse classes.json")
 		return classes
 	
-	var data = json.data
-	
 	# Extract all class names from playable, non_playable, and boss sections
 	for category in ["playable", "non_playable", "boss"]:
 		if data.has(category):
@@ -287,15 +291,7 @@ func _get_random_equipment_id(slot_category: String) -> String:
 
 func _get_random_weapon_id(slot_filter: String) -> String:
 	# Random weapon selection
-	var all_weapons = ItemManager.weapons.keys()
-	
-	if slot_filter != "":
-		var filtered = []
-		for weapon_id in all_weapons:
-			var template = ItemManager.get_equipment_template(weapon_id)
-			if template.get("slot", "main_hand") == slot_filter:
-				filtered.append(weapon_id)
-		all_weapons = filtered
+	var all_weapons = ItemManager.get_weapon_ids("", slot_filter)
 	
 	if all_weapons.is_empty():
 		return ""
@@ -7,24 +7,72 @@ var skills = {}
 var current_dungeon_race: String = ""
 var dungeon_race: String = ""
 var current_floor: int = 0
+var enemy_table = {}  # data/enemy_stats.json (DevTools/content_enemy.py), empty when missing
+var verbose_logging: bool = false  # per-spawn debug output
+
+const ENEMY_TABLE_PATH = "res://data/enemy_stats.json"
+const ENEMY_TABLE_FORMAT = "uldtale-enemy-stats"
+const ENEMY_TABLE_VERSION = 1
+# Bump together with content_enemy.FORMULA_VERSION when the stat / scaling formulas change
+const ENEMY_TABLE_FORMULA = 1
+const PRIMARY_STATS = ["vitality", "strength", "dexterity", "intelligence", "faith", "mind", "endurance", "arcane", "agility", "fortitude"]
 
 func _ready():
 	load_data()
 
 func load_data():
-	var file = FileAccess.open("res://data/races.json", FileAccess.READ)
-	races = JSON.parse_string(file.get_as_text())
+	races = ContentPack.load_json("res://data/races.json")
+	classes = ContentPack.load_json("res://data/classes.json")
+	skills = ContentPack.load_json("res://data/skills.json")["skills"]
+	_load_enemy_table()
+
+func _load_enemy_table():
+	enemy_table = {}
+	if not FileAccess.file_exists(ENEMY_TABLE_PATH):
+		return
+	var table = ContentPack.load_json(ENEMY_TABLE_PATH)
+	if typeof(table) != TYPE_DICTIONARY or table.get("format") != ENEMY_TABLE_FORMAT or int(table.get("version", 0)) != ENEMY_TABLE_VERSION:
+		push_warning("EnemyFactory: ignoring %s (unknown format)" % ENEMY_TABLE_PATH)
+		return
+	if int(table.get("formula", 0)) != ENEMY_TABLE_FORMULA:
+		push_warning("EnemyFactory: %s was built for other enemy formulas, computing enemy stats" % ENEMY_TABLE_PATH)
+		return
+	# Stale if classes/races changed after it was built: fall back to computing stats
+	for class_type in ["non_playable", "boss"]:
+		for class_name_key in classes.get(class_type, {}):
+			var source = table.sources.classes.get(class_name_key)
+			if source != null and not _matches_source(source, classes[class_type][class_name_key], "base_%s"):
+				push_warning("EnemyFactory: %s is out of date, computing enemy stats" % ENEMY_TABLE_PATH)
+				return
+	for race_name in races.get("non_playable", {}):
+		var source = table.sources.races.get(race_name)
+		if source != null and not _matches_source(source, races["non_playable"][race_name], "%s_mod"):
+			push_warning("EnemyFactory: %s is out of date, computing enemy stats" % ENEMY_TABLE_PATH)
+			return
+	enemy_table = table
 
-	file = FileAccess.open("res://data/classes.json", FileAccess.READ)
-	classes = JSON.parse_string(file.get_as_text())
+func _matches_source(source: Array, entry: Dictionary, key_format: String) -> bool:
+	var keys = ["vit", "str", "dex", "int", "fai", "mnd", "end", "arc", "agi", "for"]
+	for i in range(keys.size()):
+		if int(source[i]) != int(entry.get(key_format % keys[i], 0)):
+			return false
+	return true
 
-	file = FileAccess.open("res://data/skills.json", FileAccess.READ)
-	skills = JSON.parse_string(file.get_as_text())["skills"]
+func _in_table_grid(floor: int, wave: int, momentum_level: int) -> bool:
+	if enemy_table.is_empty():
+		return false
+	var grid = enemy_table.grid
+	return floor >= 1 and floor <= int(grid.floors) and wave >= 1 and wave <= int(grid.waves) \
+		and momentum_level >= 0 and momentum_level <= int(grid.max_momentum)
+
+func _set_primary_stats(character: CharacterData, row: Array):
+	for i in range(PRIMARY_STATS.size()):
+		character.set(PRIMARY_STATS[i], int(row[i]))
 
 func get_dungeon_race():
 	if current_dungeon_race == "":
 		print("Warning: Dungeon race not set yet! Call set_dungeon_race(floor) first.")
-	else:
+	elif verbose_logging:
 		print("Current dungeon race:", current_dungeon_race)
 	return current_dungeon_race
 
@@ -49,11 +97,12 @@ func create_enemy(level: int = 1, floor: int = 1, wave: int = 1, momentum_level:
 	get_dungeon_race()
 
 	#  DEBUG: Check types at each step
-	print("=== DEBUG create_enemy ===")
-	print("1. races type: ", typeof(races))
-	print("2. races.keys(): ", races.keys())
-	print("3. races['non_playable'] type: ", typeof(races["non_playable"]))
-	print("4. current_dungeon_race: ", current_dungeon_race, " (type: ", typeof(current_dungeon_race), ")")
+	if verbose_logging:
+		print("=== DEBUG create_enemy ===")
+		print("1. races type: ", typeof(races))
+		print("2. races.keys(): ", races.keys())
+		print("3. races['non_playable'] type: ", typeof(races["non_playable"]))
+		print("4. current_dungeon_race: ", current_dungeon_race, " (type: ", typeof(current_dungeon_race), ")")
 	
 	# Check if current_dungeon_race exists in races
 	if not races["non_playable"].has(current_dungeon_race):
@@ -61,18 +110,21 @@ func create_enemy(level: int = 1, floor: int = 1, wave: int = 1, momentum_level:
 		print("Available races: ", races["non_playable"].keys())
 		return enemy
 	
-	print("5. races['non_playable'][current_dungeon_race] type: ", typeof(races["non_playable"][current_dungeon_race]))
+	if verbose_logging:
+		print("5. races['non_playable'][current_dungeon_race] type: ", typeof(races["non_playable"][current_dungeon_race]))
 	
 	var enemy_classes = classes["non_playable"].keys()
 	var chosen_class = enemy_classes[RandomManager.randi() % enemy_classes.size()]
 	
-	print("6. chosen_class: ", chosen_class)
-	print("7. classes['non_playable'][chosen_class] type: ", typeof(classes["non_playable"][chosen_class]))
+	if verbose_logging:
+		print("6. chosen_class: ", chosen_class)
+		print("7. classes['non_playable'][chosen_class] type: ", typeof(classes["non_playable"][chosen_class]))
 
 	#  FIX: Pass race name AND race data separately
 	var race_data = races["non_playable"][current_dungeon_race]
-	print("8. race_data: ", race_data)
-	print("9. About to call setup_character...")
+	if verbose_logging:
+		print("8. race_data: ", race_data)
+		print("9. About to call setup_character...")
 	
 	setup_character(enemy, chosen_class, "non_playable", current_dungeon_race, race_data)
 	enemy.name = "%s %s" % [current_dungeon_race, chosen_class]
@@ -83,8 +135,19 @@ func create_enemy(level: int = 1, floor: int = 1, wave: int = 1, momentum_level:
 	enemy.initialize_racial_elementals(true)
 
 	enemy.level = level + 1
-	for _i in range(level - 1):
-		enemy.level_up()
+	var table_rows = null
+	if _in_table_grid(floor, wave, momentum_level):
+		table_rows = enemy_table.enemies.get(current_dungeon_race, {}).get(chosen_class)
+	if table_rows != null:
+		# Stats after the (level - 1) level ups come from the table; only their random points
+		# are still rolled (same RandomManager sequence as level_up)
+		_set_primary_stats(enemy, table_rows[level - 1])
+		enemy.level += level - 1
+		for _i in range(level - 1):
+			enemy.distribute_enemy_points()
+	else:
+		for _i in range(level - 1):
+			enemy.level_up()
 	
 	apply_enemy_scaling(enemy, floor, wave, false, momentum_level)
 	give_enemy_equipment(enemy, floor)
@@ -116,24 +179,31 @@ func create_boss(floor: int = 1, wave: int = 1, momentum_level: int = 0) -> Char
 	boss.race = current_dungeon_race
 	boss.character_class = "King (%s)" % chosen_minion
 	
-	var minion_contribution = 0.5
-	#  FIX: Use bracket notation for dictionary access
-	boss.vitality = int((king_data["base_vit"] + race_data["vit_mod"]) + (minion_data["base_vit"] * minion_contribution))
-	boss.strength = int((king_data["base_str"] + race_data["str_mod"]) + (minion_data["base_str"] * minion_contribution))
-	boss.dexterity = int((king_data["base_dex"] + race_data["dex_mod"]) + (minion_data["base_dex"] * minion_contribution))
-	boss.intelligence = int((king_data["base_int"] + race_data["int_mod"]) + (minion_data["base_int"] * minion_contribution))
-	boss.faith = int((king_data["base_fai"] + race_data["fai_mod"]) + (minion_data["base_fai"] * minion_contribution))
-	boss.mind = int((king_data["base_mnd"] + race_data["mnd_mod"]) + (minion_data["base_mnd"] * minion_contribution))
-	boss.endurance = int((king_data["base_end"] + race_data["end_mod"]) + (minion_data["base_end"] * minion_contribution))
-	boss.arcane = int((king_data["base_arc"] + race_data["arc_mod"]) + (minion_data["base_arc"] * minion_contribution))
-	boss.agility = int((king_data["base_agi"] + race_data["agi_mod"]) + (minion_data["base_agi"] * minion_contribution))
-	boss.fortitude = int((king_data["base_for"] + race_data["for_mod"]) + (minion_data["base_for"] * minion_contribution))
-	
-	boss.vitality = int(boss.vitality * 2)
-	boss.strength = int(boss.strength * 1.5)
-	boss.intelligence = int(boss.intelligence * 1.5)
-	boss.faith = int(boss.faith * 1.5)
-	boss.endurance = int(boss.endurance * 1.5)
+	var boss_row = null
+	if _in_table_grid(floor, wave, momentum_level):
+		boss_row = enemy_table.bosses.get(current_dungeon_race, {}).get(chosen_minion)
+	
+	if boss_row != null:
+		_set_primary_stats(boss, boss_row)
+	else:
+		var minion_contribution = 0.5
+		#  FIX: Use bracket notation for dictionary access
+		boss.vitality = int((king_data["base_vit"] + race_data["vit_mod"]) + (minion_data["base_vit"] * minion_contribution))
+		boss.strength = int((king_data["base_str"] + race_data["str_mod"]) + (minion_data["base_str"] * minion_contribution))
+		boss.dexterity = int((king_data["base_dex"] + race_data["dex_mod"]) + (minion_data["base_dex"] * minion_contribution))
+		boss.intelligence = int((king_data["base_int"] + race_data["int_mod"]) + (minion_data["base_int"] * minion_contribution))
+		boss.faith = int((king_data["base_fai"] + race_data["fai_mod"]) + (minion_data["base_fai"] * minion_contribution))
+		boss.mind = int((king_data["base_mnd"] + race_data["mnd_mod"]) + (minion_data["base_mnd"] * minion_contribution))
+		boss.endurance = int((king_data["base_end"] + race_data["end_mod"]) + (minion_data["base_end"] * minion_contribution))
+		boss.arcane = int((king_data["base_arc"] + race_data["arc_mod"]) + (minion_data["base_arc"] * minion_contribution))
+		boss.agility = int((king_data["base_agi"] + race_data["agi_mod"]) + (minion_data["base_agi"] * minion_contribution))
+		boss.fortitude = int((king_data["base_for"] + race_data["for_mod"]) + (minion_data["base_for"] * minion_contribution))
+		
+		boss.vitality = int(boss.vitality * 2)
+		boss.strength = int(boss.strength * 1.5)
+		boss.intelligence = int(boss.intelligence * 1.5)
+		boss.faith = int(boss.faith * 1.5)
+		boss.endurance = int(boss.endurance * 1.5)
 	
 	boss.attack_power_type = king_data["attack_power_type"]
 	boss.spell_power_type = king_data["spell_power_type"]
@@ -168,18 +238,7 @@ func create_boss(floor: int = 1, wave: int = 1, momentum_level: int = 0) -> Char
 
 func apply_enemy_scaling(enemy: CharacterData, floor: int, wave: int, is_boss: bool = false, momentum_level: int = 0):
 	# Progressive difficulty curve with breakpoints
-	var difficulty_tier = get_difficulty_tier(floor)
-	var base_multiplier = get_base_multiplier(floor)
-	var wave_multiplier = 1.0 + (0.15 * wave)  # Reduced from 0.25
-	
-	var momentum_multiplier = 1.0
-	if momentum_level > 0:
-		momentum_multiplier = 1.0 + (momentum_level * 0.10)
-	
-	# Boss scaling
-	var boss_multiplier = 1.5 if is_boss else 1.0
-	
-	var total_multiplier = base_multiplier * wave_multiplier * momentum_multiplier * boss_multiplier
+	var total_multiplier = get_total_multiplier(floor, wave, is_boss, momentum_level)
 	
 	# Apply scaling
 	enemy.vitality = int(enemy.vitality * total_multiplier)
@@ -193,10 +252,28 @@ func apply_enemy_scaling(enemy: CharacterData, floor: int, wave: int, is_boss: b
 	enemy.agility = int(enemy.agility * total_multiplier)
 	enemy.fortitude = int(enemy.fortitude * total_multiplier)
 	
+	if verbose_logging:
+		if momentum_level > 0:
+			print("Enemy scaled with momentum x%d: +%d%% stats" % [momentum_level, momentum_level * 10])
+		print("Floor %d (Tier %d): Base multiplier %.2f, Total multiplier: %.2f" % [floor, get_difficulty_tier(floor), get_base_multiplier(floor), total_multiplier])
+
+func get_total_multiplier(floor: int, wave: int, is_boss: bool = false, momentum_level: int = 0) -> float:
+	"""base x wave x momentum x boss multiplier, from the precomputed table when it covers the cell"""
+	if _in_table_grid(floor, wave, momentum_level):
+		return enemy_table.multipliers["boss" if is_boss else "enemy"][floor - 1][wave - 1][momentum_level]
+	
+	# Progressive difficulty curve with breakpoints
+	var base_multiplier = get_base_multiplier(floor)
+	var wave_multiplier = 1.0 + (0.15 * wave)  # Reduced from 0.25
+	
+	var momentum_multiplier = 1.0
 	if momentum_level > 0:
-		print("Enemy scaled with momentum x%d: +%d%% stats" % [momentum_level, int((momentum_multiplier - 1.0) * 100)])
+		momentum_multiplier = 1.0 + (momentum_level * 0.10)
 	
-	print("Floor %d (Tier %d): Base multiplier %.2f, Total multiplier: %.2f" % [floor, difficulty_tier, base_multiplier, total_multiplier])
+	# Boss scaling
+	var boss_multiplier = 1.5 if is_boss else 1.0
+	
+	return base_multiplier * wave_multiplier * momentum_multiplier * boss_multiplier
 
 func get_difficulty_tier(floor: int) -> int:
 	"""Returns difficulty tier 1-8 based on floor"""
@@ -390,32 +467,32 @@ func setup_character(character: CharacterData, character_class: String, class_ty
 	race_name: String key like "Goblin", "Elf", etc.
 	race_data: Dictionary with stat modifiers like {"vit_mod": -1, "str_mod": 0, ...}
 	"""
-	print("=== DEBUG setup_character ===")
-	print("1. character_class: ", character_class, " (type: ", typeof(character_class), ")")
-	print("2. class_type: ", class_type, " (type: ", typeof(class_type), ")")
-	print("3. race_name: ", race_name, " (type: ", typeof(race_name), ")")
-	print("4. race_data: ", race_data, " (type: ", typeof(race_data), ")")
-	
-	print("5. classes keys: ", classes.keys())
-	print("6. classes[class_type] type: ", typeof(classes[class_type]))
-	print("7. classes[class_type] keys: ", classes[class_type].keys())
+	if verbose_logging:
+		print("=== DEBUG setup_character ===")
+		print("1. character_class: ", character_class, " (type: ", typeof(character_class), ")")
+		print("2. class_type: ", class_type, " (type: ", typeof(class_type), ")")
+		print("3. race_name: ", race_name, " (type: ", typeof(race_name), ")")
+		print("4. race_data: ", race_data, " (type: ", typeof(race_data), ")")
+		
+		print("5. classes keys: ", classes.keys())
+		print("6. classes[class_type] type: ", typeof(classes[class_type]))
+		print("7. classes[class_type] keys: ", classes[class_type].keys())
 	
 	if not classes[class_type].has(character_class):
 		push_error("ERROR: Class '%s' not found in classes['%s']!" % [character_class, class_type])
 		return
 	
-	print("8. classes[class_type][character_class] type: ", typeof(classes[class_type][character_class]))
-	
 	var class_data = classes[class_type][character_class]
 	
-	print("9. class_data: ", class_data)
+	if verbose_logging:
+		print("8. classes[class_type][character_class] type: ", typeof(class_data))
+		print("9. class_data: ", class_data)
 
 	character.name = "%s %s" % [race_name, character_class]
 	character.race = race_name
 	character.character_class = character_class
 
 	#  FIX: Use bracket notation for all dictionary access
-	print("10. Accessing class_data['base_vit']...")
 	character.vitality = class_data["base_vit"] + race_data["vit_mod"]
 	character.strength = class_data["base_str"] + race_data["str_mod"]
 	character.dexterity = class_data["base_dex"] + race_data["dex_mod"]
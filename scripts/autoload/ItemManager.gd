@@ -8,6 +8,7 @@ var armors = {}
 var consumables = {}
 var materials = {}
 var equipment_templates = {}  # Base templates (never modified)
+var item_lookup = {}  # Weapon/armor ids grouped by type and slot (in weapons/armors key order)
 
 
 func _ready():
@@ -16,6 +17,7 @@ func _ready():
 	load_weapons()
 	load_armors()
 	update_items()
+	_build_item_lookup()
 	print("Loaded items: ", items.keys())
 	print("Loaded consumables: ", consumables.keys())
 	print("Loaded materials: ", materials.keys())
@@ -23,25 +25,19 @@ func _ready():
 	print("Loaded armors: ", armors.keys())
 
 func load_consumables():
-	var file = FileAccess.open("res://data/items/consumables.json", FileAccess.READ)
-	var json = JSON.parse_string(file.get_as_text())
-	file.close()
+	var json = ContentPack.load_json("res://data/items/consumables.json")
 	
 	for item_id in json:
 		consumables[item_id] = Item.create_from_dict(item_id, json[item_id])
 
 func load_materials():
-	var file = FileAccess.open("res://data/items/materials.json", FileAccess.READ)
-	var json = JSON.parse_string(file.get_as_text())
-	file.close()
+	var json = ContentPack.load_json("res://data/items/materials.json")
 	
 	for item_id in json:
 		materials[item_id] = Item.create_from_dict(item_id, json[item_id])
 
 func load_weapons():
-	var file = FileAccess.open("res://data/items/weapons.json", FileAccess.READ)
-	var json = JSON.parse_string(file.get_as_text())
-	file.close()
+	var json = ContentPack.load_json("res://data/items/weapons.json")
 	
 	for hand_type in json:
 		for weapon_category in json[hand_type]:
@@ -49,6 +45,7 @@ func load_weapons():
 				if weapon_id != "rarity":
 					var weapon_data = json[hand_type][weapon_category][weapon_id]
 					if typeof(weapon_data) == TYPE_DICTIONARY:
+						weapon_data = weapon_data.duplicate()  # ContentPack data is shared, annotate a copy
 						weapon_data["id"] = weapon_id
 						weapon_data["key"] = weapon_id  # NEW: Add proficiency key
 						equipment_templates[weapon_id] = weapon_data
@@ -56,20 +53,63 @@ func load_weapons():
 						print("ItemManager: Loaded weapon '%s' with key '%s'" % [weapon_data.get("name", ""), weapon_id])
 
 func load_armors():
-	var file = FileAccess.open("res://data/items/armors.json", FileAccess.READ)
-	var json = JSON.parse_string(file.get_as_text())
-	file.close()
+	var json = ContentPack.load_json("res://data/items/armors.json")
 	
 	for armor_type in json:
 		for slot in json[armor_type]:
 			for armor_id in json[armor_type][slot]:
-				var armor_data = json[armor_type][slot][armor_id]
+				var armor_data = json[armor_type][slot][armor_id].duplicate()  # ContentPack data is shared
 				armor_data["id"] = armor_id
 				armor_data["key"] = armor_id  # NEW: Add proficiency key
 				equipment_templates[armor_id] = armor_data
 				armors[armor_id] = armor_data
 				print("ItemManager: Loaded armor '%s' with key '%s'" % [armor_data.get("name", ""), armor_id])
 
+func _build_item_lookup():
+	# Precomputed by DevTools/content_pack.py when the content pack is current
+	item_lookup = ContentPack.get_index("item_lookup")
+	if not item_lookup.is_empty():
+		return
+	
+	item_lookup = {"weapons_by_type": {}, "weapons_by_slot": {}, "armors_by_type": {}, "armors_by_slot": {}, "armors_by_type_slot": {}}
+	for weapon_id in weapons:
+		var weapon_data = weapons[weapon_id]
+		_add_to_lookup("weapons_by_type", str(weapon_data.get("type", "")), weapon_id)
+		_add_to_lookup("weapons_by_slot", str(weapon_data.get("slot", "main_hand")), weapon_id)
+	for armor_id in armors:
+		var armor_data = armors[armor_id]
+		var armor_type = str(armor_data.get("type", ""))
+		var slot = str(armor_data.get("slot", ""))
+		_add_to_lookup("armors_by_type", armor_type, armor_id)
+		_add_to_lookup("armors_by_slot", slot, armor_id)
+		_add_to_lookup("armors_by_type_slot", armor_type + "/" + slot, armor_id)
+
+func _add_to_lookup(index_name: String, value: String, item_id: String):
+	var index = item_lookup[index_name]
+	if not index.has(value):
+		index[value] = []
+	index[value].append(item_id)
+
+func get_weapon_ids(category: String = "", slot: String = "") -> Array:
+	"""Weapon ids of a type and/or slot, in weapons key order (do not modify)"""
+	if category != "" and slot != "":
+		return item_lookup["weapons_by_type"].get(category, []).filter(func(weapon_id): return weapons[weapon_id].get("slot", "main_hand") == slot)
+	if category != "":
+		return item_lookup["weapons_by_type"].get(category, [])
+	if slot != "":
+		return item_lookup["weapons_by_slot"].get(slot, [])
+	return weapons.keys()
+
+func get_armor_ids(type: String = "", slot: String = "") -> Array:
+	"""Armor ids of a type and/or slot, in armors key order (do not modify)"""
+	if type != "" and slot != "":
+		return item_lookup["armors_by_type_slot"].get(type + "/" + slot, [])
+	if type != "":
+		return item_lookup["armors_by_type"].get(type, [])
+	if slot != "":
+		return item_lookup["armors_by_slot"].get(slot, [])
+	return armors.keys()
+
 func create_equipment_instance(item_id: String) -> Equipment:
 	"""Creates a NEW equipment instance with fresh random rolls"""
 	if not equipment_templates.has(item_id):
@@ -116,25 +156,15 @@ func get_random_material() -> String:
 	return ""
 	
 func get_random_weapon(category: String = "") -> String:
-	if weapons.size() > 0:
-		var available_weapons = weapons.keys()
-		if category != "":
-			available_weapons = available_weapons.filter(func(weapon_id): return weapons[weapon_id].type == category)
-		
-		if available_weapons.size() > 0:
-			return available_weapons[RandomManager.randi() % available_weapons.size()]
+	var available_weapons = get_weapon_ids(category)
+	if available_weapons.size() > 0:
+		return available_weapons[RandomManager.randi() % available_weapons.size()]
 	return ""
 
 func get_random_armor(type: String = "", slot: String = "") -> String:
-	if armors.size() > 0:
-		var available_armors = armors.keys()
-		if type != "":
-			available_armors = available_armors.filter(func(armor_id): return armors[armor_id].type == type)
-		if slot != "":
-			available_armors = available_armors.filter(func(armor_id): return armors[armor_id].slot == slot)
-		
-		if available_armors.size() > 0:
-			return available_armors[RandomManager.randi() % available_armors.size()]
+	var available_armors = get_armor_ids(type, slot)
+	if available_armors.size() > 0:
+		return available_armors[RandomManager.randi() % available_armors.size()]
 	return ""
 
 func get_random_equipment() -> String:
@@ -243,10 +273,10 @@ func get_random_armor_biased(character_class: String = "", slot: String = "") ->
 # ADD: Helper for slot filtering
 func _get_armors_by_type_and_slot(armor_types: Array, slot: String) -> Array:
 	"""Get armor IDs matching both type and slot"""
+	# Only this slot's armors are scanned; order stays that of armors.keys()
 	var result = []
-	for armor_id in armors.keys():
-		var template = get_equipment_template(armor_id)
-		if template.get("type", "") in armor_types and template.get("slot", "") == slot:
+	for armor_id in get_armor_ids("", slot):
+		if armors[armor_id].get("type", "") in armor_types:
 			result.append(armor_id)
 	return result
 
@@ -1,13 +1,22 @@
 # res://scripts/autoload/RaceElementalData.gd
 # Autoload singleton that loads race elemental data from races.json
 # Provides lookup for resistances, weaknesses, and damage bonuses
+# Uses the precomputed rows of data/element_matrix.json (DevTools/content_elements.py) when present
+# and in sync with races.json
 
 extends Node
 
+const MATRIX_PATH = "res://data/element_matrix.json"
+const MATRIX_FORMAT = "uldtale-element-matrix"
+const MATRIX_VERSION = 1
+const MATRIX_FIELDS = ["elemental_resistances", "elemental_weaknesses", "elemental_damage_bonuses"]
+
 var race_data: Dictionary = {}
+var element_matrix: Dictionary = {}  # empty when missing or stale
 
 func _ready():
 	load_data()
+	_load_element_matrix()
 
 func load_data():
 	var path = "res://data/races.json"
@@ -16,19 +25,45 @@ func load_data():
 		push_error("RaceElementalData: races.json not found at " + path)
 		return
 	
-	var file = FileAccess.open(path, FileAccess.READ)
-	if file:
-		var result = JSON.parse_string(file.get_as_text())
-		if typeof(result) == TYPE_DICTIONARY:
-			race_data = result
-			print(" Loaded race elemental data from races.json")
-			print("   Playable races: ", race_data.get("playable", {}).keys())
-			print("   NPC races: ", race_data.get("non_playable", {}).keys())
-		else:
-			push_error("RaceElementalData: Invalid JSON format in races.json")
-		file.close()
+	var result = ContentPack.load_json(path)
+	if typeof(result) == TYPE_DICTIONARY:
+		race_data = result
+		print(" Loaded race elemental data from races.json")
+		print("   Playable races: ", race_data.get("playable", {}).keys())
+		print("   NPC races: ", race_data.get("non_playable", {}).keys())
 	else:
-		push_error("RaceElementalData: Could not open races.json")
+		push_error("RaceElementalData: Invalid JSON format in races.json")
+
+func _load_element_matrix():
+	element_matrix = {}
+	if not FileAccess.file_exists(MATRIX_PATH):
+		return
+	var table = ContentPack.load_json(MATRIX_PATH)
+	if typeof(table) != TYPE_DICTIONARY or table.get("format") != MATRIX_FORMAT or int(table.get("version", 0)) != MATRIX_VERSION:
+		push_warning("RaceElementalData: ignoring %s (unknown format)" % MATRIX_PATH)
+		return
+	# Stale if races.json changed after it was built: fall back to the race dictionaries
+	for category in ["playable", "non_playable"]:
+		for race_name in race_data.get(category, {}):
+			var source = table.sources.races.get("%s/%s" % [category, race_name])
+			if source == null or not _matches_source(source, race_data[category][race_name]):
+				push_warning("RaceElementalData: %s is out of date, using races.json" % MATRIX_PATH)
+				return
+	element_matrix = table
+
+func _matches_source(source: Dictionary, race: Dictionary) -> bool:
+	for field in MATRIX_FIELDS:
+		var values = race.get(field, {})
+		if typeof(values) != TYPE_DICTIONARY or source.get(field, {}) != values:
+			return false
+	return true
+
+func get_element_row(race_name: String, is_playable: bool = true) -> Dictionary:
+	"""Precomputed {resist, weak, bonus, taken} arrays in element_matrix.elements order, {} if unavailable"""
+	if element_matrix.is_empty():
+		return {}
+	var category = "playable" if is_playable else "non_playable"
+	return element_matrix.races.get(category, {}).get(race_name, {})
 
 func get_race_elemental_data(race_name: String, is_playable: bool = true) -> Dictionary:
 	"""Get elemental data for a specific race"""
@@ -57,6 +92,17 @@ func apply_to_character(character: CharacterData, race_name: String, is_playable
 		push_error("RaceElementalData: Character missing elemental_resistances manager")
 		return
 	
+	var row = get_element_row(race_name, is_playable)
+	if not row.is_empty():
+		# Already filtered to ElementalDamage.Element names and clamped like the setters
+		var elements = element_matrix.elements
+		for i in range(elements.size()):
+			var element = ElementalDamage.Element[elements[i]]
+			character.elemental_resistances.set_base_resistance(element, float(row.resist[i]))
+			character.elemental_resistances.set_base_weakness(element, float(row.weak[i]))
+			character.elemental_resistances.set_damage_bonus(element, float(row.bonus[i]))
+		return
+	
 	var data = get_race_elemental_data(race_name, is_playable)
 	
 	# Apply resistances
@@ -3,9 +3,15 @@ extends Node
 
 const SAVE_DIR = "user://saves/"
 const SAVE_FILE_EXTENSION = ".json"
+# item renames/deletions and skill/class/race renames recorded by the content tools
+# (DevTools/content_migrate.py, content_refs.py)
+const MIGRATIONS_FILE = "res://data/save_migrations.json"
+
+var migrations: Dictionary = {}
 
 func _ready():
 	create_save_directory()
+	load_migrations()
 
 func create_save_directory():
 	if not DirAccess.dir_exists_absolute(SAVE_DIR):
@@ -17,8 +23,93 @@ func get_save_file_path(character_name: String) -> String:
 func save_exists(character_name: String) -> bool:
 	return FileAccess.file_exists(get_save_file_path(character_name))
 
+func load_migrations():
+	migrations = {}
+	if not FileAccess.file_exists(MIGRATIONS_FILE):
+		return
+	var data = JSON.parse_string(FileAccess.get_file_as_string(MIGRATIONS_FILE))
+	if typeof(data) == TYPE_DICTIONARY and data.get("format", "") == "uldtale-save-migrations":
+		migrations = data
+
+func get_content_version() -> int:
+	return int(migrations.get("version", 0))
+
+# Renamed item ids are rewritten and deleted ones dropped (with a warning) instead of
+# silently failing the ItemManager lookup, and renamed skills / class / race follow their new
+# names; mirrors content_migrate.migrate_save
+func migrate_save_data(save_data: Dictionary):
+	var version = int(save_data.get("content_version", 0))
+	for step in migrations.get("steps", []):
+		if int(step.get("version", 0)) <= version:
+			continue
+		var renames = step.get("renames", {})
+		var deleted = step.get("deletions", [])
+		for box in ["inventory", "stash"]:
+			if not box in save_data or typeof(save_data[box]) != TYPE_DICTIONARY:
+				continue
+			var kept = {}
+			for item_key in save_data[box]:
+				var item_data = save_data[box][item_key]
+				if typeof(item_data) != TYPE_DICTIONARY:
+					print("SaveManager: dropped malformed entry ", item_key, " from ", box)
+					continue
+				if item_data.get("is_equipment", false):
+					var base_id = item_data.get("base_id", "")
+					if base_id in deleted:
+						print("SaveManager: dropped deleted item ", base_id, " from ", box)
+						continue
+					if base_id in renames:
+						item_data["base_id"] = renames[base_id]
+					kept[item_key] = item_data
+				else:
+					if item_key in deleted:
+						print("SaveManager: dropped deleted item ", item_key, " from ", box)
+						continue
+					var new_key = renames.get(item_key, item_key)
+					if new_key in kept:
+						kept[new_key]["quantity"] = kept[new_key].get("quantity", 0) + item_data.get("quantity", 0)
+					else:
+						kept[new_key] = item_data
+			save_data[box] = kept
+		if "equipment" in save_data and typeof(save_data["equipment"]) == TYPE_DICTIONARY:
+			for slot in save_data["equipment"].keys():
+				var equip_data = save_data["equipment"][slot]
+				if typeof(equip_data) != TYPE_DICTIONARY:
+					continue
+				var item_id = equip_data.get("id", "")
+				if item_id in deleted:
+					print("SaveManager: unequipped deleted item ", item_id)
+					save_data["equipment"].erase(slot)
+				elif item_id in renames:
+					equip_data["id"] = renames[item_id]
+		_rename_keys(save_data, step)
+		version = int(step.get("version", 0))
+	save_data["content_version"] = version
+
+func _rename_keys(save_data: Dictionary, step: Dictionary):
+	var skill_renames = step.get("skill_renames", {})
+	if not skill_renames.is_empty():
+		if "skills" in save_data and save_data["skills"] is Array:
+			var skills = save_data["skills"]
+			for i in range(skills.size()):
+				if typeof(skills[i]) == TYPE_STRING and skills[i] in skill_renames:
+					print("SaveManager: renamed skill ", skills[i], " -> ", skill_renames[skills[i]])
+					skills[i] = skill_renames[skills[i]]
+		if "skill_levels" in save_data and typeof(save_data["skill_levels"]) == TYPE_DICTIONARY:
+			var levels = {}
+			for skill_name in save_data["skill_levels"]:
+				levels[skill_renames.get(skill_name, skill_name)] = save_data["skill_levels"][skill_name]
+			save_data["skill_levels"] = levels
+	for pair in [["class_renames", "character_class"], ["race_renames", "race"]]:
+		var mapping = step.get(pair[0], {})
+		var value = save_data.get(pair[1])
+		if typeof(value) == TYPE_STRING and value in mapping:
+			print("SaveManager: renamed ", pair[1], " ", value, " -> ", mapping[value])
+			save_data[pair[1]] = mapping[value]
+
 func save_game(player: CharacterData):
 	var save_data = {
+		"content_version": get_content_version(),
 		"name": player.name,
 		"race": player.race,
 		"character_class": player.character_class,
@@ -65,7 +156,8 @@ func save_game(player: CharacterData):
 				"rarity": item.rarity,
 				"rarity_applied": item.rarity_applied,
 				"damage": item.damage,
-				"armor_value": item.armor_value
+				"armor_value": item.armor_value,
+				"item_level": item.item_level
 			}
 			
 			# CRITICAL FIX: Convert enum keys to strings for JSON
@@ -111,7 +203,8 @@ func save_game(player: CharacterData):
 				"rarity": item.rarity,
 				"rarity_applied": item.rarity_applied,
 				"damage": item.damage,
-				"armor_value": item.armor_value
+				"armor_value": item.armor_value,
+				"item_level": item.item_level
 			}
 			
 			# CRITICAL FIX: Convert enum keys to strings
@@ -154,6 +247,7 @@ func save_game(player: CharacterData):
 				"rarity_applied": equipped_item.rarity_applied,
 				"damage": equipped_item.damage,
 				"armor_value": equipped_item.armor_value,
+				"item_level": equipped_item.item_level,
 				"inventory_key": equipped_item.inventory_key
 			}
 			
@@ -204,6 +298,7 @@ func load_game(character_name: String) -> CharacterData:
 	if save_data == null:
 		print("Error: Could not parse save data for character: ", character_name)
 		return null
+	migrate_save_data(save_data)
 
 	var player = CharacterData.new()
 	player.name = save_data.get("name", "")
@@ -264,6 +359,7 @@ func load_game(character_name: String) -> CharacterData:
 					base_item.rarity_applied = item_data.get("rarity_applied", false)
 					base_item.damage = item_data.get("damage", base_item.damage)
 					base_item.armor_value = item_data.get("armor_value", base_item.armor_value)
+					base_item.item_level = item_data.get("item_level", base_item.item_level)
 					base_item.inventory_key = item_key
 					
 					# CRITICAL FIX: Convert string keys back to enum
@@ -311,6 +407,7 @@ func load_game(character_name: String) -> CharacterData:
 					base_item.rarity_applied = item_data.get("rarity_applied", false)
 					base_item.damage = item_data.get("damage", base_item.damage)
 					base_item.armor_value = item_data.get("armor_value", base_item.armor_value)
+					base_item.item_level = item_data.get("item_level", base_item.item_level)
 					base_item.inventory_key = item_key
 					
 					# CRITICAL FIX: Convert string keys back to enum
@@ -357,6 +454,7 @@ func load_game(character_name: String) -> CharacterData:
 					item.rarity_applied = equip_data.get("rarity_applied", false)
 					item.damage = equip_data.get("damage", item.damage)
 					item.armor_value = equip_data.get("armor_value", item.armor_value)
+					item.item_level = equip_data.get("item_level", item.item_level)
 					item.inventory_key = equip_data.get("inventory_key", item.id)
 					
 					# CRITICAL FIX: Convert string keys back to enum
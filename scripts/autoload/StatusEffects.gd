@@ -18,17 +18,7 @@ func _load_status_effects():
 		push_error("StatusEffects: JSON file not found at " + path)
 		return
 	
-	var file = FileAccess.open(path, FileAccess.READ)
-	if not file:
-		push_error("StatusEffects: Could not open file at " + path)
-		return
-	
-	var json_text = file.get_as_text()
-	file.close()
-	
-	print("[StatusEffects] JSON text length: %d" % json_text.length())
-	
-	var result = JSON.parse_string(json_text)
+	var result = ContentPack.load_json(path)
 	if typeof(result) != TYPE_DICTIONARY:
 		push_error("StatusEffects: Invalid JSON format in " + path)
 		push_error("StatusEffects: JSON parse result type: %d" % typeof(result))
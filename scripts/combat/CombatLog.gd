@@ -0,0 +1,145 @@
+# CombatLog.gd
+# Structured combat transcript for headless runs and balance work
+# One JSON object per line (read by DevTools/content_combatlog.py). Off unless the game is
+# started with `-- --combat-log[=path]` or ULDTALE_COMBAT_LOG is set; the default path is
+# user://combat_log.jsonl. "stdout" prints the events (prefixed "@clog ") between the usual
+# console output instead of writing a file.
+#
+# Events (all carry "ev", "b" = battle id, "turn"):
+#   log     format / version header, once per run
+#   battle  floor, wave, boss, pvp, units [{name, class, race, level, hp, side}]
+#   turn    actor
+#   effect  actor, effect, damage, healing, left (turns remaining), us
+#   action  actor, action (attack/skill/item/defend), skill, target, damage, healing,
+#           crit, miss, dodge, effects (status effects applied), us
+#   damage  target, source, amount, hp (every CharacterData.take_damage)
+#   skip    actor, reason
+#   end     outcome (victory/defeat), turns, us
+
+class_name CombatLog
+extends RefCounted
+
+const LOG_FORMAT = "uldtale-combat-log"
+const LOG_VERSION = 1
+const DEFAULT_PATH = "user://combat_log.jsonl"
+const STDOUT_PREFIX = "@clog "
+
+static var active: bool = false
+static var _checked: bool = false
+static var _file: FileAccess = null
+static var _session: String = ""
+static var _battles: int = 0
+static var _battle: String = ""
+static var _turn: int = 0
+static var _battle_start_usec: int = 0
+
+static func is_on() -> bool:
+	if not _checked:
+		_open()
+	return active
+
+static func _open():
+	_checked = true
+	var path = OS.get_environment("ULDTALE_COMBAT_LOG")
+	for arg in OS.get_cmdline_user_args():
+		if arg == "--combat-log":
+			path = DEFAULT_PATH
+		elif arg.begins_with("--combat-log="):
+			path = arg.substr("--combat-log=".length())
+	if path == "":
+		return
+	if path != "stdout":
+		_file = FileAccess.open(path, FileAccess.READ_WRITE if FileAccess.file_exists(path) else FileAccess.WRITE)
+		if _file == null:
+			push_warning("CombatLog: cannot open %s" % path)
+			return
+		_file.seek_end()
+	active = true
+	# battle ids stay unique when several runs append to one file
+	_session = "%x%04x" % [int(Time.get_unix_time_from_system()), randi() % 0x10000]
+	_write({"ev": "log", "format": LOG_FORMAT, "version": LOG_VERSION, "session": _session,
+		"started": Time.get_datetime_string_from_system()})
+
+static func _write(event: Dictionary):
+	var line = JSON.stringify(event)
+	if _file:
+		_file.store_line(line)
+	else:
+		print(STDOUT_PREFIX + line)
+
+static func _event(kind: String, fields: Dictionary):
+	fields["ev"] = kind
+	fields["b"] = _battle
+	fields["turn"] = _turn
+	_write(fields)
+
+static func _unit(character: CharacterData, side: String) -> Dictionary:
+	return {"name": character.name, "class": character.character_class, "race": character.race,
+		"level": character.level, "hp": character.max_hp, "side": side}
+
+# === BATTLE FLOW ===
+
+static func begin_battle(context: BattleContext):
+	if not is_on():
+		return
+	_battles += 1
+	_battle = "%s-%d" % [_session, _battles]
+	_turn = 0
+	_battle_start_usec = Time.get_ticks_usec()
+	var units = [_unit(context.player, "player")]
+	for enemy in context.enemies:
+		units.append(_unit(enemy, "enemy"))
+	_event("battle", {"floor": context.current_floor, "wave": context.current_wave,
+		"boss": context.is_boss_battle, "pvp": context.is_pvp_mode, "units": units})
+
+static func turn(turn_number: int, character: CharacterData):
+	if not active:
+		return
+	_turn = turn_number
+	_event("turn", {"actor": character.name})
+
+static func skip(character: CharacterData, reason: String):
+	if not active:
+		return
+	_event("skip", {"actor": character.name, "reason": reason})
+
+static func end_battle(player_won: bool):
+	if not active or _battle == "":
+		return
+	_event("end", {"outcome": "victory" if player_won else "defeat", "turns": _turn,
+		"us": Time.get_ticks_usec() - _battle_start_usec})
+	_battle = ""
+	if _file:
+		_file.flush()
+
+# === HOT PATH ===
+
+static func action(act: BattleAction, result: ActionResult, usec: int):
+	if not active:
+		return
+	var kind = BattleAction.ActionType.keys()[act.type].to_lower()
+	var skill_name = ""
+	if act.type == BattleAction.ActionType.SKILL and act.skill_data:
+		skill_name = act.skill_data.name
+	elif act.type == BattleAction.ActionType.ITEM and act.item_data:
+		skill_name = act.item_data.id
+	var effects = []
+	for effect in result.status_effects:
+		effects.append(effect.get("name", ""))
+	_event("action", {"actor": act.actor.name if act.actor else "",
+		"action": kind, "skill": skill_name,
+		"target": act.primary_target.name if act.primary_target else "",
+		"damage": result.damage, "healing": result.healing, "crit": result.is_critical,
+		"miss": result.was_missed, "dodge": result.was_dodged, "effects": effects, "us": usec})
+
+static func effect_tick(character: CharacterData, effect_name: String, damage: int, healing: int, left: int, usec: int):
+	if not active:
+		return
+	_event("effect", {"actor": character.name, "effect": effect_name, "damage": damage,
+		"healing": healing, "left": left, "us": usec})
+
+static func damage(target: CharacterData, amount: int, source: CharacterData):
+	if not active:
+		return
+	_event("damage", {"target": target.name, "source": source.name if source else "",
+		"amount": amount, "hp": target.current_hp})
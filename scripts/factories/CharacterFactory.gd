@@ -10,16 +10,14 @@ static var _classes_data: Dictionary = {}
 
 static func _load_data():
 	if _races_data.is_empty():
-		var file = FileAccess.open(RACES_PATH, FileAccess.READ)
-		if file:
-			_races_data = JSON.parse_string(file.get_as_text())
-			file.close()
+		var races = ContentPack.load_json(RACES_PATH)
+		if races:
+			_races_data = races
 	
 	if _classes_data.is_empty():
-		var file = FileAccess.open(CLASSES_PATH, FileAccess.READ)
-		if file:
-			_classes_data = JSON.parse_string(file.get_as_text())
-			file.close()
+		var classes = ContentPack.load_json(CLASSES_PATH)
+		if classes:
+			_classes_data = classes
 
 static func create_character(char_name: String, race: String, char_class: String, is_player: bool = false) -> CharacterData:
 	_load_data()
@@ -18,6 +18,11 @@ var players := {}
 var local_player_id := 1
 var match_seed := 0
 
+# Compact payloads (ArenaWire) once both sides have the same wire table
+var wire_enabled := false
+var _wire_out := ArenaWire.ActionStream.new()
+var _wire_in := ArenaWire.ActionStream.new()
+
 func _ready():
 	multiplayer.peer_connected.connect(_on_peer_connected)
 	multiplayer.peer_disconnected.connect(_on_peer_disconnected)
@@ -73,6 +78,7 @@ func disconnect_from_match():
 	players.clear()
 	is_host = false
 	match_seed = 0
+	_reset_wire(false)
 	multiplayer.multiplayer_peer = null
 	print("[ARENA NET] Disconnected from match")
 
@@ -83,7 +89,7 @@ func _on_peer_connected(id: int):
 	
 	if is_host:
 		match_seed = RandomManager.new_game_seed()
-		rpc_id(id, "_receive_match_setup", match_seed)
+		rpc_id(id, "_receive_match_setup", match_seed, ArenaWire.version())
 
 func _on_peer_disconnected(id: int):
 	print("[ARENA NET] Peer disconnected: %d" % id)
@@ -137,11 +143,20 @@ func _register_player(peer_id: int, character_data: Dictionary):
 	if is_host and peer_id != local_player_id:
 		print("[ARENA NET] Sending host character to client %d" % peer_id)
 		var host_character = players[local_player_id].character
-		rpc_id(peer_id, "_receive_host_character", local_player_id, _serialize_character(host_character))
+		if wire_enabled:
+			rpc_id(peer_id, "_receive_host_character_packed", local_player_id, ArenaWire.encode(_serialize_character(host_character)))
+		else:
+			rpc_id(peer_id, "_receive_host_character", local_player_id, _serialize_character(host_character))
 	
 	if players.size() == 2:
 		print("[ARENA NET] Both players connected, ready to start")
 
+@rpc("any_peer", "reliable")
+func _register_player_packed(peer_id: int, character_bytes: PackedByteArray):
+	# The client only sends this when its wire table matches ours
+	_reset_wire(true)
+	_register_player(peer_id, ArenaWire.decode(character_bytes))
+
 @rpc("authority", "reliable")
 func _receive_host_character(host_id: int, character_data: Dictionary):
 	print("[ARENA NET] Received host character (ID: %d)" % host_id)
@@ -157,13 +172,22 @@ func _receive_host_character(host_id: int, character_data: Dictionary):
 	emit_signal("player_connected", host_id, players[host_id])
 
 @rpc("authority", "reliable")
-func _receive_match_setup(seed: int):
+func _receive_host_character_packed(host_id: int, character_bytes: PackedByteArray):
+	_receive_host_character(host_id, ArenaWire.decode(character_bytes))
+
+@rpc("authority", "reliable")
+func _receive_match_setup(seed: int, wire_version: int = 0):
 	print("[ARENA NET] Received match setup with seed: %d" % seed)
 	match_seed = seed
 	RandomManager.seed = seed
+	# Older hosts send no version; a different wire table means plain dictionaries
+	_reset_wire(wire_version != 0 and wire_version == ArenaWire.version())
 	
 	var character = CharacterManager.get_current_character()
-	rpc_id(1, "_register_player", local_player_id, _serialize_character(character))
+	if wire_enabled:
+		rpc_id(1, "_register_player_packed", local_player_id, ArenaWire.encode(_serialize_character(character)))
+	else:
+		rpc_id(1, "_register_player", local_player_id, _serialize_character(character))
 
 @rpc("any_peer", "call_local", "reliable")
 func _player_ready(peer_id: int):
@@ -189,6 +213,11 @@ func _send_action(action_data: Dictionary):
 	print("[ARENA NET] Action received from %d (timestamp: %d)" % [sender_id, action_data.get("timestamp", 0)])
 	emit_signal("action_received", sender_id, action_data)
 
+@rpc("any_peer", "call_remote", "reliable")
+func _send_action_packed(action_bytes: PackedByteArray):
+	# Delta against the previous packed action; reliable RPCs arrive in order
+	_send_action(_wire_in.decode(action_bytes))
+
 @rpc("any_peer", "call_local", "reliable")
 func _end_match(winner_id: int):
 	print("[ARENA NET] Match ended, winner: %d" % winner_id)
@@ -204,7 +233,10 @@ func send_action(action: Dictionary):
 	"""Send combat action to opponent"""
 	if multiplayer.multiplayer_peer:
 		print("[ARENA NET] Sending action to opponent (timestamp: %d)" % action.get("timestamp", 0))
-		rpc("_send_action", action)
+		if wire_enabled:
+			rpc("_send_action_packed", _wire_out.encode(action))
+		else:
+			rpc("_send_action", action)
 
 func send_battle_end(winner_id: int):
 	"""Send battle end notification to opponent"""
@@ -251,6 +283,11 @@ func _start_match():
 	print("[ARENA NET] Match starting! (is_host: %s)" % is_host)
 	emit_signal("match_started", is_host)
 
+func _reset_wire(enabled: bool):
+	wire_enabled = enabled
+	_wire_out = ArenaWire.ActionStream.new()
+	_wire_in = ArenaWire.ActionStream.new()
+
 # === CHARACTER SERIALIZATION ===
 
 func _serialize_character(character: CharacterData) -> Dictionary:
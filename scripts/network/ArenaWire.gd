@@ -0,0 +1,257 @@
+# ArenaWire.gd
+# Compact arena payloads (DevTools/content_wire.py writes the table and benchmarks the format)
+# Strings listed in res://data/wire_ids.json travel as their index; peers use the format only when
+# both have the same table (version() is its CRC, 0 when missing). Values are tagged: ints 0..63
+# and the first 128 strings of the table fit in one byte. Actions are sent as deltas against the
+# previous action of the same direction (ActionStream), which the reliable RPC channel keeps in order.
+
+class_name ArenaWire
+extends RefCounted
+
+const TABLE_PATH = "res://data/wire_ids.json"
+const TABLE_FORMAT = "uldtale-wire-ids"
+const TABLE_VERSION = 1
+
+# BattleNetworkSync._serialize_action_result fields, in delta mask bit order
+const ACTION_FIELDS = [
+	"type", "timestamp", "damage", "healing", "sp_cost", "mp_cost", "sp_gain", "mp_gain", "message",
+	"target_is_opponent", "is_drain", "status_effects", "status_effects_removed", "buffs_debuffs",
+	"skill_name", "item_id"
+]
+const EXTRA_BIT = 1 << 16  # other keys follow as one dictionary
+
+enum { T_NIL, T_FALSE, T_TRUE, T_INT, T_F32, T_F64, T_SYM, T_STR, T_LIST, T_DICT, T_ABSENT }
+const SMALL_INT = 0x40
+const SMALL_SYM = 0x80
+
+static var _loaded: bool = false
+static var _crc: int = 0
+static var _strings: Array = []
+static var _ids: Dictionary = {}
+
+static func version() -> int:
+	if not _loaded:
+		_load_table()
+	return _crc
+
+static func _load_table():
+	_loaded = true
+	if not FileAccess.file_exists(TABLE_PATH):
+		return
+	var table = ContentPack.load_json(TABLE_PATH)
+	if typeof(table) != TYPE_DICTIONARY or table.get("format") != TABLE_FORMAT or int(table.get("version", 0)) != TABLE_VERSION:
+		push_warning("ArenaWire: ignoring %s (unknown format)" % TABLE_PATH)
+		return
+	_strings = table.strings
+	for i in range(_strings.size()):
+		_ids[_strings[i]] = i
+	_crc = int(table.crc)
+
+# === VALUES ===
+
+static func encode(value) -> PackedByteArray:
+	var buf = PackedByteArray()
+	_write(buf, value)
+	return buf
+
+static func decode(bytes: PackedByteArray):
+	return _read(bytes, 0)[0]
+
+static func _write(buf: PackedByteArray, v):
+	match typeof(v):
+		TYPE_NIL:
+			buf.append(T_NIL)
+		TYPE_BOOL:
+			buf.append(T_TRUE if v else T_FALSE)
+		TYPE_INT:
+			if v >= 0 and v < 64:
+				buf.append(SMALL_INT | v)
+			else:
+				buf.append(T_INT)
+				_write_uvarint(buf, _zigzag(v))
+		TYPE_FLOAT:
+			var start = buf.size()
+			buf.resize(start + 5)
+			buf.encode_float(start + 1, v)
+			if buf.decode_float(start + 1) == v:
+				buf[start] = T_F32
+			else:
+				buf.resize(start + 9)
+				buf[start] = T_F64
+				buf.encode_double(start + 1, v)
+		TYPE_STRING, TYPE_STRING_NAME:
+			var s = String(v)
+			var id = _ids.get(s, -1)
+			if id >= 0 and id < 128:
+				buf.append(SMALL_SYM | id)
+			elif id >= 0:
+				buf.append(T_SYM)
+				_write_uvarint(buf, id)
+			else:
+				var raw = s.to_utf8_buffer()
+				buf.append(T_STR)
+				_write_uvarint(buf, raw.size())
+				buf.append_array(raw)
+		TYPE_ARRAY:
+			buf.append(T_LIST)
+			_write_uvarint(buf, v.size())
+			for x in v:
+				_write(buf, x)
+		TYPE_DICTIONARY:
+			buf.append(T_DICT)
+			_write_uvarint(buf, v.size())
+			for k in v:
+				_write(buf, k)
+				_write(buf, v[k])
+		_:
+			push_warning("ArenaWire: cannot encode %s, sent as null" % type_string(typeof(v)))
+			buf.append(T_NIL)
+
+static func _read(buf: PackedByteArray, pos: int) -> Array:
+	# -> [value, next position]
+	var tag = buf[pos]
+	pos += 1
+	if tag >= SMALL_SYM:
+		return [_strings[tag & 0x7F], pos]
+	if tag >= SMALL_INT:
+		return [tag & 0x3F, pos]
+	match tag:
+		T_NIL:
+			return [null, pos]
+		T_FALSE:
+			return [false, pos]
+		T_TRUE:
+			return [true, pos]
+		T_INT:
+			var r = _read_uvarint(buf, pos)
+			return [_unzigzag(r[0]), r[1]]
+		T_F32:
+			return [buf.decode_float(pos), pos + 4]
+		T_F64:
+			return [buf.decode_double(pos), pos + 8]
+		T_SYM:
+			var r = _read_uvarint(buf, pos)
+			return [_strings[r[0]], r[1]]
+		T_STR:
+			var r = _read_uvarint(buf, pos)
+			return [buf.slice(r[1], r[1] + r[0]).get_string_from_utf8(), r[1] + r[0]]
+		T_LIST:
+			var r = _read_uvarint(buf, pos)
+			pos = r[1]
+			var out = []
+			for i in range(r[0]):
+				var item = _read(buf, pos)
+				out.append(item[0])
+				pos = item[1]
+			return [out, pos]
+		T_DICT:
+			var r = _read_uvarint(buf, pos)
+			pos = r[1]
+			var out = {}
+			for i in range(r[0]):
+				var k = _read(buf, pos)
+				var item = _read(buf, k[1])
+				out[k[0]] = item[0]
+				pos = item[1]
+			return [out, pos]
+	push_error("ArenaWire: bad tag %d at %d" % [tag, pos - 1])
+	return [null, buf.size()]
+
+static func _write_uvarint(buf: PackedByteArray, n: int):
+	# n is treated as unsigned 64-bit
+	while (n & ~0x7F) != 0:
+		buf.append((n & 0x7F) | 0x80)
+		n = (n >> 7) & 0x01FFFFFFFFFFFFFF
+	buf.append(n)
+
+static func _read_uvarint(buf: PackedByteArray, pos: int) -> Array:
+	var n = 0
+	var shift = 0
+	while true:
+		var b = buf[pos]
+		pos += 1
+		n |= (b & 0x7F) << shift
+		if b < 0x80:
+			return [n, pos]
+		shift += 7
+	return [n, pos]
+
+static func _zigzag(n: int) -> int:
+	return (n << 1) ^ (n >> 63)
+
+static func _unzigzag(n: int) -> int:
+	return ((n >> 1) & 0x7FFFFFFFFFFFFFFF) ^ -(n & 1)
+
+# === ACTION DELTAS ===
+
+static func blank_action() -> Dictionary:
+	return {
+		"type": 0, "timestamp": 0, "damage": 0, "healing": 0,
+		"sp_cost": 0, "mp_cost": 0, "sp_gain": 0, "mp_gain": 0, "message": "",
+		"target_is_opponent": false, "is_drain": false,
+		"status_effects": [], "status_effects_removed": [], "buffs_debuffs": []
+	}
+
+class ActionStream:
+	# One direction of one match; both ends start from blank_action()
+	var prev: Dictionary = ArenaWire.blank_action()
+
+	func encode(action: Dictionary) -> PackedByteArray:
+		var mask = 0
+		var body = PackedByteArray()
+		for bit in range(ArenaWire.ACTION_FIELDS.size()):
+			var key = ArenaWire.ACTION_FIELDS[bit]
+			if not action.has(key):
+				if prev.has(key):
+					mask |= 1 << bit
+					body.append(ArenaWire.T_ABSENT)
+				continue
+			var v = action[key]
+			if prev.has(key) and typeof(prev[key]) == typeof(v) and prev[key] == v:
+				continue
+			mask |= 1 << bit
+			if key == "timestamp" and typeof(v) == TYPE_INT and typeof(prev.get(key)) == TYPE_INT:
+				body.append(ArenaWire.T_INT)
+				ArenaWire._write_uvarint(body, ArenaWire._zigzag(v - prev[key]))
+			else:
+				ArenaWire._write(body, v)
+		var extra = {}
+		for key in action:
+			if key not in ArenaWire.ACTION_FIELDS:
+				extra[key] = action[key]
+		if not extra.is_empty():
+			mask |= ArenaWire.EXTRA_BIT
+			ArenaWire._write(body, extra)
+		var out = PackedByteArray()
+		ArenaWire._write_uvarint(out, mask)
+		out.append_array(body)
+		prev = action.duplicate(true)
+		return out
+
+	func decode(buf: PackedByteArray) -> Dictionary:
+		var r = ArenaWire._read_uvarint(buf, 0)
+		var mask = r[0]
+		var pos = r[1]
+		var action = {}
+		for key in prev:
+			if key in ArenaWire.ACTION_FIELDS:
+				action[key] = prev[key]
+		for bit in range(ArenaWire.ACTION_FIELDS.size()):
+			if not mask & (1 << bit):
+				continue
+			var key = ArenaWire.ACTION_FIELDS[bit]
+			if buf[pos] == ArenaWire.T_ABSENT:
+				action.erase(key)
+				pos += 1
+			elif key == "timestamp" and buf[pos] == ArenaWire.T_INT and typeof(prev.get(key)) == TYPE_INT:
+				var d = ArenaWire._read_uvarint(buf, pos + 1)
+				action[key] = prev[key] + ArenaWire._unzigzag(d[0])
+				pos = d[1]
+			else:
+				var item = ArenaWire._read(buf, pos)
+				action[key] = item[0]
+				pos = item[1]
+		if mask & ArenaWire.EXTRA_BIT:
+			action.merge(ArenaWire._read(buf, pos)[0], true)
+		prev = action.duplicate(true)
+		return action
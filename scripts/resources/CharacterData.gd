@@ -302,6 +302,7 @@ func take_damage(amount: float, attacker: CharacterData = null):
 	current_hp -= int(amount)
 	current_hp = clamp(current_hp, 0, max_hp)
 	print("[DAMAGE] %s took %d damage. HP: %d/%d" % [name, int(amount), current_hp, max_hp])
+	CombatLog.damage(self, int(amount), attacker)
 
 # === EQUIPMENT ===
 func equip_item(item: Equipment) -> Equipment:
@@ -89,6 +89,11 @@ static func calculate_elemental_damage(
 		"is_weak": target_weakness > 0
 	}
 
+# Hot-path form of the multiplier above for one element; `taken` is the target's
+# ElementalResistanceManager.get_damage_taken_multiplier (or a data/element_matrix.json row)
+static func hit_multiplier(attacker_bonus: float, taken: float) -> float:
+	return max((1.0 + attacker_bonus) * taken, 0.1)
+
 # Get status effect proc chance based on element
 static func get_status_proc_chance(element: Element, base_chance: float = 0.3) -> float:
 	"""Returns the chance to apply status effect from elemental attack"""
@@ -141,7 +141,13 @@ func update_effects() -> String:
 			effects_to_remove.append(effect)
 		else:
 			print("[STATUS MGR]   Calling _process_effect_damage...")
+			var hp_before = character.current_hp
+			var start_usec = Time.get_ticks_usec()
 			var effect_msg = _process_effect_damage(effect)
+			if CombatLog.active:
+				var hp_change = character.current_hp - hp_before
+				CombatLog.effect_tick(character, effect_name, max(0, -hp_change), max(0, hp_change),
+					new_duration, Time.get_ticks_usec() - start_usec)
 			print("[STATUS MGR]   _process_effect_damage returned: '%s'" % effect_msg)
 			message += effect_msg
 	